@@ -0,0 +1,480 @@
+import operator
+
+import numpy as np
+
+from zoonomia.solution import (
+    BasisOperator, ConstantTerminal, VariableTerminal, OperatorSet, Objective
+)
+from zoonomia.interpreter import (
+    Interpreter, BitwiseInterpreter, bitwise_if, popcount
+)
+
+
+class Problem(object):
+
+    __slots__ = (
+        'name', 'basis_set', 'terminal_set', 'dtype', 'objectives',
+        'max_depth', 'solved', 'interpreter'
+    )
+
+    def __init__(
+        self, name, basis_set, terminal_set, dtype, objectives, max_depth,
+        solved, interpreter
+    ):
+        """A Problem is a standard genetic programming benchmark: the typed
+        operators trees are built from, the objective they are scored by and
+        a test of whether a solution solves the problem.
+
+        :param name: The name of the problem.
+        :type name: str
+
+        :param basis_set: The basis operators.
+        :type basis_set: zoonomia.solution.OperatorSet[BasisOperator]
+
+        :param terminal_set: The terminal operators.
+        :type terminal_set: zoonomia.solution.OperatorSet[TerminalOperator]
+
+        :param dtype: The return type of a solution's tree.
+        :type dtype: type
+
+        :param objectives: The objectives solutions are scored by.
+        :type objectives: tuple[zoonomia.solution.Objective]
+
+        :param max_depth: The maximum depth of the initial population's trees.
+        :type max_depth: int
+
+        :param solved: Whether a solution solves the problem.
+        :type solved: (zoonomia.solution.Solution) -> bool
+
+        :param interpreter: The interpreter the objectives evaluate trees with.
+        :type interpreter: zoonomia.interpreter.Interpreter
+
+        """
+        self.name = name
+        self.basis_set = basis_set
+        self.terminal_set = terminal_set
+        self.dtype = dtype
+        self.objectives = objectives
+        self.max_depth = max_depth
+        self.solved = solved
+        self.interpreter = interpreter
+
+    def __repr__(self):
+        return 'Problem(name={name})'.format(name=repr(self.name))
+
+
+# Symbolic regression
+
+
+def protected_div(a, b):
+    with np.errstate(all='ignore'):
+        return np.where(np.abs(b) > 1e-6, np.divide(a, b), 1.0)
+
+
+def protected_log(a):
+    with np.errstate(all='ignore'):
+        return np.where(np.abs(a) > 1e-6, np.log(np.abs(a)), 0.0)
+
+
+def exp(a):
+    with np.errstate(all='ignore'):
+        return np.exp(a)
+
+
+def _regression(name, columns, target, constants=()):
+    basis_set = OperatorSet(operators=tuple(
+        BasisOperator(func=func, signature=signature, dtype=float)
+        for func, signature in (
+            (np.add, (float, float)),
+            (np.subtract, (float, float)),
+            (np.multiply, (float, float)),
+            (protected_div, (float, float)),
+            (np.sin, (float,)),
+            (np.cos, (float,)),
+            (exp, (float,)),
+            (protected_log, (float,))
+        )
+    ))
+    terminal_set = OperatorSet(operators=tuple(
+        VariableTerminal(name=column, dtype=float) for column in columns
+    ) + tuple(
+        ConstantTerminal(value=value, dtype=float) for value in constants
+    ))
+    interpreter = Interpreter(bindings=columns)
+
+    def errors(solution):
+        with np.errstate(all='ignore'):
+            e = np.abs(interpreter.evaluate(solution.tree) - target)
+        return np.where(np.isfinite(e), e, np.inf)
+
+    def error(solution):
+        return float(np.sum(errors(solution)))
+
+    def solved(solution):
+        return (
+            -solution.evaluate()[0].score <= 0.01 * len(target) and
+            bool(np.all(errors(solution) <= 0.01))
+        )
+
+    return Problem(
+        name=name,
+        basis_set=basis_set,
+        terminal_set=terminal_set,
+        dtype=float,
+        objectives=(Objective(eval_func=error, weight=-1.0),),
+        max_depth=6,
+        solved=solved,
+        interpreter=interpreter
+    )
+
+
+def koza_1(n_cases=20, seed=0):
+    """Koza's quartic polynomial :math:`x^4 + x^3 + x^2 + x` on *n_cases*
+    points drawn uniformly from [-1, 1] (see Koza1992). A solution is scored
+    by the sum of its absolute errors, and solves the problem when every error
+    is within 0.01.
+
+    :rtype: benchmarks.problems.Problem
+
+    """
+    x = np.random.RandomState(seed).uniform(-1.0, 1.0, n_cases)
+    return _regression(
+        name='koza-1',
+        columns={'x': x},
+        target=x ** 4 + x ** 3 + x ** 2 + x
+    )
+
+
+def pagie_1():
+    """Pagie and Hogeweg's :math:`1 / (1 + x^{-4}) + 1 / (1 + y^{-4})` on a
+    grid of 676 points over [-5, 5] x [-5, 5] (see Pagie1997), with the
+    constant 1.0 as an extra terminal. Scored like *koza_1*.
+
+    :rtype: benchmarks.problems.Problem
+
+    """
+    x, y = np.meshgrid(np.linspace(-5.0, 5.0, 26), np.linspace(-5.0, 5.0, 26))
+    x = x.ravel()
+    y = y.ravel()
+    return _regression(
+        name='pagie-1',
+        columns={'x': x, 'y': y},
+        target=1.0 / (1.0 + x ** -4) + 1.0 / (1.0 + y ** -4),
+        constants=(1.0,)
+    )
+
+
+# Boolean problems
+
+
+def and_(a, b): return a and b
+
+
+def or_(a, b): return a or b
+
+
+def not_(a): return not a
+
+
+def if_(a, b, c): return b if a else c
+
+
+def nand(a, b): return not (a and b)
+
+
+def nor(a, b): return not (a or b)
+
+
+def _bitwise_and(a, b): return a & b
+
+
+def _bitwise_or(a, b): return a | b
+
+
+def _bitwise_not(a): return ~a
+
+
+def _bitwise_nand(a, b): return ~(a & b)
+
+
+def _bitwise_nor(a, b): return ~(a | b)
+
+
+def _packed_input(i, n_inputs):
+    """The packed values of the *i*-th of *n_inputs* inputs when the
+    :math:`c`-th fitness case sets each input to the corresponding bit of
+    :math:`c`: runs of :math:`2^i` zeros and ones, built without enumerating
+    the :math:`2^{n\\_inputs}` fitness cases.
+
+    """
+    run = 1 << i
+    packed = ((1 << run) - 1) << run
+    width = run << 1
+    while width < 1 << n_inputs:
+        packed |= packed << width
+        width <<= 1
+    return packed
+
+
+def _boolean(name, functions, input_names, target):
+    basis_set = OperatorSet(operators=tuple(
+        BasisOperator(
+            func=func, signature=(bool,) * arity, dtype=bool, bitwise=bitwise
+        )
+        for func, bitwise, arity in functions
+    ))
+    terminals = tuple(
+        VariableTerminal(name=input_name, dtype=bool)
+        for input_name in input_names
+    )
+    n_cases = 1 << len(input_names)
+    inputs = [
+        _packed_input(i, len(input_names)) for i in xrange(len(input_names))
+    ]
+    interpreter = BitwiseInterpreter(bindings={}, n_cases=n_cases)
+    # The inputs are packed already, so they are bound after construction
+    # rather than unpacked into 2^n_inputs booleans only to be packed again.
+    interpreter.bindings.update(zip(input_names, inputs))
+    packed_target = target(inputs) & interpreter.mask
+
+    def hits(solution):
+        output = interpreter.evaluate(solution.tree)
+        return popcount(~(output ^ packed_target) & interpreter.mask)
+
+    def solved(solution):
+        return solution.evaluate()[0].score == n_cases
+
+    return Problem(
+        name=name,
+        basis_set=basis_set,
+        terminal_set=OperatorSet(operators=terminals),
+        dtype=bool,
+        objectives=(Objective(eval_func=hits, weight=1.0),),
+        max_depth=6,
+        solved=solved,
+        interpreter=interpreter
+    )
+
+
+def multiplexer(address_bits):
+    """The Boolean multiplexer with *address_bits* address inputs and
+    :math:`2^{address\\_bits}` data inputs, whose output is the data input
+    selected by the address (see Koza1992). A solution is scored by the
+    number of the :math:`2^{address\\_bits + 2^{address\\_bits}}` fitness
+    cases it gets right, all evaluated at once by a
+    zoonomia.interpreter.BitwiseInterpreter.
+
+    :rtype: benchmarks.problems.Problem
+
+    """
+    n_data = 1 << address_bits
+
+    def target(inputs):
+        addresses, data = inputs[:address_bits], inputs[address_bits:]
+        packed = 0
+        for address in xrange(n_data):
+            selected = data[address]
+            for i, bit in enumerate(addresses):
+                selected &= bit if address >> i & 1 else ~bit
+            packed |= selected
+        return packed
+
+    return _boolean(
+        name='{0}-multiplexer'.format(address_bits + n_data),
+        functions=(
+            (and_, _bitwise_and, 2),
+            (or_, _bitwise_or, 2),
+            (not_, _bitwise_not, 1),
+            (if_, bitwise_if, 3)
+        ),
+        input_names=tuple(
+            'a{0}'.format(i) for i in xrange(address_bits)
+        ) + tuple('d{0}'.format(i) for i in xrange(n_data)),
+        target=target
+    )
+
+
+def even_parity(n_inputs):
+    """The even-parity function of *n_inputs* inputs, which is true when an
+    even number of them are true, built from and, or, nand and nor (see
+    Koza1992). Scored like *multiplexer*.
+
+    :rtype: benchmarks.problems.Problem
+
+    """
+    return _boolean(
+        name='even-{0}-parity'.format(n_inputs),
+        functions=(
+            (and_, _bitwise_and, 2),
+            (or_, _bitwise_or, 2),
+            (nand, _bitwise_nand, 2),
+            (nor, _bitwise_nor, 2)
+        ),
+        input_names=tuple('b{0}'.format(i) for i in xrange(n_inputs)),
+        target=lambda inputs: ~reduce(operator.xor, inputs, 0)
+    )
+
+
+# Santa Fe ant
+
+SANTA_FE_TRAIL = (
+    'S###............................',
+    '...#............................',
+    '...#.....................###....',
+    '...#....................#....#..',
+    '...#....................#....#..',
+    '...####.#####........##.........',
+    '............#................#..',
+    '............#.......#...........',
+    '............#.......#........#..',
+    '............#.......#...........',
+    '....................#...........',
+    '............#................#..',
+    '............#...................',
+    '............#.......#.....###...',
+    '............#.......#..#........',
+    '.................#..............',
+    '................................',
+    '............#...........#.......',
+    '............#...#..........#....',
+    '............#...#...............',
+    '............#...#...............',
+    '............#...#.........#.....',
+    '............#..........#........',
+    '............#...................',
+    '...##..#####....#...............',
+    '.#..............#...............',
+    '.#..............#...............',
+    '.#......#######.................',
+    '.#.....#........................',
+    '.......#........................',
+    '..####..........................',
+    '................................'
+)
+
+MOVE = 'move'
+LEFT = 'left'
+RIGHT = 'right'
+
+_HEADINGS = ((0, 1), (1, 0), (0, -1), (-1, 0))  # east, south, west, north
+
+
+class Program(object):
+    """The type of the actions and control structures of an ant's program."""
+
+    __slots__ = ()
+
+
+def if_food_ahead(a, b): return 'if', a, b
+
+
+def progn2(a, b): return 'progn', a, b
+
+
+def progn3(a, b, c): return 'progn', a, b, c
+
+
+class _Ant(object):
+
+    __slots__ = ('food', 'row', 'column', 'heading', 'moves', 'max_moves')
+
+    def __init__(self, food, max_moves):
+        self.food = set(food)
+        self.row = 0
+        self.column = 0
+        self.heading = 0
+        self.moves = 0
+        self.max_moves = max_moves
+
+    @property
+    def done(self):
+        return self.moves >= self.max_moves or len(self.food) == 0
+
+    def ahead(self):
+        d_row, d_column = _HEADINGS[self.heading]
+        return (
+            (self.row + d_row) % len(SANTA_FE_TRAIL),
+            (self.column + d_column) % len(SANTA_FE_TRAIL[0])
+        )
+
+    def run(self, program):
+        if self.done:
+            return
+        elif program == MOVE:
+            self.row, self.column = self.ahead()
+            self.food.discard((self.row, self.column))
+            self.moves += 1
+        elif program == LEFT:
+            self.heading = (self.heading - 1) % 4
+            self.moves += 1
+        elif program == RIGHT:
+            self.heading = (self.heading + 1) % 4
+            self.moves += 1
+        elif program[0] == 'if':
+            self.run(program[1] if self.ahead() in self.food else program[2])
+        else:
+            for step in program[1:]:
+                self.run(step)
+
+
+def santa_fe_ant(max_moves=600):
+    """Koza's artificial ant on the Santa Fe trail: an ant starting at the
+    top left corner of a toroidal 32 x 32 grid, facing east, runs its program
+    repeatedly until it has used *max_moves* actions (moving, or turning left
+    or right), and is scored by the number of the trail's 89 pieces of food
+    it eats (see Koza1992). Trees evaluate to the ant's program, which is
+    then run on the grid.
+
+    :rtype: benchmarks.problems.Problem
+
+    """
+    food = frozenset(
+        (row, column)
+        for row, line in enumerate(SANTA_FE_TRAIL)
+        for column, cell in enumerate(line) if cell == '#'
+    )
+    basis_set = OperatorSet(operators=(
+        BasisOperator(
+            func=if_food_ahead, signature=(Program, Program), dtype=Program
+        ),
+        BasisOperator(
+            func=progn2, signature=(Program, Program), dtype=Program
+        ),
+        BasisOperator(
+            func=progn3, signature=(Program, Program, Program), dtype=Program
+        )
+    ))
+    terminal_set = OperatorSet(operators=tuple(
+        ConstantTerminal(value=action, dtype=Program)
+        for action in (MOVE, LEFT, RIGHT)
+    ))
+    interpreter = Interpreter()
+
+    def eaten(solution):
+        program = interpreter.evaluate(solution.tree)
+        ant = _Ant(food, max_moves)
+        while not ant.done:
+            ant.run(program)
+        return len(food) - len(ant.food)
+
+    return Problem(
+        name='santa-fe-ant',
+        basis_set=basis_set,
+        terminal_set=terminal_set,
+        dtype=Program,
+        objectives=(Objective(eval_func=eaten, weight=1.0),),
+        max_depth=6,
+        solved=lambda solution: solution.evaluate()[0].score == len(food),
+        interpreter=interpreter
+    )
+
+
+PROBLEMS = (
+    ('koza-1', koza_1),
+    ('pagie-1', pagie_1),
+    ('6-multiplexer', lambda: multiplexer(2)),
+    ('11-multiplexer', lambda: multiplexer(3)),
+    ('20-multiplexer', lambda: multiplexer(4)),
+    ('even-5-parity', lambda: even_parity(5)),
+    ('santa-fe-ant', santa_fe_ant)
+)
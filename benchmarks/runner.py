@@ -0,0 +1,333 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import platform
+import random
+import resource
+import sys
+import time
+
+from zoonomia import _version
+from zoonomia.operations import (
+    ramped_half_and_half, grow, tournament_select, crossover_subtree,
+    mutate_subtree
+)
+from zoonomia.interpreter import Interpreter, BitwiseInterpreter
+
+from benchmarks.problems import PROBLEMS
+
+log = logging.getLogger(__name__)  # FIXME
+
+RESULTS_VERSION = 1
+
+INTERPRETER_PROBLEMS = ('11-multiplexer', '20-multiplexer')
+
+
+def _select(population, tournament_size, rng):
+    winner = rng.choice(population)
+    for _ in xrange(tournament_size - 1):
+        winner = tournament_select(winner, rng.choice(population), rng)
+    return winner
+
+
+def _score(solution):
+    return sum(fitness.score for fitness in solution.evaluate())
+
+
+def run(
+    problem, population_size=500, generations=50, seed=0, tournament_size=7,
+    crossover_rate=0.9, max_depth=17
+):
+    """Run a generational genetic program on *problem*: a population
+    initialized by ramped half-and-half, parents chosen by tournaments of
+    *tournament_size* built from zoonomia.operations.tournament_select, and
+    offspring made by subtree crossover or, failing that, subtree mutation.
+    The run stops early once a solution solves the problem.
+
+    ramped_half_and_half keeps only one of the solutions which have equal
+    fitnesses, so the initial population is built by one ramped call and
+    then topped up by further ramped calls for the remainder. The number
+    of solutions the first call came up short is reported as
+    *initial_shortfall*.
+
+    :param problem: The problem.
+    :type problem: benchmarks.problems.Problem
+
+    :param population_size: The number of solutions in each generation.
+    :type population_size: int
+
+    :param generations: The maximum number of generations after the first.
+    :type generations: int
+
+    :param seed: The seed of the run's random number generator.
+    :type seed: int
+
+    :param tournament_size: The number of solutions in each tournament.
+    :type tournament_size: int
+
+    :param crossover_rate:
+        The probability of making an offspring by crossover rather than
+        mutation.
+
+    :type crossover_rate: float
+
+    :param max_depth: The maximum depth of an offspring's tree.
+    :type max_depth: int
+
+    :return:
+        The measurements of the run, which can be represented as JSON:
+        *evaluations* and *generations* run, their rates per second of wall
+        clock time, the process's *peak_memory_kb*, the wall clock
+        *seconds* the run took, the *initial_shortfall* (see above), the
+        *time_to_solution* in seconds (or None if the problem was not
+        solved) and the *best_score* found.
+
+    :rtype: dict
+
+    """
+    rng = random.Random(seed)
+    start = time.time()
+    evaluations = [0]
+    time_to_solution = None
+
+    def evaluate(population):
+        for solution in population:
+            if solution.fitnesses is None:
+                evaluations[0] += 1
+                solution.evaluate()
+
+    population = []
+    shortfall = None
+    while len(population) < population_size:
+        requested = population_size - len(population)
+        population.extend(ramped_half_and_half(
+            problem.max_depth, requested, problem.basis_set,
+            problem.terminal_set, problem.dtype, problem.objectives, rng
+        ))
+        evaluations[0] += requested
+        if shortfall is None:
+            shortfall = population_size - len(population)
+
+    best = max(population, key=_score)
+    generation = 0
+
+    while generation < generations and not problem.solved(best):
+        offspring = []
+
+        while len(offspring) < population_size:
+            parent = _select(population, tournament_size, rng)
+
+            if rng.random() < crossover_rate:
+                child, _ = crossover_subtree(
+                    parent, _select(population, tournament_size, rng), rng,
+                    max_depth=max_depth
+                )
+            else:
+                child = mutate_subtree(
+                    parent, problem.basis_set, problem.terminal_set,
+                    max_depth, rng
+                )
+
+            offspring.append(child)
+
+        evaluate(offspring)
+        population = offspring
+        generation += 1
+        best = max([best] + population, key=_score)
+
+    seconds = time.time() - start
+
+    if problem.solved(best):
+        time_to_solution = seconds
+
+    return {
+        'problem': problem.name,
+        'seed': seed,
+        'population_size': population_size,
+        'generations': generation,
+        'evaluations': evaluations[0],
+        'seconds': seconds,
+        'evaluations_per_second': evaluations[0] / seconds,
+        'generations_per_second': generation / seconds,
+        'initial_shortfall': shortfall,
+        'peak_memory_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'time_to_solution': time_to_solution,
+        'best_score': _score(best)
+    }
+
+
+def compare_interpreters(problem, n_trees=20, sample_cases=256, seed=0):
+    """Time the BitwiseInterpreter which scores a boolean *problem* against a
+    plain Interpreter evaluating the same random trees one fitness case at a
+    time. The plain interpreter only evaluates a sample of *sample_cases*
+    fitness cases, and its time is scaled up to every fitness case.
+
+    :param problem: A problem scored by a BitwiseInterpreter.
+    :type problem: benchmarks.problems.Problem
+
+    :param n_trees: The number of random trees to evaluate.
+    :type n_trees: int
+
+    :param sample_cases: The number of fitness cases to sample.
+    :type sample_cases: int
+
+    :param seed: The seed of the random trees and sample.
+    :type seed: int
+
+    :return:
+        The measurements, which can be represented as JSON: the number of
+        *trees*, *cases* and *sampled_cases*, the seconds each interpreter
+        took to evaluate every tree on every fitness case, and the
+        *speedup* of the BitwiseInterpreter.
+
+    :rtype: dict
+
+    """
+    rng = random.Random(seed)
+    packed = problem.interpreter.bindings
+    n_cases = problem.interpreter.n_cases
+    sample = rng.sample(xrange(n_cases), min(sample_cases, n_cases))
+    trees = [
+        grow(
+            problem.max_depth, problem.basis_set, problem.terminal_set,
+            problem.dtype, problem.objectives, rng
+        ).tree for _ in xrange(n_trees)
+    ]
+
+    bitwise = BitwiseInterpreter(bindings={}, n_cases=n_cases)
+    bitwise.bindings.update(packed)
+    start = time.time()
+    for tree in trees:
+        bitwise.evaluate(tree)
+    bitwise_seconds = time.time() - start
+
+    interpreters = [
+        Interpreter(bindings={
+            name: bool(values >> case & 1)
+            for name, values in packed.iteritems()
+        }) for case in sample
+    ]
+    start = time.time()
+    for tree in trees:
+        for interpreter in interpreters:
+            interpreter.evaluate(tree)
+    interpreter_seconds = (time.time() - start) * n_cases / len(sample)
+
+    return {
+        'problem': problem.name,
+        'trees': n_trees,
+        'cases': n_cases,
+        'sampled_cases': len(sample),
+        'bitwise_seconds': bitwise_seconds,
+        'interpreter_seconds': interpreter_seconds,
+        'speedup': interpreter_seconds / bitwise_seconds
+    }
+
+
+def _run_named(name, kwargs):
+    return run(dict(PROBLEMS)[name](), **kwargs)
+
+
+def run_all(names=None, repeats=1, interpreters=True, **kwargs):
+    """Run each named problem *repeats* times, each run in a fresh child
+    process so that peak memory is measured per run, and compare the
+    interpreters (see *compare_interpreters*) on the multiplexers named in
+    INTERPRETER_PROBLEMS.
+
+    :param names: The names of the problems to run. Defaults to all of them.
+    :type names: collections.Iterable[str]
+
+    :param repeats: The number of runs of each problem, seeded 0, 1, ...
+    :type repeats: int
+
+    :param interpreters: Whether to compare the interpreters.
+    :type interpreters: bool
+
+    :param kwargs: Passed on to *run*.
+
+    :return:
+        The results, with the versions of Python and zoonomia they were
+        measured with.
+
+    :rtype: dict
+
+    """
+    names = [name for name, _ in PROBLEMS] if names is None else list(names)
+    runs = []
+
+    for name in names:
+        for seed in xrange(repeats):
+            pool = multiprocessing.Pool(processes=1)
+            try:
+                arguments = dict(kwargs, seed=seed)
+                runs.append(pool.apply(_run_named, (name, arguments)))
+            finally:
+                pool.close()
+                pool.join()
+            log.info('%s seed %d done', name, seed)
+
+    comparisons = [
+        compare_interpreters(dict(PROBLEMS)[name]())
+        for name in (INTERPRETER_PROBLEMS if interpreters else ())
+    ]
+
+    return {
+        'version': RESULTS_VERSION,
+        'zoonomia': _version.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.time(),
+        'runs': runs,
+        'interpreters': comparisons
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Run standard genetic programming benchmarks.'
+    )
+    parser.add_argument(
+        'problems', nargs='*', metavar='problem',
+        help='the problems to run (default: all of {0})'.format(
+            ', '.join(name for name, _ in PROBLEMS)
+        )
+    )
+    parser.add_argument('--population-size', type=int, default=500)
+    parser.add_argument('--generations', type=int, default=50)
+    parser.add_argument('--repeats', type=int, default=1)
+    parser.add_argument(
+        '--skip-interpreters', action='store_true',
+        help='do not compare the interpreters on {0}'.format(
+            ' and '.join(INTERPRETER_PROBLEMS)
+        )
+    )
+    parser.add_argument(
+        '--output', default='-',
+        help='the file to write JSON results to (default: stdout)'
+    )
+    args = parser.parse_args(argv)
+
+    # Initialization evaluates solutions by hashing them, which
+    # zoonomia.solution warns about for every solution.
+    logging.getLogger('zoonomia.solution').setLevel(logging.ERROR)
+
+    unknown = set(args.problems) - set(name for name, _ in PROBLEMS)
+    if len(unknown) > 0:
+        parser.error('unknown problems: {0}'.format(', '.join(unknown)))
+
+    results = run_all(
+        names=args.problems or None,
+        repeats=args.repeats,
+        interpreters=not args.skip_interpreters,
+        population_size=args.population_size,
+        generations=args.generations
+    )
+    text = json.dumps(results, indent=2, sort_keys=True)
+
+    if args.output == '-':
+        sys.stdout.write(text + '\n')
+    else:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
@@ -54,6 +54,7 @@ setup(
         'Topic :: Software Development :: Libraries',
     ),
     install_requires=REQUIREMENTS,
+    extras_require={'data': ('numpy',)},
     tests_require=REQUIREMENTS_TEST,
     test_suite='nose.collector',
     zip_safe=False
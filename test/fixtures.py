@@ -0,0 +1,64 @@
+from zoonomia.tree import Node, Tree
+from zoonomia.solution import (
+    BasisOperator, TerminalOperator, OperatorSet, Objective, Solution
+)
+
+
+def add(a, b): return a + b
+
+
+def neg(a): return -a
+
+
+def chain(operator, terminal, length, operand=None):
+    """Build a tree of *length* nested applications of *operator* above a
+    *terminal*. Each application takes the one below it as its first
+    argument, and *operand* (*terminal* if None) as any other argument.
+
+    """
+    operand = terminal if operand is None else operand
+    node = Node(operator=terminal)
+
+    for _ in xrange(length):
+        parent = Node(operator=operator)
+        parent.add_child(child=node, position=0)
+        for position in xrange(1, len(operator.signature)):
+            parent.add_child(child=Node(operator=operand), position=position)
+        node = parent
+
+    return Tree(root=node)
+
+
+class Chains(object):
+
+    def setUp(self):
+        self.add_op = BasisOperator(func=add, signature=(int, int), dtype=int)
+        self.neg_op = BasisOperator(func=neg, signature=(int,), dtype=int)
+        self.x = TerminalOperator(source=xrange(10), dtype=int)
+        self.operand = self.x
+        self.basis_set = OperatorSet(operators=(self.add_op,))
+        self.terminal_set = OperatorSet(operators=(self.x,))
+        self.calls = 0
+        self.objectives = (
+            Objective(
+                eval_func=self.counted(lambda s: s.tree.size), weight=1.0
+            ),
+        )
+
+    def counted(self, eval_func):
+        """Wrap *eval_func* so that each call is counted in *calls*."""
+        def counted_eval_func(solution):
+            self.calls += 1
+            return eval_func(solution)
+
+        return counted_eval_func
+
+    def solution(self, size):
+        """A solution whose tree is a chain of additions of *size* nodes
+        (rounded down to an odd number), with *operand* on the right.
+
+        """
+        return Solution(
+            tree=chain(self.add_op, self.x, (size - 1) // 2, self.operand),
+            objectives=self.objectives
+        )
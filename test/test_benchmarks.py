@@ -0,0 +1,158 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from zoonomia.tree import Node, Tree
+from zoonomia.solution import Solution
+
+from benchmarks.problems import (
+    PROBLEMS, koza_1, multiplexer, even_parity, santa_fe_ant
+)
+from benchmarks.runner import run, compare_interpreters, main
+
+
+def build(problem, spec):
+    """Build a solution from a nested tuple of operator names, where basis
+    operators are named after their functions and terminals after their
+    variable names or constant values.
+
+    """
+    operators = {}
+    for operator in problem.basis_set:
+        operators[operator.func.__name__] = operator
+    for operator in problem.terminal_set:
+        operators[getattr(operator, 'name', operator.source)] = operator
+
+    def node(spec):
+        if not isinstance(spec, tuple):
+            return Node(operator=operators[spec])
+        parent = Node(operator=operators[spec[0]])
+        for position, child in enumerate(spec[1:]):
+            parent.add_child(child=node(child), position=position)
+        return parent
+
+    return Solution(tree=Tree(root=node(spec)), objectives=problem.objectives)
+
+
+class TestProblems(unittest.TestCase):
+
+    def test_koza_1(self):
+        problem = koza_1()
+        x_2 = ('multiply', 'x', 'x')
+        solution = build(problem, (
+            'add', ('add', 'x', x_2), ('add', ('multiply', x_2, 'x'),
+                                       ('multiply', x_2, x_2))
+        ))
+
+        self.assertAlmostEqual(solution.evaluate()[0].score, 0.0)
+        self.assertTrue(problem.solved(solution))
+        self.assertFalse(problem.solved(build(problem, 'x')))
+
+    def test_multiplexer(self):
+        problem = multiplexer(2)
+        solution = build(problem, (
+            'if_', 'a1',
+            ('if_', 'a0', 'd3', 'd2'),
+            ('if_', 'a0', 'd1', 'd0')
+        ))
+
+        self.assertEqual(problem.name, '6-multiplexer')
+        self.assertEqual(solution.evaluate()[0].score, 64)
+        self.assertTrue(problem.solved(solution))
+        self.assertEqual(build(problem, 'd0').evaluate()[0].score, 40)
+
+    def test_20_multiplexer(self):
+        problem = multiplexer(4)
+
+        self.assertEqual(problem.name, '20-multiplexer')
+        self.assertEqual(problem.interpreter.n_cases, 1 << 20)
+        self.assertEqual(
+            build(problem, 'd0').evaluate()[0].score, (1 << 20) * 17 // 32
+        )
+
+    def test_even_parity(self):
+        problem = even_parity(2)
+        solution = build(
+            problem, ('or_', ('and_', 'b0', 'b1'), ('nor', 'b0', 'b1'))
+        )
+
+        self.assertEqual(solution.evaluate()[0].score, 4)
+        self.assertTrue(problem.solved(solution))
+
+    def test_santa_fe_ant(self):
+        """Test Koza's solution to the Santa Fe trail."""
+        problem = santa_fe_ant()
+        solution = build(problem, (
+            'if_food_ahead', 'move',
+            ('progn3',
+             'left',
+             ('progn2',
+              ('if_food_ahead', 'move', 'right'),
+              ('progn2', 'right', ('progn2', 'left', 'right'))),
+             ('progn2', ('if_food_ahead', 'move', 'left'), 'move'))
+        ))
+
+        self.assertEqual(solution.evaluate()[0].score, 89)
+        self.assertTrue(problem.solved(solution))
+        self.assertLess(build(problem, 'move').evaluate()[0].score, 89)
+
+
+class TestRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_run(self):
+        for name, make in PROBLEMS:
+            result = run(make(), population_size=20, generations=2, seed=1)
+
+            self.assertEqual(result['problem'], name)
+            self.assertLessEqual(result['generations'], 2)
+            self.assertGreaterEqual(result['evaluations'], 20)
+            self.assertGreater(result['evaluations_per_second'], 0.0)
+            self.assertGreater(result['peak_memory_kb'], 0)
+            self.assertGreaterEqual(result['initial_shortfall'], 0)
+            self.assertLess(result['initial_shortfall'], 20)
+
+    def test_time_to_solution(self):
+        result = run(koza_1(), population_size=200, generations=30)
+
+        if result['time_to_solution'] is not None:
+            self.assertLessEqual(result['time_to_solution'], result['seconds'])
+            self.assertGreater(result['best_score'], -0.2)
+
+    def test_compare_interpreters(self):
+        result = compare_interpreters(
+            multiplexer(3), n_trees=5, sample_cases=64
+        )
+
+        self.assertEqual(result['problem'], '11-multiplexer')
+        self.assertEqual(result['cases'], 2048)
+        self.assertEqual(result['sampled_cases'], 64)
+        self.assertGreater(result['speedup'], 1.0)
+
+    def test_main(self):
+        path = os.path.join(self.directory, 'results.json')
+
+        main([
+            '6-multiplexer', '--population-size', '10', '--generations', '1',
+            '--repeats', '2', '--output', path
+        ])
+
+        with open(path) as f:
+            results = json.load(f)
+
+        self.assertEqual(results['version'], 1)
+        self.assertListEqual(
+            [(r['problem'], r['seed']) for r in results['runs']],
+            [('6-multiplexer', 0), ('6-multiplexer', 1)]
+        )
+        self.assertListEqual(
+            [r['problem'] for r in results['interpreters']],
+            ['11-multiplexer', '20-multiplexer']
+        )
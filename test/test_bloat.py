@@ -0,0 +1,166 @@
+import random
+import unittest
+
+from zoonomia.solution import Objective
+from zoonomia.operations import (
+    grow, mutate_subtree, mutate_bulk, crossover_subtree, tournament_select
+)
+from zoonomia.bloat import within_limits, tarpeian, OperatorEqualisation
+
+from .fixtures import Chains
+
+
+class TestLimits(Chains, unittest.TestCase):
+
+    def test_within_limits(self):
+        solution = self.solution(7)
+
+        self.assertTrue(within_limits(solution))
+        self.assertTrue(within_limits(solution, max_size=7, max_depth=4))
+        self.assertFalse(within_limits(solution, max_size=5))
+        self.assertFalse(within_limits(solution, max_depth=3))
+
+    def test_mutate_subtree_max_size(self):
+        rng = random.Random(1)
+        solution = self.solution(9)
+
+        for _ in xrange(50):
+            mutant = mutate_subtree(
+                solution, self.basis_set, self.terminal_set, 8, rng,
+                max_size=11
+            )
+            self.assertLessEqual(mutant.tree.size, 11)
+
+    def test_mutate_bulk_max_size(self):
+        population = [self.solution(9) for _ in xrange(50)]
+
+        mutants = mutate_bulk(
+            population, self.basis_set, self.terminal_set, 8,
+            random.Random(1), node_rate=0.0, max_size=11
+        )
+
+        self.assertEqual(len(mutants), 50)
+        for mutant in mutants:
+            self.assertLessEqual(mutant.tree.size, 11)
+
+
+class TestTarpeian(Chains, unittest.TestCase):
+
+    def test_discards_large_solutions_without_evaluating(self):
+        population = [self.solution(size) for size in (1, 3, 5, 21, 23)]
+
+        discarded = tarpeian(population, rate=1.0, rng=random.Random(2))
+
+        self.assertEqual(discarded, 2)
+        self.assertEqual(self.calls, 0)
+        self.assertEqual(population[3].evaluate()[0].score, float('-inf'))
+        self.assertEqual(population[4].evaluate()[0].score, float('-inf'))
+        self.assertIsNone(population[2].fitnesses)
+
+    def test_rate(self):
+        rng = random.Random(3)
+        population = [self.solution(1) for _ in xrange(1000)] + [
+            self.solution(99) for _ in xrange(1000)
+        ]
+
+        discarded = tarpeian(population, rate=0.25, rng=rng)
+
+        self.assertAlmostEqual(discarded / 1000.0, 0.25, delta=0.05)
+
+
+class TestOperatorEqualisation(Chains, unittest.TestCase):
+
+    def test_update(self):
+        opeq = OperatorEqualisation(bin_width=10)
+        population = [self.solution(size) for size in (1, 3, 5, 25)]
+
+        opeq.update(population)
+
+        # ranks 1, 2, 3 average 2 in the first bin, rank 4 in the third
+        self.assertListEqual(opeq.capacities, [1, 0, 3])
+        self.assertEqual(opeq.best, 25)
+
+    def test_update_empty(self):
+        opeq = OperatorEqualisation(bin_width=10)
+        opeq.update([self.solution(1)])
+
+        self.assertRaises(ValueError, opeq.update, [])
+        self.assertListEqual(opeq.capacities, [1])
+
+    def test_admit(self):
+        opeq = OperatorEqualisation(bin_width=10)
+        opeq.update([self.solution(size) for size in (1, 3, 5, 25)])
+        self.calls = 0
+
+        self.assertTrue(opeq.admit(self.solution(3)))
+        self.assertFalse(opeq.admit(self.solution(5)))
+        self.assertFalse(opeq.admit(self.solution(15)))
+        self.assertEqual(self.calls, 0)
+
+        self.assertTrue(opeq.admit(self.solution(45)))
+        self.assertFalse(opeq.admit(self.solution(41)))
+        self.assertEqual(self.calls, 1)
+        self.assertListEqual(opeq.capacities, [1, 0, 3, 0, 1])
+        self.assertEqual((opeq.accepted, opeq.rejected), (2, 3))
+
+    def test_fill(self):
+        opeq = OperatorEqualisation(bin_width=10)
+        opeq.update([self.solution(size) for size in (1, 3, 5, 25)])
+        offspring = iter(
+            [self.solution(s) for s in (1, 3, 21, 5, 23, 25, 27)]
+        )
+
+        population = opeq.fill(offspring, 4)
+
+        self.assertListEqual(
+            [s.tree.size for s in population], [1, 21, 23, 25]
+        )
+        self.assertEqual(next(offspring).tree.size, 27)
+        self.assertListEqual(
+            [s.tree.size for s in opeq.fill(iter(population), 4, 0)],
+            [1, 21, 23, 25]
+        )
+
+    def test_size_stays_flat(self):
+        """Test that when larger trees stop paying off, equalisation keeps
+        the mean size flat while it keeps growing without it.
+
+        """
+        def run(opeq):
+            rng = random.Random(4)
+            def score(solution):
+                return min(solution.tree.size, 15) + 0.1 * rng.random()
+
+            objectives = (Objective(eval_func=score, weight=1.0),)
+            population = [
+                grow(3, self.basis_set, self.terminal_set, int, objectives,
+                     rng)
+                for _ in xrange(50)
+            ]
+
+            def offspring():
+                while True:
+                    parents = [
+                        tournament_select(*rng.sample(population, 2), rng=rng)
+                        for _ in xrange(2)
+                    ]
+                    yield crossover_subtree(parents[0], parents[1], rng)[0]
+
+            means = []
+
+            for _ in xrange(30):
+                if opeq is None:
+                    population = [c for c, _ in zip(offspring(), population)]
+                else:
+                    opeq.update(population)
+                    population = opeq.fill(offspring(), len(population))
+                means.append(sum(s.tree.size for s in population) / 50.0)
+
+            return means
+
+        equalised = run(OperatorEqualisation(bin_width=4))
+        uncontrolled = run(None)
+
+        self.assertLess(equalised[-1], 1.2 * equalised[19])
+        self.assertGreater(uncontrolled[-1], 1.2 * uncontrolled[19])
+        self.assertLess(equalised[-1], uncontrolled[-1] / 2.0)
@@ -0,0 +1,251 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from zoonomia.tree import Node, Tree
+from zoonomia.solution import (
+    BasisOperator, TerminalOperator, OperatorSet, Objective, Solution
+)
+from zoonomia.operations import grow
+from zoonomia.codec import OperatorRegistry
+from zoonomia import checkpoint as checkpoint_module
+from zoonomia.checkpoint import Checkpointer, checkpoints, load
+
+from .fixtures import Chains
+
+
+def mul(a, b): return a * b
+
+
+class Runs(Chains):
+
+    def setUp(self):
+        Chains.setUp(self)
+        self.mul_op = BasisOperator(func=mul, signature=(int, int), dtype=int)
+        self.registry = OperatorRegistry(
+            operators=(self.add_op, self.mul_op, self.x)
+        )
+        self.objectives = (
+            Objective(
+                eval_func=self.counted(lambda s: float(s.tree.size)),
+                weight=-1.0
+            ),
+            Objective(eval_func=lambda s: float(s.tree.depth), weight=1.0)
+        )
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def population(self, size, rng):
+        basis_set = OperatorSet(operators=(self.add_op, self.mul_op))
+        terminal_set = OperatorSet(operators=(self.x,))
+
+        return [
+            grow(5, basis_set, terminal_set, int, self.objectives, rng)
+            for _ in xrange(size)
+        ]
+
+
+class TestCheckpointer(Runs, unittest.TestCase):
+
+    def test_round_trip(self):
+        rng = random.Random(1)
+        population = self.population(20, rng)
+        archive = population[:3]
+
+        for solution in population[::2]:
+            solution.evaluate()
+
+        checkpointer = Checkpointer(self.directory, self.registry)
+        checkpointer.snapshot(
+            population, generation=7, rng=rng, archive=archive,
+            counters={'evaluations': 10}
+        )
+        checkpointer.close()
+        self.calls = 0
+
+        checkpoint = load(self.directory, self.registry, self.objectives)
+
+        self.assertEqual(checkpoint.generation, 7)
+        self.assertDictEqual(checkpoint.counters, {'evaluations': 10})
+        self.assertEqual(checkpoint.rng.random(), rng.random())
+        self.assertEqual(len(checkpoint.population), 20)
+        self.assertEqual(len(checkpoint.archive), 3)
+
+        for original, restored in zip(population, checkpoint.population):
+            self.assertEqual(
+                restored.tree.index.hashes[-1], original.tree.index.hashes[-1]
+            )
+            if original.fitnesses is None:
+                self.assertIsNone(restored.fitnesses)
+            else:
+                self.assertEqual(
+                    [f.score for f in restored.fitnesses],
+                    [f.score for f in original.fitnesses]
+                )
+
+        self.assertEqual(self.calls, 0)
+        self.assertEqual(
+            checkpoint.archive[-1].tree.index.hashes[-1],
+            archive[-1].tree.index.hashes[-1]
+        )
+
+    def test_lazy(self):
+        """Test that trees are only decoded when their solutions are
+        accessed, and that scores can be read without decoding.
+
+        """
+        population = self.population(10, random.Random(2))
+        population[4].evaluate()
+
+        checkpointer = Checkpointer(self.directory, self.registry)
+        checkpointer.snapshot(population, generation=0)
+        checkpointer.close()
+
+        checkpoint = load(self.directory, self.registry, self.objectives)
+
+        self.assertEqual(checkpoint.population.decoded, 0)
+        self.assertIsNone(checkpoint.rng)
+        self.assertEqual(
+            checkpoint.population.scores(4),
+            tuple(f.score for f in population[4].fitnesses)
+        )
+        self.assertIsNone(checkpoint.population.scores(5))
+        self.assertEqual(checkpoint.population.decoded, 0)
+
+        solution = checkpoint.population[4]
+
+        self.assertIs(checkpoint.population[4], solution)
+        self.assertIs(checkpoint.population[-6], solution)
+        self.assertEqual(checkpoint.population.decoded, 1)
+
+    def test_snapshot_ignores_later_changes(self):
+        """Test that a snapshot records the fitnesses as they were when it
+        was taken, even if written afterwards.
+
+        """
+        population = self.population(5, random.Random(3))
+        checkpointer = Checkpointer(self.directory, self.registry)
+
+        checkpointer.snapshot(population, generation=0)
+        for solution in population:
+            solution.evaluate()
+        checkpointer.close()
+
+        checkpoint = load(self.directory, self.registry, self.objectives)
+
+        for i in xrange(5):
+            self.assertIsNone(checkpoint.population.scores(i))
+
+    def test_keep(self):
+        population = self.population(5, random.Random(4))
+        checkpointer = Checkpointer(self.directory, self.registry, keep=2)
+
+        for generation in xrange(5):
+            checkpointer.snapshot(population, generation=generation)
+            checkpointer.wait()
+
+        checkpointer.close()
+
+        self.assertEqual(checkpointer.written, 5)
+        self.assertListEqual(
+            [g for g, _ in checkpoints(self.directory)], [3, 4]
+        )
+        self.assertListEqual(
+            [f for f in os.listdir(self.directory) if f.endswith('.tmp')], []
+        )
+        self.assertEqual(
+            load(self.directory, self.registry, self.objectives).generation, 4
+        )
+
+    def test_keep_at_least_one(self):
+        self.assertRaises(
+            ValueError, Checkpointer, self.directory, self.registry, keep=0
+        )
+
+    def test_offsets_overflow(self):
+        """Test that trees too large for the offsets fail the write rather
+        than being recorded at wrapped-around offsets.
+
+        """
+        population = self.population(5, random.Random(5))
+        max_offset = checkpoint_module._MAX_OFFSET
+        checkpoint_module._MAX_OFFSET = 4
+        try:
+            checkpointer = Checkpointer(self.directory, self.registry)
+            checkpointer.snapshot(population, generation=0)
+            checkpointer.close()
+        finally:
+            checkpoint_module._MAX_OFFSET = max_offset
+
+        self.assertIsInstance(checkpointer.error, OverflowError)
+        self.assertListEqual(checkpoints(self.directory), [])
+
+    def test_error(self):
+        """Test that a failed write is recorded rather than raised in the
+        evolution loop.
+
+        """
+        y = TerminalOperator(source=xrange(10), dtype=int)
+        population = [
+            Solution(tree=Tree(root=Node(operator=y)),
+                     objectives=self.objectives)
+        ]
+        checkpointer = Checkpointer(self.directory, self.registry)
+
+        checkpointer.snapshot(population, generation=0)
+        checkpointer.close()
+
+        self.assertIsInstance(checkpointer.error, KeyError)
+        self.assertListEqual(checkpoints(self.directory), [])
+        self.assertRaises(
+            ValueError, checkpointer.snapshot, population, 1
+        )
+
+    def test_wrong_objectives(self):
+        checkpointer = Checkpointer(self.directory, self.registry)
+        checkpointer.snapshot(self.population(3, random.Random(6)), 0)
+        checkpointer.close()
+
+        self.assertRaises(
+            ValueError, load, self.directory, self.registry,
+            self.objectives[:1]
+        )
+
+    def test_mixed_objectives(self):
+        """Test that a snapshot is refused when the solutions after the
+        first of a section have more objectives, rather than having their
+        scores overlap in the checkpoint.
+
+        """
+        checkpointer = Checkpointer(self.directory, self.registry)
+        population = self.population(2, random.Random(7))
+        archive = [
+            Solution(tree=population[1].tree, objectives=self.objectives[:1]),
+            population[0]
+        ]
+
+        self.assertRaises(
+            ValueError, checkpointer.snapshot, population, 0, archive=archive
+        )
+        checkpointer.close()
+
+        self.assertEqual(checkpointer.written, 0)
+
+    def test_invalid(self):
+        path = os.path.join(self.directory, 'checkpoint-00000000.zck')
+
+        with open(path, 'wb') as f:
+            f.write(b'not a checkpoint')
+
+        self.assertRaises(
+            ValueError, load, path, self.registry, self.objectives
+        )
+        shutil.rmtree(self.directory)
+        os.mkdir(self.directory)
+        self.assertRaises(
+            ValueError, load, self.directory, self.registry, self.objectives
+        )
@@ -0,0 +1,356 @@
+import pickle
+import unittest
+
+from zoonomia.tree import Node, Tree
+from zoonomia.solution import (
+    BasisOperator, TerminalOperator, ConstantTerminal, Objective, Fitness,
+    Solution
+)
+from zoonomia.codec import (
+    OperatorRegistry, encode_tree, decode_tree, encode_solution,
+    decode_solution, write_varint, read_varint, pack_tree, unpack_tree,
+    pack_population, unpack_population
+)
+
+
+def add(a, b): return a + b
+
+
+def neg(a): return -a
+
+
+def if_(a, b, c): return b if a else c
+
+
+class TestOperatorRegistry(unittest.TestCase):
+
+    def test_ids_follow_given_order(self):
+        """Test that operators are assigned ids in the order given, and that
+        duplicates do not consume an id.
+
+        """
+        add_op = BasisOperator(func=add, signature=(int, int), dtype=int)
+        x = TerminalOperator(source=xrange(10), dtype=int)
+
+        registry = OperatorRegistry(operators=(add_op, x, add_op))
+
+        self.assertEqual(len(registry), 2)
+        self.assertEqual(registry.id_of(add_op), 0)
+        self.assertEqual(registry.id_of(x), 1)
+        self.assertIs(registry[0], add_op)
+        self.assertIs(registry[1], x)
+
+    def test_unregistered_operator_raises(self):
+        """Test that looking up an unregistered operator raises KeyError."""
+        x = TerminalOperator(source=xrange(10), dtype=int)
+        y = TerminalOperator(source=xrange(10), dtype=int)
+
+        registry = OperatorRegistry(operators=(x,))
+
+        self.assertRaises(KeyError, registry.id_of, y)
+
+
+class TestTreeCodec(unittest.TestCase):
+
+    def setUp(self):
+        self.add_op = BasisOperator(func=add, signature=(int, int), dtype=int)
+        self.neg_op = BasisOperator(func=neg, signature=(int,), dtype=int)
+        self.if_op = BasisOperator(
+            func=if_, signature=(bool, int, int), dtype=int
+        )
+        self.x = TerminalOperator(source=xrange(10), dtype=int)
+        self.y = TerminalOperator(source=xrange(10), dtype=int)
+        self.p = TerminalOperator(source=(True, False), dtype=bool)
+
+        self.registry = OperatorRegistry(
+            operators=(
+                self.add_op, self.neg_op, self.if_op, self.x, self.y, self.p
+            )
+        )
+
+    def test_round_trip(self):
+        """Test that decoding an encoded tree rebuilds the same structure.
+
+        The tree looks like this:
+
+                              if_
+                           /   |   \\
+                          p   add   neg
+                             /   \\    |
+                            x     y    x
+
+        """
+        node_p = Node(operator=self.p)
+        node_x_1 = Node(operator=self.x)
+        node_y = Node(operator=self.y)
+        node_x_2 = Node(operator=self.x)
+        node_add = Node(operator=self.add_op)
+        node_neg = Node(operator=self.neg_op)
+        node_if = Node(operator=self.if_op)
+
+        node_add.add_child(child=node_x_1, position=0)
+        node_add.add_child(child=node_y, position=1)
+        node_neg.add_child(child=node_x_2, position=0)
+        node_if.add_child(child=node_p, position=0)
+        node_if.add_child(child=node_add, position=1)
+        node_if.add_child(child=node_neg, position=2)
+
+        tree = Tree(root=node_if)
+        codes = encode_tree(tree, self.registry)
+
+        self.assertTupleEqual(codes, (5, 3, 4, 0, 3, 1, 2))
+
+        decoded = decode_tree(codes, self.registry)
+
+        self.assertIsNot(decoded.root, tree.root)
+        self.assertTupleEqual(
+            tuple(n.operator for n in decoded),
+            tuple(n.operator for n in tree)
+        )
+        self.assertTupleEqual(encode_tree(decoded, self.registry), codes)
+
+    def test_decode_incomplete_raises(self):
+        """Test that decoding codes which do not describe exactly one tree
+        raises ValueError.
+
+        """
+        self.assertRaises(ValueError, decode_tree, (3, 0), self.registry)
+        self.assertRaises(ValueError, decode_tree, (3, 4), self.registry)
+        self.assertRaises(ValueError, decode_tree, (), self.registry)
+
+    def test_solution_round_trip_keeps_scores(self):
+        """Test that an evaluated solution's scores survive encoding, so the
+        decoded solution is not evaluated again.
+
+        """
+        calls = []
+
+        def size(solution):
+            calls.append(solution)
+            return float(len(tuple(solution.tree)))
+
+        objective = Objective(eval_func=size, weight=1.0)
+
+        node_add = Node(operator=self.add_op)
+        node_add.add_child(child=Node(operator=self.x), position=0)
+        node_add.add_child(child=Node(operator=self.y), position=1)
+
+        solution = Solution(tree=Tree(root=node_add), objectives=(objective,))
+        solution.evaluate()
+
+        encoded = encode_solution(solution, self.registry)
+
+        self.assertTupleEqual(encoded, ((3, 4, 0), (3.0,)))
+
+        decoded = decode_solution(encoded, self.registry, (objective,))
+
+        self.assertEqual(decoded.evaluate()[0].score, 3.0)
+        self.assertEqual(len(calls), 1)
+
+    def test_unevaluated_solution_has_no_scores(self):
+        """Test that encoding an unevaluated solution does not evaluate it."""
+        objective = Objective(eval_func=lambda s: 1.0, weight=1.0)
+        solution = Solution(
+            tree=Tree(root=Node(operator=self.x)), objectives=(objective,)
+        )
+
+        self.assertTupleEqual(
+            encode_solution(solution, self.registry), ((3,), None)
+        )
+        self.assertIsNone(solution.fitnesses)
+        self.assertIsInstance(
+            decode_solution(
+                ((3,), None), self.registry, (objective,)
+            ).evaluate()[0],
+            Fitness
+        )
+
+
+class TestVarint(unittest.TestCase):
+
+    def test_round_trip(self):
+        out = bytearray()
+        values = (0, 1, 127, 128, 300, 2 ** 32, 2 ** 70 + 5)
+
+        for value in values:
+            write_varint(value, out)
+
+        self.assertEqual(out[:5], bytearray((0, 1, 127, 0x80, 1)))
+
+        offset = 0
+        for value in values:
+            decoded, offset = read_varint(out, offset)
+            self.assertEqual(decoded, value)
+
+        self.assertEqual(offset, len(out))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, write_varint, -1, bytearray())
+        self.assertRaises(ValueError, read_varint, bytearray((0x80,)), 0)
+
+
+class TestBinaryCodec(unittest.TestCase):
+
+    def setUp(self):
+        self.add_op = BasisOperator(func=add, signature=(int, int), dtype=int)
+        self.neg_op = BasisOperator(func=neg, signature=(int,), dtype=int)
+        self.x = TerminalOperator(source=xrange(10), dtype=int)
+        self.one = ConstantTerminal(value=1, dtype=int)
+        self.registry = OperatorRegistry(
+            operators=(self.add_op, self.neg_op, self.x, self.one)
+        )
+        self.objectives = (
+            Objective(eval_func=lambda s: 1.0, weight=1.0),
+            Objective(eval_func=lambda s: 2.0, weight=-1.0)
+        )
+
+    def node(self, operator, *children):
+        node = Node(operator=operator)
+        for position, child in enumerate(children):
+            node.add_child(child=child, position=position)
+        return node
+
+    def test_tree_round_trip(self):
+        """Test that registered operators are written as one byte ids, and
+        that unregistered constants are written inline and shared when
+        read back.
+
+        """
+        tree = Tree(root=self.node(
+            self.add_op,
+            self.node(self.neg_op, self.node(self.x)),
+            self.node(
+                self.add_op,
+                self.node(self.one),
+                self.node(ConstantTerminal(value=-300, dtype=int))
+            )
+        ))
+        packed = pack_tree(tree, self.registry)
+
+        self.assertEqual(packed[:5], b'\x06\x03\x02\x04\x00')
+
+        decoded = unpack_tree(packed, self.registry)
+        operators = tuple(n.operator for n in decoded.index.nodes)
+
+        self.assertTupleEqual(
+            operators[:3] + operators[4:],
+            (self.x, self.neg_op, self.one, self.add_op, self.add_op)
+        )
+        self.assertEqual(operators[3].value, -300)
+        self.assertIs(operators[3].dtype, int)
+
+    def test_inline_constants(self):
+        constants = (
+            ConstantTerminal(value=0.1, dtype=float),
+            ConstantTerminal(value=True, dtype=bool),
+            ConstantTerminal(value=2 ** 40, dtype=int),
+            ConstantTerminal(value=0.1, dtype=float)
+        )
+        registry = OperatorRegistry(operators=())
+
+        for constant in constants:
+            decoded = unpack_tree(
+                pack_tree(Tree(root=Node(operator=constant)), registry),
+                registry
+            ).root.operator
+
+            self.assertEqual(decoded.key, constant.key)
+
+    def test_unregistered_operator_raises(self):
+        y = TerminalOperator(source=xrange(10), dtype=int)
+        string = ConstantTerminal(value='a', dtype=str)
+
+        for operator in (y, string):
+            self.assertRaises(
+                KeyError, pack_tree, Tree(root=Node(operator=operator)),
+                self.registry
+            )
+
+    def test_invalid_data_raises(self):
+        packed = pack_tree(
+            Tree(root=self.node(self.neg_op, self.node(self.x))),
+            self.registry
+        )
+
+        self.assertRaises(ValueError, unpack_tree, packed[:-1], self.registry)
+        self.assertRaises(ValueError, unpack_tree, packed + b'\x00',
+                          self.registry)
+        self.assertRaises(ValueError, unpack_tree, b'\x01\x01', self.registry)
+
+    def test_deep_tree(self):
+        """Test that very deep trees can be packed and unpacked without
+        recursion, and take far less space than when pickled.
+
+        """
+        node = self.node(self.x)
+        for _ in xrange(100000):
+            node = self.node(self.neg_op, node)
+        tree = Tree(root=node)
+
+        packed = pack_tree(tree, self.registry)
+        decoded = unpack_tree(packed, self.registry)
+
+        self.assertEqual(len(packed), 100001 + 3)
+        self.assertEqual(decoded.depth, 100001)
+
+        shallow = Tree(root=self.node(
+            self.add_op, self.node(self.x), self.node(self.one)
+        ))
+        self.assertLess(
+            10 * len(pack_tree(shallow, self.registry)),
+            len(pickle.dumps(shallow, pickle.HIGHEST_PROTOCOL))
+        )
+
+    def test_population_round_trip(self):
+        evaluated = Solution(
+            tree=Tree(root=self.node(self.neg_op, self.node(self.x))),
+            objectives=self.objectives
+        )
+        evaluated.set_fitnesses((
+            Fitness(score=0.5, objective=self.objectives[0]),
+            Fitness(score=-2.25, objective=self.objectives[1])
+        ))
+        unevaluated = Solution(
+            tree=Tree(root=self.node(self.one)), objectives=self.objectives
+        )
+
+        packed = pack_population((evaluated, unevaluated), self.registry)
+        decoded = unpack_population(packed, self.registry, self.objectives)
+
+        self.assertEqual(len(decoded), 2)
+        self.assertTupleEqual(
+            tuple(f.score for f in decoded[0].fitnesses), (0.5, -2.25)
+        )
+        self.assertIsNone(decoded[1].fitnesses)
+        self.assertIs(decoded[1].tree.root.operator, self.one)
+        self.assertEqual(
+            unpack_population(
+                pack_population((), self.registry), self.registry,
+                self.objectives
+            ),
+            ()
+        )
+
+    def test_population_objectives(self):
+        packed = pack_population(
+            (Solution(tree=Tree(root=self.node(self.one)),
+                      objectives=self.objectives),),
+            self.registry
+        )
+
+        self.assertRaisesRegexp(
+            ValueError, 'expected 1 objectives, found 2', unpack_population,
+            packed, self.registry, self.objectives[:1]
+        )
+
+    def test_population_header(self):
+        packed = pack_population((), self.registry, n_objectives=2)
+
+        self.assertRaises(
+            ValueError, unpack_population, b'XXXX' + packed[4:],
+            self.registry, self.objectives
+        )
+        self.assertRaises(
+            ValueError, unpack_population, packed[:4] + b'\x09' + packed[5:],
+            self.registry, self.objectives
+        )
@@ -0,0 +1,106 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from zoonomia.tree import Node, Tree
+from zoonomia.solution import BasisOperator, VariableTerminal
+from zoonomia.interpreter import Interpreter
+from zoonomia.data import Dataset, open_npy, open_columnar, save_npy
+
+
+class TestDataset(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.x = np.arange(1000, dtype=np.float64)
+        self.y = np.linspace(0.0, 1.0, 1000)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_open_npy(self):
+        save_npy(self.directory, {'x': self.x, 'y': self.y})
+
+        dataset = open_npy(self.directory)
+
+        self.assertTupleEqual(dataset.names, ('x', 'y'))
+        self.assertEqual(dataset.n_cases, 1000)
+        self.assertEqual(len(dataset), 2)
+        self.assertIn('x', dataset)
+        self.assertIsInstance(dataset['x'], np.memmap)
+        np.testing.assert_array_equal(dataset['y'], self.y)
+
+    def test_open_columnar(self):
+        path = os.path.join(self.directory, 'table.bin')
+        with open(path, 'wb') as f:
+            f.write(b'HEADER!!')
+            np.vstack((self.x, self.y)).tofile(f)
+
+        dataset = open_columnar(
+            path, names=('x', 'y'), dtype=np.float64, offset=8
+        )
+
+        self.assertEqual(dataset.n_cases, 1000)
+        self.assertIsInstance(dataset['x'], np.memmap)
+        np.testing.assert_array_equal(dataset['x'], self.x)
+        np.testing.assert_array_equal(dataset['y'], self.y)
+
+        self.assertRaises(
+            ValueError,
+            open_columnar, path, names=('x', 'y', 'z'), dtype=np.float64,
+            offset=8
+        )
+
+    def test_mismatched_columns_raise(self):
+        self.assertRaises(
+            ValueError, Dataset, columns={'x': self.x, 'y': self.y[:10]}
+        )
+
+    def test_pickle_reopens(self):
+        """Test that pickling a memory-mapped dataset pickles how to open it
+        rather than its fitness cases.
+
+        """
+        save_npy(self.directory, {'x': self.x, 'y': self.y})
+        dataset = open_npy(self.directory)
+
+        pickled = pickle.dumps(dataset, pickle.HIGHEST_PROTOCOL)
+        restored = pickle.loads(pickled)
+
+        self.assertLess(len(pickled), self.x.nbytes)
+        self.assertIsInstance(restored['x'], np.memmap)
+        np.testing.assert_array_equal(restored['x'], self.x)
+
+    def test_slice(self):
+        dataset = Dataset(columns={'x': self.x, 'y': self.y})
+
+        chunk = dataset.slice(100, 200)
+
+        self.assertEqual(chunk.n_cases, 100)
+        self.assertTrue(np.shares_memory(chunk['x'], self.x))
+        np.testing.assert_array_equal(chunk['x'], self.x[100:200])
+
+        copied = dataset.slice(100, 200, copy=True)
+
+        self.assertFalse(np.shares_memory(copied['x'], self.x))
+        np.testing.assert_array_equal(copied['x'], self.x[100:200])
+
+    def test_bind_variables_by_name(self):
+        save_npy(self.directory, {'x': self.x, 'y': self.y})
+        dataset = open_npy(self.directory)
+        x = VariableTerminal(name='x', dtype=float)
+        y = VariableTerminal(name='y', dtype=float)
+        mul = BasisOperator(
+            func=np.multiply, signature=(float, float), dtype=float
+        )
+        root = Node(operator=mul)
+        root.add_child(child=Node(operator=x), position=0)
+        root.add_child(child=Node(operator=y), position=1)
+
+        output = Interpreter(bindings=dataset).evaluate(Tree(root=root))
+
+        np.testing.assert_allclose(output, self.x * self.y)
@@ -0,0 +1,129 @@
+import itertools
+import math
+import random
+import unittest
+
+from zoonomia.tree import Node, Tree
+from zoonomia.solution import (
+    BasisOperator, TerminalOperator, OperatorSet, Objective, Solution
+)
+from zoonomia.operations import grow
+from zoonomia.diversity import (
+    subtree_hashes, distinct_subtrees, operator_entropy, MinHash, Diversity
+)
+
+
+def add(a, b): return a + b
+
+
+class Trees(object):
+
+    def setUp(self):
+        self.add_op = BasisOperator(func=add, signature=(int, int), dtype=int)
+        self.mul_op = BasisOperator(func=add, signature=(int, int), dtype=int)
+        self.x = TerminalOperator(source=xrange(10), dtype=int)
+        self.y = TerminalOperator(source=xrange(10), dtype=int)
+        self.objectives = (
+            Objective(eval_func=lambda s: float(s.tree.size), weight=-1.0),
+        )
+
+    def node(self, operator, *children):
+        node = Node(operator=operator)
+        for position, child in enumerate(children):
+            node.add_child(child=child, position=position)
+        return node
+
+    def solution(self, root):
+        return Solution(tree=Tree(root=root), objectives=self.objectives)
+
+    def population(self, size, seed):
+        basis_set = OperatorSet(operators=(self.add_op, self.mul_op))
+        terminal_set = OperatorSet(operators=(self.x, self.y))
+        rng = random.Random(seed)
+
+        return [
+            grow(6, basis_set, terminal_set, int, self.objectives, rng)
+            for _ in xrange(size)
+        ]
+
+
+class TestMetrics(Trees, unittest.TestCase):
+
+    def test_distinct_subtrees(self):
+        x_plus_y = self.node(
+            self.add_op, self.node(self.x), self.node(self.y)
+        )
+        solutions = (
+            self.solution(x_plus_y),
+            self.solution(self.node(self.mul_op, x_plus_y, self.node(self.x)))
+        )
+
+        self.assertEqual(len(subtree_hashes(solutions[0].tree)), 3)
+        self.assertEqual(len(subtree_hashes(solutions[1].tree)), 4)
+        self.assertEqual(distinct_subtrees(solutions), 4)
+
+    def test_operator_entropy(self):
+        uniform = self.solution(
+            self.node(self.add_op, self.node(self.x), self.node(self.y))
+        )
+        constant = self.solution(self.node(self.x))
+
+        self.assertAlmostEqual(operator_entropy((uniform,)), math.log(3, 2))
+        self.assertEqual(operator_entropy((constant, constant)), 0.0)
+
+
+class TestMinHash(Trees, unittest.TestCase):
+
+    def jaccard(self, tree_1, tree_2):
+        a = subtree_hashes(tree_1)
+        b = subtree_hashes(tree_2)
+        return float(len(a & b)) / len(a | b)
+
+    def test_similarity(self):
+        minhash = MinHash(num_hashes=256)
+        population = self.population(size=20, seed=1)
+
+        for s_1, s_2 in itertools.combinations(population[:10], 2):
+            self.assertAlmostEqual(
+                1.0 - minhash.distance(s_1.tree, s_2.tree),
+                self.jaccard(s_1.tree, s_2.tree),
+                delta=0.15
+            )
+
+        self.assertEqual(minhash.distance(s_1.tree, s_1.tree), 0.0)
+
+    def test_mean_distance(self):
+        """Test that the linear time mean agrees with the mean over every
+        pair.
+
+        """
+        minhash = MinHash(num_hashes=32)
+        population = self.population(size=30, seed=2)
+        signatures = [minhash.signature(s.tree) for s in population]
+        distances = [
+            1.0 - minhash.similarity(a, b)
+            for a, b in itertools.combinations(signatures, 2)
+        ]
+
+        self.assertAlmostEqual(
+            minhash.mean_distance(signatures),
+            sum(distances) / len(distances)
+        )
+        self.assertEqual(minhash.mean_distance(signatures[:1]), 0.0)
+
+
+class TestDiversity(Trees, unittest.TestCase):
+
+    def test_convergence(self):
+        population = self.population(size=30, seed=3)
+        diverse = Diversity(population)
+        converged = Diversity(population[:3] * 10)
+
+        self.assertEqual(diverse.population_size, 30)
+        self.assertEqual(converged.population_size, 30)
+        self.assertEqual(converged.distinct_trees, 3)
+        self.assertGreater(diverse.distinct_trees, converged.distinct_trees)
+        self.assertGreater(
+            diverse.distinct_subtrees, converged.distinct_subtrees
+        )
+        self.assertGreater(diverse.mean_distance, converged.mean_distance)
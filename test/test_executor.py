@@ -0,0 +1,295 @@
+import os
+import signal
+import time
+import unittest
+
+from multiprocessing.pool import ThreadPool
+
+from zoonomia.tree import Node, Tree
+from zoonomia.solution import (
+    BasisOperator, TerminalOperator, Objective, Solution
+)
+from zoonomia.codec import OperatorRegistry
+from zoonomia.executor import (
+    MapExecutor, CostModel, schedule, ScheduledExecutor, ProcessExecutor
+)
+
+
+def add(a, b): return a + b
+
+
+class TestMapExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.terminals = tuple(
+            TerminalOperator(source=(i,), dtype=int) for i in xrange(10)
+        )
+        self.objective = Objective(
+            eval_func=lambda s: float(s.tree.root.operator.source[0]),
+            weight=2.0
+        )
+        self.solutions = tuple(
+            Solution(
+                tree=Tree(root=Node(operator=t)), objectives=(self.objective,)
+            ) for t in self.terminals
+        )
+
+    def test_evaluate(self):
+        fitnesses = MapExecutor().evaluate(self.solutions)
+
+        self.assertListEqual(
+            [f[0].score for f in fitnesses], [2.0 * i for i in xrange(10)]
+        )
+        for solution, fitness in zip(self.solutions, fitnesses):
+            self.assertIs(solution.fitnesses, fitness)
+
+    def test_evaluate_thread_pool(self):
+        pool = ThreadPool(processes=4)
+
+        try:
+            fitnesses = MapExecutor(map_=pool.map).evaluate(self.solutions)
+        finally:
+            pool.close()
+            pool.join()
+
+        self.assertListEqual(
+            [f[0].score for f in fitnesses], [2.0 * i for i in xrange(10)]
+        )
+
+
+class TestCostModel(unittest.TestCase):
+
+    def setUp(self):
+        self.add_op = BasisOperator(func=add, signature=(int, int), dtype=int)
+        self.x = TerminalOperator(source=(1,), dtype=int)
+
+    def _chain(self, n):
+        node = Node(operator=self.x)
+
+        for _ in xrange(n):
+            parent = Node(operator=self.add_op)
+            parent.add_child(child=node, position=0)
+            parent.add_child(child=Node(operator=self.x), position=1)
+            node = parent
+
+        return Tree(root=node)
+
+    def test_initial_estimate_is_node_count(self):
+        model = CostModel(initial_weight=1.0)
+
+        self.assertEqual(model.estimate(self._chain(3)), 7.0)
+
+    def test_learns_operator_weights(self):
+        """Test that weights converge to the true per-operator costs when
+        timings are an exact weighted node count.
+
+        """
+        model = CostModel(initial_weight=1.0)
+        true_weights = {self.add_op: 0.003, self.x: 0.001}
+
+        for _ in xrange(200):
+            for n in (0, 1, 2, 5, 9):
+                tree = self._chain(n)
+                model.update(
+                    tree, sum(true_weights[node.operator] for node in tree)
+                )
+
+        self.assertAlmostEqual(model.weights[self.add_op], 0.003, places=5)
+        self.assertAlmostEqual(model.weights[self.x], 0.001, places=5)
+        self.assertAlmostEqual(
+            model.estimate(self._chain(20)), 20 * 0.003 + 21 * 0.001, places=4
+        )
+
+
+class TestSchedule(unittest.TestCase):
+
+    def test_longest_expected_first(self):
+        costs = [1.0, 50.0, 2.0, 30.0, 1.0, 1.0, 5.0, 1.0]
+        chunks = schedule(costs, n_workers=2)
+        order = [i for chunk in chunks for i in chunk]
+
+        self.assertItemsEqual(order, xrange(len(costs)))
+        self.assertListEqual(
+            [costs[i] for i in order], sorted(costs, reverse=True)
+        )
+        self.assertListEqual(chunks[0], [1])
+
+    def test_chunks_grow_as_costs_shrink(self):
+        costs = [100.0] * 4 + [1.0] * 400
+        chunks = schedule(costs, n_workers=4)
+
+        self.assertEqual(len(chunks[0]), 1)
+        self.assertGreater(max(len(c) for c in chunks), 10)
+        self.assertItemsEqual(
+            [i for chunk in chunks for i in chunk], xrange(len(costs))
+        )
+
+    def test_empty(self):
+        self.assertListEqual(schedule([], n_workers=3), [])
+
+
+class TestScheduledExecutor(unittest.TestCase):
+
+    def test_evaluate_updates_cost_model(self):
+        terminals = tuple(
+            TerminalOperator(source=(i,), dtype=int) for i in xrange(10)
+        )
+        objective = Objective(
+            eval_func=lambda s: float(s.tree.root.operator.source[0]),
+            weight=1.0
+        )
+        solutions = tuple(
+            Solution(tree=Tree(root=Node(operator=t)), objectives=(objective,))
+            for t in terminals
+        )
+        cost_model = CostModel()
+        pool = ThreadPool(processes=3)
+
+        try:
+            executor = ScheduledExecutor(
+                map_=pool.imap, n_workers=3, cost_model=cost_model
+            )
+            fitnesses = executor.evaluate(solutions)
+        finally:
+            pool.close()
+            pool.join()
+
+        self.assertListEqual(
+            [f[0].score for f in fitnesses], [float(i) for i in xrange(10)]
+        )
+        self.assertItemsEqual(cost_model.weights.keys(), terminals)
+
+
+def _behaviour(solution):
+    value = solution.tree.root.operator.source[0]
+
+    if value == 'spin':
+        while True:
+            pass
+    elif value == 'stuck':
+        signal.signal(signal.SIGALRM, signal.SIG_IGN)
+        time.sleep(30)
+    elif value == 'hog':
+        return float(len(' ' * (512 * 2 ** 20)))
+    elif value == 'raise':
+        raise ZeroDivisionError()
+    elif value == 'exit':
+        os._exit(3)
+    elif value == 'kill':
+        os.kill(os.getpid(), signal.SIGKILL)
+
+    return float(value)
+
+
+class TestProcessExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.terminals = tuple(
+            TerminalOperator(source=(v,), dtype=int)
+            for v in (
+                0, 1, 2, 3, 'spin', 'stuck', 'hog', 'raise', 'exit', 'kill'
+            )
+        )
+        self.registry = OperatorRegistry(operators=self.terminals)
+        self.objectives = (Objective(eval_func=_behaviour, weight=1.0),)
+        self.executor = None
+
+    def tearDown(self):
+        if self.executor is not None:
+            self.executor.close()
+
+    def _solutions(self, values):
+        by_value = {t.source[0]: t for t in self.terminals}
+        return tuple(
+            Solution(
+                tree=Tree(root=Node(operator=by_value[v])),
+                objectives=self.objectives
+            ) for v in values
+        )
+
+    def test_evaluate(self):
+        self.executor = ProcessExecutor(
+            registry=self.registry,
+            objectives=self.objectives,
+            processes=2,
+            chunk_size=3,
+            cost_model=None
+        )
+        solutions = self._solutions([0, 1, 2, 3] * 5)
+
+        fitnesses = self.executor.evaluate(solutions)
+
+        self.assertListEqual(
+            [f[0].score for f in fitnesses], [0.0, 1.0, 2.0, 3.0] * 5
+        )
+        self.assertListEqual(self.executor.violations, [])
+
+    def test_budgets(self):
+        """Test that runaway, memory hungry and failing evaluations get the
+        worst-case score and are recorded, while every other solution in the
+        same chunks is evaluated normally.
+
+        """
+        self.executor = ProcessExecutor(
+            registry=self.registry,
+            objectives=self.objectives,
+            processes=2,
+            time_limit=0.2,
+            memory_limit=128 * 2 ** 20,
+            worst_scores=(-1000.0,),
+            grace=0.3,
+            chunk_size=4,
+            cost_model=CostModel()
+        )
+        solutions = self._solutions(
+            [0, 'spin', 1, 'stuck', 2, 'hog', 3, 'raise', 1]
+        )
+
+        fitnesses = self.executor.evaluate(solutions)
+
+        self.assertListEqual(
+            [f[0].score for f in fitnesses],
+            [0.0, -1000.0, 1.0, -1000.0, 2.0, -1000.0, 3.0, -1000.0, 1.0]
+        )
+
+        reasons = {
+            v.solution.tree.root.operator.source[0]: v.reason
+            for v in self.executor.violations
+        }
+
+        self.assertEqual(reasons['spin'], 'time')
+        self.assertEqual(reasons['stuck'], 'time')
+        self.assertEqual(reasons['hog'], 'memory')
+        self.assertTrue(reasons['raise'].startswith('error'))
+        self.assertEqual(len(reasons), 4)
+
+        # the pool is still healthy afterwards
+        more = self._solutions([3, 2])
+        self.assertListEqual(
+            [f[0].score for f in self.executor.evaluate(more)], [3.0, 2.0]
+        )
+
+    def test_dead_workers(self):
+        """Test that a worker killed by the kernel is reported as out of
+        memory, and one which exits for any other reason by its exit code.
+
+        """
+        self.executor = ProcessExecutor(
+            registry=self.registry,
+            objectives=self.objectives,
+            processes=1,
+            worst_scores=(-1000.0,),
+            chunk_size=3,
+            cost_model=None
+        )
+        solutions = self._solutions([0, 'exit', 1, 'kill', 2])
+
+        fitnesses = self.executor.evaluate(solutions)
+
+        self.assertListEqual(
+            [f[0].score for f in fitnesses], [0.0, -1000.0, 1.0, -1000.0, 2.0]
+        )
+        self.assertListEqual(
+            [v.reason for v in self.executor.violations],
+            ['error: exit 3', 'memory']
+        )
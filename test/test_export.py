@@ -0,0 +1,132 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from zoonomia.solution import ConstantTerminal, Objective
+from zoonomia.codec import OperatorRegistry
+from zoonomia.export import Exporter, chunks, read_column
+
+from .fixtures import Chains
+
+
+class TestExporter(Chains, unittest.TestCase):
+
+    def setUp(self):
+        Chains.setUp(self)
+        self.operand = ConstantTerminal(value=1, dtype=int)
+        self.registry = OperatorRegistry(operators=(self.add_op, self.x))
+        self.objectives = (
+            Objective(eval_func=lambda s: float(s.tree.size), weight=-1.0),
+            Objective(eval_func=lambda s: float(s.tree.depth), weight=1.0)
+        )
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_record(self):
+        exporter = Exporter(
+            self.directory, n_objectives=2, registry=self.registry,
+            chunk_size=4
+        )
+        population = [self.solution(size) for size in (1, 3, 5)]
+        population[1].evaluate()
+
+        ids = exporter.record_generation(population, generation=0)
+        child = exporter.record(
+            self.solution(7), generation=1, parents=(ids[0], ids[2])
+        )
+        exporter.record(self.solution(9), generation=1, parents=(child,))
+        exporter.close()
+
+        self.assertListEqual(ids, [0, 1, 2])
+        self.assertEqual(len(chunks(self.directory)), 2)
+        np.testing.assert_array_equal(read_column(self.directory, 'id'), [
+            0, 1, 2, 3, 4
+        ])
+        np.testing.assert_array_equal(
+            read_column(self.directory, 'generation'), [0, 0, 0, 1, 1]
+        )
+        np.testing.assert_array_equal(
+            read_column(self.directory, 'size'), [1, 3, 5, 7, 9]
+        )
+        np.testing.assert_array_equal(
+            read_column(self.directory, 'depth'), [1, 2, 3, 4, 5]
+        )
+        np.testing.assert_array_equal(
+            read_column(self.directory, 'parents'),
+            [[-1, -1], [-1, -1], [-1, -1], [0, 2], [3, -1]]
+        )
+
+        scores = read_column(self.directory, 'scores')
+
+        np.testing.assert_array_equal(scores[1], [-3.0, 2.0])
+        self.assertTrue(np.isnan(scores[0]).all())
+
+        np.testing.assert_array_equal(
+            read_column(self.directory, 'operators')[2], [2, 1, 2]
+        )
+
+    def test_bounded_buffer(self):
+        """Test that records are written out whenever a chunk fills."""
+        exporter = Exporter(self.directory, n_objectives=2, chunk_size=10)
+
+        for i in xrange(25):
+            exporter.record(self.solution(1), generation=i)
+            self.assertEqual(len(chunks(self.directory)), (i + 1) // 10)
+
+        exporter.flush()
+
+        self.assertListEqual(
+            [len(chunk['id']) for chunk in chunks(self.directory)],
+            [10, 10, 5]
+        )
+        self.assertNotIn('operators', chunks(self.directory)[0])
+        self.assertListEqual(
+            [f for f in os.listdir(self.directory) if f.endswith('.tmp')], []
+        )
+
+    def test_append(self):
+        exporter = Exporter(self.directory, n_objectives=2)
+        exporter.record(self.solution(1), generation=0)
+        exporter.close()
+
+        exporter = Exporter(self.directory, n_objectives=2)
+
+        self.assertEqual(
+            exporter.record(self.solution(3), generation=1, parents=(0,)), 1
+        )
+        exporter.close()
+
+        np.testing.assert_array_equal(
+            read_column(self.directory, 'id'), [0, 1]
+        )
+
+    def test_stale_temporary_chunk(self):
+        """Test that a partial chunk left behind by a crashed run does not
+        leak into the chunk written in its place.
+
+        """
+        stale = os.path.join(self.directory, 'chunk-000000.tmp')
+        os.mkdir(stale)
+        np.save(os.path.join(stale, 'stale.npy'), np.zeros(3))
+
+        exporter = Exporter(self.directory, n_objectives=2)
+        exporter.record(self.solution(1), generation=0)
+        exporter.close()
+
+        self.assertFalse(os.path.exists(stale))
+        self.assertNotIn('stale', chunks(self.directory)[0])
+        np.testing.assert_array_equal(
+            read_column(self.directory, 'id'), [0]
+        )
+
+    def test_too_many_parents(self):
+        exporter = Exporter(self.directory, n_objectives=2, max_parents=1)
+
+        self.assertRaises(
+            ValueError, exporter.record, self.solution(1), 0, (0, 1)
+        )
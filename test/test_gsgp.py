@@ -0,0 +1,148 @@
+import random
+import unittest
+
+import numpy as np
+
+from zoonomia.solution import (
+    BasisOperator, VariableTerminal, ConstantTerminal, OperatorSet, Solution
+)
+from zoonomia.operations import grow
+from zoonomia.interpreter import Interpreter
+from zoonomia.data import Dataset
+from zoonomia.streaming import MEAN, squared_error
+from zoonomia.gsgp import (
+    SemanticSolution, SemanticObjective, GeometricSemanticOperators
+)
+
+
+def _unique_and_expanded(tree):
+    """Count the distinct nodes of a tree and the nodes it would have if its
+    shared subtrees were copied.
+
+    """
+    sizes = {}
+    stack = [tree.root]
+
+    while len(stack) > 0:
+        node = stack[-1]
+        pending = [c for c in node.children if c not in sizes]
+        if len(pending) > 0:
+            stack.extend(pending)
+        else:
+            stack.pop()
+            sizes[node] = 1 + sum(sizes[c] for c in node.children)
+
+    return len(sizes), sizes[tree.root]
+
+
+class TestGeometricSemanticOperators(unittest.TestCase):
+
+    def setUp(self):
+        x = np.linspace(-1.0, 1.0, 201)
+        self.dataset = Dataset(columns={'x': x, 'y': np.sin(3.0 * x)})
+        self.add_op = BasisOperator(
+            func=np.add, signature=(float, float), dtype=float
+        )
+        self.sub_op = BasisOperator(
+            func=np.subtract, signature=(float, float), dtype=float
+        )
+        self.mul_op = BasisOperator(
+            func=np.multiply, signature=(float, float), dtype=float
+        )
+        self.logistic_op = BasisOperator(
+            func=lambda a: 1.0 / (1.0 + np.exp(-a)),
+            signature=(float,),
+            dtype=float
+        )
+        self.basis_set = OperatorSet(
+            operators=(self.add_op, self.sub_op, self.mul_op)
+        )
+        self.terminal_set = OperatorSet(
+            operators=(
+                VariableTerminal(name='x', dtype=float),
+                ConstantTerminal(value=0.5, dtype=float)
+            )
+        )
+        self.objectives = (
+            SemanticObjective(
+                error=squared_error('y'), reducer=MEAN, weight=-1.0,
+                dataset=self.dataset
+            ),
+        )
+        self.operators = GeometricSemanticOperators(
+            dataset=self.dataset,
+            basis_set=self.basis_set,
+            terminal_set=self.terminal_set,
+            add=self.add_op,
+            subtract=self.sub_op,
+            multiply=self.mul_op,
+            logistic=self.logistic_op
+        )
+
+    def population(self, rng, n=10):
+        return [
+            self.operators.solution(
+                grow(
+                    3, self.basis_set, self.terminal_set, float,
+                    self.objectives, rng
+                ).tree,
+                self.objectives
+            )
+            for _ in xrange(n)
+        ]
+
+    def test_crossover_is_convex(self):
+        rng = random.Random(1)
+        parent_1, parent_2 = self.population(rng, n=2)
+
+        child = self.operators.crossover(parent_1, parent_2, rng)
+
+        low = np.minimum(parent_1.semantics, parent_2.semantics)
+        high = np.maximum(parent_1.semantics, parent_2.semantics)
+        self.assertIsInstance(child, SemanticSolution)
+        self.assertTrue(np.all(child.semantics >= low - 1e-12))
+        self.assertTrue(np.all(child.semantics <= high + 1e-12))
+
+    def test_semantics_match_trees(self):
+        """Test that after many generations the incrementally computed
+        semantics still agree with evaluating the offspring's tree, which has
+        become far too large to copy.
+
+        """
+        rng = random.Random(2)
+        population = self.population(rng)
+
+        for _ in xrange(25):
+            offspring = []
+            for _ in xrange(len(population)):
+                a, b = rng.sample(population, 2)
+                child = self.operators.crossover(a, b, rng)
+                offspring.append(self.operators.mutate(child, rng))
+            population = offspring
+
+        best = max(population, key=lambda s: s.evaluate()[0].score)
+        unique, expanded = _unique_and_expanded(best.tree)
+        output = Interpreter(
+            bindings=self.dataset, cache_budget=10 ** 9
+        ).evaluate(best.tree)
+
+        self.assertGreater(expanded, 10 ** 6)
+        self.assertLess(unique, 10 ** 5)
+        np.testing.assert_allclose(output, best.semantics)
+
+    def test_semantic_objective(self):
+        """Test that scoring from cached semantics agrees with scoring from
+        the tree, which is what happens for ordinary solutions.
+
+        """
+        rng = random.Random(3)
+        solution = self.population(rng, n=1)[0]
+        plain = Solution(tree=solution.tree, objectives=self.objectives)
+
+        self.assertAlmostEqual(
+            solution.evaluate()[0].score, plain.evaluate()[0].score
+        )
+        self.assertAlmostEqual(
+            solution.evaluate()[0].score,
+            -np.mean((solution.semantics - self.dataset['y']) ** 2)
+        )
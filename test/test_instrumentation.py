@@ -0,0 +1,223 @@
+import json
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from zoonomia.tree import Node, Tree
+from zoonomia.solution import (
+    BasisOperator, ConstantTerminal, Objective, Solution
+)
+from zoonomia.interpreter import Interpreter, BitwiseInterpreter
+from zoonomia.instrumentation import (
+    Instrumentation, MemorySink, LoggingSink, JSONLinesSink, OperatorStats
+)
+
+
+def add(a, b): return a + b
+
+
+def neg(a): return -a
+
+
+class Operators(object):
+
+    def setUp(self):
+        self.add_op = BasisOperator(func=add, signature=(int, int), dtype=int)
+        self.neg_op = BasisOperator(func=neg, signature=(int,), dtype=int)
+        self.x = ConstantTerminal(value=2, dtype=int)
+        self.objectives = (
+            Objective(eval_func=lambda s: float(s.tree.size), weight=-1.0),
+        )
+
+    def tree(self):
+        """-(x + x)"""
+        add_node = Node(operator=self.add_op)
+        add_node.add_child(child=Node(operator=self.x), position=0)
+        add_node.add_child(child=Node(operator=self.x), position=1)
+        root = Node(operator=self.neg_op)
+        root.add_child(child=add_node, position=0)
+        return Tree(root=root)
+
+
+class TestInstrumentation(Operators, unittest.TestCase):
+
+    def test_operators(self):
+        sink = MemorySink()
+        instrumentation = Instrumentation(sink)
+        interpreter = Interpreter()
+        tree = self.tree()
+
+        instrumentation.instrument((self.add_op, self.neg_op, self.x))
+        instrumentation.instrument((self.add_op,))
+
+        self.assertIsInstance(self.add_op.func, OperatorStats)
+        self.assertEqual(len(instrumentation.operators), 2)
+
+        for _ in xrange(3):
+            self.assertEqual(interpreter.evaluate(tree), -4)
+
+        record = instrumentation.end_generation(0)
+
+        self.assertIs(sink.records[0], record)
+        self.assertListEqual(
+            [(o['name'], o['calls']) for o in record['operators']],
+            [('add', 3), ('neg', 3)]
+        )
+        self.assertTrue(all(o['seconds'] >= 0.0 for o in record['operators']))
+
+        interpreter.evaluate(tree)
+        record = instrumentation.end_generation(1)
+
+        self.assertEqual(record['operators'][0]['calls'], 1)
+
+        instrumentation.close()
+
+        self.assertIs(self.add_op.func, add)
+        self.assertIs(self.neg_op.func, neg)
+
+    def test_pickle_instrumented_operator(self):
+        instrumentation = Instrumentation(MemorySink())
+        instrumentation.instrument((self.add_op,))
+        self.add_op(1, 2)
+
+        restored = pickle.loads(
+            pickle.dumps(self.add_op, pickle.HIGHEST_PROTOCOL)
+        )
+
+        self.assertIsInstance(restored.func, OperatorStats)
+        self.assertIs(restored.func.operator, restored)
+        self.assertIs(restored.func.func, add)
+        self.assertEqual(restored.func.calls, 1)
+        self.assertEqual(restored(2, 3), 5)
+        self.assertEqual(restored.func.calls, 2)
+        self.assertEqual(self.add_op.func.calls, 1)
+
+        instrumentation.close()
+
+    def test_bitwise_operators(self):
+        """Test that calls made by a BitwiseInterpreter are counted against
+        the operators' bitwise implementations.
+
+        """
+        def and_(a, b): return a and b
+
+        def bitwise_and(a, b): return a & b
+
+        and_op = BasisOperator(
+            func=and_, signature=(bool, bool), dtype=bool, bitwise=bitwise_and
+        )
+        a = ConstantTerminal(value=True, dtype=bool)
+        root = Node(operator=and_op)
+        root.add_child(child=Node(operator=a), position=0)
+        root.add_child(child=Node(operator=a), position=1)
+        instrumentation = Instrumentation(MemorySink())
+
+        instrumentation.instrument((and_op,))
+        BitwiseInterpreter(bindings={}, n_cases=8).evaluate(Tree(root=root))
+        record = instrumentation.end_generation(0)
+
+        self.assertListEqual(
+            [(o['name'], o['implementation'], o['calls'])
+             for o in record['operators']],
+            [('and_', 'func', 0), ('bitwise_and', 'bitwise', 1)]
+        )
+
+        instrumentation.close()
+
+        self.assertIs(and_op.func, and_)
+        self.assertIs(and_op.bitwise, bitwise_and)
+
+    def test_phases_cache_and_population(self):
+        instrumentation = Instrumentation(MemorySink())
+        interpreter = Interpreter(cache_budget=1 << 20)
+        tree = self.tree()
+
+        interpreter.evaluate(tree)
+        instrumentation.observe_cache(interpreter)
+
+        with instrumentation.phase('evaluation'):
+            interpreter.evaluate(tree)
+        instrumentation.add_time('variation', 0.5)
+        instrumentation.add_time('variation', 0.25)
+        trees = (self.tree(), self.tree(), Tree(root=Node(operator=self.x)))
+        instrumentation.observe_population(
+            Solution(tree=t, objectives=self.objectives) for t in trees
+        )
+
+        record = instrumentation.end_generation(0)
+
+        self.assertEqual(record['generation'], 0)
+        self.assertEqual(record['timings']['variation'], 0.75)
+        self.assertGreaterEqual(record['timings']['evaluation'], 0.0)
+        self.assertDictEqual(
+            record['cache'], {'hits': 1, 'misses': 0, 'hit_rate': 1.0}
+        )
+        self.assertListEqual(record['sizes'], [(1, 1), (4, 2)])
+        self.assertListEqual(record['depths'], [(1, 1), (3, 2)])
+        self.assertNotIn('operators', record)
+
+        record = instrumentation.end_generation(1)
+
+        self.assertDictEqual(record['timings'], {})
+        self.assertIsNone(record['cache']['hit_rate'])
+        self.assertNotIn('sizes', record)
+
+    def test_disabled(self):
+        sink = MemorySink()
+        instrumentation = Instrumentation(sink, enabled=False)
+
+        instrumentation.instrument((self.add_op,))
+        with instrumentation.phase('evaluation'):
+            pass
+        instrumentation.observe_population(())
+
+        self.assertIs(self.add_op.func, add)
+        self.assertIsNone(instrumentation.end_generation(0))
+        self.assertListEqual(sink.records, [])
+
+
+class TestSinks(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_json_lines(self):
+        path = os.path.join(self.directory, 'run.jsonl')
+        instrumentation = Instrumentation(JSONLinesSink(path))
+
+        instrumentation.add_time('selection', 1.0)
+        instrumentation.end_generation(0)
+        instrumentation.end_generation(1)
+        instrumentation.close()
+
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+
+        self.assertListEqual(records, [
+            {'generation': 0, 'timings': {'selection': 1.0}},
+            {'generation': 1, 'timings': {}}
+        ])
+
+    def test_logging(self):
+        messages = []
+
+        class Handler(logging.Handler):
+            def emit(self, record):
+                messages.append(record.getMessage())
+
+        logger = logging.getLogger('test_instrumentation')
+        logger.setLevel(logging.INFO)
+        logger.addHandler(Handler())
+
+        Instrumentation(LoggingSink(logger)).end_generation(5)
+
+        self.assertListEqual(
+            [json.loads(m) for m in messages],
+            [{'generation': 5, 'timings': {}}]
+        )
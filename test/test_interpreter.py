@@ -0,0 +1,359 @@
+import itertools
+import operator
+import random
+import sys
+import unittest
+
+import numpy as np
+
+from zoonomia.tree import Node, Tree
+from zoonomia.solution import (
+    BasisOperator, TerminalOperator, OperatorSet, Objective, Solution,
+    VariableTerminal
+)
+from zoonomia.operations import crossover_subtree, mutate_node, full
+from zoonomia.interpreter import (
+    Interpreter, BitwiseInterpreter, interpreter_for, pack, unpack, popcount,
+    bitwise_if, _sizeof
+)
+
+
+class TestInterpreter(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+
+        def add(a, b):
+            self.calls.append('add')
+            return tuple(i + j for i, j in zip(a, b))
+
+        def sub(a, b):
+            self.calls.append('sub')
+            return tuple(i - j for i, j in zip(a, b))
+
+        def neg(a):
+            self.calls.append('neg')
+            return tuple(-i for i in a)
+
+        self.add_op = BasisOperator(func=add, signature=(int, int), dtype=int)
+        self.sub_op = BasisOperator(func=sub, signature=(int, int), dtype=int)
+        self.neg_op = BasisOperator(func=neg, signature=(int,), dtype=int)
+        self.x = TerminalOperator(source=None, dtype=int)
+        self.y = TerminalOperator(source=None, dtype=int)
+        self.one = TerminalOperator(source=(1, 1, 1), dtype=int)
+        self.bindings = {self.x: (1, 2, 3), self.y: (10, 20, 30)}
+        self.objectives = (Objective(eval_func=lambda s: 0.0, weight=1.0),)
+
+    def node(self, operator, *children):
+        node = Node(operator=operator)
+        for position, child in enumerate(children):
+            node.add_child(child=child, position=position)
+        return node
+
+    def test_evaluate(self):
+        # add(neg(x), sub(y, one))
+        tree = Tree(
+            root=self.node(
+                self.add_op,
+                self.node(self.neg_op, self.node(self.x)),
+                self.node(self.sub_op, self.node(self.y), self.node(self.one))
+            )
+        )
+
+        self.assertTupleEqual(
+            Interpreter(bindings=self.bindings).evaluate(tree), (8, 17, 26)
+        )
+
+    def test_terminal_tree(self):
+        tree = Tree(root=self.node(self.one))
+
+        self.assertTupleEqual(Interpreter().evaluate(tree), (1, 1, 1))
+
+    def test_variable_bound_by_name(self):
+        x = VariableTerminal(name='x', dtype=int)
+        tree = Tree(root=self.node(self.neg_op, self.node(x)))
+
+        self.assertTupleEqual(
+            Interpreter(bindings={'x': (1, 2)}).evaluate(tree), (-1, -2)
+        )
+        self.assertTupleEqual(
+            Interpreter(bindings={'x': (1, 2), x: (3,)}).evaluate(tree), (-3,)
+        )
+
+    def test_cache_disabled_by_default(self):
+        tree = Tree(root=self.node(self.neg_op, self.node(self.x)))
+        interpreter = Interpreter(bindings=self.bindings)
+
+        interpreter.evaluate(tree)
+        interpreter.evaluate(tree)
+
+        self.assertListEqual(self.calls, ['neg', 'neg'])
+        self.assertEqual(interpreter.cache_size, 0)
+
+    def test_offspring_recompute_only_modified_path(self):
+        """Test that evaluating offspring after their parents only applies the
+        operators on the path from each change up to the root.
+
+        """
+        basis_set = OperatorSet(
+            operators=(self.add_op, self.sub_op, self.neg_op)
+        )
+        terminal_set = OperatorSet(operators=(self.x, self.y, self.one))
+        rng = random.Random(1)
+        parents = [
+            full(6, basis_set, terminal_set, int, self.objectives, rng)
+            for _ in xrange(4)
+        ]
+        interpreter = Interpreter(bindings=self.bindings, cache_budget=10 ** 7)
+        reference = Interpreter(bindings=self.bindings)
+
+        for parent in parents:
+            interpreter.evaluate(parent.tree)
+
+        offspring = list(crossover_subtree(parents[0], parents[1], rng))
+        offspring.append(mutate_node(parents[2], basis_set, terminal_set, rng))
+
+        for child in offspring:
+            del self.calls[:]
+            value = interpreter.evaluate(child.tree)
+            recomputed = len(self.calls)
+
+            self.assertTupleEqual(value, reference.evaluate(child.tree))
+
+            parent_nodes = set()
+            for parent in parents:
+                parent_nodes.update(parent.tree)
+            new_nodes = [
+                n for n in child.tree.index.nodes
+                if n not in parent_nodes and len(n.children) > 0
+            ]
+            self.assertEqual(recomputed, len(new_nodes))
+            self.assertLessEqual(recomputed, child.tree.depth)
+
+        self.assertGreater(interpreter.hits, 0)
+
+    def test_cache_budget_evicts_least_recently_used(self):
+        trees = [
+            Tree(root=self.node(self.neg_op, self.node(terminal)))
+            for terminal in (self.x, self.y, self.one)
+        ]
+        interpreter = Interpreter(bindings=self.bindings, cache_budget=1)
+
+        interpreter.evaluate(trees[0])
+        self.assertEqual(interpreter.cache_size, 0)
+
+        interpreter = Interpreter(
+            bindings=self.bindings, cache_budget=2 * _sizeof((1, 2, 3))
+        )
+
+        for tree in trees:
+            interpreter.evaluate(tree)
+        del self.calls[:]
+
+        interpreter.evaluate(trees[0])
+        interpreter.evaluate(trees[2])
+
+        self.assertListEqual(self.calls, ['neg'])
+        self.assertLessEqual(interpreter.cache_size, interpreter.cache_budget)
+
+        interpreter.clear()
+        self.assertEqual(interpreter.cache_size, 0)
+
+    def test_retain_false_does_not_store(self):
+        tree = Tree(root=self.node(self.neg_op, self.node(self.x)))
+        interpreter = Interpreter(bindings=self.bindings, cache_budget=10 ** 6)
+
+        interpreter.evaluate(tree, retain=False)
+
+        self.assertEqual(interpreter.cache_size, 0)
+
+    def test_sizeof_arrays(self):
+        """Test that an array's buffer is counted once, whether the array
+        owns it or is a view.
+
+        """
+        array = np.zeros(1000)
+        view = array[:500]
+
+        self.assertEqual(_sizeof(array), sys.getsizeof(array))
+        self.assertGreaterEqual(_sizeof(array), 8000)
+        self.assertLess(_sizeof(array), 8000 + 200)
+        self.assertEqual(_sizeof(view), 4000 + sys.getsizeof(view))
+        self.assertLess(_sizeof(view), 4000 + 200)
+
+        neg_op = BasisOperator(
+            func=np.negative, signature=(float,), dtype=float
+        )
+        x = VariableTerminal(name='x', dtype=float)
+        interpreter = Interpreter(bindings={'x': array}, cache_budget=10 ** 6)
+
+        interpreter.evaluate(Tree(root=self.node(neg_op, self.node(x))))
+
+        self.assertEqual(interpreter.cache_size, _sizeof(array))
+
+
+class TestBitwiseInterpreter(unittest.TestCase):
+
+    def setUp(self):
+        self.and_op = BasisOperator(
+            func=lambda a, b: a and b, signature=(bool, bool), dtype=bool,
+            bitwise=operator.and_
+        )
+        self.or_op = BasisOperator(
+            func=lambda a, b: a or b, signature=(bool, bool), dtype=bool,
+            bitwise=operator.or_
+        )
+        self.not_op = BasisOperator(
+            func=lambda a: not a, signature=(bool,), dtype=bool,
+            bitwise=operator.invert
+        )
+        self.if_op = BasisOperator(
+            func=lambda a, b, c: b if a else c, signature=(bool, bool, bool),
+            dtype=bool, bitwise=bitwise_if
+        )
+        self.basis_set = OperatorSet(
+            operators=(self.and_op, self.or_op, self.not_op, self.if_op)
+        )
+        self.a0, self.a1, self.d0, self.d1, self.d2, self.d3 = (
+            TerminalOperator(source=None, dtype=bool) for _ in xrange(6)
+        )
+        self.cases = list(itertools.product((False, True), repeat=6))
+        self.bindings = {
+            terminal: tuple(case[i] for case in self.cases)
+            for i, terminal in enumerate(
+                (self.a0, self.a1, self.d0, self.d1, self.d2, self.d3)
+            )
+        }
+        self.target = tuple(
+            case[2 + 2 * case[1] + case[0]] for case in self.cases
+        )
+
+    def node(self, operator, *children):
+        node = Node(operator=operator)
+        for position, child in enumerate(children):
+            node.add_child(child=child, position=position)
+        return node
+
+    def multiplexer(self):
+        """if(a1, if(a0, d3, d2), if(a0, d1, d0))"""
+        n = self.node
+        return Tree(
+            root=n(
+                self.if_op,
+                n(self.a1),
+                n(self.if_op, n(self.a0), n(self.d3), n(self.d2)),
+                n(self.if_op, n(self.a0), n(self.d1), n(self.d0))
+            )
+        )
+
+    def test_pack_unpack(self):
+        bits = [True, False, False, True, True] * 30
+
+        self.assertEqual(pack([True, False, True]), 5)
+        self.assertEqual(pack([]), 0)
+        self.assertListEqual(unpack(pack(bits), len(bits)), bits)
+        self.assertEqual(popcount(pack(bits)), 90)
+
+    def test_six_multiplexer(self):
+        interpreter = BitwiseInterpreter(
+            bindings=self.bindings, n_cases=len(self.cases)
+        )
+        output = interpreter.evaluate(self.multiplexer())
+        agree = ~(output ^ pack(self.target)) & interpreter.mask
+
+        self.assertListEqual(
+            unpack(output, len(self.cases)), list(self.target)
+        )
+        self.assertEqual(popcount(agree), 64)
+
+    def test_matches_scalar_evaluation(self):
+        """Test that the bit-parallel output of random trees agrees with
+        evaluating each fitness case separately, including for negations whose
+        packed intermediate values are negative.
+
+        """
+        terminal_set = OperatorSet(
+            operators=(self.a0, self.a1, self.d0, self.d1, self.d2, self.d3)
+        )
+        objectives = (Objective(eval_func=lambda s: 0.0, weight=1.0),)
+        rng = random.Random(3)
+        interpreter = BitwiseInterpreter(
+            bindings=self.bindings,
+            n_cases=len(self.cases),
+            cache_budget=10 ** 6
+        )
+
+        for _ in xrange(20):
+            tree = full(
+                4, self.basis_set, terminal_set, bool, objectives, rng
+            ).tree
+            expected = [
+                Interpreter(
+                    bindings={
+                        terminal: values[i]
+                        for terminal, values in self.bindings.iteritems()
+                    }
+                ).evaluate(tree)
+                for i in xrange(len(self.cases))
+            ]
+
+            self.assertListEqual(
+                unpack(interpreter.evaluate(tree), len(self.cases)),
+                [bool(e) for e in expected]
+            )
+            self.assertGreaterEqual(interpreter.evaluate(tree), 0)
+
+    def test_interpreter_for(self):
+        self.assertIsInstance(
+            interpreter_for(self.basis_set, self.bindings), BitwiseInterpreter
+        )
+        self.assertEqual(
+            interpreter_for(self.basis_set, self.bindings).n_cases, 64
+        )
+
+        scalar = OperatorSet(
+            operators=(
+                self.and_op,
+                BasisOperator(
+                    func=lambda a, b: a != b, signature=(bool, bool),
+                    dtype=bool
+                )
+            )
+        )
+
+        self.assertNotIsInstance(
+            interpreter_for(scalar, self.bindings), BitwiseInterpreter
+        )
+        self.assertNotIsInstance(
+            interpreter_for(self.basis_set, {self.a0: (1, 2)}),
+            BitwiseInterpreter
+        )
+
+    def test_interpreter_for_numpy(self):
+        """Test that NumPy boolean columns, and sequences of NumPy booleans,
+        are evaluated bitwise too.
+
+        """
+        columns = {
+            terminal: np.array(bits, dtype=bool)
+            for terminal, bits in self.bindings.iteritems()
+        }
+        scalars = {
+            terminal: [np.bool_(bit) for bit in bits]
+            for terminal, bits in self.bindings.iteritems()
+        }
+        tree = self.multiplexer()
+
+        for bindings in (columns, scalars):
+            interpreter = interpreter_for(self.basis_set, bindings)
+
+            self.assertIsInstance(interpreter, BitwiseInterpreter)
+            self.assertEqual(
+                interpreter.evaluate(tree),
+                BitwiseInterpreter(self.bindings, 64).evaluate(tree)
+            )
+
+        self.assertNotIsInstance(
+            interpreter_for(self.basis_set, {self.a0: np.arange(2)}),
+            BitwiseInterpreter
+        )
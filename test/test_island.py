@@ -0,0 +1,209 @@
+import os
+import random
+import signal
+import time
+import unittest
+
+from zoonomia.tree import Node, Tree
+from zoonomia.solution import TerminalOperator, Objective, Solution
+from zoonomia.codec import OperatorRegistry
+from zoonomia.island import (
+    ring, torus, random_topology, IslandModel, select_emigrants,
+    absorb_immigrants
+)
+
+
+class TestTopologies(unittest.TestCase):
+
+    def test_ring(self):
+        self.assertTupleEqual(ring(3), ((1,), (2,), (0,)))
+        self.assertTupleEqual(ring(1), ((),))
+
+    def test_torus(self):
+        topology = torus(rows=3, columns=3)
+
+        self.assertEqual(len(topology), 9)
+        self.assertItemsEqual(topology[4], (1, 7, 3, 5))
+        self.assertItemsEqual(topology[0], (6, 3, 2, 1))
+
+    def test_torus_degenerate(self):
+        """Test that a single-row torus does not list an island as its own
+        neighbour, nor the same neighbour twice.
+
+        """
+        self.assertTupleEqual(torus(rows=1, columns=2), ((1,), (0,)))
+
+    def test_random_topology(self):
+        topology = random_topology(
+            n_islands=5, degree=2, rng=random.Random(42)
+        )
+
+        self.assertEqual(len(topology), 5)
+        for index, neighbours in enumerate(topology):
+            self.assertEqual(len(neighbours), 2)
+            self.assertNotIn(index, neighbours)
+
+
+class TestMigration(unittest.TestCase):
+
+    def setUp(self):
+        self.terminals = tuple(
+            TerminalOperator(source=(i,), dtype=int) for i in xrange(4)
+        )
+        self.registry = OperatorRegistry(operators=self.terminals)
+        self.objective = Objective(
+            eval_func=lambda s: float(
+                self.registry.id_of(s.tree.root.operator)
+            ),
+            weight=1.0
+        )
+
+    def _solution(self, terminal):
+        return Solution(
+            tree=Tree(root=Node(operator=terminal)),
+            objectives=(self.objective,)
+        )
+
+    def test_select_emigrants(self):
+        population = [self._solution(t) for t in self.terminals]
+        emigrants = select_emigrants(population, 3, random.Random(1))
+
+        self.assertEqual(len(emigrants), 3)
+        for emigrant in emigrants:
+            self.assertIn(emigrant, population)
+            self.assertIsNot(emigrant.tree.root.operator, self.terminals[0])
+
+    def test_absorb_immigrants_replaces_losers(self):
+        population = [self._solution(self.terminals[0]) for _ in xrange(3)]
+        population.append(self._solution(self.terminals[2]))
+        immigrant = self._solution(self.terminals[3])
+
+        absorb_immigrants(population, (immigrant,), random.Random(7))
+
+        self.assertEqual(len(population), 4)
+        self.assertIn(immigrant, population)
+        self.assertIn(
+            self.terminals[2], [s.tree.root.operator for s in population]
+        )
+
+
+def _initialize(index, rng):
+    return [
+        Solution(
+            tree=Tree(root=Node(operator=_TERMINALS[index])),
+            objectives=(_OBJECTIVE,)
+        ) for _ in xrange(4)
+    ]
+
+
+def _breed(population, rng):
+    return population
+
+
+_TERMINALS = tuple(TerminalOperator(source=(i,), dtype=int) for i in xrange(3))
+_REGISTRY = OperatorRegistry(operators=_TERMINALS)
+_OBJECTIVE = Objective(
+    eval_func=lambda s: float(_REGISTRY.id_of(s.tree.root.operator)),
+    weight=1.0
+)
+
+
+class TestIslandModel(unittest.TestCase):
+
+    def test_run(self):
+        """Test that every island's final population comes back decoded and
+        already evaluated.
+
+        """
+        model = IslandModel(
+            topology=ring(3),
+            initialize=_initialize,
+            breed=_breed,
+            registry=_REGISTRY,
+            objectives=(_OBJECTIVE,),
+            generations=6,
+            migration_interval=2,
+            migration_size=1,
+            seed=1
+        )
+
+        populations = model.run()
+
+        self.assertEqual(len(populations), 3)
+        for population in populations:
+            self.assertEqual(len(population), 4)
+            for solution in population:
+                self.assertIsNotNone(solution.fitnesses)
+                self.assertIn(solution.tree.root.operator, _TERMINALS)
+
+    def test_failed_island_raises(self):
+        def initialize(index, rng):
+            raise ValueError('boom')
+
+        model = IslandModel(
+            topology=ring(2),
+            initialize=initialize,
+            breed=_breed,
+            registry=_REGISTRY,
+            objectives=(_OBJECTIVE,),
+            generations=1,
+            migration_interval=1,
+            migration_size=1,
+            seed=1
+        )
+
+        self.assertRaises(RuntimeError, model.run)
+
+    def test_failed_island_stops_the_others(self):
+        """Test that when one island fails, run raises instead of waiting for
+        the other islands, which are still running.
+
+        """
+        def initialize(index, rng):
+            if index == 1:
+                raise ValueError('boom')
+            return _initialize(index, rng)
+
+        def breed(population, rng):
+            time.sleep(0.05)
+            return _breed(population, rng)
+
+        model = IslandModel(
+            topology=ring(3),
+            initialize=initialize,
+            breed=breed,
+            registry=_REGISTRY,
+            objectives=(_OBJECTIVE,),
+            generations=1000,
+            migration_interval=1,
+            migration_size=1,
+            seed=1
+        )
+        start = time.time()
+
+        self.assertRaises(RuntimeError, model.run)
+        self.assertLess(time.time() - start, 10.0)
+
+    def test_killed_island_raises(self):
+        """Test that an island killed without posting a result is reported
+        rather than waited for.
+
+        """
+        def initialize(index, rng):
+            if index == 0:
+                os.kill(os.getpid(), signal.SIGKILL)
+            return _initialize(index, rng)
+
+        model = IslandModel(
+            topology=ring(2),
+            initialize=initialize,
+            breed=_breed,
+            registry=_REGISTRY,
+            objectives=(_OBJECTIVE,),
+            generations=2,
+            migration_interval=1,
+            migration_size=1,
+            seed=1
+        )
+
+        self.assertRaises(RuntimeError, model.run)
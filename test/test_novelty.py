@@ -0,0 +1,122 @@
+import random
+import unittest
+
+import numpy as np
+
+from zoonomia.tree import Node, Tree
+from zoonomia.solution import ConstantTerminal, Objective, Solution
+from zoonomia.novelty import KDTree, NoveltyObjective
+
+
+class TestKDTree(unittest.TestCase):
+
+    def test_query(self):
+        """Test that queries agree with brute force as points are inserted
+        one at a time.
+
+        """
+        rng = np.random.RandomState(1)
+        points = rng.normal(size=(500, 3))
+        points[100:150] = points[0]  # duplicates must not break splitting
+        tree = KDTree(leaf_size=8)
+
+        for i, point in enumerate(points):
+            self.assertEqual(tree.insert(point), i)
+
+            if i % 50 == 0 or i == len(points) - 1:
+                target = rng.normal(size=3)
+                expected = np.sort(
+                    np.sqrt(((points[:i + 1] - target) ** 2).sum(axis=1))
+                )[:5]
+                distances, indices = tree.query(target, k=5)
+
+                np.testing.assert_allclose(distances, expected)
+                np.testing.assert_allclose(
+                    np.sqrt(((points[indices] - target) ** 2).sum(axis=1)),
+                    distances
+                )
+
+        self.assertEqual(len(tree), 500)
+        np.testing.assert_array_equal(tree.points, points)
+
+    def test_exclude(self):
+        tree = KDTree(points=((0.0,), (1.0,), (3.0,)))
+
+        self.assertEqual(tree.query((0.0,), k=2), ([0.0, 1.0], [0, 1]))
+        self.assertEqual(
+            tree.query((0.0,), k=2, exclude=0), ([1.0, 3.0], [1, 2])
+        )
+        self.assertEqual(tree.query((0.0,), k=5, exclude=0)[1], [1, 2])
+
+    def test_empty(self):
+        self.assertEqual(KDTree().query((1.0, 2.0), k=3), ([], []))
+
+    def test_dimension(self):
+        tree = KDTree(points=((0.0, 1.0),))
+
+        self.assertRaises(ValueError, tree.insert, (1.0, 2.0, 3.0))
+
+
+class TestNoveltyObjective(unittest.TestCase):
+
+    def setUp(self):
+        self.objective = NoveltyObjective(
+            behavior=lambda tree: (tree.root.operator.value,), k=2
+        )
+
+    def solution(self, value, objectives=None):
+        return Solution(
+            tree=Tree(root=Node(
+                operator=ConstantTerminal(value=float(value), dtype=float)
+            )),
+            objectives=(self.objective,) if objectives is None else objectives
+        )
+
+    def test_novelty(self):
+        population = [self.solution(v) for v in (0, 1, 2, 10)]
+        self.objective.set_population(population)
+
+        self.assertEqual(population[0].evaluate()[0].score, 1.5)
+        self.assertEqual(population[3].evaluate()[0].score, 8.5)
+        self.assertEqual(self.solution(5).evaluate()[0].score, 3.5)
+
+        self.objective.add(self.solution(9))
+
+        self.assertEqual(self.solution(10).evaluate()[0].score, 0.5)
+        self.assertEqual(len(self.objective.archive), 1)
+
+    def test_threshold(self):
+        self.objective.k = 1
+        self.objective.threshold = 3.0
+        self.objective.set_population(
+            [self.solution(v) for v in (0, 1, 2)]
+        )
+
+        for value in (1.5, 20, 21, 40):
+            self.solution(value).evaluate()
+
+        np.testing.assert_array_equal(
+            self.objective.archive.points, ((1.5,), (20.0,), (40.0,))
+        )
+
+    def test_dominates(self):
+        """Test that novelty can be traded off against another objective."""
+        size = Objective(eval_func=lambda s: s.tree.size, weight=-1.0)
+        objectives = (self.objective, size)
+        population = [self.solution(v, objectives) for v in (0, 1, 2, 10)]
+        self.objective.set_population(population)
+
+        self.assertTrue(population[3].dominates(population[1]))
+        self.assertFalse(population[1].dominates(population[3]))
+
+    def test_large_population(self):
+        rng = random.Random(2)
+        values = np.array([rng.uniform(0.0, 1000.0) for _ in xrange(5000)])
+        population = [self.solution(v) for v in values]
+        self.objective.set_population(population)
+
+        for value, solution in zip(values[:50], population):
+            nearest = np.sort(np.abs(values - value))[1:3]
+            self.assertAlmostEqual(
+                solution.evaluate()[0].score, nearest.mean()
+            )
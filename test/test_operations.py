@@ -1,33 +1,371 @@
+import random
 import unittest
 
+from zoonomia.tree import Node, Tree
+from zoonomia.solution import (
+    BasisOperator, TerminalOperator, OperatorSet, Objective, Solution,
+    ConstantTerminal, EphemeralConstant
+)
 from zoonomia.operations import (
     full, grow, ramped_half_and_half, mutate_subtree, mutate_node,
-    crossover_subtree, tournament_select
+    crossover_subtree, tournament_select, SubtreePool, crossover_subtree_bulk,
+    mutate_bulk
 )
 
 
-class TestOperations(unittest.TestCase):
+def add(a, b): return a + b
+
+
+def neg(a): return -a
+
+
+def gt(a, b): return a > b
+
+
+def if_(p, a, b): return a if p else b
+
+
+class TypedTrees(object):
+
+    def setUp(self):
+        self.add_op = BasisOperator(func=add, signature=(int, int), dtype=int)
+        self.neg_op = BasisOperator(func=neg, signature=(int,), dtype=int)
+        self.gt_op = BasisOperator(func=gt, signature=(int, int), dtype=bool)
+        self.if_op = BasisOperator(
+            func=if_, signature=(bool, int, int), dtype=int
+        )
+        self.sub_op = BasisOperator(func=add, signature=(int, int), dtype=int)
+        self.lt_op = BasisOperator(func=gt, signature=(int, int), dtype=bool)
+        self.x = TerminalOperator(source=xrange(10), dtype=int)
+        self.y = TerminalOperator(source=xrange(10), dtype=int)
+        self.basis_set = OperatorSet(
+            operators=(
+                self.add_op, self.sub_op, self.neg_op, self.gt_op, self.lt_op,
+                self.if_op
+            )
+        )
+        self.terminal_set = OperatorSet(operators=(self.x, self.y))
+        self.objectives = (
+            Objective(eval_func=lambda s: float(s.tree.size), weight=-1.0),
+        )
+
+    def node(self, operator, *children):
+        node = Node(operator=operator)
+        for position, child in enumerate(children):
+            node.add_child(child=child, position=position)
+        return node
+
+    def solution(self, root):
+        return Solution(tree=Tree(root=root), objectives=self.objectives)
+
+    def chain(self, n):
+        node = self.node(self.x)
+        for _ in xrange(n):
+            node = self.node(self.neg_op, node)
+        return self.solution(node)
+
+    def typed(self):
+        # if_(gt(x, y), add(x, y), neg(y))
+        return self.solution(
+            self.node(
+                self.if_op,
+                self.node(self.gt_op, self.node(self.x), self.node(self.y)),
+                self.node(self.add_op, self.node(self.x), self.node(self.y)),
+                self.node(self.neg_op, self.node(self.y))
+            )
+        )
+
+    def assertWellTyped(self, tree):
+        for node in tree:
+            for position, child in enumerate(node.children):
+                self.assertIs(node.operator.signature[position], child.dtype)
+
+
+class TestOperations(TypedTrees, unittest.TestCase):
 
     def test_build_types_possibility_table(self):
         raise NotImplementedError()  # FIXME
 
     def test_full(self):
-        raise NotImplementedError()  # FIXME
+        rng = random.Random(1)
+
+        for depth in xrange(1, 6):
+            solution = full(
+                max_depth=depth,
+                basis_set=self.basis_set,
+                terminal_set=self.terminal_set,
+                dtype=int,
+                objectives=self.objectives,
+                rng=rng
+            )
+            tree = solution.tree
+            index = tree.index
+
+            self.assertWellTyped(tree)
+            self.assertIs(tree.dtype, int)
+            self.assertEqual(tree.depth, depth)
+            # every branch reaches the maximum depth, since bool can always be
+            # produced by gt/lt one level above the terminals
+            for position, node in enumerate(index.nodes):
+                if len(node.children) == 0:
+                    self.assertEqual(index.levels[position], depth)
 
     def test_grow(self):
-        raise NotImplementedError()  # FIXME
+        rng = random.Random(2)
+        depths = set()
+
+        for _ in xrange(50):
+            solution = grow(
+                max_depth=4,
+                basis_set=self.basis_set,
+                terminal_set=self.terminal_set,
+                dtype=int,
+                objectives=self.objectives,
+                rng=rng
+            )
+            self.assertWellTyped(solution.tree)
+            self.assertLessEqual(solution.tree.depth, 4)
+            depths.add(solution.tree.depth)
+
+        self.assertGreater(len(depths), 1)
+
+    def test_grow_respects_types(self):
+        """Test that a bool-typed tree of depth 1 is impossible (there is no
+        bool terminal) and that depth 2 always produces a comparison.
+
+        """
+        rng = random.Random(3)
+
+        self.assertRaises(
+            KeyError, grow, 1, self.basis_set, self.terminal_set, bool,
+            self.objectives, rng
+        )
+
+        solution = grow(2, self.basis_set, self.terminal_set, bool,
+                        self.objectives, rng)
+        self.assertIn(solution.tree.root.operator, (self.gt_op, self.lt_op))
 
     def test_ramped_half_and_half(self):
-        raise NotImplementedError()  # FIXME
+        population = ramped_half_and_half(
+            max_depth=5,
+            population_size=20,
+            basis_set=self.basis_set,
+            terminal_set=self.terminal_set,
+            dtype=int,
+            objectives=self.objectives,
+            rng=random.Random(4)
+        )
+
+        self.assertGreater(len(population), 0)
+        for solution in population:
+            self.assertWellTyped(solution.tree)
+            self.assertLessEqual(solution.tree.depth, 5)
 
     def test_mutate_subtree(self):
-        mutate_subtree(None)  # FIXME
+        rng = random.Random(5)
+        parent = self.typed()
+        before = tuple(parent.tree)
+
+        for _ in xrange(50):
+            mutant = mutate_subtree(
+                parent, self.basis_set, self.terminal_set, max_depth=5, rng=rng
+            )
+            self.assertWellTyped(mutant.tree)
+            self.assertIs(mutant.tree.dtype, int)
+            self.assertLessEqual(mutant.tree.depth, 5)
+
+        self.assertTupleEqual(tuple(parent.tree), before)
 
     def test_mutate_node(self):
-        mutate_node(None)  # FIXME
+        rng = random.Random(6)
+        parent = self.typed()
+        operators = [n.operator for n in parent.tree]
+
+        for _ in xrange(50):
+            mutant = mutate_node(
+                parent, self.basis_set, self.terminal_set, rng
+            )
+            mutated = [n.operator for n in mutant.tree]
+
+            self.assertEqual(len(mutated), len(operators))
+            differences = [
+                (a, b) for a, b in zip(operators, mutated) if a is not b
+            ]
+            self.assertLessEqual(len(differences), 1)
+            for before, after in differences:
+                self.assertIs(before.dtype, after.dtype)
+                self.assertEqual(
+                    getattr(before, 'signature', None),
+                    getattr(after, 'signature', None)
+                )
+
+    def test_mutate_node_without_alternatives(self):
+        """Test that a node whose operator has no same-signature alternative
+        leaves the solution unchanged.
 
-    def test_crossover_subtree(self):
-        crossover_subtree(None, None)  # FIXME
+        """
+        solution = self.solution(self.node(self.neg_op, self.node(self.x)))
+        basis_set = OperatorSet(operators=(self.neg_op,))
+        terminal_set = OperatorSet(operators=(self.x,))
+
+        self.assertIs(
+            mutate_node(solution, basis_set, terminal_set, random.Random(7)),
+            solution
+        )
+
+    def test_mutate_bulk(self):
+        population = tuple(self.typed() for _ in xrange(20))
+
+        mutants = mutate_bulk(
+            population, self.basis_set, self.terminal_set, max_depth=5,
+            rng=random.Random(8)
+        )
+        again = mutate_bulk(
+            population, self.basis_set, self.terminal_set, max_depth=5,
+            rng=random.Random(8)
+        )
+
+        self.assertEqual(len(mutants), 20)
+        for mutant, other in zip(mutants, again):
+            self.assertWellTyped(mutant.tree)
+            self.assertLessEqual(mutant.tree.depth, 5)
+            self.assertListEqual(
+                [n.operator for n in mutant.tree],
+                [n.operator for n in other.tree]
+            )
+
+    def test_ephemeral_constants_are_drawn(self):
+        """Test that tree builders and node mutation replace an ephemeral
+        constant with a constant drawn from its pool.
+
+        """
+        erc = EphemeralConstant(
+            distribution=lambda rng: rng.randint(-5, 5), dtype=int, size=32
+        )
+        terminal_set = OperatorSet(operators=(self.x, erc))
+        rng = random.Random(9)
+        drawn = set()
+
+        for _ in xrange(20):
+            solution = grow(
+                4, self.basis_set, terminal_set, int, self.objectives, rng
+            )
+            mutant = mutate_node(solution, self.basis_set, terminal_set, rng)
+
+            for node in list(solution.tree) + list(mutant.tree):
+                self.assertIsNot(node.operator, erc)
+                if isinstance(node.operator, ConstantTerminal):
+                    self.assertIn(node.operator, erc.constants)
+                    drawn.add(node.operator)
+
+        self.assertGreater(len(drawn), 1)
 
     def test_tournament_select(self):
         raise NotImplementedError()  # FIXME
+
+
+class TestCrossover(TypedTrees, unittest.TestCase):
+
+    def test_crossover_subtree_types(self):
+        """Test that offspring are well typed and that the parents are left
+        untouched.
+
+        """
+        rng = random.Random(3)
+        parent_1 = self.typed()
+        parent_2 = self.typed()
+        before_1 = tuple(parent_1.tree)
+        before_2 = tuple(parent_2.tree)
+
+        for _ in xrange(50):
+            child_1, child_2 = crossover_subtree(parent_1, parent_2, rng)
+
+            self.assertWellTyped(child_1.tree)
+            self.assertWellTyped(child_2.tree)
+            self.assertIs(child_1.tree.dtype, int)
+            self.assertEqual(
+                child_1.tree.size + child_2.tree.size,
+                parent_1.tree.size + parent_2.tree.size
+            )
+            self.assertIs(child_1.objectives, self.objectives)
+
+        self.assertTupleEqual(tuple(parent_1.tree), before_1)
+        self.assertTupleEqual(tuple(parent_2.tree), before_2)
+
+    def test_crossover_subtree_limits(self):
+        """Test that offspring never exceed the depth and size limits, and
+        that the parents come back unchanged when no swap fits.
+
+        """
+        rng = random.Random(5)
+        deep = self.chain(6)
+        shallow = self.chain(1)
+
+        for _ in xrange(50):
+            for child in crossover_subtree(
+                deep, shallow, rng, max_depth=7, max_size=7
+            ):
+                self.assertLessEqual(child.tree.depth, 7)
+                self.assertLessEqual(child.tree.size, 7)
+
+        big = self.chain(5)
+        small = self.chain(0)
+        self.assertTupleEqual(
+            crossover_subtree(big, small, rng, max_depth=1, max_size=1),
+            (big, small)
+        )
+
+    def test_crossover_subtree_shares_unchanged_subtrees(self):
+        rng = random.Random(11)
+        parent_1 = self.typed()
+        parent_2 = self.typed()
+
+        child_1, _ = crossover_subtree(parent_1, parent_2, rng)
+
+        parent_nodes = set(parent_1.tree) | set(parent_2.tree)
+        copied = [n for n in child_1.tree if n not in parent_nodes]
+
+        self.assertLess(len(copied), parent_1.tree.depth)
+
+
+class TestSubtreePool(TypedTrees, unittest.TestCase):
+
+    def test_entries(self):
+        population = (self.typed(), self.chain(2))
+        pool = SubtreePool(population)
+
+        self.assertEqual(len(pool), 9 + 3)
+        self.assertEqual(len(pool.entries(bool)), 1)
+        self.assertEqual(len(pool.entries(int)), 11)
+        self.assertRaises(KeyError, pool.entries, float)
+
+        for solution_index, position in pool.entries(int):
+            node = population[solution_index].tree.index.nodes[position]
+            self.assertIs(node.dtype, int)
+
+    def test_sample(self):
+        pool = SubtreePool((self.typed(),))
+        rng = random.Random(1)
+
+        self.assertEqual(pool.sample(bool, rng), (0, 2))
+        self.assertRaises(KeyError, pool.sample, float, rng)
+
+    def test_crossover_subtree_bulk(self):
+        rng = random.Random(17)
+        population = tuple(self.typed() for _ in xrange(5)) + tuple(
+            self.chain(n) for n in xrange(5)
+        )
+        pool = SubtreePool(population)
+
+        offspring = crossover_subtree_bulk(
+            population, pool, rng, max_depth=5, max_size=12
+        )
+
+        self.assertEqual(len(offspring), len(population))
+        changed = 0
+        for parent, child in zip(population, offspring):
+            self.assertWellTyped(child.tree)
+            self.assertLessEqual(child.tree.depth, 5)
+            self.assertLessEqual(child.tree.size, 12)
+            changed += child is not parent
+        self.assertGreater(changed, 0)
@@ -0,0 +1,151 @@
+import unittest
+
+import numpy as np
+
+from zoonomia.tree import Node, Tree
+from zoonomia.solution import (
+    BasisOperator, VariableTerminal, ConstantTerminal, Solution
+)
+from zoonomia.interpreter import Interpreter
+from zoonomia.data import Dataset
+from zoonomia.streaming import StreamingExecutor
+from zoonomia.regression import (
+    linear_scaling, ScaledObjective, scale_tree, tune_constants, tune_solution
+)
+
+
+class TestRegression(unittest.TestCase):
+
+    def setUp(self):
+        x = np.linspace(-2.0, 2.0, 401)
+        self.dataset = Dataset(
+            columns={'x': x, 'y': 3.0 * x ** 2 - 5.0, 'z': np.exp(0.7 * x)}
+        )
+        self.x = VariableTerminal(name='x', dtype=float)
+        self.add_op = BasisOperator(
+            func=np.add, signature=(float, float), dtype=float
+        )
+        self.mul_op = BasisOperator(
+            func=np.multiply, signature=(float, float), dtype=float
+        )
+        self.exp_op = BasisOperator(
+            func=np.exp, signature=(float,), dtype=float
+        )
+
+    def node(self, operator, *children):
+        node = Node(operator=operator)
+        for position, child in enumerate(children):
+            node.add_child(child=child, position=position)
+        return node
+
+    def constant(self, value):
+        return self.node(ConstantTerminal(value=value, dtype=float))
+
+    def square(self):
+        return Tree(
+            root=self.node(self.mul_op, self.node(self.x), self.node(self.x))
+        )
+
+    def test_linear_scaling(self):
+        x = self.dataset['x']
+
+        intercept, slope = linear_scaling(x ** 2, self.dataset['y'])
+
+        self.assertAlmostEqual(intercept, -5.0)
+        self.assertAlmostEqual(slope, 3.0)
+        self.assertEqual(linear_scaling(2.0, self.dataset['y'])[1], 0.0)
+
+    def test_scaled_objective(self):
+        """Test that x * x is a perfect model of 3x^2 - 5 once scaled, both
+        when evaluated at once and when streamed in chunks.
+
+        """
+        objective = ScaledObjective(target='y', dataset=self.dataset)
+        unscaled = Solution(tree=self.square(), objectives=(objective,))
+        streamed = Solution(tree=self.square(), objectives=(objective,))
+        constant = Solution(
+            tree=Tree(root=self.constant(1.0)), objectives=(objective,)
+        )
+
+        StreamingExecutor(dataset=self.dataset, chunk_size=50).evaluate(
+            (streamed,)
+        )
+
+        self.assertAlmostEqual(unscaled.evaluate()[0].score, 0.0)
+        self.assertAlmostEqual(streamed.evaluate()[0].score, 0.0)
+        self.assertAlmostEqual(
+            constant.evaluate()[0].score, -np.var(self.dataset['y'])
+        )
+
+    def test_scale_tree(self):
+        scaled = scale_tree(
+            self.square(), -5.0, 3.0, add=self.add_op, multiply=self.mul_op
+        )
+
+        np.testing.assert_allclose(
+            Interpreter(bindings=self.dataset).evaluate(scaled),
+            self.dataset['y']
+        )
+
+    def test_tune_constants(self):
+        # exp(mul(0.2, x)) is fitted to exp(0.7x) by tuning the 0.2
+        tree = Tree(
+            root=self.node(
+                self.exp_op,
+                self.node(self.mul_op, self.constant(0.2), self.node(self.x))
+            )
+        )
+        _, initial = tune_constants(
+            tree, self.dataset, 'z', steps=0, scale=False
+        )
+
+        tuned, error = tune_constants(
+            tree, self.dataset, 'z', steps=20, scale=False
+        )
+
+        self.assertLess(error, initial * 1e-6)
+        self.assertAlmostEqual(
+            tuned.root.left.left.operator.value, 0.7, places=4
+        )
+        self.assertIs(tuned.root.left.right[0], tree.root.left.right[0])
+
+    def test_tune_constants_leaves_other_paths_alone(self):
+        """Test that integer constants are not tuned, and that subtrees off
+        the tuned constants' paths are evaluated only once.
+
+        """
+        calls = []
+
+        def multiply(a, b):
+            calls.append(None)
+            return np.multiply(a, b)
+
+        counted = BasisOperator(
+            func=multiply, signature=(float, float), dtype=float
+        )
+        integer = self.node(ConstantTerminal(value=2, dtype=float))
+        tree = Tree(
+            root=self.node(
+                self.add_op,
+                self.node(
+                    self.exp_op,
+                    self.node(
+                        self.mul_op, self.constant(0.2), self.node(self.x)
+                    )
+                ),
+                self.node(counted, integer, self.node(self.x))
+            )
+        )
+
+        tuned, _ = tune_constants(tree, self.dataset, 'z', steps=3)
+
+        self.assertEqual(len(calls), 1)
+        self.assertIs(tuned.root.right[0].left, integer)
+        self.assertIsInstance(integer.operator.value, int)
+
+    def test_tune_solution_without_constants(self):
+        solution = Solution(
+            tree=self.square(), objectives=(ScaledObjective(target='y'),)
+        )
+
+        self.assertIs(tune_solution(solution, self.dataset, 'y'), solution)
@@ -0,0 +1,243 @@
+import socket
+import time
+import unittest
+
+from zoonomia.tree import Node, Tree
+from zoonomia.solution import (
+    BasisOperator, TerminalOperator, ConstantTerminal, Objective, Solution
+)
+from zoonomia.codec import OperatorRegistry
+from zoonomia.executor import CostModel
+from zoonomia.remote import (
+    Worker, RemoteExecutor, send_frame, recv_frame, TASK, ProtocolError
+)
+
+
+def add(a, b): return a + b
+
+
+class TestFrames(unittest.TestCase):
+
+    def test_round_trip(self):
+        left, right = socket.socketpair()
+
+        try:
+            send_frame(left, TASK, {'batch': 3, 'trees': [[1, 2, 0]]})
+            self.assertTupleEqual(
+                recv_frame(right), (TASK, {'batch': 3, 'trees': [[1, 2, 0]]})
+            )
+
+            left.close()
+            self.assertIsNone(recv_frame(right))
+        finally:
+            right.close()
+
+    def test_truncated_frame_raises(self):
+        left, right = socket.socketpair()
+
+        try:
+            left.sendall('\x01\x00\x00\x00\x10{"batch"')
+            left.close()
+            self.assertRaises(ProtocolError, recv_frame, right)
+        finally:
+            right.close()
+
+
+class TestRemoteExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.add_op = BasisOperator(func=add, signature=(int, int), dtype=int)
+        self.terminals = tuple(
+            TerminalOperator(source=(i,), dtype=int) for i in xrange(5)
+        )
+        self.registry = OperatorRegistry(
+            operators=(self.add_op,) + self.terminals
+        )
+        self.objectives = (
+            Objective(eval_func=self._value, weight=1.0),
+            Objective(eval_func=self._size, weight=-1.0),
+        )
+        self.workers = []
+
+    def tearDown(self):
+        for worker in self.workers:
+            worker.close()
+
+    @staticmethod
+    def _value(solution):
+        return float(sum(n.operator.source[0] for n in solution.tree
+                         if isinstance(n.operator, TerminalOperator)))
+
+    @staticmethod
+    def _size(solution):
+        return float(len(tuple(solution.tree)))
+
+    def _worker(self, objectives=None, **kwargs):
+        worker = Worker(
+            registry=self.registry,
+            objectives=objectives or self.objectives,
+            **kwargs
+        ).start()
+        self.workers.append(worker)
+        return worker
+
+    def _population(self):
+        population = []
+
+        for i in xrange(5):
+            for j in xrange(5):
+                root = Node(operator=self.add_op)
+                root.add_child(
+                    child=Node(operator=self.terminals[i]), position=0
+                )
+                root.add_child(
+                    child=Node(operator=self.terminals[j]), position=1
+                )
+                population.append(
+                    Solution(tree=Tree(root=root), objectives=self.objectives)
+                )
+
+        return population
+
+    def test_evaluate(self):
+        """Test that scores computed by several workers match local
+        evaluation and are cached on the solutions.
+
+        """
+        executor = RemoteExecutor(
+            addresses=(self._worker().address, self._worker().address),
+            registry=self.registry,
+            batch_size=4
+        )
+        population = self._population()
+
+        fitnesses = executor.evaluate(population)
+
+        self.assertEqual(len(fitnesses), 25)
+        for solution, fitness in zip(population, fitnesses):
+            self.assertIs(solution.fitnesses, fitness)
+            self.assertListEqual(
+                [f.score for f in fitness],
+                [self._value(solution), -self._size(solution)]
+            )
+
+    def test_unregistered_constants(self):
+        """Test that trees holding constants missing from the registry, such
+        as tuned constants, are shipped inline.
+
+        """
+        objectives = (Objective(eval_func=self._size, weight=-1.0),)
+        executor = RemoteExecutor(
+            addresses=(self._worker(objectives=objectives).address,),
+            registry=self.registry
+        )
+        root = Node(operator=self.add_op)
+        root.add_child(child=Node(operator=self.terminals[0]), position=0)
+        root.add_child(
+            child=Node(operator=ConstantTerminal(value=7, dtype=int)),
+            position=1
+        )
+        solution = Solution(tree=Tree(root=root), objectives=objectives)
+
+        self.assertEqual(executor.evaluate((solution,))[0][0].score, -3.0)
+
+    def test_evaluate_with_cost_model(self):
+        """Test that scheduling batches by cost gives the same scores, and
+        that worker timings are fed back into the cost model.
+
+        """
+        cost_model = CostModel()
+        executor = RemoteExecutor(
+            addresses=(self._worker().address, self._worker().address),
+            registry=self.registry,
+            cost_model=cost_model
+        )
+        population = self._population()
+
+        fitnesses = executor.evaluate(population)
+
+        for solution, fitness in zip(population, fitnesses):
+            self.assertListEqual(
+                [f.score for f in fitness],
+                [self._value(solution), -self._size(solution)]
+            )
+        self.assertItemsEqual(
+            cost_model.weights.keys(), (self.add_op,) + self.terminals
+        )
+
+    def test_dead_worker_is_abandoned(self):
+        """Test that batches are retried on the remaining workers when one of
+        the worker addresses refuses connections.
+
+        """
+        dead = Worker(registry=self.registry, objectives=self.objectives)
+        dead_address = dead.address
+        dead.close()
+
+        executor = RemoteExecutor(
+            addresses=(dead_address, self._worker().address),
+            registry=self.registry,
+            batch_size=3,
+            max_retries=2
+        )
+        population = self._population()
+
+        executor.evaluate(population)
+
+        for solution in population:
+            self.assertIsNotNone(solution.fitnesses)
+
+    def test_heartbeats_keep_slow_batches_alive(self):
+        """Test that a batch which takes longer than the heartbeat timeout
+        still completes, as long as the worker keeps sending heartbeats.
+
+        """
+        def slow(solution):
+            time.sleep(0.3)
+            return 1.0
+
+        objectives = (Objective(eval_func=slow, weight=1.0),)
+        worker = self._worker(objectives=objectives, heartbeat_interval=0.05)
+        executor = RemoteExecutor(
+            addresses=(worker.address,),
+            registry=self.registry,
+            heartbeat_timeout=0.2,
+            max_retries=0
+        )
+        solution = Solution(
+            tree=Tree(root=Node(operator=self.terminals[0])),
+            objectives=objectives
+        )
+
+        self.assertEqual(executor.evaluate((solution,))[0][0].score, 1.0)
+
+    def test_failing_batch_raises(self):
+        """Test that a batch which keeps failing raises once its retry budget
+        is spent.
+
+        """
+        def broken(solution):
+            raise ValueError('broken')
+
+        objectives = (Objective(eval_func=broken, weight=1.0),)
+        executor = RemoteExecutor(
+            addresses=(self._worker(objectives=objectives).address,),
+            registry=self.registry,
+            max_retries=1
+        )
+        solution = Solution(
+            tree=Tree(root=Node(operator=self.terminals[0])),
+            objectives=objectives
+        )
+
+        self.assertRaises(RuntimeError, executor.evaluate, (solution,))
+        self.assertIsNone(solution.fitnesses)
+
+    def test_evaluated_solutions_are_not_sent(self):
+        executor = RemoteExecutor(addresses=(), registry=self.registry)
+        population = self._population()
+
+        for solution in population:
+            solution.evaluate()
+
+        self.assertEqual(len(executor.evaluate(population)), 25)
@@ -0,0 +1,239 @@
+import random
+import unittest
+
+import numpy as np
+
+from zoonomia.tree import Node, Tree
+from zoonomia.solution import (
+    BasisOperator, VariableTerminal, ConstantTerminal, OperatorSet, Solution
+)
+from zoonomia.operations import ramped_half_and_half
+from zoonomia.data import Dataset
+from zoonomia.streaming import CaseObjective, MEAN, squared_error
+from zoonomia.semantics import semantic_hash, SemanticIndex, unique
+
+
+class TestSemanticHash(unittest.TestCase):
+
+    def test_tolerance(self):
+        self.assertEqual(
+            semantic_hash((1.0, 2.0)), semantic_hash((1.0 + 1e-9, 2.0))
+        )
+        self.assertNotEqual(
+            semantic_hash((1.0, 2.0)), semantic_hash((1.0 + 1e-3, 2.0))
+        )
+        self.assertEqual(
+            semantic_hash((1.0, 2.0), tolerance=0.1),
+            semantic_hash((1.01, 2.0), tolerance=0.1)
+        )
+
+    def test_constants(self):
+        self.assertEqual(semantic_hash(3.0), semantic_hash((3.0, 3.0, 3.0)))
+        self.assertEqual(
+            semantic_hash(np.array(2.5)), semantic_hash(np.array([2.5, 2.5]))
+        )
+
+    def test_exact_values(self):
+        self.assertEqual(
+            semantic_hash(np.array([True, False])), semantic_hash((1, 0))
+        )
+        self.assertNotEqual(
+            semantic_hash((10 ** 20, 1)), semantic_hash((10 ** 20 + 1, 1))
+        )
+        self.assertEqual(
+            semantic_hash((float('nan'), 1.0)),
+            semantic_hash((float('nan'), 1.0))
+        )
+
+
+class Arithmetic(object):
+
+    def setUp(self):
+        x = np.linspace(-1.0, 1.0, 9)
+        self.cases = Dataset(columns={'x': x, 'y': x ** 2})
+        self.add_op = BasisOperator(
+            func=np.add, signature=(float, float), dtype=float
+        )
+        self.sub_op = BasisOperator(
+            func=np.subtract, signature=(float, float), dtype=float
+        )
+        self.mul_op = BasisOperator(
+            func=np.multiply, signature=(float, float), dtype=float
+        )
+        self.x = VariableTerminal(name='x', dtype=float)
+        self.y = VariableTerminal(name='y', dtype=float)
+        self.basis_set = OperatorSet(
+            operators=(self.add_op, self.sub_op, self.mul_op)
+        )
+        self.terminal_set = OperatorSet(operators=(self.x, self.y))
+        self.objectives = (
+            CaseObjective(
+                error=squared_error('y'), reducer=MEAN, weight=-1.0,
+                dataset=self.cases
+            ),
+        )
+
+    def solution(self, operator, *children):
+        root = Node(operator=operator)
+        for position, child in enumerate(children):
+            root.add_child(child=Node(operator=child), position=position)
+        return Solution(tree=Tree(root=root), objectives=self.objectives)
+
+
+class TestSemanticIndex(Arithmetic, unittest.TestCase):
+
+    def test_add(self):
+        index = SemanticIndex(cases=self.cases)
+
+        self.assertTrue(index.add(self.solution(self.add_op, self.x, self.y)))
+        self.assertFalse(index.add(self.solution(self.add_op, self.y, self.x)))
+        self.assertTrue(index.add(self.solution(self.mul_op, self.x, self.x)))
+        self.assertFalse(index.add(self.solution(self.y)))
+        self.assertTrue(index.add(self.solution(self.sub_op, self.x, self.x)))
+        self.assertFalse(
+            index.add(self.solution(ConstantTerminal(value=0.0, dtype=float)))
+        )
+
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index.duplicates, 3)
+
+    def test_discard(self):
+        index = SemanticIndex(cases=self.cases)
+        x_plus_y = self.solution(self.add_op, self.x, self.y)
+        y_plus_x = self.solution(self.add_op, self.y, self.x)
+
+        index.update((x_plus_y, y_plus_x))
+        index.discard(x_plus_y)
+
+        self.assertIn(y_plus_x, index)
+
+        index.discard(y_plus_x)
+
+        self.assertNotIn(x_plus_y, index)
+        self.assertEqual(len(index), 0)
+
+    def test_structural_memo(self):
+        """Test that structurally identical trees are only interpreted
+        once.
+
+        """
+        calls = []
+
+        def add(a, b):
+            calls.append(None)
+            return a + b
+
+        add_op = BasisOperator(func=add, signature=(float, float), dtype=float)
+        index = SemanticIndex(cases=self.cases)
+
+        for _ in xrange(3):
+            index.add(self.solution(add_op, self.x, self.y))
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(index.duplicates, 2)
+
+    def test_memo_is_bounded(self):
+        index = SemanticIndex(cases=self.cases, memo_size=2)
+
+        for operator in (self.add_op, self.sub_op, self.mul_op):
+            index.add(self.solution(operator, self.x, self.y))
+
+        self.assertEqual(index.memo_length, 2)
+
+        index.clear()
+
+        self.assertEqual(index.memo_length, 0)
+        self.assertEqual(len(index), 0)
+
+
+class TestDeduplication(Arithmetic, unittest.TestCase):
+
+    def population(self, semantic_index=None):
+        return ramped_half_and_half(
+            max_depth=3,
+            population_size=60,
+            basis_set=self.basis_set,
+            terminal_set=self.terminal_set,
+            dtype=float,
+            objectives=self.objectives,
+            rng=random.Random(1),
+            semantic_index=semantic_index
+        )
+
+    def test_ramped_half_and_half(self):
+        index = SemanticIndex(cases=self.cases)
+        population = self.population(semantic_index=index)
+        keys = set(index.key(s) for s in population)
+
+        self.assertGreater(index.duplicates, 0)
+        self.assertEqual(len(keys), len(population))
+        self.assertGreater(len(population), len(self.population()))
+
+    def test_unique(self):
+        """Test that offspring semantically identical to the population are
+        rejected and variation is retried until a novel one is found.
+
+        """
+        index = SemanticIndex(cases=self.cases)
+        x_plus_y = self.solution(self.add_op, self.x, self.y)
+        index.update((x_plus_y,))
+        offspring = [
+            self.solution(self.add_op, self.y, self.x),
+            self.solution(self.add_op, self.x, self.y),
+            self.solution(self.mul_op, self.x, self.y)
+        ]
+        calls = []
+
+        def variation(parent):
+            calls.append(parent)
+            return offspring[len(calls) - 1]
+
+        mutant = unique(variation, index, attempts=5)(x_plus_y)
+
+        self.assertIs(mutant, offspring[2])
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(len(index), 2)
+        self.assertIn(offspring[2], index)
+
+    def test_unique_pairs(self):
+        """Test that a pair of offspring duplicating each other is retried
+        too.
+
+        """
+        index = SemanticIndex(cases=self.cases)
+        pairs = [
+            (self.solution(self.add_op, self.x, self.y),
+             self.solution(self.add_op, self.y, self.x)),
+            (self.solution(self.add_op, self.x, self.y),
+             self.solution(self.sub_op, self.x, self.y))
+        ]
+        calls = []
+
+        def variation(parent_1, parent_2):
+            calls.append(None)
+            return pairs[len(calls) - 1]
+
+        offspring = unique(variation, index)(None, None)
+
+        self.assertIs(offspring, pairs[1])
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(len(index), 2)
+
+    def test_unique_gives_up(self):
+        """Test that the last offspring is returned when every attempt is a
+        duplicate.
+
+        """
+        index = SemanticIndex(cases=self.cases)
+        index.update((self.solution(self.add_op, self.x, self.y),))
+        calls = []
+
+        def variation():
+            calls.append(None)
+            return self.solution(self.add_op, self.y, self.x)
+
+        mutant = unique(variation, index, attempts=4)()
+
+        self.assertEqual(len(calls), 4)
+        self.assertIn(mutant, index)
+        self.assertEqual(len(index), 1)
@@ -0,0 +1,230 @@
+import operator
+import random
+import unittest
+
+from zoonomia.tree import Node, Tree
+from zoonomia.solution import (
+    BasisOperator, TerminalOperator, ConstantTerminal, OperatorSet, Objective,
+    Solution
+)
+from zoonomia.operations import full
+from zoonomia.interpreter import Interpreter
+from zoonomia.simplify import (
+    Simplifier, constant, equivalent, is_constant, collapse_identical,
+    drop_identity, select_branch
+)
+
+
+class TestSimplifier(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+
+        def counted(name, func):
+            def wrapper(*args):
+                self.calls.append(name)
+                return func(*args)
+            return wrapper
+
+        self.add_op = BasisOperator(
+            func=counted('add', operator.add), signature=(int, int), dtype=int
+        )
+        self.sub_op = BasisOperator(
+            func=counted('sub', operator.sub), signature=(int, int), dtype=int
+        )
+        self.gt_op = BasisOperator(
+            func=counted('gt', operator.gt), signature=(int, int), dtype=bool
+        )
+        self.if_op = BasisOperator(
+            func=counted('if', lambda c, a, b: a if c else b),
+            signature=(bool, int, int),
+            dtype=int
+        )
+        self.x = TerminalOperator(source=None, dtype=int)
+        self.y = TerminalOperator(source=None, dtype=int)
+        self.objectives = (Objective(eval_func=lambda s: 0.0, weight=1.0),)
+
+    def node(self, operator, *children):
+        node = Node(operator=operator)
+        for position, child in enumerate(children):
+            node.add_child(child=child, position=position)
+        return node
+
+    def simplifier(self):
+        simplifier = Simplifier()
+        simplifier.register(self.sub_op, collapse_identical(0))
+        simplifier.register(self.add_op, drop_identity(0))
+        simplifier.register(self.if_op, select_branch)
+        return simplifier
+
+    def test_constant_terminal(self):
+        c = ConstantTerminal(value=3, dtype=int)
+        source = iter(c)
+
+        self.assertEqual(c.value, 3)
+        self.assertListEqual([next(source) for _ in xrange(3)], [3, 3, 3])
+        self.assertEqual(Interpreter().evaluate(Tree(root=Node(c))), 3)
+
+    def test_fold_constants(self):
+        # add(x, sub(7, add(2, 3)))
+        tree = Tree(
+            root=self.node(
+                self.add_op,
+                self.node(self.x),
+                self.node(
+                    self.sub_op,
+                    constant(7, int),
+                    self.node(self.add_op, constant(2, int), constant(3, int))
+                )
+            )
+        )
+        simplifier = Simplifier()
+
+        simplified = simplifier.simplify(tree)
+
+        self.assertEqual(simplified.size, 3)
+        self.assertIs(simplified.root.left.operator, self.x)
+        self.assertTrue(is_constant(simplified.root.children[1]))
+        self.assertEqual(simplified.root.children[1].operator.value, 2)
+        self.assertEqual(simplifier.folded, 2)
+        self.assertEqual(simplifier.nodes_removed, 4)
+        self.assertEqual(
+            Interpreter(bindings={self.x: 5}).evaluate(simplified), 7
+        )
+
+    def test_rewrite_rules(self):
+        """Test that rules compose: if(gt(x, x), y, add(sub(y, y), x))
+        simplifies to x once sub(y, y) collapses to 0, add(0, x) drops its
+        identity, and so on.
+
+        """
+        n = self.node
+        tree = Tree(
+            root=n(
+                self.if_op,
+                n(self.gt_op, n(self.x), n(self.x)),
+                n(self.y),
+                n(self.add_op, n(self.sub_op, n(self.y), n(self.y)), n(self.x))
+            )
+        )
+        simplifier = self.simplifier()
+        simplifier.register(self.gt_op, collapse_identical(False))
+
+        simplified = simplifier.simplify(tree)
+
+        self.assertIs(simplified.root.operator, self.x)
+        self.assertEqual(simplifier.nodes_removed, tree.size - 1)
+        self.assertEqual(simplifier.rewritten, 4)
+
+    def test_drop_identity_positions(self):
+        """Test that an identity restricted to the right operand drops
+        sub(x, 0) to x but leaves sub(0, x) alone.
+
+        """
+        n = self.node
+        simplifier = Simplifier(fold=False)
+        simplifier.register(self.sub_op, drop_identity(0, positions=(1,)))
+
+        dropped = simplifier.simplify(
+            Tree(root=n(self.sub_op, n(self.x), constant(0, int)))
+        )
+        kept = Tree(root=n(self.sub_op, constant(0, int), n(self.x)))
+
+        self.assertIs(dropped.root.operator, self.x)
+        self.assertIs(simplifier.simplify(kept), kept)
+        self.assertEqual(
+            Interpreter(bindings={self.x: 5}).evaluate(kept), -5
+        )
+
+    def test_unchanged_subtrees_are_shared(self):
+        n = self.node
+        shared = n(self.add_op, n(self.x), n(self.y))
+        tree = Tree(
+            root=n(self.add_op, shared, n(self.sub_op, n(self.x), n(self.x)))
+        )
+
+        simplified = self.simplifier().simplify(tree)
+
+        self.assertIs(simplified.root, shared)
+
+        unchanged = Tree(root=shared)
+        self.assertIs(self.simplifier().simplify(unchanged), unchanged)
+
+    def test_rule_must_preserve_dtype(self):
+        tree = Tree(
+            root=self.node(self.add_op, self.node(self.x), self.node(self.y))
+        )
+        simplifier = Simplifier()
+        simplifier.register(self.add_op, lambda node: constant(True, bool))
+
+        self.assertRaises(TypeError, simplifier.simplify, tree)
+
+    def test_equivalent(self):
+        n = self.node
+        a = n(self.add_op, n(self.x), constant(1, int))
+        b = n(self.add_op, n(self.x), constant(1, int))
+        c = n(self.add_op, n(self.x), constant(2, int))
+
+        self.assertTrue(equivalent(a, a))
+        self.assertTrue(equivalent(a, b))
+        self.assertFalse(equivalent(a, c))
+        self.assertFalse(equivalent(a, n(self.sub_op, n(self.x), n(self.x))))
+
+    def test_simplified_trees_agree(self):
+        """Test that simplification never changes the output or dtype of
+        random trees containing constants.
+
+        """
+        basis_set = OperatorSet(
+            operators=(self.add_op, self.sub_op, self.gt_op, self.if_op)
+        )
+        terminal_set = OperatorSet(
+            operators=(
+                self.x,
+                ConstantTerminal(value=0, dtype=int),
+                ConstantTerminal(value=2, dtype=int)
+            )
+        )
+        rng = random.Random(7)
+        simplifier = self.simplifier()
+        interpreter = Interpreter(bindings={self.x: 5})
+
+        for _ in xrange(30):
+            solution = full(
+                5, basis_set, terminal_set, int, self.objectives, rng
+            )
+            simplified = simplifier.simplify_solution(solution)
+
+            self.assertIsInstance(simplified, Solution)
+            self.assertIs(simplified.tree.dtype, int)
+            self.assertLessEqual(simplified.tree.size, solution.tree.size)
+            self.assertEqual(
+                interpreter.evaluate(simplified.tree),
+                interpreter.evaluate(solution.tree)
+            )
+
+        self.assertEqual(simplifier.simplified, 30)
+        self.assertGreater(simplifier.nodes_removed, 0)
+
+    def test_fold_error(self):
+        """Test that a node whose operator raises on its constant arguments
+        is left unfolded, while its rewrite rules still apply.
+
+        """
+        div_op = BasisOperator(
+            func=operator.floordiv, signature=(int, int), dtype=int
+        )
+        tree = Tree(
+            root=self.node(
+                self.add_op,
+                self.node(div_op, constant(1, int), constant(0, int)),
+                self.node(self.sub_op, self.node(self.x), self.node(self.x))
+            )
+        )
+        simplifier = self.simplifier()
+
+        simplified = simplifier.simplify(tree)
+
+        self.assertIs(simplified.root, tree.root.left)
+        self.assertEqual(simplifier.folded, 0)
+        self.assertEqual(simplifier.rewritten, 2)
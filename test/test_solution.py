@@ -1,8 +1,11 @@
+import array
+import random
 import unittest
 
 from zoonomia.solution import (
     verify_closure_property, BasisOperator, TerminalOperator, OperatorSet,
-    Objective, Fitness, Solution
+    Objective, Fitness, Solution, VariableTerminal, ConstantTerminal,
+    EphemeralConstant
 )
 
 
@@ -37,7 +40,95 @@ class TestBasisOperator(unittest.TestCase):
 class TestTerminalOperator(unittest.TestCase):
 
     def test_terminal_operator(self):
-        raise NotImplementedError()  # FIXME
+        terminal = TerminalOperator(source=xrange(5), dtype=int)
+
+        self.assertIs(terminal.dtype, int)
+        self.assertListEqual(list(terminal), range(5))
+        self.assertListEqual(list(terminal), range(5))
+
+    def test_one_shot_source_is_reusable(self):
+        """Test that a generator source can be iterated more than once, even
+        partially.
+
+        """
+        terminal = TerminalOperator(
+            source=(i * i for i in xrange(5)), dtype=int
+        )
+        first = iter(terminal)
+
+        self.assertEqual(next(first), 0)
+        self.assertListEqual(list(terminal), [0, 1, 4, 9, 16])
+        self.assertListEqual(list(first), [1, 4, 9, 16])
+        self.assertListEqual(list(terminal), [0, 1, 4, 9, 16])
+
+
+class TestVariableTerminal(unittest.TestCase):
+
+    def test_variable_terminal(self):
+        x = VariableTerminal(name='x', dtype=float)
+
+        self.assertEqual(x.name, 'x')
+        self.assertIs(x.dtype, float)
+        self.assertEqual(x.key, VariableTerminal(name='x', dtype=float).key)
+        self.assertNotEqual(x.key, VariableTerminal(name='y', dtype=float).key)
+
+
+class TestConstantTerminal(unittest.TestCase):
+
+    def test_key(self):
+        self.assertEqual(
+            ConstantTerminal(value=2, dtype=int).key,
+            ConstantTerminal(value=2, dtype=int).key
+        )
+        self.assertNotEqual(
+            ConstantTerminal(value=2, dtype=int).key,
+            ConstantTerminal(value=3, dtype=int).key
+        )
+        self.assertNotEqual(
+            ConstantTerminal(value=2, dtype=int).key,
+            ConstantTerminal(value=2.0, dtype=float).key
+        )
+
+
+class TestEphemeralConstant(unittest.TestCase):
+
+    def test_pool_is_seeded(self):
+        def distribution(rng): return rng.uniform(-1.0, 1.0)
+
+        erc = EphemeralConstant(
+            distribution=distribution, dtype=float, size=16, seed=3,
+            typecode='d'
+        )
+        again = EphemeralConstant(
+            distribution=distribution, dtype=float, size=16, seed=3,
+            typecode='d'
+        )
+
+        self.assertIsInstance(erc.source, array.array)
+        self.assertEqual(len(erc.constants), 16)
+        self.assertListEqual(list(erc.source), list(again.source))
+        self.assertEqual(erc.key, again.key)
+        self.assertNotEqual(
+            erc.key,
+            EphemeralConstant(
+                distribution=distribution, dtype=float, size=16, seed=4
+            ).key
+        )
+
+    def test_draw(self):
+        erc = EphemeralConstant(
+            distribution=lambda rng: rng.randint(0, 9), dtype=int, size=8
+        )
+        rng = random.Random(1)
+
+        for _ in xrange(20):
+            constant = erc.draw(rng)
+            self.assertIsInstance(constant, ConstantTerminal)
+            self.assertIn(constant, erc.constants)
+            self.assertIs(constant.dtype, int)
+
+        self.assertIs(erc.constant(0.0), erc.constants[0])
+        self.assertIs(erc.constant(0.999), erc.constants[-1])
 
 
 class TestOperatorSet(unittest.TestCase):
@@ -0,0 +1,246 @@
+import random
+import unittest
+
+import numpy as np
+
+from zoonomia.tree import Node, Tree
+from zoonomia.solution import (
+    BasisOperator, VariableTerminal, ConstantTerminal, OperatorSet, Objective,
+    Solution
+)
+from zoonomia.operations import full, tournament_select
+from zoonomia.data import Dataset
+from zoonomia.streaming import (
+    SUM, MEAN, MAX, CaseObjective, StreamingExecutor, absolute_error,
+    squared_error, threshold
+)
+
+
+class TestReducers(unittest.TestCase):
+
+    def test_reducers(self):
+        chunks = ([1.0, 4.0], np.array([2.0, 0.5, 3.0]))
+
+        for reducer, expected in ((SUM, 10.5), (MEAN, 2.1), (MAX, 4.0)):
+            state = reducer.initial
+            for errors in chunks:
+                state = reducer.update(state, errors)
+            self.assertAlmostEqual(reducer.finish(state), expected)
+
+
+class Regression(object):
+
+    def setUp(self):
+        x = np.linspace(-1.0, 1.0, 1001)
+        self.dataset = Dataset(columns={'x': x, 'y': x ** 2 + x})
+        self.x = VariableTerminal(name='x', dtype=float)
+        self.add_op = BasisOperator(
+            func=np.add, signature=(float, float), dtype=float
+        )
+        self.mul_op = BasisOperator(
+            func=np.multiply, signature=(float, float), dtype=float
+        )
+        self.basis_set = OperatorSet(
+            operators=(
+                self.add_op,
+                self.mul_op,
+                BasisOperator(
+                    func=np.subtract, signature=(float, float), dtype=float
+                )
+            )
+        )
+        self.terminal_set = OperatorSet(
+            operators=(self.x, ConstantTerminal(value=0.5, dtype=float))
+        )
+
+    def population(self, objectives, n=20):
+        rng = random.Random(4)
+        return tuple(
+            full(3, self.basis_set, self.terminal_set, float, objectives, rng)
+            for _ in xrange(n)
+        )
+
+
+class TestStreamingExecutor(Regression, unittest.TestCase):
+
+    def test_matches_whole_dataset_evaluation(self):
+        """Test that accumulating objectives chunk by chunk gives the same
+        scores as evaluating them on every fitness case at once.
+
+        """
+        objectives = (
+            CaseObjective(
+                error=squared_error('y'), reducer=MEAN, weight=-1.0,
+                dataset=self.dataset
+            ),
+            CaseObjective(
+                error=absolute_error('y'), reducer=MAX, weight=-1.0,
+                dataset=self.dataset
+            ),
+            CaseObjective(
+                error=absolute_error('y'), reducer=SUM, weight=-1.0,
+                dataset=self.dataset
+            ),
+            Objective(eval_func=lambda s: float(s.tree.size), weight=-1.0)
+        )
+        streamed = self.population(objectives)
+        reference = self.population(objectives)
+        executor = StreamingExecutor(
+            dataset=self.dataset, chunk_size=100, cache_budget=10 ** 6
+        )
+
+        results = executor.evaluate(streamed)
+
+        self.assertEqual(len(results), 20)
+        for fitnesses, solution in zip(results, reference):
+            for streamed_fitness, fitness in zip(
+                fitnesses, solution.evaluate()
+            ):
+                self.assertAlmostEqual(streamed_fitness.score, fitness.score)
+
+    def test_each_chunk_read_once_per_evaluation(self):
+        objectives = (
+            CaseObjective(error=squared_error('y'), reducer=MEAN, weight=-1.0),
+        )
+        population = self.population(objectives)
+        executor = StreamingExecutor(dataset=self.dataset, chunk_size=100)
+
+        executor.evaluate(population + population[:5])
+
+        self.assertEqual(executor.chunks_read, 11)
+
+        executor.evaluate(population)
+
+        self.assertEqual(executor.chunks_read, 11)
+
+    def test_evaluate_without_dataset_raises(self):
+        objective = CaseObjective(
+            error=squared_error('y'), reducer=MEAN, weight=-1.0
+        )
+        solution = self.population((objective,), n=1)[0]
+
+        self.assertRaises(ValueError, solution.evaluate)
+
+
+class TestRacing(Regression, unittest.TestCase):
+
+    def objectives(self):
+        return (
+            CaseObjective(
+                error=absolute_error('y'), reducer=MEAN, weight=-1.0
+            ),
+            CaseObjective(error=squared_error('y'), reducer=MAX, weight=-1.0)
+        )
+
+    def exact(self, objectives):
+        # add(mul(x, x), x)
+        root = Node(operator=self.add_op)
+        square = Node(operator=self.mul_op)
+        square.add_child(child=Node(operator=self.x), position=0)
+        square.add_child(child=Node(operator=self.x), position=1)
+        root.add_child(child=square, position=0)
+        root.add_child(child=Node(operator=self.x), position=1)
+        return Solution(tree=Tree(root=root), objectives=objectives)
+
+    def test_race_against_front(self):
+        """Test that solutions dominated by a perfect rival are eliminated
+        after the first chunk, and that survivors get exact scores.
+
+        """
+        objectives = self.objectives()
+        rival = self.exact(objectives)
+        StreamingExecutor(dataset=self.dataset, chunk_size=100).evaluate(
+            (rival,)
+        )
+        population = self.population(objectives) + (self.exact(objectives),)
+        reference = self.population(objectives) + (self.exact(objectives),)
+        StreamingExecutor(dataset=self.dataset, chunk_size=100).evaluate(
+            reference
+        )
+        executor = StreamingExecutor(
+            dataset=self.dataset, chunk_size=100, rivals=(rival,)
+        )
+
+        executor.evaluate(population)
+
+        self.assertGreater(executor.eliminated, 0)
+        self.assertEqual(executor.cases_skipped, executor.eliminated * 901)
+
+        for solution, other in zip(population, reference):
+            if rival.dominates(solution):
+                self.assertTrue(rival.dominates(other))
+            else:
+                for fitness, exact in zip(
+                    solution.evaluate(), other.evaluate()
+                ):
+                    self.assertAlmostEqual(fitness.score, exact.score)
+
+        self.assertFalse(rival.dominates(population[-1]))
+
+    def test_eliminated_loses_to_non_rivals(self):
+        """Test that an eliminated solution loses to a fully evaluated
+        solution which is worse than the rival that eliminated it, even if
+        its own score on the cases it was evaluated on is better still.
+
+        """
+        objectives = self.objectives()
+        rival = threshold((-0.1, -0.1), objectives)
+        population = self.population(objectives)
+        StreamingExecutor(dataset=self.dataset, chunk_size=100, rivals=(
+            rival,
+        )).evaluate(population)
+        eliminated = [
+            s for s in population if s.evaluate()[0].score == float('-inf')
+        ]
+        non_rival = threshold((-1e6, -1e6), objectives)
+
+        self.assertGreater(len(eliminated), 0)
+        for solution in eliminated:
+            self.assertTrue(
+                all(f.score == float('-inf') for f in solution.evaluate())
+            )
+            self.assertTrue(non_rival.dominates(solution))
+            self.assertIs(
+                tournament_select(solution, non_rival, random.Random(1)),
+                non_rival
+            )
+
+    def test_race_against_threshold(self):
+        objectives = self.objectives()
+        population = self.population(objectives)
+        reference = self.population(objectives)
+        StreamingExecutor(dataset=self.dataset, chunk_size=1001).evaluate(
+            reference
+        )
+        median = sorted(s.evaluate()[0].score for s in reference)[10]
+        executor = StreamingExecutor(
+            dataset=self.dataset,
+            chunk_size=50,
+            rivals=(threshold((median, 0.0), objectives),)
+        )
+
+        executor.evaluate(population)
+
+        self.assertGreater(executor.eliminated, 0)
+        self.assertGreater(executor.cases_skipped, 0)
+        for solution, other in zip(population, reference):
+            if other.evaluate()[0].score >= median:
+                self.assertAlmostEqual(
+                    solution.evaluate()[0].score, other.evaluate()[0].score
+                )
+            else:
+                self.assertLess(solution.evaluate()[0].score, median + 1e-12)
+
+    def test_unbounded_objectives_never_race(self):
+        objectives = (
+            CaseObjective(error=absolute_error('y'), reducer=SUM, weight=1.0),
+        )
+        rival = threshold((float('inf'),), objectives)
+        executor = StreamingExecutor(
+            dataset=self.dataset, chunk_size=100, rivals=(rival,)
+        )
+
+        executor.evaluate(self.population(objectives))
+
+        self.assertEqual(executor.eliminated, 0)
+        self.assertEqual(executor.cases_skipped, 0)
@@ -0,0 +1,187 @@
+import random
+import unittest
+
+from zoonomia.tree import Node, Tree
+from zoonomia.solution import (
+    TerminalOperator, ConstantTerminal, Objective, Solution
+)
+from zoonomia.data import Dataset
+from zoonomia.executor import MapExecutor
+from zoonomia.operations import tournament_select
+from zoonomia.surrogate import (
+    structural_features, phenotype_features, KNNSurrogate, SurrogateExecutor,
+    PredictedFitness
+)
+
+from .fixtures import Chains, chain
+
+
+class Negations(Chains):
+
+    def setUp(self):
+        Chains.setUp(self)
+        self.sign = -1.0
+        self.objectives = (
+            Objective(
+                eval_func=self.counted(lambda s: self.sign * s.tree.size),
+                weight=1.0
+            ),
+        )
+
+    def chain(self, n):
+        return Solution(
+            tree=chain(self.neg_op, self.x, n), objectives=self.objectives
+        )
+
+    def population(self, rng, n=40):
+        return tuple(self.chain(rng.randint(0, 30)) for _ in xrange(n))
+
+
+class TestFeatures(Negations, unittest.TestCase):
+
+    def test_structural_features(self):
+        features = structural_features((self.neg_op, self.x))
+
+        self.assertTupleEqual(
+            features(self.chain(3).tree), (3.0, 1.0, 4.0, 4.0)
+        )
+
+    def test_phenotype_features(self):
+        cases = Dataset(columns={'x': (1, 2, 3)})
+        features = phenotype_features(cases)
+        constant = Node(operator=ConstantTerminal(value=2, dtype=int))
+
+        self.assertTupleEqual(
+            features(Tree(root=constant)), (2.0, 2.0, 2.0)
+        )
+        self.assertTupleEqual(
+            features(Tree(root=Node(operator=TerminalOperator(
+                source=(4, 5, 6), dtype=int
+            )))),
+            (4.0, 5.0, 6.0)
+        )
+
+
+class TestKNNSurrogate(Negations, unittest.TestCase):
+
+    def test_predict(self):
+        surrogate = KNNSurrogate(
+            features=structural_features((self.neg_op,)), k=1
+        )
+
+        self.assertRaises(ValueError, surrogate.predict, self.chain(1))
+
+        for n in (0, 10, 20):
+            surrogate.observe(self.chain(n))
+
+        self.assertEqual(len(surrogate), 3)
+        self.assertTupleEqual(surrogate.predict(self.chain(9)), (-11.0,))
+        self.assertTupleEqual(surrogate.predict(self.chain(19)), (-21.0,))
+
+    def test_capacity(self):
+        surrogate = KNNSurrogate(
+            features=structural_features((self.neg_op,)), k=1, capacity=2
+        )
+
+        for n in (0, 10, 20):
+            surrogate.observe(self.chain(n))
+
+        self.assertEqual(len(surrogate), 2)
+        self.assertTupleEqual(surrogate.predict(self.chain(0)), (-11.0,))
+
+
+class TestSurrogateExecutor(Negations, unittest.TestCase):
+
+    def executor(self):
+        return SurrogateExecutor(
+            executor=MapExecutor(),
+            surrogate=KNNSurrogate(
+                features=structural_features((self.neg_op,)), k=3
+            ),
+            fraction=0.25,
+            audit=0.1,
+            warmup=40
+        )
+
+    def test_prescreening(self):
+        """Test that after warming up only the most promising fraction (plus
+        an audit sample) is evaluated in full, and that the rest are given
+        predictions close to their actual scores.
+
+        """
+        rng = random.Random(2)
+        executor = self.executor()
+
+        executor.evaluate(self.population(rng))
+
+        self.assertEqual(self.calls, 40)
+        self.assertEqual(executor.predicted, 0)
+
+        self.calls = 0
+        population = self.population(rng)
+        results = executor.evaluate(population)
+
+        self.assertEqual(self.calls, 10 + 3)
+        self.assertEqual(executor.predicted, 40 - 13)
+        self.assertEqual(executor.evaluated, 53)
+        self.assertFalse(executor.fallback)
+        self.assertGreater(executor.concordance, 0.9)
+
+        for solution, fitnesses in zip(population, results):
+            self.assertLessEqual(
+                abs(fitnesses[0].score + solution.tree.size), 2.0
+            )
+
+    def test_predictions_lose_to_measurements(self):
+        """Test that a solution with an overestimated prediction neither
+        wins selection against nor dominates a worse solution evaluated in
+        full, and that its prediction is not serialized as a measurement.
+
+        """
+        rng = random.Random(2)
+        executor = self.executor()
+        executor.evaluate(self.population(rng))
+        population = self.population(rng)
+        executor.evaluate(population)
+        predicted = [
+            s for s in population
+            if isinstance(s.fitnesses[0], PredictedFitness)
+        ]
+        measured = self.chain(40)
+        measured.evaluate()
+
+        self.assertGreater(len(predicted), 0)
+        for solution in predicted:
+            self.assertGreater(
+                solution.fitnesses[0].score, measured.fitnesses[0].score
+            )
+            self.assertTrue(measured.dominates(solution))
+            self.assertFalse(solution.dominates(measured))
+            self.assertIs(
+                tournament_select(solution, measured, random.Random(1)),
+                measured
+            )
+            self.assertIsNone(solution.measured)
+
+        best = max(predicted, key=lambda s: s.fitnesses[0].score)
+        worst = min(predicted, key=lambda s: s.fitnesses[0].score)
+
+        if best.fitnesses[0].score > worst.fitnesses[0].score:
+            self.assertTrue(best.dominates(worst))
+
+    def test_fallback_on_drift(self):
+        rng = random.Random(3)
+        executor = self.executor()
+        executor.evaluate(self.population(rng))
+
+        self.sign = 1.0
+        executor.evaluate(self.population(rng))
+
+        self.assertTrue(executor.fallback)
+        self.assertEqual(executor.fallbacks, 1)
+        self.assertLess(executor.concordance, 0.6)
+
+        self.calls = 0
+        executor.evaluate(self.population(rng))
+
+        self.assertEqual(self.calls, 40)
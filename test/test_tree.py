@@ -1,7 +1,7 @@
 import unittest
 
 from zoonomia.tree import Node, Tree
-from zoonomia.solution import BasisOperator, TerminalOperator
+from zoonomia.solution import BasisOperator, TerminalOperator, ConstantTerminal
 
 
 class SomeType(object):
@@ -621,3 +621,152 @@ class TestTree(unittest.TestCase):
         self.assertIs(iter_3, node_4)
         self.assertIs(iter_4, node_5)
         self.assertIs(iter_5, node_6)
+
+
+class TestTreeIndex(unittest.TestCase):
+
+    def setUp(self):
+        def add(a, b): return a + b
+
+        def neg(a): return -a
+
+        self.add_op = BasisOperator(func=add, signature=(int, int), dtype=int)
+        self.neg_op = BasisOperator(func=neg, signature=(int,), dtype=int)
+        self.x = TerminalOperator(source=xrange(10), dtype=int)
+        self.y = TerminalOperator(source=xrange(10), dtype=int)
+
+    def _tree(self):
+        """Builds the following tree, numbered in post-order:
+
+                                node_5
+                               /      \\
+                         node_3        node_4
+                        /      \\
+                   node_1      node_2
+                     |
+                   node_0
+
+        """
+        self.nodes = [
+            Node(operator=self.x),
+            Node(operator=self.neg_op),
+            Node(operator=self.y),
+            Node(operator=self.add_op),
+            Node(operator=self.x),
+            Node(operator=self.add_op),
+        ]
+        self.nodes[1].add_child(child=self.nodes[0], position=0)
+        self.nodes[3].add_child(child=self.nodes[1], position=0)
+        self.nodes[3].add_child(child=self.nodes[2], position=1)
+        self.nodes[5].add_child(child=self.nodes[3], position=0)
+        self.nodes[5].add_child(child=self.nodes[4], position=1)
+
+        return Tree(root=self.nodes[5])
+
+    def test_children(self):
+        tree = self._tree()
+
+        self.assertTupleEqual(self.nodes[0].children, ())
+        self.assertTupleEqual(self.nodes[1].children, (self.nodes[0],))
+        self.assertTupleEqual(
+            tree.root.children, (self.nodes[3], self.nodes[4])
+        )
+
+    def test_index(self):
+        tree = self._tree()
+        index = tree.index
+
+        self.assertTupleEqual(index.nodes, tuple(self.nodes))
+        self.assertTupleEqual(index.sizes, (1, 2, 1, 4, 1, 6))
+        self.assertTupleEqual(index.heights, (1, 2, 1, 3, 1, 4))
+        self.assertTupleEqual(index.levels, (4, 3, 3, 2, 2, 1))
+        self.assertTupleEqual(index.parents, (1, 3, 3, 5, 5, -1))
+        self.assertTupleEqual(index.positions, (0, 0, 1, 0, 1, -1))
+        self.assertTupleEqual(index.by_dtype[int], (0, 1, 2, 3, 4, 5))
+        self.assertIs(tree.index, index)
+        self.assertEqual(tree.size, 6)
+        self.assertEqual(tree.depth, 4)
+
+    def test_hashes(self):
+        """Test that structurally identical subtrees hash alike, including
+        distinct but equal constants.
+
+        """
+        tree = self._tree()
+        hashes = tree.index.hashes
+
+        self.assertEqual(len(hashes), 6)
+        self.assertEqual(hashes[0], hashes[4])
+        self.assertNotEqual(hashes[0], hashes[2])
+        self.assertEqual(hashes, self._tree().index.hashes)
+
+        def add_constant(value):
+            node = Node(operator=self.add_op)
+            node.add_child(child=Node(operator=self.x), position=0)
+            node.add_child(
+                child=Node(operator=ConstantTerminal(value=value, dtype=int)),
+                position=1
+            )
+            return Tree(root=node)
+
+        self.assertEqual(
+            add_constant(1).index.hashes[-1], add_constant(1).index.hashes[-1]
+        )
+        self.assertNotEqual(
+            add_constant(1).index.hashes[-1], add_constant(2).index.hashes[-1]
+        )
+
+    def test_replace_shares_unchanged_subtrees(self):
+        """Test that replacing a subtree copies only the path up to the root.
+
+        """
+        tree = self._tree()
+        replacement = Node(operator=self.y)
+
+        new_tree = tree.replace(0, replacement)
+        new_nodes = tuple(new_tree)
+
+        self.assertIs(new_nodes[0], replacement)
+        self.assertIsNot(new_nodes[1], self.nodes[1])
+        self.assertIs(new_nodes[2], self.nodes[2])
+        self.assertIsNot(new_nodes[3], self.nodes[3])
+        self.assertIs(new_nodes[4], self.nodes[4])
+        self.assertIsNot(new_nodes[5], self.nodes[5])
+        self.assertListEqual(
+            [n.operator for n in new_nodes],
+            [self.y, self.neg_op, self.y, self.add_op, self.x, self.add_op]
+        )
+        self.assertEqual(new_tree.depth, 4)
+
+        # the original tree is untouched
+        self.assertTupleEqual(tuple(tree), tuple(self.nodes))
+
+    def test_replace_root(self):
+        tree = self._tree()
+        replacement = Node(operator=self.y)
+
+        self.assertIs(tree.replace(5, replacement).root, replacement)
+
+    def test_replace_type_mismatch_raises(self):
+        tree = self._tree()
+        other = TerminalOperator(source=xrange(10), dtype=SomeType)
+
+        self.assertRaises(TypeError, tree.replace, 2, Node(operator=other))
+
+    def test_shared_subtree_iter(self):
+        """Test that a tree which refers to the same subtree from two places
+        visits it twice and terminates.
+
+        """
+        leaf = Node(operator=self.x)
+        neg = Node(operator=self.neg_op)
+        neg.add_child(child=leaf, position=0)
+        root = Node(operator=self.add_op)
+        root.add_child(child=neg, position=0)
+        root.add_child(child=neg, position=1)
+
+        tree = Tree(root=root)
+
+        self.assertListEqual(list(tree), [leaf, neg, leaf, neg, root])
+        self.assertTupleEqual(tree.index.parents, (1, 4, 3, 4, -1))
+        self.assertEqual(tree.size, 5)
@@ -0,0 +1,283 @@
+import logging
+import threading
+
+from zoonomia.solution import Fitness
+
+log = logging.getLogger(__name__)  # FIXME
+
+
+def within_limits(solution, max_size=None, max_depth=None):
+    """Check a solution's tree against hard size and depth limits. The size
+    and depth are read from the tree's cached index (see
+    zoonomia.tree.TreeIndex), so checking the offspring of variation
+    operators, whose indexes are needed anyway, is essentially free.
+
+    :param solution: A solution.
+    :type solution: zoonomia.solution.Solution
+
+    :param max_size: The maximum number of nodes, or None for no limit.
+    :type max_size: int
+
+    :param max_depth: The maximum depth, or None for no limit.
+    :type max_depth: int
+
+    :rtype: bool
+
+    """
+    tree = solution.tree
+    return (
+        (max_size is None or tree.size <= max_size) and
+        (max_depth is None or tree.depth <= max_depth)
+    )
+
+
+def tarpeian(solutions, rate, rng):
+    """Apply the Tarpeian method of bloat control (see Poli2003): each
+    unevaluated solution whose tree is larger than the population's mean
+    size is, with probability *rate*, given the worst possible score on every
+    objective instead of being evaluated. Since this happens before
+    evaluation, the largest solutions are also the cheapest to discard.
+
+    :param solutions: The population, which is modified in place.
+    :type solutions: collections.Iterable[zoonomia.solution.Solution]
+
+    :param rate: The probability of discarding an oversized solution.
+    :type rate: float
+
+    :param rng: A random number generator instance.
+    :type rng: random.Random
+
+    :return: The number of solutions discarded.
+    :rtype: int
+
+    """
+    solutions = tuple(solutions)
+
+    if len(solutions) == 0:
+        return 0
+
+    mean = sum(s.tree.size for s in solutions) / float(len(solutions))
+    discarded = 0
+
+    for solution in solutions:
+        if (
+            solution.fitnesses is None and solution.tree.size > mean and
+            rng.random() < rate
+        ):
+            solution.set_fitnesses(
+                Fitness(score=float('-inf'), objective=objective)
+                for objective in solution.objectives
+            )
+            discarded += 1
+
+    return discarded
+
+
+def _score(solution):
+    return sum(fitness.score for fitness in solution.evaluate())
+
+
+class OperatorEqualisation(object):
+
+    __slots__ = (
+        'bin_width', 'capacities', 'counts', 'best', 'accepted', 'rejected',
+        '_lock'
+    )
+
+    def __init__(self, bin_width=5):
+        """Dynamic operator equalisation (see Silva2009) controls the
+        distribution of tree sizes rather than just its maximum. Sizes are
+        grouped into bins *bin_width* nodes wide, and each generation every
+        bin is given a capacity proportional to the mean quality of the
+        current population's solutions of that size, measured by rank so that
+        any mix of objectives can be used. Offspring are then admitted to the
+        next generation only while their size's bin has room, so the size
+        distribution follows the sizes which actually pay off instead of
+        drifting upwards.
+
+        An offspring falling in an empty bin below the largest one is
+        rejected without being evaluated. An offspring larger than every bin
+        is evaluated, and admitted (opening a new bin) only if it is better
+        than the best solution seen so far, which is how the histogram grows
+        when larger trees are needed.
+
+        :param bin_width: The number of sizes grouped into each bin.
+        :type bin_width: int
+
+        The following attributes are available:
+
+        *capacities*
+            The number of offspring each bin admits in the current
+            generation, or None before the first call to *update*.
+
+        *counts*
+            The number of offspring each bin has admitted so far.
+
+        *best*
+            The best sum of Fitness scores seen so far.
+
+        *accepted*, *rejected*
+            The number of offspring admitted and rejected so far.
+
+        """
+        self.bin_width = bin_width
+        self.capacities = None
+        self.counts = None
+        self.best = None
+        self.accepted = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def bin(self, solution):
+        """Returns the index of the bin *solution*'s size falls in.
+
+        :rtype: int
+
+        """
+        return (solution.tree.size - 1) // self.bin_width
+
+    def update(self, population):
+        """Compute the target size histogram for the next generation from
+        the current (evaluated) *population*.
+
+        :param population: The current population.
+        :type population: collections.Sequence[zoonomia.solution.Solution]
+
+        :raise ValueError:
+            If *population* is empty, leaving the capacities unchanged.
+
+        """
+        population = tuple(population)
+
+        if len(population) == 0:
+            raise ValueError('cannot compute capacities without solutions')
+
+        scores = [_score(s) for s in population]
+        bins = [self.bin(s) for s in population]
+        n_bins = max(bins) + 1
+        ranks = [0] * len(population)
+
+        for rank, i in enumerate(
+            sorted(xrange(len(population)), key=lambda i: scores[i])
+        ):
+            ranks[i] = rank + 1
+
+        totals = [0.0] * n_bins
+        sizes = [0] * n_bins
+
+        for b, rank in zip(bins, ranks):
+            totals[b] += rank
+            sizes[b] += 1
+
+        quality = [
+            totals[b] / sizes[b] if sizes[b] > 0 else 0.0
+            for b in xrange(n_bins)
+        ]
+        total = sum(quality)
+
+        if not total > 0:
+            raise ValueError(
+                'cannot compute capacities from a total quality of {0}'.format(
+                    total
+                )
+            )
+
+        with self._lock:
+            self.capacities = [
+                int(round(len(population) * q / total)) for q in quality
+            ]
+            self.counts = [0] * n_bins
+            best = max(scores)
+            self.best = best if self.best is None else max(self.best, best)
+
+    def admit(self, solution):
+        """Decide whether an offspring may join the next generation, counting
+        it against its bin's capacity if so.
+
+        :param solution: An offspring.
+        :type solution: zoonomia.solution.Solution
+
+        :rtype: bool
+
+        """
+        b = self.bin(solution)
+
+        with self._lock:
+            if self.capacities is None:
+                self.accepted += 1
+                return True
+
+            if b < len(self.capacities):
+                if self.counts[b] < self.capacities[b]:
+                    self.counts[b] += 1
+                    self.accepted += 1
+                    return True
+                self.rejected += 1
+                return False
+
+        score = _score(solution)
+
+        with self._lock:
+            if score > self.best:
+                extension = b + 1 - len(self.capacities)
+                if extension > 0:
+                    self.capacities.extend([0] * extension)
+                    self.counts.extend([0] * extension)
+                self.capacities[b] = max(self.capacities[b], 1)
+                self.counts[b] += 1
+                self.best = score
+                self.accepted += 1
+                return True
+
+            self.rejected += 1
+            return False
+
+    def fill(self, offspring, population_size, max_rejections=None):
+        """Admit offspring until the next generation holds
+        *population_size* solutions.
+
+        :param offspring: A (possibly endless) source of offspring.
+        :type offspring: collections.Iterable[zoonomia.solution.Solution]
+
+        :param population_size: The size of the next generation.
+        :type population_size: int
+
+        :param max_rejections:
+            The number of consecutive rejections after which offspring are
+            admitted regardless, so that a histogram which the variation
+            operators cannot fill does not stall the run. Defaults to ten
+            times *population_size*.
+
+        :type max_rejections: int
+
+        :return:
+            The next generation, which is smaller than *population_size*
+            only if *offspring* ran out.
+
+        :rtype: list[zoonomia.solution.Solution]
+
+        """
+        if max_rejections is None:
+            max_rejections = 10 * population_size
+
+        population = []
+        rejections = 0
+
+        if population_size <= 0:
+            return population
+
+        for solution in offspring:
+            if rejections >= max_rejections or self.admit(solution):
+                population.append(solution)
+                rejections = 0
+                if len(population) == population_size:
+                    break
+            else:
+                rejections += 1
+
+        return population
+
+    def __repr__(self):
+        return 'OperatorEqualisation(bin_width={bin_width})'.format(
+            bin_width=repr(self.bin_width)
+        )
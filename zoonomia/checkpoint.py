@@ -0,0 +1,579 @@
+import array
+import json
+import logging
+import mmap
+import os
+import random
+import re
+import struct
+import sys
+import threading
+
+from zoonomia.codec import write_tree, read_tree
+from zoonomia.solution import Fitness, Solution
+
+log = logging.getLogger(__name__)  # FIXME
+
+CHECKPOINT_MAGIC = b'ZCKP'
+CHECKPOINT_VERSION = 1
+CHECKPOINT_SUFFIX = '.zck'
+
+_FILENAME = re.compile(
+    r'^checkpoint-(\d+)' + re.escape(CHECKPOINT_SUFFIX) + '$'
+)
+_LENGTH = struct.Struct('<I')
+_ALIGNMENT = 8
+# Python 2's array has no 'Q', but 'L' is 64 bits wide on LP64 platforms.
+_OFFSET_TYPECODE = 'L'
+_MAX_OFFSET = (1 << 8 * array.array(_OFFSET_TYPECODE).itemsize) - 1
+
+
+class _State(object):
+
+    __slots__ = (
+        'generation', 'counters', 'rng_state', 'sections', 'n_objectives'
+    )
+
+    def __init__(self, generation, counters, rng_state, sections):
+        self.generation = generation
+        self.counters = counters
+        self.rng_state = rng_state
+        self.sections = sections
+        # every solution's scores take the same stride in the scores column
+        counts = set(
+            len(s.objectives) for _, solutions, _ in sections
+            for s in solutions
+        )
+        if len(counts) > 1:
+            raise ValueError(
+                'solutions have differing numbers of objectives: {0}'.format(
+                    sorted(counts)
+                )
+            )
+        self.n_objectives = counts.pop() if len(counts) > 0 else 0
+
+
+def _capture(solutions):
+    # Only references are taken here: trees are never modified in place,
+    # so they can be encoded later in the background. Fitnesses are read
+    # now because a solution may be evaluated after the snapshot is taken.
+    solutions = tuple(solutions)
+    return solutions, tuple(s.measured for s in solutions)
+
+
+def _pad(out):
+    out.extend(b'\x00' * (-len(out) % _ALIGNMENT))
+
+
+def _write_section(solutions, fitnesses, n_objectives, registry, out):
+    flags = bytearray(0 if f is None else 1 for f in fitnesses)
+    scores = array.array('d', [0.0]) * (len(solutions) * n_objectives)
+    offsets = array.array(_OFFSET_TYPECODE)
+    trees = bytearray()
+
+    for i, (solution, fitness) in enumerate(zip(solutions, fitnesses)):
+        offsets.append(len(trees))
+        write_tree(solution.tree, registry, trees)
+        if fitness is not None:
+            for j, f in enumerate(fitness):
+                scores[i * n_objectives + j] = f.score
+
+    if len(trees) > _MAX_OFFSET:
+        raise OverflowError(
+            'trees take {0} bytes, more than {1}-byte offsets can '
+            'address'.format(len(trees), offsets.itemsize)
+        )
+
+    offsets.append(len(trees))
+    columns = {}
+
+    for name, column in (
+        ('flags', flags), ('scores', scores), ('offsets', offsets),
+        ('trees', trees)
+    ):
+        _pad(out)
+        data = column if isinstance(column, bytearray) else column.tostring()
+        columns[name] = (len(out), len(data))
+        out.extend(data)
+
+    columns['count'] = len(solutions)
+    columns['offset_typecode'] = offsets.typecode
+    columns['offset_itemsize'] = offsets.itemsize
+    return columns
+
+
+def _encode(state, registry):
+    body = bytearray()
+    sections = {}
+
+    for name, solutions, fitnesses in state.sections:
+        sections[name] = _write_section(
+            solutions, fitnesses, state.n_objectives, registry, body
+        )
+
+    header = json.dumps({
+        'generation': state.generation,
+        'counters': state.counters,
+        'rng_state': state.rng_state,
+        'n_objectives': state.n_objectives,
+        'byteorder': sys.byteorder,
+        'sections': sections
+    }).encode('utf-8')
+
+    prefix = bytearray(CHECKPOINT_MAGIC)
+    prefix.append(CHECKPOINT_VERSION)
+    prefix.extend(_LENGTH.pack(len(header)))
+    prefix.extend(header)
+    _pad(prefix)
+
+    return prefix, body
+
+
+def _write(path, state, registry):
+    prefix, body = _encode(state, registry)
+    temporary = path + '.tmp'
+
+    with open(temporary, 'wb') as f:
+        f.write(prefix)
+        f.write(body)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.rename(temporary, path)
+
+
+def checkpoints(directory):
+    """List the checkpoints in *directory*, oldest first.
+
+    :param directory: The directory checkpoints are written to.
+    :type directory: str
+
+    :return: Pairs of (generation, path).
+    :rtype: list[(int, str)]
+
+    """
+    found = []
+
+    for filename in os.listdir(directory):
+        match = _FILENAME.match(filename)
+        if match is not None:
+            found.append(
+                (int(match.group(1)), os.path.join(directory, filename))
+            )
+
+    return sorted(found)
+
+
+class Checkpointer(object):
+
+    __slots__ = (
+        'directory', 'registry', 'keep', 'written', 'error', '_pending',
+        '_busy', '_closed', '_condition', '_thread'
+    )
+
+    def __init__(self, directory, registry, keep=2):
+        """A Checkpointer writes snapshots of a run's state to *directory*
+        from a background thread. Taking a snapshot only copies references to
+        the population and archive, their cached Fitness measurements, the
+        random number generator's state and the counters, so the evolution
+        loop pauses for a time proportional to the population size rather
+        than to the total size of its trees. Encoding and writing happen in
+        the background.
+
+        If a snapshot is taken while another is still being written, it
+        waits for its turn, and is superseded if a newer snapshot is taken in
+        the meantime, so a slow disk makes checkpoints less frequent rather
+        than slowing down the run.
+
+        Each snapshot is written to a temporary file which is renamed into
+        place once complete, so a crash never leaves a partial checkpoint
+        behind. Only the newest *keep* checkpoints are kept.
+
+        A checkpoint file is laid out in columns which can be memory-mapped:
+        for each of the population and the archive, a flag byte per solution
+        saying whether its fitness has been measured, the scores as a
+        solutions by objectives array of doubles, the offsets of each tree's
+        encoding, and the trees themselves in the binary format of
+        zoonomia.codec.write_tree. See *load*.
+
+        :param directory: The directory to write checkpoints to.
+        :type directory: str
+
+        :param registry: The registry to encode trees against.
+        :type registry: zoonomia.codec.OperatorRegistry
+
+        :param keep: The number of checkpoints to keep, at least 1.
+        :type keep: int
+
+        :raise ValueError: If *keep* is less than 1.
+
+        The *written* attribute counts the checkpoints written, and *error*
+        holds the exception raised by the last failed write, if any.
+
+        """
+        if keep < 1:
+            raise ValueError('keep must be at least 1, not {0}'.format(keep))
+
+        self.directory = directory
+        self.registry = registry
+        self.keep = keep
+        self.written = 0
+        self.error = None
+        self._pending = None
+        self._busy = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def snapshot(
+        self, population, generation, rng=None, archive=(), counters=None
+    ):
+        """Take a snapshot of the run's state, to be written in the
+        background.
+
+        :param population: The current population.
+        :type population: collections.Iterable[zoonomia.solution.Solution]
+
+        :param generation: The current generation.
+        :type generation: int
+
+        :param rng: The run's random number generator, if any.
+        :type rng: random.Random
+
+        :param archive:
+            Any other solutions to keep, such as the Pareto front found so
+            far.
+
+        :type archive: collections.Iterable[zoonomia.solution.Solution]
+
+        :param counters:
+            Any other state of the run which can be represented as JSON.
+
+        :type counters: dict
+
+        :raise ValueError:
+            If the checkpointer has been closed, or if the solutions do not
+            all have the same number of objectives.
+
+        """
+        population, population_fitnesses = _capture(population)
+        archive, archive_fitnesses = _capture(archive)
+        state = _State(
+            generation=generation,
+            counters=dict(counters or {}),
+            rng_state=None if rng is None else rng.getstate(),
+            sections=(
+                ('population', population, population_fitnesses),
+                ('archive', archive, archive_fitnesses)
+            )
+        )
+
+        with self._condition:
+            if self._closed:
+                raise ValueError('checkpointer is closed')
+            self._pending = state
+            self._condition.notify_all()
+
+    def wait(self):
+        """Block until every snapshot taken so far has been written (or has
+        failed).
+
+        """
+        with self._condition:
+            while self._pending is not None or self._busy:
+                self._condition.wait()
+
+    def close(self):
+        """Write any pending snapshot, then stop the background thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                state = self._pending
+                self._pending = None
+                self._busy = True
+
+            try:
+                path = os.path.join(
+                    self.directory,
+                    'checkpoint-{0:08d}{1}'.format(
+                        state.generation, CHECKPOINT_SUFFIX
+                    )
+                )
+                _write(path, state, self.registry)
+                self.written += 1
+
+                for _, old in checkpoints(self.directory)[:-self.keep]:
+                    os.remove(old)
+            except Exception as e:
+                log.exception('failed to write checkpoint')
+                self.error = e
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+    def __repr__(self):
+        return (
+            'Checkpointer(directory={directory}, registry={registry}, '
+            'keep={keep})'
+        ).format(
+            directory=repr(self.directory),
+            registry=repr(self.registry),
+            keep=repr(self.keep)
+        )
+
+
+class LazyPopulation(object):
+
+    __slots__ = (
+        'registry', 'objectives', 'map', '_buffer', '_flags', '_scores',
+        '_offsets', '_trees', '_solutions'
+    )
+
+    def __init__(
+        self, buffer, columns, n_objectives, swap, registry, objectives,
+        map_=map
+    ):
+        """A LazyPopulation is a read-only sequence of the solutions in a
+        section of a checkpoint. A solution's tree is only decoded when the
+        solution is first accessed; until then the population holds only the
+        memory-mapped checkpoint and its small per-solution columns.
+
+        See *load* rather than constructing one directly.
+
+        """
+        self.registry = registry
+        self.objectives = objectives
+        self.map = map_
+        self._buffer = buffer
+
+        start, length = columns['flags']
+        self._flags = bytearray(buffer[start:start + length])
+
+        start, length = columns['scores']
+        self._scores = array.array('d')
+        self._scores.fromstring(buffer[start:start + length])
+
+        start, length = columns['offsets']
+        self._offsets = array.array(columns['offset_typecode'])
+        if self._offsets.itemsize != columns['offset_itemsize']:
+            raise ValueError(
+                'checkpoint has {0}-byte offsets, but {1} is {2} bytes on '
+                'this platform'.format(
+                    columns['offset_itemsize'], repr(self._offsets.typecode),
+                    self._offsets.itemsize
+                )
+            )
+        self._offsets.fromstring(buffer[start:start + length])
+
+        if swap:
+            self._scores.byteswap()
+            self._offsets.byteswap()
+
+        self._trees = columns['trees'][0]
+        self._solutions = [None] * columns['count']
+
+        if n_objectives != len(objectives) and columns['count'] > 0:
+            raise ValueError(
+                'expected {0} objectives, found {1}'.format(
+                    len(objectives), n_objectives
+                )
+            )
+
+    def scores(self, index):
+        """Returns the fitness scores of the solution at *index* without
+        decoding its tree, or None if it had not been evaluated.
+
+        :rtype: tuple[float]|None
+
+        """
+        if not self._flags[index]:
+            return None
+        n = len(self.objectives)
+        return tuple(self._scores[index * n:(index + 1) * n])
+
+    @property
+    def decoded(self):
+        """The number of solutions decoded so far.
+
+        :rtype: int
+
+        """
+        return sum(1 for s in self._solutions if s is not None)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self._solutions)
+
+        solution = self._solutions[index]
+
+        if solution is None:
+            start = self._trees + self._offsets[index]
+            stop = self._trees + self._offsets[index + 1]
+            tree, _ = read_tree(
+                bytearray(self._buffer[start:stop]), self.registry
+            )
+            solution = Solution(
+                tree=tree, objectives=self.objectives, map_=self.map
+            )
+            scores = self.scores(index)
+            if scores is not None:
+                solution.set_fitnesses(
+                    Fitness(score=score, objective=objective)
+                    for score, objective in zip(scores, self.objectives)
+                )
+            self._solutions[index] = solution
+
+        return solution
+
+    def __len__(self):
+        return len(self._solutions)
+
+    def __iter__(self):
+        for index in xrange(len(self._solutions)):
+            yield self[index]
+
+    def __repr__(self):
+        return 'LazyPopulation(size={size}, decoded={decoded})'.format(
+            size=repr(len(self)), decoded=repr(self.decoded)
+        )
+
+
+class Checkpoint(object):
+
+    __slots__ = ('generation', 'counters', 'rng', 'population', 'archive')
+
+    def __init__(self, generation, counters, rng, population, archive):
+        """A Checkpoint is the state of a run restored by *load*.
+
+        :param generation: The generation the snapshot was taken at.
+        :type generation: int
+
+        :param counters: The counters given to the snapshot.
+        :type counters: dict
+
+        :param rng:
+            A random number generator in the state the run's generator was
+            in, or None if the snapshot did not include one.
+
+        :type rng: random.Random
+
+        :param population: The population.
+        :type population: zoonomia.checkpoint.LazyPopulation
+
+        :param archive: The archive.
+        :type archive: zoonomia.checkpoint.LazyPopulation
+
+        """
+        self.generation = generation
+        self.counters = counters
+        self.rng = rng
+        self.population = population
+        self.archive = archive
+
+    def __repr__(self):
+        return (
+            'Checkpoint(generation={generation}, counters={counters}, '
+            'rng={rng}, population={population}, archive={archive})'
+        ).format(
+            generation=repr(self.generation),
+            counters=repr(self.counters),
+            rng=repr(self.rng),
+            population=repr(self.population),
+            archive=repr(self.archive)
+        )
+
+
+def _as_tuple(value):
+    if isinstance(value, list):
+        return tuple(_as_tuple(v) for v in value)
+    return value
+
+
+def load(path, registry, objectives, map_=map):
+    """Resume from a checkpoint written by a Checkpointer. The file is
+    memory-mapped and only its header and per-solution columns are read up
+    front; each tree is decoded when its solution is first accessed.
+
+    :param path:
+        The checkpoint file, or a directory to load the newest checkpoint
+        from.
+
+    :type path: str
+
+    :param registry: The registry to decode trees against.
+    :type registry: zoonomia.codec.OperatorRegistry
+
+    :param objectives: The objectives to construct solutions with.
+    :type objectives: tuple[zoonomia.solution.Objective]
+
+    :param map_: The map implementation to construct solutions with.
+    :type map_: ((T) -> U, collections.Iterable[T]) -> collections.Iterable[U]
+
+    :raise ValueError:
+        If *path* is not a checkpoint of a supported version, or holds no
+        checkpoints.
+
+    :rtype: zoonomia.checkpoint.Checkpoint
+
+    """
+    if os.path.isdir(path):
+        found = checkpoints(path)
+        if len(found) == 0:
+            raise ValueError('no checkpoints in {0}'.format(path))
+        path = found[-1][1]
+
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if buffer[:len(CHECKPOINT_MAGIC)] != CHECKPOINT_MAGIC:
+        raise ValueError('{0} is not a checkpoint'.format(path))
+
+    offset = len(CHECKPOINT_MAGIC)
+    version = ord(buffer[offset])
+
+    if version != CHECKPOINT_VERSION:
+        raise ValueError('unsupported checkpoint version {0}'.format(version))
+
+    (length,) = _LENGTH.unpack(buffer[offset + 1:offset + 1 + _LENGTH.size])
+    start = offset + 1 + _LENGTH.size
+    header = json.loads(buffer[start:start + length].decode('utf-8'))
+    body = start + length + (-(start + length) % _ALIGNMENT)
+    swap = header['byteorder'] != sys.byteorder
+
+    sections = {}
+
+    for name, columns in header['sections'].iteritems():
+        columns = dict(columns)
+        for column in ('flags', 'scores', 'offsets', 'trees'):
+            column_start, column_length = columns[column]
+            columns[column] = (body + column_start, column_length)
+        sections[name] = LazyPopulation(
+            buffer, columns, header['n_objectives'], swap, registry,
+            objectives, map_
+        )
+
+    rng = None
+
+    if header['rng_state'] is not None:
+        rng = random.Random()
+        rng.setstate(_as_tuple(header['rng_state']))
+
+    return Checkpoint(
+        generation=header['generation'],
+        counters=header['counters'],
+        rng=rng,
+        population=sections['population'],
+        archive=sections['archive']
+    )
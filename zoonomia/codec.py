@@ -0,0 +1,546 @@
+import logging
+import struct
+
+from zoonomia.tree import Node, Tree
+from zoonomia.solution import ConstantTerminal, Fitness, Solution
+
+log = logging.getLogger(__name__)  # FIXME
+
+POPULATION_MAGIC = b'ZPOP'
+POPULATION_VERSION = 1
+
+_INLINE_CONSTANT = 0
+_FLOAT, _INT, _FALSE, _TRUE = 1, 2, 3, 4
+_DOUBLE = struct.Struct('<d')
+
+
+class OperatorRegistry(object):
+
+    __slots__ = ('operators', '_ids')
+
+    def __init__(self, operators):
+        """An OperatorRegistry assigns each operator a stable integer id so
+        that trees can be written down as flat sequences of ids and rebuilt
+        elsewhere (in another process, or on another machine) against an
+        equivalent registry.
+
+        .. warning::
+            Ids are assigned in the order in which *operators* are given. Two
+            registries only agree with each other if they were constructed
+            from equivalent operators in the same order. Iteration order of an
+            OperatorSet is only stable within a process (and its forked
+            children), so prefer an explicit sequence when encoded trees must
+            cross machine boundaries.
+
+        :param operators:
+            The operators to register. Duplicates are ignored.
+
+        :type operators: collections.Iterable[BasisOperator|TerminalOperator]
+
+        """
+        ordered = []
+        ids = {}
+
+        for operator in operators:
+            if operator not in ids:
+                ids[operator] = len(ordered)
+                ordered.append(operator)
+
+        self.operators = tuple(ordered)
+        self._ids = ids
+
+    def id_of(self, operator):
+        """Look up the id assigned to *operator*.
+
+        :param operator: A registered operator.
+        :type operator: BasisOperator or TerminalOperator
+
+        :raise KeyError: If *operator* is not registered.
+
+        :return: The operator's id.
+        :rtype: int
+
+        """
+        return self._ids[operator]
+
+    def __getitem__(self, operator_id):
+        """Look up the operator having id *operator_id*.
+
+        :param operator_id: An operator id.
+        :type operator_id: int
+
+        :raise IndexError: If no operator has the given id.
+
+        :return: The operator.
+        :rtype: BasisOperator or TerminalOperator
+
+        """
+        return self.operators[operator_id]
+
+    def __contains__(self, operator):
+        return operator in self._ids
+
+    def __iter__(self):
+        return iter(self.operators)
+
+    def __len__(self):
+        return len(self.operators)
+
+    def __repr__(self):
+        return 'OperatorRegistry(operators={operators})'.format(
+            operators=repr(self.operators)
+        )
+
+
+def encode_tree(tree, registry):
+    """Encode *tree* as the post-order (postfix) sequence of its operators'
+    ids. Because every operator's arity is known from its signature, the
+    postfix sequence alone is enough to rebuild the tree. Trees shipped
+    between processes or machines use the more compact *pack_tree* instead,
+    which also handles unregistered constants.
+
+    :param tree: The tree to encode.
+    :type tree: zoonomia.tree.Tree
+
+    :param registry: The registry to take operator ids from.
+    :type registry: zoonomia.codec.OperatorRegistry
+
+    :raise KeyError: If the tree contains an unregistered operator.
+
+    :return: The postfix sequence of operator ids.
+    :rtype: tuple[int]
+
+    """
+    return tuple(registry.id_of(node.operator) for node in tree)
+
+
+def decode_tree(codes, registry):
+    """Rebuild a tree from a postfix sequence of operator ids produced by
+    *encode_tree*. Decoding is iterative, so arbitrarily deep trees can be
+    decoded without hitting the recursion limit.
+
+    :param codes: A postfix sequence of operator ids.
+    :type codes: collections.Iterable[int]
+
+    :param registry: The registry to look operators up in.
+    :type registry: zoonomia.codec.OperatorRegistry
+
+    :raise ValueError: If *codes* does not describe exactly one tree.
+
+    :return: The decoded tree.
+    :rtype: zoonomia.tree.Tree
+
+    """
+    return _rebuild(registry[code] for code in codes)
+
+
+def _rebuild(operators):
+    # Rebuild a tree from its operators in post-order, iteratively: each
+    # operator's children are the last arity subtrees built before it.
+    stack = []
+
+    for operator in operators:
+        node = Node(operator=operator)
+        arity = len(getattr(operator, 'signature', ()))
+
+        if arity > 0:
+            if len(stack) < arity:
+                raise ValueError('operators do not describe a complete tree')
+            children = stack[-arity:]
+            del stack[-arity:]
+            for position, child in enumerate(children):
+                node.add_child(child=child, position=position)
+
+        stack.append(node)
+
+    if len(stack) != 1:
+        raise ValueError('operators do not describe exactly one tree')
+
+    return Tree(root=stack[0])
+
+
+def encode_solution(solution, registry):
+    """Encode *solution* as a pair of its tree's postfix codes and, if the
+    solution has already been evaluated, its measured fitness scores (see
+    zoonomia.solution.Solution.measured). Shipping the scores along with the
+    tree spares the receiving end from evaluating the solution again.
+
+    :param solution: The solution to encode.
+    :type solution: zoonomia.solution.Solution
+
+    :param registry: The registry to take operator ids from.
+    :type registry: zoonomia.codec.OperatorRegistry
+
+    :return: A pair of (codes, scores), where scores may be None.
+    :rtype: (tuple[int], tuple[float]|None)
+
+    """
+    fitnesses = solution.measured
+    scores = None if fitnesses is None else tuple(f.score for f in fitnesses)
+
+    return encode_tree(solution.tree, registry), scores
+
+
+def decode_solution(encoded, registry, objectives, map_=map):
+    """Rebuild a solution from a pair produced by *encode_solution*. Any
+    scores that were shipped along with the tree are installed as the new
+    solution's Fitness measurements against *objectives*.
+
+    :param encoded: A pair of (codes, scores).
+    :type encoded: (tuple[int], tuple[float]|None)
+
+    :param registry: The registry to look operators up in.
+    :type registry: zoonomia.codec.OperatorRegistry
+
+    :param objectives: The objectives to construct the solution with.
+    :type objectives: tuple[zoonomia.solution.Objective]
+
+    :param map_: The map implementation to construct the solution with.
+    :type map_: ((T) -> U, collections.Iterable[T]) -> collections.Iterable[U]
+
+    :return: The decoded solution.
+    :rtype: zoonomia.solution.Solution
+
+    """
+    codes, scores = encoded
+    solution = Solution(
+        tree=decode_tree(codes, registry), objectives=objectives, map_=map_
+    )
+
+    if scores is not None:
+        solution.set_fitnesses(
+            tuple(
+                Fitness(score=score, objective=objective)
+                for score, objective in zip(scores, objectives)
+            )
+        )
+
+    return solution
+
+
+def write_varint(value, out):
+    """Append a non-negative integer to *out* as an unsigned LEB128 varint:
+    seven bits per byte, least significant first, with the high bit set on
+    every byte but the last. Small integers, such as the ids of a registry
+    of fewer than 128 operators, take a single byte.
+
+    :param value: A non-negative integer.
+    :type value: int
+
+    :param out: The buffer to append to.
+    :type out: bytearray
+
+    :raise ValueError: If *value* is negative.
+
+    """
+    if value < 0:
+        raise ValueError('cannot write a negative varint')
+
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+
+    out.append(value)
+
+
+def read_varint(data, offset):
+    """Read an unsigned LEB128 varint written by *write_varint*.
+
+    :param data: The buffer to read from.
+    :type data: bytearray
+
+    :param offset: The position of the varint's first byte.
+    :type offset: int
+
+    :raise ValueError: If *data* ends in the middle of the varint.
+
+    :return: The integer and the position following it.
+    :rtype: (int, int)
+
+    """
+    value = 0
+    shift = 0
+
+    while True:
+        if offset >= len(data):
+            raise ValueError('truncated varint')
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def _write_constant(operator, out):
+    dtype = operator.dtype
+
+    if dtype is bool:
+        out.append(_TRUE if operator.value else _FALSE)
+    elif dtype in (int, long):
+        value = int(operator.value)
+        out.append(_INT)
+        write_varint(value << 1 if value >= 0 else ((-value) << 1) - 1, out)
+    elif dtype is float:
+        out.append(_FLOAT)
+        out.extend(_DOUBLE.pack(float(operator.value)))
+    else:
+        raise KeyError(
+            'cannot write an unregistered constant of dtype {0!r}'.format(
+                dtype
+            )
+        )
+
+
+def _read_constant(data, offset):
+    tag = data[offset]
+    offset += 1
+
+    if tag == _FALSE or tag == _TRUE:
+        return (bool, tag == _TRUE), offset
+    elif tag == _INT:
+        zigzag, offset = read_varint(data, offset)
+        value = zigzag >> 1 if zigzag & 1 == 0 else -(zigzag >> 1) - 1
+        return (int, value), offset
+    elif tag == _FLOAT:
+        (value,) = _DOUBLE.unpack_from(data, offset)
+        return (float, value), offset + _DOUBLE.size
+    else:
+        raise ValueError('unknown constant tag {0}'.format(tag))
+
+
+def write_tree(tree, registry, out):
+    """Append the binary encoding of *tree* to *out*: the number of nodes,
+    then each node in post-order, all as varints. A registered operator is
+    written as its id plus one. A ConstantTerminal which is not registered
+    (such as one produced by simplification or constant tuning) is written
+    inline as a zero followed by its value: one byte for a bool, a zigzag
+    varint for an int, and eight bytes for a float.
+
+    :param tree: The tree to encode.
+    :type tree: zoonomia.tree.Tree
+
+    :param registry: The registry to take operator ids from.
+    :type registry: zoonomia.codec.OperatorRegistry
+
+    :param out: The buffer to append to.
+    :type out: bytearray
+
+    :raise KeyError:
+        If the tree contains an unregistered operator which is not a bool,
+        int or float ConstantTerminal.
+
+    """
+    nodes = tree.index.nodes
+    write_varint(len(nodes), out)
+
+    for node in nodes:
+        operator = node.operator
+        if operator in registry:
+            write_varint(registry.id_of(operator) + 1, out)
+        elif isinstance(operator, ConstantTerminal):
+            out.append(_INLINE_CONSTANT)
+            _write_constant(operator, out)
+        else:
+            raise KeyError('unregistered operator {0!r}'.format(operator))
+
+
+def read_tree(data, registry, offset=0):
+    """Read a tree written by *write_tree*. Reading is iterative, so
+    arbitrarily deep trees can be read without hitting the recursion limit.
+    Equal inline constants are read as a single shared ConstantTerminal.
+
+    :param data: The buffer to read from.
+    :type data: bytearray
+
+    :param registry: The registry to look operators up in.
+    :type registry: zoonomia.codec.OperatorRegistry
+
+    :param offset: The position of the tree's first byte.
+    :type offset: int
+
+    :raise ValueError: If *data* does not hold a complete tree at *offset*.
+
+    :return: The tree and the position following it.
+    :rtype: (zoonomia.tree.Tree, int)
+
+    """
+    n_nodes, offset = read_varint(data, offset)
+    constants = {}
+    operators = []
+
+    for _ in xrange(n_nodes):
+        code, offset = read_varint(data, offset)
+
+        if code == _INLINE_CONSTANT:
+            key, offset = _read_constant(data, offset)
+            operator = constants.get(key)
+            if operator is None:
+                operator = ConstantTerminal(value=key[1], dtype=key[0])
+                constants[key] = operator
+        else:
+            operator = registry[code - 1]
+
+        operators.append(operator)
+
+    return _rebuild(operators), offset
+
+
+def pack_tree(tree, registry):
+    """Encode *tree* with *write_tree*.
+
+    :rtype: bytes
+
+    """
+    out = bytearray()
+    write_tree(tree, registry, out)
+    return bytes(out)
+
+
+def unpack_tree(data, registry):
+    """Decode a tree packed by *pack_tree*.
+
+    :raise ValueError: If *data* does not hold exactly one tree.
+
+    :rtype: zoonomia.tree.Tree
+
+    """
+    data = bytearray(data)
+    tree, offset = read_tree(data, registry)
+
+    if offset != len(data):
+        raise ValueError('trailing data after tree')
+
+    return tree
+
+
+def pack_population(solutions, registry, n_objectives=None):
+    """Encode a population in a compact binary container: a four byte magic
+    number and a version byte, then the number of solutions and of
+    objectives as varints, then each solution as a flag byte saying whether
+    its fitness has been measured, its fitness scores as little-endian
+    doubles if so, and its tree (see *write_tree*). The container is
+    typically a small fraction of the size of the pickled solutions, and
+    unlike pickle it is written and read without recursion.
+
+    :param solutions: The population.
+    :type solutions: collections.Iterable[zoonomia.solution.Solution]
+
+    :param registry: The registry to take operator ids from.
+    :type registry: zoonomia.codec.OperatorRegistry
+
+    :param n_objectives:
+        The number of objectives of every solution. Defaults to that of the
+        first solution.
+
+    :type n_objectives: int
+
+    :raise ValueError:
+        If a solution's number of objectives differs from *n_objectives*.
+
+    :rtype: bytes
+
+    """
+    solutions = tuple(solutions)
+
+    if n_objectives is None:
+        n_objectives = len(solutions[0].objectives) if solutions else 0
+
+    out = bytearray(POPULATION_MAGIC)
+    out.append(POPULATION_VERSION)
+    write_varint(len(solutions), out)
+    write_varint(n_objectives, out)
+
+    for solution in solutions:
+        if len(solution.objectives) != n_objectives:
+            raise ValueError(
+                'expected {0} objectives, found {1}'.format(
+                    n_objectives, len(solution.objectives)
+                )
+            )
+
+        fitnesses = solution.measured
+
+        if fitnesses is None:
+            out.append(0)
+        else:
+            out.append(1)
+            for fitness in fitnesses:
+                out.extend(_DOUBLE.pack(fitness.score))
+
+        write_tree(solution.tree, registry, out)
+
+    return bytes(out)
+
+
+def unpack_population(data, registry, objectives, map_=map):
+    """Decode a population packed by *pack_population*. Any fitness scores
+    are installed as the solutions' Fitness measurements against
+    *objectives*, so they are not evaluated again.
+
+    :param data: The packed population.
+    :type data: bytes
+
+    :param registry: The registry to look operators up in.
+    :type registry: zoonomia.codec.OperatorRegistry
+
+    :param objectives: The objectives to construct the solutions with.
+    :type objectives: tuple[zoonomia.solution.Objective]
+
+    :param map_: The map implementation to construct the solutions with.
+    :type map_: ((T) -> U, collections.Iterable[T]) -> collections.Iterable[U]
+
+    :raise ValueError:
+        If *data* is not a packed population of a supported version, or if
+        its number of objectives differs from that of *objectives*.
+
+    :rtype: tuple[zoonomia.solution.Solution]
+
+    """
+    data = bytearray(data)
+
+    if data[:len(POPULATION_MAGIC)] != POPULATION_MAGIC:
+        raise ValueError('not a packed population')
+
+    offset = len(POPULATION_MAGIC)
+
+    if data[offset] != POPULATION_VERSION:
+        raise ValueError(
+            'unsupported population version {0}'.format(data[offset])
+        )
+
+    n_solutions, offset = read_varint(data, offset + 1)
+    n_objectives, offset = read_varint(data, offset)
+
+    if n_solutions > 0 and n_objectives != len(objectives):
+        raise ValueError(
+            'expected {0} objectives, found {1}'.format(
+                len(objectives), n_objectives
+            )
+        )
+
+    solutions = []
+
+    for _ in xrange(n_solutions):
+        evaluated = data[offset]
+        offset += 1
+        scores = None
+
+        if evaluated:
+            scores = struct.unpack_from(
+                '<{0}d'.format(n_objectives), data, offset
+            )
+            offset += _DOUBLE.size * n_objectives
+
+        tree, offset = read_tree(data, registry, offset)
+        solution = Solution(tree=tree, objectives=objectives, map_=map_)
+
+        if scores is not None:
+            solution.set_fitnesses(
+                Fitness(score=score, objective=objective)
+                for score, objective in zip(scores, objectives)
+            )
+
+        solutions.append(solution)
+
+    return tuple(solutions)
@@ -0,0 +1,223 @@
+import logging
+import os
+
+import numpy as np
+
+log = logging.getLogger(__name__)  # FIXME
+
+NPY_SUFFIX = '.npy'
+
+
+def open_npy(directory, mmap_mode='r'):
+    """Open a dataset stored as a directory of .npy files, one per column,
+    where each column is named after its file. Columns are memory-mapped, so
+    opening a dataset only reads the files' headers: pages of fitness cases
+    are read on demand and are shared between every process on the machine
+    which maps the same file.
+
+    :param directory: The directory containing the .npy files.
+    :type directory: str
+
+    :param mmap_mode:
+        The mode with which to map the columns. See numpy.memmap.
+
+    :type mmap_mode: str
+
+    :raise ValueError: If the columns are not all the same length.
+
+    :rtype: zoonomia.data.Dataset
+
+    """
+    columns = {}
+
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(NPY_SUFFIX):
+            columns[filename[:-len(NPY_SUFFIX)]] = np.load(
+                os.path.join(directory, filename), mmap_mode=mmap_mode
+            )
+
+    return Dataset(
+        columns=columns, reopen=(open_npy, (directory, mmap_mode))
+    )
+
+
+def open_columnar(path, names, dtype, offset=0, mmap_mode='r'):
+    """Open a dataset stored as a raw columnar file, in which the columns are
+    laid out one after another, each holding the same number of values of
+    type *dtype* in native byte order. The number of fitness cases is
+    inferred from the size of the file. Like *open_npy*, the columns are
+    memory-mapped.
+
+    :param path: The path to the file.
+    :type path: str
+
+    :param names: The name of each column, in the order they are stored.
+    :type names: collections.Sequence[str]
+
+    :param dtype: The type of every value in the file.
+    :type dtype: numpy.dtype
+
+    :param offset: The number of header bytes to skip.
+    :type offset: int
+
+    :param mmap_mode:
+        The mode with which to map the columns. See numpy.memmap.
+
+    :type mmap_mode: str
+
+    :raise ValueError:
+        If the file does not hold a whole number of values per column.
+
+    :rtype: zoonomia.data.Dataset
+
+    """
+    itemsize = np.dtype(dtype).itemsize
+    length = os.path.getsize(path) - offset
+
+    if length % (itemsize * len(names)) != 0:
+        raise ValueError('file size is not a multiple of the row size')
+
+    table = np.memmap(
+        path,
+        dtype=dtype,
+        mode=mmap_mode,
+        offset=offset,
+        shape=(len(names), length // (itemsize * len(names)))
+    )
+
+    return Dataset(
+        columns={name: table[i] for i, name in enumerate(names)},
+        reopen=(
+            open_columnar, (path, tuple(names), dtype, offset, mmap_mode)
+        )
+    )
+
+
+def save_npy(directory, columns):
+    """Write *columns* as a directory of .npy files which can be opened with
+    *open_npy*. The directory is created if it does not exist.
+
+    :param directory: The directory to write the .npy files to.
+    :type directory: str
+
+    :param columns: A mapping from column names to array-likes.
+    :type columns: dict[str, numpy.ndarray]
+
+    """
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    for name, column in columns.iteritems():
+        np.save(os.path.join(directory, name + NPY_SUFFIX), column)
+
+
+class Dataset(object):
+
+    __slots__ = ('columns', 'n_cases', '_reopen')
+
+    def __init__(self, columns, reopen=None):
+        """A Dataset is a table of fitness cases held as one array per
+        column. It behaves like a read-only mapping from column names to
+        columns, so it can be passed directly as the bindings of a
+        zoonomia.interpreter.Interpreter, where each
+        zoonomia.solution.VariableTerminal is bound to the column of the same
+        name.
+
+        Datasets returned by *open_npy* and *open_columnar* are
+        memory-mapped. Worker processes forked after a dataset is opened (see
+        zoonomia.executor.ProcessExecutor) share its pages, and pickling such
+        a dataset only pickles the instructions for opening it again, so there
+        is a single physical copy of the fitness cases per machine either
+        way.
+
+        :param columns: A mapping from column names to arrays.
+        :type columns: dict[str, numpy.ndarray]
+
+        :param reopen:
+            Optionally, a function and arguments which reopen this dataset,
+            used when pickling.
+
+        :type reopen: ((T) -> zoonomia.data.Dataset, tuple[T])
+
+        :raise ValueError: If the columns are not all the same length.
+
+        """
+        lengths = set(len(column) for column in columns.itervalues())
+
+        if len(lengths) > 1:
+            raise ValueError('columns must all have the same length')
+
+        self.columns = dict(columns)
+        self.n_cases = lengths.pop() if len(lengths) > 0 else 0
+        self._reopen = reopen
+
+    @property
+    def names(self):
+        """The names of this dataset's columns, in sorted order.
+
+        :rtype: tuple[str]
+
+        """
+        return tuple(sorted(self.columns))
+
+    def get(self, name, default=None):
+        return self.columns.get(name, default)
+
+    def iteritems(self):
+        return self.columns.iteritems()
+
+    def itervalues(self):
+        return self.columns.itervalues()
+
+    def slice(self, start, stop, copy=False):
+        """Returns a dataset of the fitness cases from *start* up to (but not
+        including) *stop*. By default the columns are views, so no fitness
+        cases are copied.
+
+        :param start: The first fitness case.
+        :type start: int
+
+        :param stop: The fitness case after the last.
+        :type stop: int
+
+        :param copy:
+            Whether to read the fitness cases into memory, so that they are
+            read from disk exactly once no matter how often they are used.
+
+        :type copy: bool
+
+        :rtype: zoonomia.data.Dataset
+
+        """
+        return Dataset(
+            columns={
+                name: (
+                    np.array(column[start:stop]) if copy
+                    else column[start:stop]
+                )
+                for name, column in self.columns.iteritems()
+            }
+        )
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.columns)
+
+    def __reduce__(self):
+        if self._reopen is not None:
+            return self._reopen
+        else:
+            return Dataset, (self.columns,)
+
+    def __repr__(self):
+        return 'Dataset(names={names}, n_cases={n_cases})'.format(
+            names=repr(self.names), n_cases=repr(self.n_cases)
+        )
@@ -0,0 +1,248 @@
+import collections
+import logging
+import math
+import random
+
+log = logging.getLogger(__name__)  # FIXME
+
+_PRIME = (1 << 61) - 1
+_MASK = (1 << 64) - 1
+
+
+def subtree_hashes(tree):
+    """Returns the set of structural hashes of every subtree of *tree* (see
+    zoonomia.tree.TreeIndex).
+
+    :param tree: A tree.
+    :type tree: zoonomia.tree.Tree
+
+    :rtype: frozenset[int]
+
+    """
+    return frozenset(tree.index.hashes)
+
+
+def distinct_subtrees(solutions):
+    """Count the distinct subtrees in a population, each counted once however
+    many times it occurs in however many trees. A converging population
+    shares more and more of its subtrees, so this count falls.
+
+    :param solutions: The population.
+    :type solutions: collections.Iterable[zoonomia.solution.Solution]
+
+    :rtype: int
+
+    """
+    hashes = set()
+    for solution in solutions:
+        hashes.update(solution.tree.index.hashes)
+    return len(hashes)
+
+
+def operator_entropy(solutions):
+    """Returns the Shannon entropy, in bits, of the distribution of operators
+    over every node in a population. Terminals are identified by their
+    *key* where they have one, as they are for structural hashing.
+
+    :param solutions: The population.
+    :type solutions: collections.Iterable[zoonomia.solution.Solution]
+
+    :rtype: float
+
+    """
+    counts = collections.Counter()
+
+    for solution in solutions:
+        counts.update(
+            getattr(node.operator, 'key', node.operator)
+            for node in solution.tree.index.nodes
+        )
+
+    total = float(sum(counts.itervalues()))
+
+    return -sum(
+        (n / total) * math.log(n / total, 2) for n in counts.itervalues()
+    )
+
+
+class MinHash(object):
+
+    __slots__ = ('num_hashes', 'seed', '_coefficients')
+
+    def __init__(self, num_hashes=64, seed=0):
+        """A MinHash summarizes a set of subtree hashes by a short signature,
+        such that the fraction of positions at which two signatures agree
+        estimates the Jaccard similarity of their sets (see Broder1997). The
+        structural distance between two trees can then be estimated in time
+        proportional to *num_hashes* rather than to their sizes.
+
+        :param num_hashes:
+            The length of each signature. The standard error of a similarity
+            estimate is about :math:`1 / \\sqrt{num\\_hashes}`.
+
+        :type num_hashes: int
+
+        :param seed: The seed of the random hash functions.
+        :type seed: int
+
+        """
+        rng = random.Random(seed)
+        self.num_hashes = num_hashes
+        self.seed = seed
+        self._coefficients = tuple(
+            (rng.randrange(1, _PRIME), rng.randrange(0, _PRIME))
+            for _ in xrange(num_hashes)
+        )
+
+    def signature(self, tree):
+        """Returns the signature of the set of subtrees of *tree*.
+
+        :param tree: A tree.
+        :type tree: zoonomia.tree.Tree
+
+        :rtype: tuple[int]
+
+        """
+        values = [h & _MASK for h in subtree_hashes(tree)]
+
+        return tuple(
+            min((a * value + b) % _PRIME for value in values)
+            for a, b in self._coefficients
+        )
+
+    @staticmethod
+    def similarity(signature_1, signature_2):
+        """Estimate the Jaccard similarity of the sets two signatures were
+        computed from.
+
+        :rtype: float
+
+        """
+        agree = sum(
+            1 for x, y in zip(signature_1, signature_2) if x == y
+        )
+        return float(agree) / len(signature_1)
+
+    def distance(self, tree_1, tree_2):
+        """Estimate the structural distance between two trees: the Jaccard
+        distance between their sets of subtrees.
+
+        :param tree_1: A tree.
+        :type tree_1: zoonomia.tree.Tree
+
+        :param tree_2: Another tree.
+        :type tree_2: zoonomia.tree.Tree
+
+        :rtype: float
+
+        """
+        return 1.0 - self.similarity(
+            self.signature(tree_1), self.signature(tree_2)
+        )
+
+    def mean_distance(self, signatures):
+        """Returns the mean of the estimated distances between every pair of
+        signatures, in :math:`O(N \\cdot num\\_hashes)` time rather than
+        :math:`O(N^2 \\cdot num\\_hashes)`: two signatures agree at a
+        position exactly when they share its minimum, so the number of pairs
+        agreeing at each position follows from counting how many signatures
+        share each minimum.
+
+        :param signatures: The signatures of a population's trees.
+        :type signatures: collections.Sequence[tuple[int]]
+
+        :return: The mean distance, or 0.0 for fewer than two signatures.
+        :rtype: float
+
+        """
+        n = len(signatures)
+
+        if n < 2:
+            return 0.0
+
+        agreeing = 0
+
+        for i in xrange(self.num_hashes):
+            counts = collections.Counter(s[i] for s in signatures)
+            agreeing += sum(c * (c - 1) // 2 for c in counts.itervalues())
+
+        pairs = n * (n - 1) // 2
+
+        return 1.0 - float(agreeing) / (pairs * self.num_hashes)
+
+    def __repr__(self):
+        return 'MinHash(num_hashes={num_hashes}, seed={seed})'.format(
+            num_hashes=repr(self.num_hashes), seed=repr(self.seed)
+        )
+
+
+class Diversity(object):
+
+    __slots__ = (
+        'population_size', 'distinct_trees', 'distinct_subtrees',
+        'mean_distance', 'operator_entropy'
+    )
+
+    def __init__(self, solutions, minhash=None):
+        """A Diversity measures the structural diversity of a population, for
+        monitoring convergence from one generation to the next. Every
+        measurement is built on the structural hashes of the population's
+        trees, so it takes time roughly linear in the total number of nodes,
+        with no pairwise tree comparisons.
+
+        :param solutions: The population.
+        :type solutions: collections.Iterable[zoonomia.solution.Solution]
+
+        :param minhash:
+            The MinHash used to estimate the mean distance between trees.
+            Pass the same one every generation so the estimates are
+            comparable. Defaults to MinHash().
+
+        :type minhash: zoonomia.diversity.MinHash
+
+        The following attributes are available:
+
+        *population_size*
+            The number of solutions.
+
+        *distinct_trees*
+            The number of structurally distinct trees.
+
+        *distinct_subtrees*
+            See *distinct_subtrees*.
+
+        *mean_distance*
+            The estimated mean Jaccard distance between the sets of subtrees
+            of every pair of trees. See MinHash.mean_distance.
+
+        *operator_entropy*
+            See *operator_entropy*.
+
+        """
+        solutions = tuple(solutions)
+        minhash = MinHash() if minhash is None else minhash
+
+        self.population_size = len(solutions)
+        self.distinct_trees = len(
+            set(s.tree.index.hashes[-1] for s in solutions)
+        )
+        self.distinct_subtrees = distinct_subtrees(solutions)
+        self.mean_distance = minhash.mean_distance(
+            [minhash.signature(s.tree) for s in solutions]
+        )
+        self.operator_entropy = operator_entropy(solutions)
+
+    def __repr__(self):
+        return (
+            'Diversity(population_size={population_size}, '
+            'distinct_trees={distinct_trees}, '
+            'distinct_subtrees={distinct_subtrees}, '
+            'mean_distance={mean_distance}, '
+            'operator_entropy={operator_entropy})'
+        ).format(
+            population_size=repr(self.population_size),
+            distinct_trees=repr(self.distinct_trees),
+            distinct_subtrees=repr(self.distinct_subtrees),
+            mean_distance=repr(self.mean_distance),
+            operator_entropy=repr(self.operator_entropy)
+        )
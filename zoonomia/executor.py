@@ -0,0 +1,675 @@
+import collections
+import logging
+import multiprocessing
+import resource
+import select
+import signal
+import threading
+import time
+
+from zoonomia.codec import pack_tree, unpack_tree
+from zoonomia.solution import Fitness, Solution
+
+log = logging.getLogger(__name__)  # FIXME
+
+
+def _evaluate(solution):
+    return solution.evaluate()
+
+
+class MapExecutor(object):
+
+    __slots__ = ('map',)
+
+    def __init__(self, map_=map):
+        """A MapExecutor evaluates whole populations using a map
+        implementation. It is the simplest executor: with the builtin *map* it
+        evaluates one solution after another, and with the *map* method of a
+        thread pool it evaluates solutions concurrently.
+
+        Every executor provides an *evaluate* method which takes a population
+        and returns the Fitness measurements of each of its solutions, leaving
+        each solution's cache populated so that subsequent calls to
+        zoonomia.solution.Solution.evaluate are free.
+
+        :param map_:
+            The map implementation to use. It must be able to call a function
+            on each solution in place, so process pools (which would evaluate
+            pickled copies) are not suitable here.
+
+        :type map_:
+            ((T) -> U, collections.Iterable[T]) -> collections.Iterable[U]
+
+        """
+        self.map = map_
+
+    def evaluate(self, solutions):
+        """Evaluate every solution in *solutions*.
+
+        :param solutions: The population to evaluate.
+        :type solutions: collections.Iterable[zoonomia.solution.Solution]
+
+        :return: The Fitness measurements of each solution, in order.
+        :rtype: tuple[tuple[zoonomia.solution.Fitness]]
+
+        """
+        return tuple(self.map(_evaluate, tuple(solutions)))
+
+    def __repr__(self):
+        return 'MapExecutor(map_={map_})'.format(map_=repr(self.map))
+
+
+class CostModel(object):
+
+    __slots__ = ('weights', 'initial_weight', 'learning_rate', '_lock')
+
+    def __init__(self, initial_weight=1.0, learning_rate=0.5):
+        """A CostModel estimates how long it will take to evaluate a tree. The
+        estimate is a weighted node count: each operator has a cost weight,
+        and a tree's cost is the sum of the weights of the operators at each
+        of its nodes. The weights are learned online from measured evaluation
+        times with a normalized least mean squares update, so they converge
+        to seconds per node of each operator.
+
+        :param initial_weight:
+            The weight given to operators before anything has been learned.
+            Operators seen for the first time after learning has started get
+            the mean of the learned weights instead.
+
+        :type initial_weight: float
+
+        :param learning_rate:
+            The fraction of each prediction error which is corrected by an
+            update, in :math:`(0, 1]`.
+
+        :type learning_rate: float
+
+        """
+        self.weights = {}
+        self.initial_weight = initial_weight
+        self.learning_rate = learning_rate
+        self._lock = threading.Lock()
+
+    def _default_weight(self):
+        if len(self.weights) == 0:
+            return self.initial_weight
+        else:
+            return sum(self.weights.itervalues()) / len(self.weights)
+
+    def estimate(self, tree):
+        """Estimate the cost of evaluating *tree*.
+
+        :param tree: A tree.
+        :type tree: zoonomia.tree.Tree
+
+        :return: The estimated cost.
+        :rtype: float
+
+        """
+        default = self._default_weight()
+
+        return sum(
+            self.weights.get(operator, default) * count
+            for operator, count in _operator_counts(tree).iteritems()
+        )
+
+    def update(self, tree, elapsed):
+        """Learn from one measurement of the time it took to evaluate *tree*.
+
+        :param tree: The tree which was evaluated.
+        :type tree: zoonomia.tree.Tree
+
+        :param elapsed: The measured evaluation time, in seconds.
+        :type elapsed: float
+
+        """
+        counts = _operator_counts(tree)
+        norm = float(sum(c * c for c in counts.itervalues()))
+
+        with self._lock:
+            default = self._default_weight()
+            weights = {
+                operator: self.weights.get(operator, default)
+                for operator in counts
+            }
+            error = elapsed - sum(
+                weights[operator] * count
+                for operator, count in counts.iteritems()
+            )
+
+            for operator, count in counts.iteritems():
+                self.weights[operator] = max(
+                    weights[operator] +
+                    self.learning_rate * error * count / norm,
+                    0.0
+                )
+
+    def __repr__(self):
+        return (
+            'CostModel(initial_weight={initial_weight}, '
+            'learning_rate={learning_rate})'
+        ).format(
+            initial_weight=repr(self.initial_weight),
+            learning_rate=repr(self.learning_rate)
+        )
+
+
+def _operator_counts(tree):
+    return collections.Counter(node.operator for node in tree)
+
+
+def schedule(costs, n_workers):
+    """Split work items with estimated *costs* into chunks for *n_workers*
+    workers which pull one chunk at a time.
+
+    Items are ordered longest-expected-first, so the most expensive items are
+    started while there is still plenty of cheaper work to balance them
+    against. Chunk sizes are then chosen by guided self-scheduling on cost:
+    each chunk takes roughly half of every worker's fair share of the
+    remaining cost, so early chunks hold a few expensive items, later chunks
+    hold many cheap ones, and all workers run dry at about the same time.
+
+    :param costs: The estimated cost of each work item.
+    :type costs: collections.Sequence[float]
+
+    :param n_workers: The number of workers.
+    :type n_workers: int
+
+    :return:
+        The chunks, in dispatch order, as lists of indices into *costs*.
+
+    :rtype: list[list[int]]
+
+    """
+    order = sorted(xrange(len(costs)), key=lambda i: costs[i], reverse=True)
+    remaining = float(sum(costs))
+    chunks = []
+    position = 0
+
+    while position < len(order):
+        target = remaining / (2 * max(n_workers, 1))
+        chunk = []
+        chunk_cost = 0.0
+
+        while position < len(order) and (
+            len(chunk) == 0 or chunk_cost + costs[order[position]] <= target
+        ):
+            chunk.append(order[position])
+            chunk_cost += costs[order[position]]
+            position += 1
+
+        remaining -= chunk_cost
+        chunks.append(chunk)
+
+    return chunks
+
+
+def _evaluate_chunk(solutions):
+    times = []
+
+    for solution in solutions:
+        start = time.time()
+        solution.evaluate()
+        times.append(time.time() - start)
+
+    return times
+
+
+class ScheduledExecutor(object):
+
+    __slots__ = ('map', 'n_workers', 'cost_model')
+
+    def __init__(self, map_=map, n_workers=1, cost_model=None):
+        """A ScheduledExecutor evaluates populations in chunks scheduled by
+        estimated cost (see *schedule* and CostModel), and feeds the measured
+        time of every evaluation back into its cost model.
+
+        :param map_:
+            The map implementation used to evaluate chunks. Pass the *imap*
+            method of a thread pool so that idle threads pull chunks one at a
+            time in dispatch order; a *map* which batches its input itself
+            defeats the schedule.
+
+        :type map_:
+            ((T) -> U, collections.Iterable[T]) -> collections.Iterable[U]
+
+        :param n_workers: The number of workers behind *map_*.
+        :type n_workers: int
+
+        :param cost_model:
+            The cost model to schedule with. A fresh CostModel is used by
+            default.
+
+        :type cost_model: zoonomia.executor.CostModel
+
+        """
+        self.map = map_
+        self.n_workers = n_workers
+        self.cost_model = CostModel() if cost_model is None else cost_model
+
+    def evaluate(self, solutions):
+        """Evaluate every solution in *solutions*.
+
+        :param solutions: The population to evaluate.
+        :type solutions: collections.Iterable[zoonomia.solution.Solution]
+
+        :return: The Fitness measurements of each solution, in order.
+        :rtype: tuple[tuple[zoonomia.solution.Fitness]]
+
+        """
+        solutions = tuple(solutions)
+        pending = tuple(s for s in solutions if s.fitnesses is None)
+        chunks = tuple(
+            [pending[i] for i in chunk] for chunk in schedule(
+                [self.cost_model.estimate(s.tree) for s in pending],
+                self.n_workers
+            )
+        )
+
+        for chunk, times in zip(chunks, self.map(_evaluate_chunk, chunks)):
+            for solution, elapsed in zip(chunk, times):
+                self.cost_model.update(solution.tree, elapsed)
+
+        return tuple(s.evaluate() for s in solutions)
+
+    def __repr__(self):
+        return (
+            'ScheduledExecutor(map_={map_}, n_workers={n_workers}, '
+            'cost_model={cost_model})'
+        ).format(
+            map_=repr(self.map),
+            n_workers=repr(self.n_workers),
+            cost_model=repr(self.cost_model)
+        )
+
+
+class BudgetViolation(object):
+
+    __slots__ = ('solution', 'reason', 'elapsed')
+
+    def __init__(self, solution, reason, elapsed):
+        """A BudgetViolation records a solution whose evaluation was cut off
+        by a ProcessExecutor.
+
+        :param solution: The offending solution.
+        :type solution: zoonomia.solution.Solution
+
+        :param reason:
+            Why the evaluation was cut off: 'time' if it ran out of wall-clock
+            time, 'memory' if it ran out of memory, 'error' followed by the
+            exception's repr if an objective raised, or 'error: exit'
+            followed by the exit code if the worker process died for any
+            other reason.
+
+        :type reason: str
+
+        :param elapsed: Seconds spent on the evaluation before the cutoff.
+        :type elapsed: float
+
+        """
+        self.solution = solution
+        self.reason = reason
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return (
+            'BudgetViolation(solution={solution}, reason={reason}, '
+            'elapsed={elapsed})'
+        ).format(
+            solution=repr(self.solution),
+            reason=repr(self.reason),
+            elapsed=repr(self.elapsed)
+        )
+
+
+class _TimeBudgetExceeded(Exception):
+    pass
+
+
+def _raise_time_budget_exceeded(signum, frame):
+    raise _TimeBudgetExceeded()
+
+
+def _address_space_size():
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[0]) * resource.getpagesize()
+    except (IOError, OSError, ValueError, IndexError):
+        return 0
+
+
+def _work(conn, registry, objectives, time_limit, memory_limit):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    if memory_limit is not None:
+        soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+        limit = _address_space_size() + memory_limit
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+    if time_limit is not None:
+        signal.signal(signal.SIGALRM, _raise_time_budget_exceeded)
+
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+
+        if task is None:
+            return
+
+        for index, packed in task:
+            start = time.time()
+            scores = None
+
+            try:
+                solution = Solution(
+                    tree=unpack_tree(packed, registry), objectives=objectives
+                )
+                if time_limit is not None:
+                    signal.setitimer(signal.ITIMER_REAL, time_limit)
+                try:
+                    scores = [fitness.score for fitness in solution.evaluate()]
+                finally:
+                    if time_limit is not None:
+                        signal.setitimer(signal.ITIMER_REAL, 0)
+                reason = None
+            except _TimeBudgetExceeded:
+                reason = 'time'
+            except MemoryError:
+                reason = 'memory'
+            except Exception as e:
+                reason = 'error: {0!r}'.format(e)
+
+            solution = None
+            conn.send((index, scores, time.time() - start, reason))
+
+
+class _WorkerProcess(object):
+
+    __slots__ = ('process', 'conn', 'outstanding', 'started')
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.outstanding = collections.deque()
+        self.started = None
+
+
+class ProcessExecutor(object):
+
+    __slots__ = (
+        'registry', 'objectives', 'processes', 'time_limit', 'memory_limit',
+        'worst_scores', 'grace', 'chunk_size', 'cost_model', 'violations',
+        '_workers'
+    )
+
+    def __init__(
+        self, registry, objectives, processes=None, time_limit=None,
+        memory_limit=None, worst_scores=None, grace=1.0, chunk_size=16,
+        cost_model=None
+    ):
+        """A ProcessExecutor evaluates populations in a pool of worker
+        processes, giving every single evaluation a wall-clock and a memory
+        budget. A solution which exceeds either budget, or whose evaluation
+        raises, is given the configured worst-case Fitness and recorded in
+        *violations*, and the rest of the population carries on.
+
+        Budgets are enforced by the workers themselves: a per-evaluation
+        interval timer interrupts evaluations which run past *time_limit*,
+        and each worker's address space is capped at its size on startup plus
+        *memory_limit*. Because a timer cannot interrupt a long running call
+        into C code (a huge integer power, for instance), the parent also
+        watches the clock and kills any worker which is still busy with one
+        solution *grace* seconds after its time limit; a fresh worker takes
+        its place.
+
+        Trees travel to the workers in the compact binary encoding of
+        zoonomia.codec.pack_tree.
+        Workers are forked on the first call to *evaluate* and inherit
+        *registry* and *objectives*; call *close* to shut them down.
+
+        :param registry: The registry to encode trees against.
+        :type registry: zoonomia.codec.OperatorRegistry
+
+        :param objectives:
+            The objectives to evaluate each tree against, in the same order as
+            the solutions' objectives.
+
+        :type objectives: tuple[zoonomia.solution.Objective]
+
+        :param processes:
+            The number of worker processes. Defaults to the number of CPUs.
+
+        :type processes: int
+
+        :param time_limit:
+            Wall-clock seconds allowed per evaluation, or None for no limit.
+
+        :type time_limit: float
+
+        :param memory_limit:
+            Bytes of address space each worker may grow by, or None for no
+            limit.
+
+        :type memory_limit: int
+
+        :param worst_scores:
+            The weighted score to give an offending solution for each
+            objective. Defaults to negative infinity for every objective, so
+            that offenders are dominated by everything else.
+
+        :type worst_scores: tuple[float]
+
+        :param grace:
+            Seconds past *time_limit* after which a busy worker is killed.
+
+        :type grace: float
+
+        :param chunk_size:
+            The number of trees sent to a worker at a time, unless chunks are
+            scheduled by *cost_model*.
+
+        :type chunk_size: int
+
+        :param cost_model:
+            An optional cost model to schedule chunks with. See
+            zoonomia.executor.schedule.
+
+        :type cost_model: zoonomia.executor.CostModel
+
+        """
+        self.registry = registry
+        self.objectives = objectives
+        self.processes = processes or multiprocessing.cpu_count()
+        self.time_limit = time_limit
+        self.memory_limit = memory_limit
+        self.worst_scores = tuple(
+            float('-inf') for _ in objectives
+        ) if worst_scores is None else tuple(worst_scores)
+        self.grace = grace
+        self.chunk_size = chunk_size
+        self.cost_model = cost_model
+        self.violations = []
+        self._workers = []
+
+    def _spawn(self):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(
+            target=_work,
+            args=(
+                child_conn, self.registry, self.objectives, self.time_limit,
+                self.memory_limit
+            )
+        )
+        process.daemon = True
+        process.start()
+        child_conn.close()
+        return _WorkerProcess(process=process, conn=parent_conn)
+
+    def _replace(self, worker):
+        worker.process.terminate()
+        worker.process.join()
+        worker.conn.close()
+        self._workers[self._workers.index(worker)] = self._spawn()
+
+    def evaluate(self, solutions):
+        """Evaluate every solution in *solutions* within budget.
+
+        :param solutions: The population to evaluate.
+        :type solutions: collections.Iterable[zoonomia.solution.Solution]
+
+        :return: The Fitness measurements of each solution, in order.
+        :rtype: tuple[tuple[zoonomia.solution.Fitness]]
+
+        """
+        solutions = tuple(solutions)
+        pending = tuple(s for s in solutions if s.fitnesses is None)
+
+        if len(pending) == 0:
+            return tuple(s.evaluate() for s in solutions)
+
+        while len(self._workers) < self.processes:
+            self._workers.append(self._spawn())
+
+        if self.cost_model is None:
+            chunks = collections.deque(
+                range(i, min(i + self.chunk_size, len(pending)))
+                for i in xrange(0, len(pending), self.chunk_size)
+            )
+        else:
+            chunks = collections.deque(
+                schedule(
+                    [self.cost_model.estimate(s.tree) for s in pending],
+                    self.processes
+                )
+            )
+
+        remaining = len(pending)
+
+        while remaining > 0:
+            for worker in self._workers:
+                if len(worker.outstanding) == 0 and len(chunks) > 0:
+                    chunk = chunks.popleft()
+                    worker.conn.send(
+                        [
+                            (i, pack_tree(pending[i].tree, self.registry))
+                            for i in chunk
+                        ]
+                    )
+                    worker.outstanding.extend(chunk)
+                    worker.started = time.time()
+
+            busy = [w for w in self._workers if len(w.outstanding) > 0]
+            ready, _, _ = select.select(
+                [w.conn for w in busy], [], [], self._poll_interval()
+            )
+
+            for worker in busy:
+                if worker.conn not in ready:
+                    continue
+                try:
+                    result = worker.conn.recv()
+                except (EOFError, IOError):
+                    remaining -= self._cut_off(
+                        worker, pending, chunks, self._cause_of_death(worker)
+                    )
+                    continue
+                self._finish(pending, *result)
+                worker.outstanding.remove(result[0])
+                worker.started = time.time()
+                remaining -= 1
+
+            if self.time_limit is not None:
+                deadline = time.time() - self.time_limit - self.grace
+                for worker in list(self._workers):
+                    if (
+                        len(worker.outstanding) > 0 and
+                        worker.started < deadline
+                    ):
+                        remaining -= self._cut_off(
+                            worker, pending, chunks, 'time'
+                        )
+
+        return tuple(s.evaluate() for s in solutions)
+
+    def _poll_interval(self):
+        if self.time_limit is None:
+            return None
+        return max(min(self.grace, self.time_limit), 0.01)
+
+    def _cause_of_death(self, worker):
+        worker.process.join(self.grace)
+        exitcode = worker.process.exitcode
+
+        # the kernel's OOM killer sends SIGKILL, and a worker which outgrows
+        # its address space limit outside the interpreter crashes instead
+        # of raising MemoryError
+        if exitcode == -signal.SIGKILL or (
+            self.memory_limit is not None and exitcode not in (0, None)
+        ):
+            return 'memory'
+        else:
+            return 'error: exit {code}'.format(code=exitcode)
+
+    def _cut_off(self, worker, pending, chunks, reason):
+        index = worker.outstanding.popleft()
+        self._finish(
+            pending, index, None, time.time() - worker.started, reason
+        )
+
+        if len(worker.outstanding) > 0:
+            chunks.appendleft(list(worker.outstanding))
+
+        log.warn('replacing worker %d (%s)', worker.process.pid, reason)
+        self._replace(worker)
+        return 1
+
+    def _finish(self, pending, index, scores, elapsed, reason):
+        solution = pending[index]
+
+        if reason is None:
+            if self.cost_model is not None:
+                self.cost_model.update(solution.tree, elapsed)
+        else:
+            scores = self.worst_scores
+            self.violations.append(
+                BudgetViolation(
+                    solution=solution, reason=reason, elapsed=elapsed
+                )
+            )
+
+        solution.set_fitnesses(
+            tuple(
+                Fitness(score=score, objective=objective)
+                for score, objective in zip(scores, solution.objectives)
+            )
+        )
+
+    def close(self):
+        """Shut down the worker processes."""
+        for worker in self._workers:
+            try:
+                worker.conn.send(None)
+            except IOError:
+                pass
+            worker.process.join(self.grace)
+            if worker.process.is_alive():
+                worker.process.terminate()
+                worker.process.join()
+            worker.conn.close()
+
+        self._workers = []
+
+    def __repr__(self):
+        return (
+            'ProcessExecutor(processes={processes}, time_limit={time_limit}, '
+            'memory_limit={memory_limit}, worst_scores={worst_scores})'
+        ).format(
+            processes=repr(self.processes),
+            time_limit=repr(self.time_limit),
+            memory_limit=repr(self.memory_limit),
+            worst_scores=repr(self.worst_scores)
+        )
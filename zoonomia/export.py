@@ -0,0 +1,306 @@
+import logging
+import os
+import re
+import shutil
+import threading
+
+import numpy as np
+
+from zoonomia.data import open_npy, save_npy
+
+log = logging.getLogger(__name__)  # FIXME
+
+_CHUNK = re.compile(r'^chunk-(\d+)$')
+
+
+def chunks(directory, mmap_mode='r'):
+    """Open every chunk written by an Exporter to *directory*, in the order
+    they were written. Each chunk is a memory-mapped
+    zoonomia.data.Dataset, so a whole export can be scanned chunk by chunk
+    without reading it into memory.
+
+    :param directory: The directory the Exporter wrote to.
+    :type directory: str
+
+    :param mmap_mode:
+        The mode with which to map the columns. See numpy.memmap.
+
+    :type mmap_mode: str
+
+    :rtype: list[zoonomia.data.Dataset]
+
+    """
+    found = []
+
+    if os.path.isdir(directory):
+        for filename in os.listdir(directory):
+            match = _CHUNK.match(filename)
+            if match is not None:
+                found.append((int(match.group(1)), filename))
+
+    return [
+        open_npy(os.path.join(directory, filename), mmap_mode=mmap_mode)
+        for _, filename in sorted(found)
+    ]
+
+
+def read_column(directory, name):
+    """Read one column of every chunk written to *directory* into a single
+    array.
+
+    :param directory: The directory the Exporter wrote to.
+    :type directory: str
+
+    :param name: The name of the column.
+    :type name: str
+
+    :rtype: numpy.ndarray
+
+    """
+    columns = [chunk[name] for chunk in chunks(directory)]
+
+    if len(columns) == 0:
+        return np.empty((0,))
+
+    return np.concatenate(columns)
+
+
+class Exporter(object):
+
+    __slots__ = (
+        'directory', 'n_objectives', 'registry', 'max_parents', 'chunk_size',
+        'rows', '_chunk', '_buffer', '_length', '_lock'
+    )
+
+    def __init__(
+        self, directory, n_objectives, registry=None, max_parents=2,
+        chunk_size=65536
+    ):
+        """An Exporter streams a record of every solution of a run to
+        *directory* for offline analysis. Records are buffered in
+        preallocated columns of *chunk_size* rows, and each time the buffer
+        fills it is written out as a chunk: a directory of .npy files, one
+        per column, which can be opened with zoonomia.data.open_npy (see
+        *chunks* and *read_column*). Memory use is therefore bounded by the
+        chunk size however long the run is, and the export can be analyzed
+        with numpy alone.
+
+        Each chunk is written under a temporary name and renamed into place
+        once complete, so a crashed run leaves only whole chunks behind. A
+        partial chunk left under the temporary name is discarded when the
+        chunk is written again.
+        Exporting to a directory which already holds chunks appends to them,
+        continuing their ids.
+
+        Every record has the following columns:
+
+        *id*
+            The record's id, which is its row number across the whole
+            export.
+
+        *generation*
+            The generation the solution was recorded in.
+
+        *size*, *depth*
+            The size and depth of the solution's tree.
+
+        *parents*
+            The ids of up to *max_parents* parents, padded with -1.
+
+        *scores*
+            The solution's Fitness scores, one per objective, or NaN if it
+            had not been evaluated, or only estimated, when it was recorded.
+
+        *operators*
+            If a *registry* is given, the number of nodes of the tree
+            holding each registered operator, in the order of their ids,
+            followed by the number of nodes holding unregistered operators.
+
+        :param directory: The directory to write chunks to.
+        :type directory: str
+
+        :param n_objectives: The number of objectives solutions have.
+        :type n_objectives: int
+
+        :param registry: The operators to count in each tree, if any.
+        :type registry: zoonomia.codec.OperatorRegistry
+
+        :param max_parents: The number of parent ids recorded.
+        :type max_parents: int
+
+        :param chunk_size: The number of records buffered per chunk.
+        :type chunk_size: int
+
+        """
+        self.directory = directory
+        self.n_objectives = n_objectives
+        self.registry = registry
+        self.max_parents = max_parents
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        existing = chunks(directory)
+        self.rows = sum(len(chunk['id']) for chunk in existing)
+        self._chunk = len(existing)
+        self._buffer = self._allocate()
+        self._length = 0
+
+    def _allocate(self):
+        buffer = {
+            'id': np.empty(self.chunk_size, dtype=np.int64),
+            'generation': np.empty(self.chunk_size, dtype=np.int32),
+            'size': np.empty(self.chunk_size, dtype=np.int32),
+            'depth': np.empty(self.chunk_size, dtype=np.int32),
+            'parents': np.empty(
+                (self.chunk_size, self.max_parents), dtype=np.int64
+            ),
+            'scores': np.empty(
+                (self.chunk_size, self.n_objectives), dtype=np.float64
+            )
+        }
+
+        if self.registry is not None:
+            buffer['operators'] = np.empty(
+                (self.chunk_size, len(self.registry) + 1), dtype=np.int32
+            )
+
+        return buffer
+
+    def _count_operators(self, tree, row):
+        row[:] = 0
+        unregistered = len(self.registry)
+
+        for node in tree.index.nodes:
+            try:
+                row[self.registry.id_of(node.operator)] += 1
+            except KeyError:
+                row[unregistered] += 1
+
+    def record(self, solution, generation, parents=()):
+        """Record a solution.
+
+        :param solution: The solution.
+        :type solution: zoonomia.solution.Solution
+
+        :param generation: The current generation.
+        :type generation: int
+
+        :param parents:
+            The ids of the solution's parents, as returned when they were
+            recorded.
+
+        :type parents: collections.Sequence[int]
+
+        :raise ValueError: If there are more than *max_parents* parents.
+
+        :return: The solution's id.
+        :rtype: int
+
+        """
+        if len(parents) > self.max_parents:
+            raise ValueError(
+                'at most {0} parents are recorded'.format(self.max_parents)
+            )
+
+        tree = solution.tree
+        fitnesses = solution.measured
+
+        with self._lock:
+            i = self._length
+            buffer = self._buffer
+            identifier = self.rows
+
+            buffer['id'][i] = identifier
+            buffer['generation'][i] = generation
+            buffer['size'][i] = tree.size
+            buffer['depth'][i] = tree.depth
+            buffer['parents'][i] = -1
+            buffer['parents'][i, :len(parents)] = parents
+
+            if fitnesses is None:
+                buffer['scores'][i] = np.nan
+            else:
+                buffer['scores'][i] = [f.score for f in fitnesses]
+
+            if self.registry is not None:
+                self._count_operators(tree, buffer['operators'][i])
+
+            self.rows += 1
+            self._length += 1
+
+            if self._length == self.chunk_size:
+                self._flush()
+
+        return identifier
+
+    def record_generation(self, solutions, generation, parents=None):
+        """Record every solution of a generation.
+
+        :param solutions: The solutions.
+        :type solutions: collections.Iterable[zoonomia.solution.Solution]
+
+        :param generation: The current generation.
+        :type generation: int
+
+        :param parents:
+            The ids of each solution's parents, in the same order as
+            *solutions*.
+
+        :type parents: collections.Iterable[collections.Sequence[int]]
+
+        :return: The solutions' ids.
+        :rtype: list[int]
+
+        """
+        if parents is None:
+            return [self.record(s, generation) for s in solutions]
+
+        return [
+            self.record(s, generation, p) for s, p in zip(solutions, parents)
+        ]
+
+    def _flush(self):
+        if self._length == 0:
+            return
+
+        path = os.path.join(
+            self.directory, 'chunk-{0:06d}'.format(self._chunk)
+        )
+        temporary = path + '.tmp'
+
+        if os.path.exists(temporary):
+            shutil.rmtree(temporary)
+
+        save_npy(temporary, {
+            name: column[:self._length]
+            for name, column in self._buffer.iteritems()
+        })
+        os.rename(temporary, path)
+
+        self._chunk += 1
+        self._length = 0
+
+    def flush(self):
+        """Write out any buffered records as a (short) chunk."""
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        """Write out any buffered records."""
+        self.flush()
+
+    def __repr__(self):
+        return (
+            'Exporter(directory={directory}, n_objectives={n_objectives}, '
+            'registry={registry}, max_parents={max_parents}, '
+            'chunk_size={chunk_size})'
+        ).format(
+            directory=repr(self.directory),
+            n_objectives=repr(self.n_objectives),
+            registry=repr(self.registry),
+            max_parents=repr(self.max_parents),
+            chunk_size=repr(self.chunk_size)
+        )
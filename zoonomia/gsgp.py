@@ -0,0 +1,274 @@
+import logging
+
+from zoonomia.tree import Node, Tree
+from zoonomia.solution import ConstantTerminal, Solution
+from zoonomia.interpreter import Interpreter
+from zoonomia.operations import grow
+from zoonomia.streaming import CaseObjective
+
+log = logging.getLogger(__name__)  # FIXME
+
+
+class SemanticSolution(Solution):
+
+    __slots__ = ('semantics',)
+
+    def __init__(self, tree, objectives, semantics, map_=map):
+        """A SemanticSolution is a Solution which carries its semantics: the
+        output of its tree on every fitness case of a dataset.
+
+        .. warning::
+            The trees of geometric semantic offspring share their parents'
+            trees, possibly many times over, so while they take little memory
+            as graphs of nodes, iterating over them (or indexing them) visits
+            exponentially many nodes. Score them with a SemanticObjective,
+            and only evaluate their trees with a caching
+            zoonomia.interpreter.Interpreter, which computes each shared
+            node once.
+
+        :param tree:
+        :type tree: zoonomia.tree.Tree
+
+        :param objectives:
+        :type objectives: tuple[zoonomia.solution.Objective]
+
+        :param semantics: The output of *tree* on every fitness case.
+        :type semantics: numpy.ndarray
+
+        :param map_: See zoonomia.solution.Solution.
+
+        """
+        super(SemanticSolution, self).__init__(
+            tree=tree, objectives=objectives, map_=map_
+        )
+        self.semantics = semantics
+
+
+class SemanticObjective(CaseObjective):
+
+    __slots__ = ()
+
+    def evaluate(self, solution):
+        """Compute the fitness measurement of a solution from its semantics
+        when it has them (see SemanticSolution), or from its tree otherwise.
+
+        :param solution: A candidate solution.
+        :type solution: zoonomia.solution.Solution
+
+        :rtype: zoonomia.solution.Fitness
+
+        """
+        semantics = getattr(solution, 'semantics', None)
+
+        if semantics is None:
+            return super(SemanticObjective, self).evaluate(solution)
+
+        return self.fitness(
+            self.accumulate(self.start(), semantics, self.dataset)
+        )
+
+
+class GeometricSemanticOperators(object):
+
+    __slots__ = (
+        'dataset', 'basis_set', 'terminal_set', 'add', 'subtract', 'multiply',
+        'logistic', 'dtype', 'random_depth', 'mutation_step', '_one',
+        '_step', '_interpreter'
+    )
+
+    def __init__(
+        self, dataset, basis_set, terminal_set, add, subtract, multiply,
+        logistic, dtype=float, random_depth=3, mutation_step=0.1
+    ):
+        """Geometric semantic crossover and mutation (see Moraglio2012)
+        produce offspring whose semantics are a convex combination of their
+        parents' semantics, or a small perturbation of their parent's
+        semantics. Built naively, offspring trees contain full copies of their
+        parents and grow exponentially over the generations.
+
+        Here, an offspring's tree refers to its parents' trees rather than
+        copying them (see zoonomia.tree.Tree), so each offspring adds only
+        the nodes of its random trees and a handful of combining nodes. Its
+        semantics are computed from its parents' cached semantics by applying
+        the same combining operators to them, which costs
+        :math:`O(cases)` plus the evaluation of its small random trees, so a
+        whole generation costs :math:`O(pop \\cdot cases)` however large the
+        trees get.
+
+        Crossover of :math:`T_1` and :math:`T_2` produces
+        :math:`T_1 \\cdot \\sigma(R) + (1 - \\sigma(R)) \\cdot T_2` and
+        mutation of :math:`T` produces
+        :math:`T + ms \\cdot (\\sigma(R_1) - \\sigma(R_2))`, where the
+        :math:`R_i` are random trees grown from *basis_set* and
+        *terminal_set* and :math:`\\sigma` is the *logistic* operator.
+
+        :param dataset: The fitness cases semantics are computed on.
+        :type dataset: zoonomia.data.Dataset
+
+        :param basis_set: The basis operators of the random trees.
+        :type basis_set: zoonomia.solution.OperatorSet[BasisOperator]
+
+        :param terminal_set: The terminal operators of the random trees.
+        :type terminal_set: zoonomia.solution.OperatorSet[TerminalOperator]
+
+        :param add: An element-wise addition operator.
+        :type add: zoonomia.solution.BasisOperator
+
+        :param subtract: An element-wise subtraction operator.
+        :type subtract: zoonomia.solution.BasisOperator
+
+        :param multiply: An element-wise multiplication operator.
+        :type multiply: zoonomia.solution.BasisOperator
+
+        :param logistic:
+            An element-wise unary operator squashing its input into [0, 1].
+
+        :type logistic: zoonomia.solution.BasisOperator
+
+        :param dtype: The type of every tree involved.
+        :type dtype: type
+
+        :param random_depth: The maximum depth of the random trees.
+        :type random_depth: int
+
+        :param mutation_step: The mutation step :math:`ms`.
+        :type mutation_step: float
+
+        """
+        self.dataset = dataset
+        self.basis_set = basis_set
+        self.terminal_set = terminal_set
+        self.add = add
+        self.subtract = subtract
+        self.multiply = multiply
+        self.logistic = logistic
+        self.dtype = dtype
+        self.random_depth = random_depth
+        self.mutation_step = mutation_step
+        self._one = ConstantTerminal(value=dtype(1), dtype=dtype)
+        self._step = ConstantTerminal(value=dtype(mutation_step), dtype=dtype)
+        self._interpreter = Interpreter(bindings=dataset)
+
+    def solution(self, tree, objectives, map_=map):
+        """Returns a SemanticSolution for *tree*, computing its semantics by
+        evaluating it. Use this to seed the initial population.
+
+        :param tree: An ordinary tree.
+        :type tree: zoonomia.tree.Tree
+
+        :param objectives: The objectives of the solution.
+        :type objectives: tuple[zoonomia.solution.Objective]
+
+        :rtype: zoonomia.gsgp.SemanticSolution
+
+        """
+        return SemanticSolution(
+            tree=tree,
+            objectives=objectives,
+            semantics=self._interpreter.evaluate(tree),
+            map_=map_
+        )
+
+    def crossover(self, parent_1, parent_2, rng):
+        """Geometric semantic crossover of two parents.
+
+        :param parent_1: A parent.
+        :type parent_1: zoonomia.gsgp.SemanticSolution
+
+        :param parent_2: Another parent.
+        :type parent_2: zoonomia.gsgp.SemanticSolution
+
+        :param rng: A random number generator instance.
+        :type rng: random.Random
+
+        :rtype: zoonomia.gsgp.SemanticSolution
+
+        """
+        mask, mask_semantics = self._random(rng)
+        complement = self._node(self.subtract, Node(operator=self._one), mask)
+
+        root = self._node(
+            self.add,
+            self._node(self.multiply, parent_1.tree.root, mask),
+            self._node(self.multiply, complement, parent_2.tree.root)
+        )
+        semantics = self.add(
+            self.multiply(parent_1.semantics, mask_semantics),
+            self.multiply(
+                self.subtract(self._one.value, mask_semantics),
+                parent_2.semantics
+            )
+        )
+
+        return SemanticSolution(
+            tree=Tree(root=root),
+            objectives=parent_1.objectives,
+            semantics=semantics,
+            map_=parent_1.map
+        )
+
+    def mutate(self, parent, rng):
+        """Geometric semantic mutation of a parent.
+
+        :param parent: The parent.
+        :type parent: zoonomia.gsgp.SemanticSolution
+
+        :param rng: A random number generator instance.
+        :type rng: random.Random
+
+        :rtype: zoonomia.gsgp.SemanticSolution
+
+        """
+        r_1, semantics_1 = self._random(rng)
+        r_2, semantics_2 = self._random(rng)
+
+        root = self._node(
+            self.add,
+            parent.tree.root,
+            self._node(
+                self.multiply,
+                Node(operator=self._step),
+                self._node(self.subtract, r_1, r_2)
+            )
+        )
+        semantics = self.add(
+            parent.semantics,
+            self.multiply(
+                self._step.value, self.subtract(semantics_1, semantics_2)
+            )
+        )
+
+        return SemanticSolution(
+            tree=Tree(root=root),
+            objectives=parent.objectives,
+            semantics=semantics,
+            map_=parent.map
+        )
+
+    def _random(self, rng):
+        tree = grow(
+            self.random_depth, self.basis_set, self.terminal_set, self.dtype,
+            (), rng
+        ).tree
+        node = self._node(self.logistic, tree.root)
+        return node, self.logistic(self._interpreter.evaluate(tree))
+
+    @staticmethod
+    def _node(operator, *children):
+        node = Node(operator=operator)
+        for position, child in enumerate(children):
+            node.add_child(child=child, position=position)
+        return node
+
+    def __repr__(self):
+        return (
+            'GeometricSemanticOperators(dataset={dataset}, '
+            'basis_set={basis_set}, terminal_set={terminal_set}, '
+            'random_depth={random_depth}, mutation_step={mutation_step})'
+        ).format(
+            dataset=repr(self.dataset),
+            basis_set=repr(self.basis_set),
+            terminal_set=repr(self.terminal_set),
+            random_depth=repr(self.random_depth),
+            mutation_step=repr(self.mutation_step)
+        )
@@ -0,0 +1,425 @@
+import collections
+import json
+import logging
+import threading
+import timeit
+
+log = logging.getLogger(__name__)  # FIXME
+
+_clock = timeit.default_timer
+
+
+class MemorySink(object):
+
+    __slots__ = ('records',)
+
+    def __init__(self):
+        """A MemorySink keeps every record it is given in its *records*
+        list.
+
+        """
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def close(self):
+        pass
+
+    def __repr__(self):
+        return 'MemorySink()'
+
+
+class LoggingSink(object):
+
+    __slots__ = ('logger', 'level')
+
+    def __init__(self, logger=None, level=logging.INFO):
+        """A LoggingSink logs each record as a line of JSON.
+
+        :param logger: The logger to use. Defaults to this module's logger.
+        :type logger: logging.Logger
+
+        :param level: The level to log records at.
+        :type level: int
+
+        """
+        self.logger = log if logger is None else logger
+        self.level = level
+
+    def emit(self, record):
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, json.dumps(record, sort_keys=True))
+
+    def close(self):
+        pass
+
+    def __repr__(self):
+        return 'LoggingSink(logger={logger}, level={level})'.format(
+            logger=repr(self.logger), level=repr(self.level)
+        )
+
+
+class JSONLinesSink(object):
+
+    __slots__ = ('path', '_file', '_lock')
+
+    def __init__(self, path):
+        """A JSONLinesSink appends each record to a file as a line of JSON,
+        flushing after every record so the file can be followed while the
+        run is in progress.
+
+        :param path: The file to append to.
+        :type path: str
+
+        """
+        self.path = path
+        self._file = open(path, 'a')
+        self._lock = threading.Lock()
+
+    def emit(self, record):
+        line = json.dumps(record, sort_keys=True)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __repr__(self):
+        return 'JSONLinesSink(path={path})'.format(path=repr(self.path))
+
+
+class _Null(object):
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL = _Null()
+
+
+class _Phase(object):
+
+    __slots__ = ('instrumentation', 'name', 'start')
+
+    def __init__(self, instrumentation, name):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        self.start = _clock()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.instrumentation.add_time(self.name, _clock() - self.start)
+        return False
+
+
+class OperatorStats(object):
+
+    __slots__ = (
+        'operator', 'implementation', 'func', 'calls', 'seconds', '_lock'
+    )
+
+    def __init__(self, operator, implementation='func'):
+        """An OperatorStats counts the calls made to a BasisOperator and the
+        cumulative time spent in them, by standing in for one of the
+        operator's implementations. See Instrumentation.instrument.
+
+        :param operator: The operator.
+        :type operator: zoonomia.solution.BasisOperator
+
+        :param implementation:
+            The attribute holding the implementation: 'func', or 'bitwise'
+            for the implementation a
+            zoonomia.interpreter.BitwiseInterpreter calls.
+
+        :type implementation: str
+
+        """
+        self.operator = operator
+        self.implementation = implementation
+        self.func = getattr(operator, implementation)
+        self.calls = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def name(self):
+        """The name of the operator's function.
+
+        :rtype: str
+
+        """
+        return getattr(self.func, '__name__', repr(self.func))
+
+    def __call__(self, *args, **kwargs):
+        start = _clock()
+        try:
+            return self.func(*args, **kwargs)
+        finally:
+            elapsed = _clock() - start
+            with self._lock:
+                self.calls += 1
+                self.seconds += elapsed
+
+    def __getstate__(self):
+        # A lock cannot be pickled, and the copy counts its own calls anyway.
+        return (
+            self.operator, self.implementation, self.func, self.calls,
+            self.seconds
+        )
+
+    def __setstate__(self, state):
+        (
+            self.operator, self.implementation, self.func, self.calls,
+            self.seconds
+        ) = state
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return (
+            'OperatorStats(operator={operator}, '
+            'implementation={implementation})'
+        ).format(
+            operator=repr(self.operator),
+            implementation=repr(self.implementation)
+        )
+
+
+def _histogram(values):
+    return sorted(collections.Counter(values).iteritems())
+
+
+class Instrumentation(object):
+
+    __slots__ = (
+        'sink', 'enabled', 'operators', '_timings', '_interpreters',
+        '_population', '_lock'
+    )
+
+    def __init__(self, sink=None, enabled=True):
+        """An Instrumentation gathers measurements of a run and emits them
+        to *sink* once per generation: the time spent in each phase of the
+        generation (initialization, selection, variation, evaluation or any
+        other), the hit rate of each observed interpreter's evaluation cache
+        over the generation, histograms of the population's tree sizes and
+        depths, and the number of calls made to each instrumented
+        BasisOperator and the time spent in them.
+
+        Instrumentation is opt-in. When disabled, *phase* returns a shared
+        object which does nothing, every other method returns immediately,
+        and operators are not wrapped, so leaving the calls in the evolution
+        loop costs next to nothing.
+
+        Each record emitted is a dict which can be represented as JSON::
+
+            {
+                "generation": 3,
+                "timings": {"evaluation": 1.52, "variation": 0.08},
+                "cache": {"hits": 9012, "misses": 1877, "hit_rate": 0.83},
+                "sizes": [[1, 4], [3, 10], ...],
+                "depths": [[1, 4], [2, 10], ...],
+                "operators": [
+                    {"name": "add", "implementation": "func",
+                     "calls": 120431, "seconds": 0.41}, ...
+                ]
+            }
+
+        The histograms are lists of [value, count] pairs in increasing order
+        of value. Operators are reported once for each implementation they
+        have, since a BitwiseInterpreter calls *bitwise* rather than *func*.
+
+        :param sink:
+            An object with *emit* and *close* methods, such as a MemorySink,
+            LoggingSink or JSONLinesSink. Defaults to a LoggingSink.
+
+        :param enabled: Whether to gather measurements.
+        :type enabled: bool
+
+        """
+        self.sink = LoggingSink() if sink is None else sink
+        self.enabled = enabled
+        self.operators = []
+        self._timings = collections.defaultdict(float)
+        self._interpreters = []
+        self._population = None
+        self._lock = threading.Lock()
+
+    def phase(self, name):
+        """Time a phase of the current generation. Use the result as a
+        context manager; the time spent in it is added to the phase's total
+        for the generation::
+
+            with instrumentation.phase('evaluation'):
+                executor.evaluate(population)
+
+        :param name: The name of the phase.
+        :type name: str
+
+        """
+        if not self.enabled:
+            return _NULL
+        return _Phase(self, name)
+
+    def add_time(self, name, seconds):
+        """Add *seconds* to the total time spent in the phase *name* during
+        the current generation.
+
+        :param name: The name of the phase.
+        :type name: str
+
+        :param seconds: The time spent.
+        :type seconds: float
+
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._timings[name] += seconds
+
+    def instrument(self, operators):
+        """Count the calls made to *operators* and the time spent in them, by
+        replacing each operator's *func*, and its *bitwise* implementation if
+        it has one, with an OperatorStats which calls it. Terminals are
+        ignored. Call *uninstrument* to restore the original functions.
+
+        The operators are changed in place, so every tree and interpreter in
+        the process which shares them is measured until they are restored.
+        Instrumented operators can still be pickled, e.g. to ship solutions
+        to worker processes; each copy counts its own calls, which are not
+        reported here.
+
+        :param operators: The operators, such as a basis set.
+        :type operators: collections.Iterable[zoonomia.solution.BasisOperator]
+
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            for operator in operators:
+                for implementation in ('func', 'bitwise'):
+                    func = getattr(operator, implementation, None)
+                    if (
+                        func is not None and
+                        not isinstance(func, OperatorStats)
+                    ):
+                        stats = OperatorStats(operator, implementation)
+                        setattr(operator, implementation, stats)
+                        self.operators.append(stats)
+
+    def uninstrument(self):
+        """Restore the functions of every instrumented operator."""
+        with self._lock:
+            for stats in self.operators:
+                setattr(stats.operator, stats.implementation, stats.func)
+            self.operators = []
+
+    def observe_cache(self, interpreter):
+        """Report the hit rate of *interpreter*'s cache (see
+        zoonomia.interpreter.Interpreter) in each generation. The hits and
+        misses of every observed interpreter are added together.
+
+        :param interpreter: An interpreter.
+        :type interpreter: zoonomia.interpreter.Interpreter
+
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._interpreters.append(
+                [interpreter, interpreter.hits, interpreter.misses]
+            )
+
+    def observe_population(self, solutions):
+        """Report the size and depth histograms of *solutions* at the end of
+        the current generation.
+
+        :param solutions: The population.
+        :type solutions: collections.Iterable[zoonomia.solution.Solution]
+
+        """
+        if not self.enabled:
+            return
+        trees = [solution.tree for solution in solutions]
+        with self._lock:
+            self._population = (
+                _histogram(tree.size for tree in trees),
+                _histogram(tree.depth for tree in trees)
+            )
+
+    def end_generation(self, generation):
+        """Emit the measurements gathered since the last generation ended,
+        and start gathering afresh.
+
+        :param generation: The generation which ended.
+        :type generation: int
+
+        :return: The record emitted, or None if disabled.
+        :rtype: dict
+
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            record = {
+                'generation': generation,
+                'timings': dict(self._timings)
+            }
+            self._timings.clear()
+
+            if len(self._interpreters) > 0:
+                hits = 0
+                misses = 0
+                for observed in self._interpreters:
+                    interpreter = observed[0]
+                    hits += interpreter.hits - observed[1]
+                    misses += interpreter.misses - observed[2]
+                    observed[1] = interpreter.hits
+                    observed[2] = interpreter.misses
+                total = hits + misses
+                record['cache'] = {
+                    'hits': hits,
+                    'misses': misses,
+                    'hit_rate': float(hits) / total if total > 0 else None
+                }
+
+            if self._population is not None:
+                record['sizes'], record['depths'] = self._population
+                self._population = None
+
+            if len(self.operators) > 0:
+                record['operators'] = []
+                for stats in self.operators:
+                    with stats._lock:
+                        record['operators'].append({
+                            'name': stats.name,
+                            'implementation': stats.implementation,
+                            'calls': stats.calls,
+                            'seconds': stats.seconds
+                        })
+                        stats.calls = 0
+                        stats.seconds = 0.0
+
+        self.sink.emit(record)
+        return record
+
+    def close(self):
+        """Restore the instrumented operators and close the sink."""
+        self.uninstrument()
+        self.sink.close()
+
+    def __repr__(self):
+        return 'Instrumentation(sink={sink}, enabled={enabled})'.format(
+            sink=repr(self.sink), enabled=repr(self.enabled)
+        )
@@ -0,0 +1,379 @@
+import collections
+import logging
+import sys
+import threading
+
+from zoonomia.solution import ConstantTerminal, VariableTerminal
+
+log = logging.getLogger(__name__)  # FIXME
+
+_MISSING = object()
+
+
+def _sizeof(value):
+    # sys.getsizeof counts the buffer of an array which owns its data, but
+    # not the buffer a view borrows from its base.
+    if getattr(value, 'base', None) is not None:
+        return value.nbytes + sys.getsizeof(value)
+    else:
+        return sys.getsizeof(value)
+
+
+class Interpreter(object):
+
+    __slots__ = (
+        'bindings', 'cache_budget', 'hits', 'misses', '_cache', '_cache_size',
+        '_lock'
+    )
+
+    def __init__(self, bindings=None, cache_budget=0):
+        """An Interpreter computes the output of a tree by applying each basis
+        operator to the outputs of its children, bottom up. Terminal nodes
+        output the value bound to their operator in *bindings*, or the
+        operator's source if it is unbound. Variable terminals can also be
+        bound by name (see zoonomia.solution.VariableTerminal). Binding each
+        terminal to a column vector of fitness cases (and using basis
+        operators which work element-wise, such as NumPy ufuncs) evaluates a
+        tree on every fitness case at once.
+
+        Given a nonzero *cache_budget*, the interpreter keeps the output of
+        every basis node it computes, keyed by node identity, and evicts the
+        least recently used outputs once they take up more than
+        *cache_budget* bytes. Variation operators share every unchanged
+        subtree between parents and offspring, so when an offspring is
+        evaluated after its parents only the nodes on the path from each
+        change up to the root miss the cache, and evaluation costs
+        :math:`O(depth \\cdot cases)` rather than :math:`O(size \\cdot cases)`.
+
+        .. note::
+            Cached outputs are only valid for the bindings they were computed
+            with. Use a separate interpreter for each set of bindings.
+
+        :param bindings:
+            A mapping from terminal operators to their values.
+
+        :type bindings: dict[zoonomia.solution.TerminalOperator, T]
+
+        :param cache_budget:
+            The approximate number of bytes of node outputs to keep. The
+            default of 0 disables caching.
+
+        :type cache_budget: int
+
+        """
+        self.bindings = {} if bindings is None else bindings
+        self.cache_budget = cache_budget
+        self.hits = 0
+        self.misses = 0
+        self._cache = collections.OrderedDict()
+        self._cache_size = 0
+        self._lock = threading.Lock()
+
+    def evaluate(self, tree, retain=None):
+        """Compute the output of *tree*.
+
+        :param tree: The tree to evaluate.
+        :type tree: zoonomia.tree.Tree
+
+        :param retain:
+            Whether to keep the outputs of this tree's basis nodes in the
+            cache. Defaults to True when caching is enabled. Pass False to
+            evaluate throwaway trees without evicting outputs which are more
+            likely to be reused, such as those of parents.
+
+        :type retain: bool
+
+        :return: The output of the tree's root.
+
+        """
+        if retain is None:
+            retain = self.cache_budget > 0
+
+        caching = self.cache_budget > 0
+        values = []
+        stack = [(tree.root, False)]
+
+        while len(stack) > 0:
+            node, expanded = stack.pop()
+
+            if expanded:
+                arity = len(node.operator.signature)
+                arguments = values[-arity:]
+                del values[-arity:]
+                value = self._apply(node.operator, arguments)
+                if retain:
+                    self._store(node, value)
+                values.append(value)
+                continue
+
+            children = node.children
+
+            if len(children) == 0:
+                values.append(self._terminal(node.operator))
+                continue
+
+            if caching:
+                value = self._lookup(node)
+                if value is not _MISSING:
+                    values.append(value)
+                    continue
+
+            stack.append((node, True))
+            for child in reversed(children):
+                stack.append((child, False))
+
+        return values[0]
+
+    def _apply(self, operator, arguments):
+        return operator(*arguments)
+
+    def _terminal(self, operator):
+        value = self.bindings.get(operator, _MISSING)
+
+        if value is _MISSING and isinstance(operator, VariableTerminal):
+            value = self.bindings.get(operator.name, _MISSING)
+
+        return operator.source if value is _MISSING else value
+
+    def _lookup(self, node):
+        with self._lock:
+            value = self._cache.pop(node, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+            else:
+                self._cache[node] = value
+                self.hits += 1
+            return value
+
+    def _store(self, node, value):
+        size = _sizeof(value)
+
+        if size > self.cache_budget:
+            return
+
+        with self._lock:
+            if node in self._cache:
+                return
+
+            self._cache[node] = value
+            self._cache_size += size
+
+            while self._cache_size > self.cache_budget:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_size -= _sizeof(evicted)
+
+    @property
+    def cache_size(self):
+        """The approximate number of bytes of node outputs currently cached.
+
+        :rtype: int
+
+        """
+        return self._cache_size
+
+    def clear(self):
+        """Discard every cached node output."""
+        with self._lock:
+            self._cache.clear()
+            self._cache_size = 0
+
+    def __repr__(self):
+        return (
+            'Interpreter(bindings={bindings}, cache_budget={cache_budget})'
+        ).format(
+            bindings=repr(self.bindings),
+            cache_budget=repr(self.cache_budget)
+        )
+
+
+def pack(bits):
+    """Pack a sequence of boolean fitness case values into an integer whose
+    :math:`i`-th bit is the value on the :math:`i`-th fitness case.
+
+    :param bits: The value on each fitness case.
+    :type bits: collections.Iterable[bool]
+
+    :return: The packed values.
+    :rtype: int
+
+    """
+    digits = ''.join('1' if bit else '0' for bit in bits)[::-1]
+    return int(digits, 2) if len(digits) > 0 else 0
+
+
+def unpack(packed, n_cases):
+    """Unpack an integer produced by *pack* into a list of booleans.
+
+    :param packed: The packed values.
+    :type packed: int
+
+    :param n_cases: The number of fitness cases.
+    :type n_cases: int
+
+    :return: The value on each fitness case.
+    :rtype: list[bool]
+
+    """
+    return [bool((packed >> i) & 1) for i in xrange(n_cases)]
+
+
+def popcount(packed):
+    """Count the set bits of a nonnegative packed integer, for instance to
+    count the fitness cases on which two packed outputs agree.
+
+    :param packed: A nonnegative integer.
+    :type packed: int
+
+    :rtype: int
+
+    """
+    return bin(packed).count('1')
+
+
+def bitwise_if(condition, consequent, alternative):
+    """The bit-parallel form of a boolean *if* operator.
+
+    :rtype: int
+
+    """
+    return (condition & consequent) | (~condition & alternative)
+
+
+class BitwiseInterpreter(Interpreter):
+
+    __slots__ = ('n_cases', 'mask')
+
+    def __init__(self, bindings, n_cases, cache_budget=0):
+        """A BitwiseInterpreter evaluates boolean trees on every fitness case
+        at once by packing the fitness cases into the bits of integers (see
+        *pack*). Each basis node costs one call to its operator's *bitwise*
+        implementation on integers of *n_cases* bits, which CPython processes
+        a machine word at a time, instead of one call per fitness case.
+
+        Bindings map terminals (or the names of variable terminals) to their
+        boolean value on each fitness case and are packed once, up front. The
+        output of *evaluate* is packed; use *unpack* to recover the value on
+        each fitness case, or compare it against a packed target with
+        *popcount*.
+
+        :param bindings:
+            A mapping from terminal operators to their value on each fitness
+            case.
+
+        :type bindings: dict[zoonomia.solution.TerminalOperator, list[bool]]
+
+        :param n_cases: The number of fitness cases.
+        :type n_cases: int
+
+        :param cache_budget: See Interpreter.
+        :type cache_budget: int
+
+        """
+        super(BitwiseInterpreter, self).__init__(
+            bindings={
+                terminal: pack(bits) for terminal, bits in bindings.iteritems()
+            },
+            cache_budget=cache_budget
+        )
+        self.n_cases = n_cases
+        self.mask = (1 << n_cases) - 1
+
+    def evaluate(self, tree, retain=None):
+        """Compute the packed output of *tree* on every fitness case.
+
+        :param tree: The tree to evaluate.
+        :type tree: zoonomia.tree.Tree
+
+        :param retain: See Interpreter.evaluate.
+        :type retain: bool
+
+        :return: The packed output of the tree's root.
+        :rtype: int
+
+        """
+        return super(BitwiseInterpreter, self).evaluate(
+            tree, retain=retain
+        ) & self.mask
+
+    def _apply(self, operator, arguments):
+        return operator.bitwise(*arguments)
+
+    def _terminal(self, operator):
+        value = self.bindings.get(operator, _MISSING)
+
+        if value is _MISSING and isinstance(operator, VariableTerminal):
+            value = self.bindings.get(operator.name, _MISSING)
+
+        if value is not _MISSING:
+            return value
+        elif isinstance(operator, ConstantTerminal):
+            return self.mask if operator.value else 0
+        else:
+            return pack(operator.source)
+
+    def __repr__(self):
+        return (
+            'BitwiseInterpreter(n_cases={n_cases}, '
+            'cache_budget={cache_budget})'
+        ).format(
+            n_cases=repr(self.n_cases), cache_budget=repr(self.cache_budget)
+        )
+
+
+def _is_boolean(values):
+    dtype = getattr(values, 'dtype', None)
+
+    if dtype is not None:
+        return dtype.kind == 'b'
+    else:
+        return all(
+            isinstance(v, bool) or getattr(v, 'dtype', None) == bool
+            for v in values
+        )
+
+
+def interpreter_for(basis_set, bindings, cache_budget=0):
+    """Returns the fastest interpreter able to evaluate trees built from
+    *basis_set* against *bindings*. If every basis operator declares a
+    *bitwise* implementation and every binding is a sequence of booleans
+    (Python or NumPy) of the same length, a BitwiseInterpreter is returned;
+    otherwise a plain Interpreter.
+
+    :param basis_set: The basis operators trees will be built from.
+    :type basis_set: zoonomia.solution.OperatorSet[BasisOperator]
+
+    :param bindings: A mapping from terminal operators to their values.
+    :type bindings: dict[zoonomia.solution.TerminalOperator, T]
+
+    :param cache_budget: See Interpreter.
+    :type cache_budget: int
+
+    :rtype: zoonomia.interpreter.Interpreter
+
+    """
+    lengths = set()
+    boolean = all(
+        getattr(operator, 'bitwise', None) is not None
+        for operator in basis_set
+    )
+
+    for values in bindings.itervalues():
+        if not boolean:
+            break
+        try:
+            lengths.add(len(values))
+            boolean = _is_boolean(values)
+        except TypeError:
+            boolean = False
+
+    if boolean and len(lengths) == 1:
+        return BitwiseInterpreter(
+            bindings=bindings,
+            n_cases=lengths.pop(),
+            cache_budget=cache_budget
+        )
+    else:
+        return Interpreter(
+            bindings=bindings,
+            cache_budget=cache_budget
+        )
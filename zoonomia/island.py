@@ -0,0 +1,384 @@
+import logging
+import multiprocessing
+import random
+
+from Queue import Empty
+
+from zoonomia.codec import pack_population, unpack_population
+from zoonomia.operations import tournament_select
+
+log = logging.getLogger(__name__)  # FIXME
+
+_POLL_INTERVAL = 0.1
+
+
+def ring(n_islands):
+    """A unidirectional ring topology: island :math:`i` sends its migrants to
+    island :math:`i + 1` (modulo *n_islands*).
+
+    :param n_islands: The number of islands.
+    :type n_islands: int
+
+    :return:
+        For each island, the tuple of islands which receive its migrants.
+
+    :rtype: tuple[tuple[int]]
+
+    """
+    if n_islands < 2:
+        return tuple(() for _ in xrange(n_islands))
+
+    return tuple(((i + 1) % n_islands,) for i in xrange(n_islands))
+
+
+def torus(rows, columns):
+    """A two dimensional torus topology: islands are laid out on a *rows* by
+    *columns* grid which wraps around at the edges, and each island sends its
+    migrants to its north, south, east and west neighbours. Island
+    :math:`(r, c)` has index :math:`r \\cdot columns + c`.
+
+    :param rows: The number of rows in the grid.
+    :type rows: int
+
+    :param columns: The number of columns in the grid.
+    :type columns: int
+
+    :return:
+        For each island, the tuple of islands which receive its migrants.
+
+    :rtype: tuple[tuple[int]]
+
+    """
+    topology = []
+
+    for r in xrange(rows):
+        for c in xrange(columns):
+            index = r * columns + c
+            neighbours = []
+            for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                neighbour = ((r + dr) % rows) * columns + (c + dc) % columns
+                if neighbour != index and neighbour not in neighbours:
+                    neighbours.append(neighbour)
+            topology.append(tuple(neighbours))
+
+    return tuple(topology)
+
+
+def random_topology(n_islands, degree, rng):
+    """A random topology: each island sends its migrants to *degree* other
+    islands chosen uniformly at random.
+
+    :param n_islands: The number of islands.
+    :type n_islands: int
+
+    :param degree:
+        The number of islands each island sends migrants to. This is capped
+        at :math:`n_{islands} - 1`.
+
+    :type degree: int
+
+    :param rng: A random number generator instance.
+    :type rng: random.Random
+
+    :return:
+        For each island, the tuple of islands which receive its migrants.
+
+    :rtype: tuple[tuple[int]]
+
+    """
+    degree = min(degree, n_islands - 1)
+
+    return tuple(
+        tuple(sorted(
+            rng.sample([j for j in xrange(n_islands) if j != i], degree)
+        )) for i in xrange(n_islands)
+    )
+
+
+class IslandModel(object):
+
+    __slots__ = (
+        'topology', 'initialize', 'breed', 'registry', 'objectives',
+        'generations', 'migration_interval', 'migration_size', 'seed'
+    )
+
+    def __init__(
+        self, topology, initialize, breed, registry, objectives, generations,
+        migration_interval, migration_size, seed
+    ):
+        """An IslandModel evolves one population per island, each island in
+        its own process with its own random number stream, and periodically
+        exchanges migrants between islands along the edges of *topology*.
+
+        Migration is asynchronous: every *migration_interval* generations an
+        island sends copies of its emigrants to each of its neighbours and
+        absorbs whichever immigrants have arrived so far, without waiting for
+        its neighbours to catch up. Migrants travel as compact binary
+        populations (see zoonomia.codec.pack_population) together with their
+        fitness scores, so immigrants are never evaluated again on arrival.
+
+        .. note::
+            Islands are started with the *fork* method, so *initialize*,
+            *breed*, *registry* and *objectives* are inherited by the island
+            processes rather than pickled. They may therefore refer to
+            closures and lambdas.
+
+        :param topology:
+            For each island, the tuple of islands which receive its migrants.
+            See *ring*, *torus* and *random_topology*.
+
+        :type topology: tuple[tuple[int]]
+
+        :param initialize:
+            A function which, given an island index and that island's random
+            number generator, returns the island's initial population.
+
+        :type initialize:
+            (int, random.Random) ->
+            collections.Iterable[zoonomia.solution.Solution]
+
+        :param breed:
+            A function which, given a population and a random number
+            generator, returns the next generation's population.
+
+        :type breed:
+            (list[zoonomia.solution.Solution], random.Random) ->
+            collections.Iterable[zoonomia.solution.Solution]
+
+        :param registry:
+            The registry used to encode and decode migrants. It must contain
+            every operator which can appear in a tree.
+
+        :type registry: zoonomia.codec.OperatorRegistry
+
+        :param objectives: The objectives every solution is constructed with.
+        :type objectives: tuple[zoonomia.solution.Objective]
+
+        :param generations: The number of generations each island evolves.
+        :type generations: int
+
+        :param migration_interval:
+            The number of generations between migrations.
+
+        :type migration_interval: int
+
+        :param migration_size:
+            The number of emigrants sent to each neighbour per migration.
+
+        :type migration_size: int
+
+        :param seed:
+            The master seed. Island :math:`i` draws from the stream obtained
+            by jumping a generator seeded with *seed* ahead by :math:`i`.
+
+        :type seed: int
+
+        """
+        self.topology = topology
+        self.initialize = initialize
+        self.breed = breed
+        self.registry = registry
+        self.objectives = objectives
+        self.generations = generations
+        self.migration_interval = migration_interval
+        self.migration_size = migration_size
+        self.seed = seed
+
+    def run(self):
+        """Evolve every island to completion and collect the final
+        populations.
+
+        :raise RuntimeError:
+            If an island process fails or exits without returning its
+            population. The remaining islands are then terminated.
+
+        :return: The final population of each island, indexed by island.
+        :rtype: tuple[tuple[zoonomia.solution.Solution]]
+
+        """
+        n_islands = len(self.topology)
+        inboxes = [multiprocessing.Queue() for _ in xrange(n_islands)]
+        results = multiprocessing.Queue()
+
+        processes = [
+            multiprocessing.Process(
+                target=_run_island, args=(self, index, inboxes, results)
+            ) for index in xrange(n_islands)
+        ]
+
+        for process in processes:
+            process.start()
+
+        populations = [None for _ in xrange(n_islands)]
+        remaining = set(xrange(n_islands))
+        failed = True
+
+        try:
+            while len(remaining) > 0:
+                try:
+                    index, packed = results.get(timeout=_POLL_INTERVAL)
+                except Empty:
+                    # An island which exits without posting a result (for
+                    # instance because it was killed) would otherwise leave
+                    # this loop waiting forever. Results are flushed before
+                    # an island exits, so a dead island's result is already
+                    # readable if it posted one.
+                    dead = [
+                        i for i in remaining
+                        if processes[i].exitcode is not None
+                    ]
+                    if len(dead) > 0 and results.empty():
+                        raise RuntimeError(
+                            'island {0} exited with code {1}'.format(
+                                dead[0], processes[dead[0]].exitcode
+                            )
+                        )
+                    continue
+
+                if packed is None:
+                    raise RuntimeError('island {0} failed'.format(index))
+                populations[index] = unpack_population(
+                    packed, self.registry, self.objectives
+                )
+                remaining.discard(index)
+
+            failed = False
+        finally:
+            if failed:
+                # The surviving islands may be blocked sending results which
+                # will never be read, so they must be stopped before they can
+                # be joined.
+                for process in processes:
+                    if process.is_alive():
+                        process.terminate()
+            for process in processes:
+                process.join()
+
+        return tuple(populations)
+
+    def __repr__(self):
+        return (
+            'IslandModel(topology={topology}, generations={generations}, '
+            'migration_interval={migration_interval}, '
+            'migration_size={migration_size}, seed={seed})'
+        ).format(
+            topology=repr(self.topology),
+            generations=repr(self.generations),
+            migration_interval=repr(self.migration_interval),
+            migration_size=repr(self.migration_size),
+            seed=repr(self.seed)
+        )
+
+
+def select_emigrants(population, migration_size, rng):
+    """Choose *migration_size* emigrants from *population* by binary
+    tournament selection.
+
+    :param population: The population to choose emigrants from.
+    :type population: list[zoonomia.solution.Solution]
+
+    :param migration_size: The number of emigrants.
+    :type migration_size: int
+
+    :param rng: A random number generator instance.
+    :type rng: random.Random
+
+    :return: The emigrants.
+    :rtype: tuple[zoonomia.solution.Solution]
+
+    """
+    if len(population) < 2:
+        return tuple(population[:migration_size])
+
+    return tuple(
+        tournament_select(*rng.sample(population, 2), rng=rng)
+        for _ in xrange(migration_size)
+    )
+
+
+def absorb_immigrants(population, immigrants, rng):
+    """Replace members of *population* with *immigrants*, in place. Each
+    immigrant replaces the loser of a binary tournament between two residents.
+
+    :param population: The population receiving immigrants.
+    :type population: list[zoonomia.solution.Solution]
+
+    :param immigrants: The immigrants.
+    :type immigrants: collections.Iterable[zoonomia.solution.Solution]
+
+    :param rng: A random number generator instance.
+    :type rng: random.Random
+
+    """
+    for immigrant in immigrants:
+        if len(population) < 2:
+            population.append(immigrant)
+            continue
+
+        i, j = rng.sample(xrange(len(population)), 2)
+        winner = tournament_select(population[i], population[j], rng=rng)
+        population[j if winner is population[i] else i] = immigrant
+
+
+def _drain(inbox):
+    while True:
+        try:
+            yield inbox.get_nowait()
+        except Empty:
+            return
+
+
+def _run_island(model, index, inboxes, results):
+    inbox = inboxes[index]
+    outboxes = [inboxes[i] for i in model.topology[index]]
+
+    for outbox in outboxes:
+        # Migrants still in flight when a neighbour finishes are dropped
+        # rather than blocking this island's exit.
+        outbox.cancel_join_thread()
+
+    try:
+        rng = random.Random(model.seed)
+        rng.jumpahead(index)
+
+        population = list(model.initialize(index, rng))
+
+        for generation in xrange(1, model.generations + 1):
+            population = list(model.breed(population, rng))
+
+            if generation % model.migration_interval == 0:
+                emigrants = pack_population(
+                    select_emigrants(population, model.migration_size, rng),
+                    model.registry,
+                    len(model.objectives)
+                )
+
+                for outbox in outboxes:
+                    outbox.put(emigrants)
+
+                for batch in _drain(inbox):
+                    absorb_immigrants(
+                        population,
+                        unpack_population(
+                            batch, model.registry, model.objectives
+                        ),
+                        rng
+                    )
+
+        for solution in population:
+            solution.evaluate()
+
+        results.put(
+            (
+                index,
+                pack_population(
+                    population, model.registry, len(model.objectives)
+                )
+            )
+        )
+    except Exception:
+        log.exception('island %d failed', index)
+        results.put((index, None))
+    finally:
+        for _ in _drain(inbox):
+            pass
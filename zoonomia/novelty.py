@@ -0,0 +1,360 @@
+import heapq
+import logging
+import threading
+
+import numpy as np
+
+from zoonomia.solution import Objective, Fitness
+
+log = logging.getLogger(__name__)  # FIXME
+
+
+class _Node(object):
+
+    __slots__ = ('axis', 'split', 'left', 'right', 'indices')
+
+    def __init__(self, indices):
+        self.axis = None
+        self.split = None
+        self.left = None
+        self.right = None
+        self.indices = indices
+
+
+class KDTree(object):
+
+    __slots__ = ('leaf_size', '_points', '_size', '_root')
+
+    def __init__(self, points=(), leaf_size=16):
+        """A KDTree indexes points in a vector space so that the nearest
+        neighbours of a point can be found in roughly :math:`O(\\log N)`
+        time. Points can be inserted one at a time: an insertion descends to
+        a leaf and splits it at the median of its widest dimension once it
+        holds more than *leaf_size* points, so the tree stays balanced
+        enough without ever being rebuilt.
+
+        Points are stored in a NumPy array which doubles in size when it
+        fills up, and each leaf's distances are computed in one vectorized
+        operation.
+
+        :param points: Points to insert, all of the same dimension.
+        :type points: collections.Iterable[collections.Sequence[float]]
+
+        :param leaf_size: The number of points a leaf holds before splitting.
+        :type leaf_size: int
+
+        """
+        self.leaf_size = leaf_size
+        self._points = None
+        self._size = 0
+        self._root = _Node(indices=[])
+
+        for point in points:
+            self.insert(point)
+
+    @property
+    def points(self):
+        """The points in the tree, in the order they were inserted.
+
+        :rtype: numpy.ndarray
+
+        """
+        if self._points is None:
+            return np.empty((0, 0))
+        return self._points[:self._size]
+
+    def insert(self, point):
+        """Insert a point into the tree.
+
+        :param point: The point.
+        :type point: collections.Sequence[float]
+
+        :raise ValueError:
+            If the point's dimension differs from that of the points already
+            in the tree.
+
+        :return: The index of the point in *points*.
+        :rtype: int
+
+        """
+        point = np.asarray(point, dtype=np.float64).ravel()
+
+        if self._points is None:
+            self._points = np.empty((self.leaf_size, point.size))
+        elif point.size != self._points.shape[1]:
+            raise ValueError(
+                'expected a point of dimension {0}, got {1}'.format(
+                    self._points.shape[1], point.size
+                )
+            )
+
+        if self._size == len(self._points):
+            self._points = np.concatenate(
+                (self._points, np.empty_like(self._points))
+            )
+
+        index = self._size
+        self._points[index] = point
+        self._size += 1
+
+        node = self._root
+        while node.indices is None:
+            if point[node.axis] <= node.split:
+                node = node.left
+            else:
+                node = node.right
+
+        node.indices.append(index)
+
+        if len(node.indices) > self.leaf_size:
+            self._split(node)
+
+        return index
+
+    def _split(self, node):
+        indices = np.array(node.indices)
+        points = self._points[indices]
+        low = points.min(axis=0)
+        high = points.max(axis=0)
+        axis = int(np.argmax(high - low))
+
+        if high[axis] == low[axis]:
+            return  # the points are identical, so the leaf just grows
+
+        split = float(np.median(points[:, axis]))
+        left = points[:, axis] <= split
+
+        if left.all():
+            split = 0.5 * (low[axis] + high[axis])
+            left = points[:, axis] <= split
+
+        node.axis = axis
+        node.split = split
+        node.left = _Node(indices=indices[left].tolist())
+        node.right = _Node(indices=indices[~left].tolist())
+        node.indices = None
+
+    def query(self, point, k, exclude=None):
+        """Find the *k* points nearest to *point* by Euclidean distance.
+
+        :param point: The point to search around.
+        :type point: collections.Sequence[float]
+
+        :param k: The number of neighbours to find.
+        :type k: int
+
+        :param exclude:
+            Optionally, the index of a point to leave out, such as the point
+            being searched around.
+
+        :type exclude: int
+
+        :return:
+            The distances to the nearest points and their indices, nearest
+            first. There are fewer than *k* of them if the tree holds fewer
+            than *k* points.
+
+        :rtype: (list[float], list[int])
+
+        """
+        if self._size == 0 or k <= 0:
+            return [], []
+
+        point = np.asarray(point, dtype=np.float64).ravel()
+        best = []  # a max-heap of (-squared distance, index)
+        stack = [(self._root, 0.0)]
+
+        while len(stack) > 0:
+            node, bound = stack.pop()
+
+            if len(best) == k and bound >= -best[0][0]:
+                continue
+
+            if node.indices is not None:
+                if len(node.indices) == 0:
+                    continue
+                differences = self._points[node.indices] - point
+                distances = np.einsum('ij,ij->i', differences, differences)
+                for index, distance in zip(node.indices, distances.tolist()):
+                    if index == exclude:
+                        continue
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, index))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, index))
+                continue
+
+            offset = point[node.axis] - node.split
+            near, far = (
+                (node.left, node.right) if offset <= 0
+                else (node.right, node.left)
+            )
+            stack.append((far, max(bound, offset * offset)))
+            stack.append((near, bound))
+
+        best.sort(reverse=True)
+
+        return (
+            [float(np.sqrt(-d)) for d, _ in best], [i for _, i in best]
+        )
+
+    def __len__(self):
+        return self._size
+
+    def __repr__(self):
+        return 'KDTree(points={points}, leaf_size={leaf_size})'.format(
+            points=repr(self.points), leaf_size=repr(self.leaf_size)
+        )
+
+
+class NoveltyObjective(Objective):
+
+    __slots__ = (
+        'behavior', 'k', 'threshold', 'archive', '_population', '_ids',
+        '_solutions', '_lock'
+    )
+
+    def __init__(self, behavior, k=15, threshold=None, weight=1.0):
+        """A NoveltyObjective scores a solution by how different its behavior
+        is from that of the current population and of an archive of past
+        solutions: by the mean distance from its behavior to its *k* nearest
+        neighbours. See Lehman2011. Like any other Objective, it can be
+        combined with objectives measuring performance, so that
+        *Solution.dominates* trades novelty off against them.
+
+        Behaviors are kept in KDTrees, so scoring a solution costs roughly
+        :math:`O(k \\log N)` rather than :math:`O(N)`. The archive's tree is
+        updated incrementally as behaviors are added to it, and the
+        population's tree is built once per generation by *set_population*.
+
+        .. note::
+            Novelty is relative to the population and archive at the time a
+            solution is evaluated, and solutions cache their Fitness
+            measurements, so call *set_population* before evaluating each
+            generation's offspring.
+
+        :param behavior:
+            A function describing a tree's behavior by a vector of numbers,
+            such as those returned by zoonomia.surrogate.phenotype_features.
+
+        :type behavior: (zoonomia.tree.Tree) -> collections.Sequence[float]
+
+        :param k: The number of nearest neighbours to average over.
+        :type k: int
+
+        :param threshold:
+            The novelty at or above which a solution's behavior is added to
+            the archive as it is evaluated (the first behavior evaluated
+            always is), or None to only archive behaviors passed to *add*.
+
+        :type threshold: float
+
+        :param weight: The weight to give this objective.
+        :type weight: float
+
+        """
+        super(NoveltyObjective, self).__init__(
+            eval_func=behavior, weight=weight
+        )
+        self.behavior = behavior
+        self.k = k
+        self.threshold = threshold
+        self.archive = KDTree()
+        self._population = KDTree()
+        self._ids = {}
+        self._solutions = ()
+        self._lock = threading.Lock()
+
+    def set_population(self, solutions):
+        """Replace the population novelty is measured against.
+
+        :param solutions: The current population.
+        :type solutions: collections.Iterable[zoonomia.solution.Solution]
+
+        """
+        solutions = tuple(solutions)
+        population = KDTree()
+        ids = {}
+
+        for solution in solutions:
+            ids[id(solution)] = population.insert(
+                self.behavior(solution.tree)
+            )
+
+        with self._lock:
+            self._population = population
+            self._ids = ids
+            self._solutions = solutions  # keeps the ids in use
+
+    def add(self, solution):
+        """Add the behavior of *solution* to the archive.
+
+        :param solution: A solution.
+        :type solution: zoonomia.solution.Solution
+
+        """
+        behavior = self.behavior(solution.tree)
+
+        with self._lock:
+            self.archive.insert(behavior)
+
+    def novelty(self, behavior, exclude=None):
+        """Returns the mean distance from *behavior* to its *k* nearest
+        neighbours among the population and the archive, or 0.0 if both are
+        empty.
+
+        :param behavior: A behavior.
+        :type behavior: collections.Sequence[float]
+
+        :param exclude:
+            Optionally, the index in the population of the behavior's own
+            solution, which is not its own neighbour.
+
+        :type exclude: int
+
+        :rtype: float
+
+        """
+        with self._lock:
+            population, _ = self._population.query(
+                behavior, self.k, exclude=exclude
+            )
+            archive, _ = self.archive.query(behavior, self.k)
+
+        nearest = heapq.nsmallest(self.k, population + archive)
+
+        if len(nearest) == 0:
+            return 0.0
+
+        return sum(nearest) / len(nearest)
+
+    def evaluate(self, solution):
+        """Compute the novelty of a solution, archiving its behavior if it is
+        novel enough.
+
+        :param solution: A candidate solution.
+        :type solution: zoonomia.solution.Solution
+
+        :rtype: zoonomia.solution.Fitness
+
+        """
+        behavior = self.behavior(solution.tree)
+        novelty = self.novelty(behavior, exclude=self._ids.get(id(solution)))
+
+        if self.threshold is not None:
+            with self._lock:
+                if novelty >= self.threshold or len(self.archive) == 0:
+                    self.archive.insert(behavior)
+
+        return Fitness(score=novelty * self._weight, objective=self)
+
+    def __repr__(self):
+        return (
+            'NoveltyObjective(behavior={behavior}, k={k}, '
+            'threshold={threshold}, weight={weight})'
+        ).format(
+            behavior=repr(self.behavior),
+            k=repr(self.k),
+            threshold=repr(self.threshold),
+            weight=repr(self._weight)
+        )
@@ -1,5 +1,7 @@
+import random
+
 from zoonomia.tree import Node, Tree
-from zoonomia.solution import BasisOperator, Solution
+from zoonomia.solution import BasisOperator, EphemeralConstant, Solution
 
 
 def build_types_possibility_table(
@@ -61,8 +63,10 @@ def full(max_depth, basis_set, terminal_set, dtype, objectives, rng):
     """An implementation of Koza's *full* tree generation strategy augmented to
     take type information into account. Returns a candidate solution satisfying
     the property that all branches of the solution's tree representation have
-    path length from root to leaf equal to :math:`d_{max}`. See Koza1992 and
-    Montana1995.
+    path length from root to leaf equal to :math:`d_{max}`, wherever the types
+    possibility table allows a branch to reach that depth. See Koza1992 and
+    Montana1995. Each time an EphemeralConstant is chosen, a constant is drawn
+    from its pool in its place.
 
     :param max_depth: The maximum tree depth from root to leaf.
     :type max_depth: int
@@ -98,45 +102,29 @@ def full(max_depth, basis_set, terminal_set, dtype, objectives, rng):
     :rtype: zoonomia.solution.Solution
 
     """
-    if max_depth <= 1:
-        node = Node(operator=rng.choice(terminal_set[dtype]))
-    else:
-        node = Node(operator=rng.choice(basis_set[dtype]))
-
-    root = node
-    depth = 1
-    parents = [node]
-
-    while depth < max_depth:
-        depth += 1
-        children = []
-
-        for parent in parents:
-            for idx, t in enumerate(parent.operator.signature):
-                node = Node(
-                    operator=rng.choice(terminal_set[t])
-                ) if depth == max_depth else Node(
-                    operator=rng.choice(basis_set[dtype])
-                )
-
-                children.append(node)
-
-                tree.add_edge(
-                    edge=Edge(parent=parent, child=node, position=idx)
-                )
-
-        parents = children
-
-    tree = Tree(root=root)
+    root = _generate(
+        max_depth=max_depth,
+        basis_set=basis_set,
+        terminal_set=terminal_set,
+        dtype=dtype,
+        rng=rng,
+        grow_=False,
+        table=build_types_possibility_table(
+            basis_set, terminal_set, max_depth, grow_=True
+        )
+    )
 
-    return Solution(tree=tree, objectives=objectives)  # TODO: decouple Solution from Objectives?
+    # TODO: decouple Solution from Objectives?
+    return Solution(tree=Tree(root=root), objectives=objectives)
 
 
 def grow(max_depth, basis_set, terminal_set, dtype, objectives, rng):
     """An implementation of Koza's *grow* tree generation strategy augmented to
     take type information into account. Returns a candidate solution whose
     graph representation has maximum path length from root to leaf constrained
-    to the interval :math:`[1, d_{max}]`. See Koza1992 and Montana1995.
+    to the interval :math:`[1, d_{max}]`. See Koza1992 and Montana1995. Each
+    time an EphemeralConstant is chosen, a constant is drawn from its pool in
+    its place.
 
     :param max_depth: The maximum tree depth from root to leaf.
     :type max_depth: int
@@ -172,52 +160,36 @@ def grow(max_depth, basis_set, terminal_set, dtype, objectives, rng):
     :rtype: zoonomia.solution.Solution
 
     """
-    if max_depth <= 1:
-        node = Node(operator=rng.choice(terminal_set[dtype]))
-    else:
-        operator = rng.choice(basis_set.union(terminal_set)[dtype])
-        if isinstance(operator, BasisOperator):
-            node = Node(operator=operator)
-        else:
-            node = Node(operator=operator)
-
-    root = node
-    depth = 1
-    parents = [node]
-
-    while depth < max_depth:
-        depth += 1
-        children = []
-
-        for parent in parents:
-            for idx, t in enumerate(parent.operator.signature):
-                if depth == max_depth:
-                    node = Node(operator=rng.choice(terminal_set[t]))
-                else:
-                    operator = rng.choice(basis_set.union(terminal_set)[t])
-                    if isinstance(operator, BasisOperator):
-                        node = Node(operator=operator)
-                        children.append(node)
-                    else:
-                        node = Node(operator=operator)
-
-                tree.add_edge(
-                    edge=Edge(parent=parent, child=node, position=idx)
-                )
-
-        parents = children
-
-    tree = Tree(root=root)
+    root = _generate(
+        max_depth=max_depth,
+        basis_set=basis_set,
+        terminal_set=terminal_set,
+        dtype=dtype,
+        rng=rng,
+        grow_=True,
+        table=build_types_possibility_table(
+            basis_set, terminal_set, max_depth, grow_=True
+        )
+    )
 
-    return Solution(tree=tree, objectives=objectives)  # TODO: decouple Solution from Objectives?
+    # TODO: decouple Solution from Objectives?
+    return Solution(tree=Tree(root=root), objectives=objectives)
 
 
 def ramped_half_and_half(
-    max_depth, population_size, basis_set, terminal_set, dtype, objectives, rng
+    max_depth, population_size, basis_set, terminal_set, dtype, objectives,
+    rng, semantic_index=None, attempts=8
 ):
     """An implementation of something like Koza's ramped half-and-half
     population initialization procedure. See Koza1992.
 
+    Given a *semantic_index*, each individual which is semantically identical
+    to one generated before it is regenerated, up to *attempts* times, so
+    that the population does not start out full of trees computing the same
+    function. The individuals are added to the index, which can then be used
+    to keep variation from reintroducing duplicates (see
+    zoonomia.semantics.unique).
+
     :param max_depth: the max tree depth per individual.
     :type max_depth: int
 
@@ -251,6 +223,17 @@ def ramped_half_and_half(
     :param rng: A random number generator instance.
     :type rng: random.Random
 
+    :param semantic_index:
+        Optionally, the index to check each individual's semantics against.
+
+    :type semantic_index: zoonomia.semantics.SemanticIndex
+
+    :param attempts:
+        The number of times to generate each individual before accepting a
+        duplicate.
+
+    :type attempts: int
+
     :return:
     :rtype: frozenset
 
@@ -266,39 +249,269 @@ def ramped_half_and_half(
             terminal_set=terminal_set,
             objectives=objectives,
             dtype=dtype,
-            rng=rng
+            rng=rng,
+            semantic_index=semantic_index,
+            attempts=attempts
         )
     )
 
 
-def mutate_subtree(solution):
+def mutate_subtree(
+    solution, basis_set, terminal_set, max_depth, rng, max_size=None,
+    attempts=8
+):
     """Perform subtree mutation on a solution, returning a new mutant solution.
+    A mutation point is chosen uniformly and the subtree rooted there is
+    replaced by a new subtree of the same dtype, grown with the *grow* method
+    so that the mutant's depth does not exceed *max_depth*. Only the nodes on
+    the path from the mutation point to the root are copied.
 
     :param solution: A solution.
     :type solution: zoonomia.solution.Solution
 
+    :param basis_set:
+        The OperatorSet of basis operators which, together with *terminal_set*,
+        satisfy the closure property.
+
+    :type basis_set: zoonomia.solution.OperatorSet[BasisOperator]
+
+    :param terminal_set:
+        The OperatorSet of terminal operators which, together with
+        *basis_set*, satisfy the closure property.
+
+    :type terminal_set: zoonomia.solution.OperatorSet[TerminalOperator]
+
+    :param max_depth: The maximum depth of the mutant's tree.
+    :type max_depth: int
+
+    :param rng: A random number generator instance.
+    :type rng: random.Random
+
+    :param max_size:
+        The maximum number of nodes in the mutant's tree, or None for no
+        limit.
+
+    :type max_size: int
+
+    :param attempts:
+        The number of mutations to try before giving up. When every attempt
+        would exceed *max_size* the solution is returned unchanged.
+
+    :type attempts: int
+
     :return: A mutant solution.
 
     :rtype: zoonomia.solution.Solution
     """
-    raise NotImplementedError()  # FIXME: implement
+    table = build_types_possibility_table(
+        basis_set, terminal_set, max_depth, grow_=True
+    )
+
+    return _mutate_subtree_within(
+        solution=solution,
+        u_point=rng.random(),
+        rng=rng,
+        basis_set=basis_set,
+        terminal_set=terminal_set,
+        max_depth=max_depth,
+        table=table,
+        max_size=max_size,
+        attempts=attempts
+    )
 
 
-def mutate_node(solution):
+def mutate_node(solution, basis_set, terminal_set, rng):
     """Perform a point mutation on a solution, returning a new mutant solution.
+    A mutation point is chosen uniformly and its operator is swapped for a
+    different operator of the same kind: a basis operator is swapped for one
+    having the same signature and dtype, a terminal operator for one having
+    the same dtype. The children of the mutated node are kept. If there is no
+    such operator the solution is returned unchanged.
 
     :param solution: A solution.
     :type solution: zoonomia.solution.Solution
 
+    :param basis_set: The OperatorSet of basis operators to draw from.
+    :type basis_set: zoonomia.solution.OperatorSet[BasisOperator]
+
+    :param terminal_set: The OperatorSet of terminal operators to draw from.
+    :type terminal_set: zoonomia.solution.OperatorSet[TerminalOperator]
+
+    :param rng: A random number generator instance.
+    :type rng: random.Random
+
     :return: A mutant solution.
 
     :rtype: zoonomia.solution.Solution
     """
-    raise NotImplementedError()  # FIXME: implement
+    return _mutate_node_at(
+        solution=solution,
+        u_point=rng.random(),
+        u_operator=rng.random(),
+        basis_set=basis_set,
+        terminal_set=terminal_set
+    )
+
+
+def mutate_bulk(
+    solutions, basis_set, terminal_set, max_depth, rng, node_rate=0.5,
+    max_size=None, attempts=8
+):
+    """Mutate a whole generation in one call. Every random choice the
+    generation's mutations need is drawn from *rng* up front, in a single
+    block, before any mutation is applied: whether to perform a point or a
+    subtree mutation, where to mutate, which replacement operator to use, and
+    a seed for growing each replacement subtree. Applying the mutations is
+    then a deterministic function of those draws, and the types possibility
+    table is built only once for the whole generation.
+
+    :param solutions: The solutions to mutate.
+    :type solutions: collections.Iterable[zoonomia.solution.Solution]
+
+    :param basis_set: The OperatorSet of basis operators to draw from.
+    :type basis_set: zoonomia.solution.OperatorSet[BasisOperator]
+
+    :param terminal_set: The OperatorSet of terminal operators to draw from.
+    :type terminal_set: zoonomia.solution.OperatorSet[TerminalOperator]
+
+    :param max_depth: The maximum depth of a subtree mutant's tree.
+    :type max_depth: int
+
+    :param rng: A random number generator instance.
+    :type rng: random.Random
+
+    :param node_rate:
+        The probability of performing a point mutation instead of a subtree
+        mutation.
+
+    :type node_rate: float
+
+    :param max_size:
+        The maximum number of nodes in a subtree mutant's tree, or None for no
+        limit. A point mutation never changes the size of a tree.
+
+    :type max_size: int
+
+    :param attempts:
+        The number of subtree mutations to try on each solution before giving
+        up, as in mutate_subtree. Attempts after the first draw from the
+        solution's own seeded generator, so the result still depends only on
+        the up front draws.
+
+    :type attempts: int
+
+    :return: One mutant per solution, in order.
+    :rtype: tuple[zoonomia.solution.Solution]
+
+    """
+    solutions = tuple(solutions)
+    draws = [rng.random() for _ in xrange(3 * len(solutions))]
+    seeds = [rng.getrandbits(32) for _ in solutions]
+    table = build_types_possibility_table(
+        basis_set, terminal_set, max_depth, grow_=True
+    )
+
+    return tuple(
+        _mutate_node_at(
+            solution=solution,
+            u_point=draws[3 * i + 1],
+            u_operator=draws[3 * i + 2],
+            basis_set=basis_set,
+            terminal_set=terminal_set
+        ) if draws[3 * i] < node_rate else _mutate_subtree_within(
+            solution=solution,
+            u_point=draws[3 * i + 1],
+            rng=random.Random(seeds[i]),
+            basis_set=basis_set,
+            terminal_set=terminal_set,
+            max_depth=max_depth,
+            table=table,
+            max_size=max_size,
+            attempts=attempts
+        ) for i, solution in enumerate(solutions)
+    )
+
+
+class SubtreePool(object):
+
+    __slots__ = ('solutions', '_entries')
+
+    def __init__(self, solutions):
+        """A SubtreePool indexes every subtree of every solution in a
+        population by dtype, so that a crossover donor of a given dtype can be
+        drawn from the whole population in constant time.
+
+        :param solutions: The population to index.
+        :type solutions: collections.Iterable[zoonomia.solution.Solution]
+
+        """
+        self.solutions = tuple(solutions)
+        entries = {}
+
+        for solution_index, solution in enumerate(self.solutions):
+            for dtype, indices in solution.tree.index.by_dtype.iteritems():
+                entries.setdefault(dtype, []).extend(
+                    (solution_index, i) for i in indices
+                )
+
+        self._entries = {
+            dtype: tuple(e) for dtype, e in entries.iteritems()
+        }
+
+    def entries(self, dtype):
+        """Returns every subtree in the pool having output type *dtype*.
+
+        :param dtype: A type.
+        :type dtype: type
+
+        :raise KeyError: If no subtree in the pool has the given dtype.
+
+        :return:
+            Pairs of (solution index, post-order position). See
+            zoonomia.tree.TreeIndex.
 
+        :rtype: tuple[(int, int)]
 
-def crossover_subtree(solution_1, solution_2):
-    """Perform subtree crossover between two solutions.
+        """
+        return self._entries[dtype]
+
+    def sample(self, dtype, rng):
+        """Draw a subtree having output type *dtype* uniformly at random from
+        the pool.
+
+        :param dtype: A type.
+        :type dtype: type
+
+        :param rng: A random number generator instance.
+        :type rng: random.Random
+
+        :raise KeyError: If no subtree in the pool has the given dtype.
+
+        :return: A pair of (solution index, post-order position).
+        :rtype: (int, int)
+
+        """
+        entries = self._entries[dtype]
+        return entries[int(rng.random() * len(entries))]
+
+    def __len__(self):
+        return sum(len(e) for e in self._entries.itervalues())
+
+    def __repr__(self):
+        return 'SubtreePool(solutions={solutions})'.format(
+            solutions=repr(self.solutions)
+        )
+
+
+def crossover_subtree(
+    solution_1, solution_2, rng, max_depth=None, max_size=None, attempts=8
+):
+    """Perform subtree crossover between two solutions. A crossover point is
+    chosen uniformly in the first solution's tree, and a point of the same
+    dtype is chosen in the second solution's tree; the subtrees rooted at
+    those points are then swapped. Only the nodes on the paths from the
+    crossover points up to the roots are copied, all other subtrees are
+    shared with the parents.
 
     :param solution_1: A solution.
     :type solution_1: zoonomia.solution.Solution
@@ -306,11 +519,121 @@ def crossover_subtree(solution_1, solution_2):
     :param solution_2: Another solution.
     :type solution_2: zoonomia.solution.Solution
 
+    :param rng: A random number generator instance.
+    :type rng: random.Random
+
+    :param max_depth:
+        The maximum depth of either offspring's tree, or None for no limit.
+
+    :type max_depth: int
+
+    :param max_size:
+        The maximum number of nodes in either offspring's tree, or None for no
+        limit.
+
+    :type max_size: int
+
+    :param attempts:
+        The number of pairs of crossover points to try before giving up. When
+        every attempt would violate a limit (or no compatible points were
+        found) the parents are returned unchanged.
+
+    :type attempts: int
+
     :return: Two mutant solution offspring.
 
     :rtype: tuple[zoonomia.solution.Solution]
     """
-    raise NotImplementedError()  # FIXME: implement
+    index_1 = solution_1.tree.index
+    index_2 = solution_2.tree.index
+
+    for _ in xrange(attempts):
+        point_1 = int(rng.random() * len(index_1.nodes))
+        candidates = index_2.by_dtype.get(index_1.nodes[point_1].dtype)
+
+        if candidates is None:
+            continue
+
+        point_2 = candidates[int(rng.random() * len(candidates))]
+
+        if _fits(
+            index_1, point_1, index_2, point_2, max_depth, max_size
+        ) and _fits(
+            index_2, point_2, index_1, point_1, max_depth, max_size
+        ):
+            return (
+                _offspring(solution_1, point_1, index_2.nodes[point_2]),
+                _offspring(solution_2, point_2, index_1.nodes[point_1])
+            )
+
+    return solution_1, solution_2
+
+
+def crossover_subtree_bulk(
+    recipients, pool, rng, max_depth=None, max_size=None, attempts=8
+):
+    """Perform subtree crossover for a whole generation in one call. Each
+    recipient produces exactly one offspring: a crossover point is chosen
+    uniformly in the recipient's tree and replaced by a donor subtree of the
+    same dtype drawn from *pool* in constant time.
+
+    :param recipients: The solutions to produce offspring from.
+    :type recipients: collections.Iterable[zoonomia.solution.Solution]
+
+    :param pool: The subtree pool to draw donor subtrees from.
+    :type pool: zoonomia.operations.SubtreePool
+
+    :param rng: A random number generator instance.
+    :type rng: random.Random
+
+    :param max_depth:
+        The maximum depth of an offspring's tree, or None for no limit.
+
+    :type max_depth: int
+
+    :param max_size:
+        The maximum number of nodes in an offspring's tree, or None for no
+        limit.
+
+    :type max_size: int
+
+    :param attempts:
+        The number of crossover points to try per recipient before giving up
+        and passing the recipient through unchanged.
+
+    :type attempts: int
+
+    :return: One offspring per recipient, in order.
+    :rtype: tuple[zoonomia.solution.Solution]
+
+    """
+    offspring = []
+
+    for recipient in recipients:
+        index = recipient.tree.index
+        child = recipient
+
+        for _ in xrange(attempts):
+            point = int(rng.random() * len(index.nodes))
+
+            try:
+                donor, donor_point = pool.sample(index.nodes[point].dtype, rng)
+            except KeyError:
+                continue
+
+            donor_index = pool.solutions[donor].tree.index
+
+            if _fits(
+                index, point, donor_index, donor_point, max_depth, max_size
+            ):
+                child = _offspring(
+                    recipient, point, donor_index.nodes[donor_point]
+                )
+                break
+
+        offspring.append(child)
+
+    return tuple(offspring)
 
 
 def tournament_select(solution_1, solution_2, rng):  # TODO: clean up docs
@@ -340,12 +663,15 @@ def tournament_select(solution_1, solution_2, rng):  # TODO: clean up docs
 
 
 def _ramped_half_and_half_generator(
-    counts, basis_set, terminal_set, objectives, dtype, rng
+    counts, basis_set, terminal_set, objectives, dtype, rng,
+    semantic_index=None, attempts=8
 ):
     for depth, count in counts.items():
         for _ in xrange(count):
-            if rng.getrandbits(1):
-                yield full(
+            method = full if rng.getrandbits(1) else grow
+
+            for _ in xrange(1 if semantic_index is None else attempts):
+                solution = method(
                     max_depth=depth,
                     basis_set=basis_set,
                     terminal_set=terminal_set,
@@ -353,15 +679,12 @@ def _ramped_half_and_half_generator(
                     objectives=objectives,
                     rng=rng
                 )
+                if semantic_index is None or semantic_index.add(solution):
+                    break
             else:
-                yield grow(
-                    max_depth=depth,
-                    basis_set=basis_set,
-                    terminal_set=terminal_set,
-                    dtype=dtype,
-                    objectives=objectives,
-                    rng=rng
-                )
+                semantic_index.update((solution,))
+
+            yield solution
 
 
 def _random_depth_counts(max_depth, population_size, rng):
@@ -369,3 +692,173 @@ def _random_depth_counts(max_depth, population_size, rng):
     for _ in xrange(population_size):
         counts[rng.choice(counts.keys())] += 1
     return counts
+
+
+def _fits(index, point, donor_index, donor_point, max_depth, max_size):
+    if max_depth is not None and (
+        index.levels[point] - 1 + donor_index.heights[donor_point] > max_depth
+    ):
+        return False
+
+    if max_size is not None and (
+        len(index.nodes) - index.sizes[point] +
+        donor_index.sizes[donor_point] > max_size
+    ):
+        return False
+
+    return True
+
+
+def _offspring(solution, point, node):
+    return Solution(
+        tree=solution.tree.replace(point, node),
+        objectives=solution.objectives,
+        map_=solution.map
+    )
+
+
+def _lookup(operator_set, item):
+    try:
+        return operator_set[item]
+    except KeyError:
+        return ()
+
+
+def _choose_operator(basis_set, terminal_set, dtype, depth, rng, grow_, table):
+    terminals = _lookup(terminal_set, dtype)
+
+    if depth <= 1:
+        candidates = terminals
+    else:
+        allowed = table[depth - 2]
+        basis = tuple(
+            operator for operator in _lookup(basis_set, dtype)
+            if all(t in allowed for t in operator.signature)
+        )
+        if grow_:
+            candidates = basis + terminals
+        else:
+            candidates = basis or terminals
+
+    if len(candidates) == 0:
+        raise KeyError(
+            'no operator can produce {0} within depth {1}'.format(dtype, depth)
+        )
+
+    return candidates[int(rng.random() * len(candidates))]
+
+
+def _generate(max_depth, basis_set, terminal_set, dtype, rng, grow_, table):
+    # Nodes are created top down from an explicit stack, so arbitrarily deep
+    # trees can be generated without recursion. A basis operator is only
+    # chosen if each type in its signature can be produced within the depth
+    # remaining below it, according to the types possibility *table*.
+    root = None
+    stack = [(None, 0, dtype, max_depth)]
+
+    while len(stack) > 0:
+        parent, position, node_dtype, depth = stack.pop()
+        operator = _choose_operator(
+            basis_set, terminal_set, node_dtype, depth, rng, grow_, table
+        )
+        if isinstance(operator, EphemeralConstant):
+            operator = operator.draw(rng)
+        node = Node(operator=operator)
+
+        if parent is None:
+            root = node
+        else:
+            parent.add_child(child=node, position=position)
+
+        if isinstance(operator, BasisOperator):
+            for child_position in xrange(len(operator.signature) - 1, -1, -1):
+                stack.append(
+                    (
+                        node,
+                        child_position,
+                        operator.signature[child_position],
+                        depth - 1
+                    )
+                )
+
+    return root
+
+
+def _mutate_subtree_at(
+    solution, u_point, rng, basis_set, terminal_set, max_depth, table
+):
+    index = solution.tree.index
+    point = int(u_point * len(index.nodes))
+    depth = max(max_depth - index.levels[point] + 1, 1)
+
+    return _offspring(
+        solution,
+        point,
+        _generate(
+            max_depth=depth,
+            basis_set=basis_set,
+            terminal_set=terminal_set,
+            dtype=index.nodes[point].dtype,
+            rng=rng,
+            grow_=True,
+            table=table
+        )
+    )
+
+
+def _mutate_subtree_within(
+    solution, u_point, rng, basis_set, terminal_set, max_depth, table,
+    max_size, attempts
+):
+    for _ in xrange(attempts):
+        mutant = _mutate_subtree_at(
+            solution=solution,
+            u_point=u_point,
+            rng=rng,
+            basis_set=basis_set,
+            terminal_set=terminal_set,
+            max_depth=max_depth,
+            table=table
+        )
+
+        if max_size is None or mutant.tree.size <= max_size:
+            return mutant
+
+        u_point = rng.random()
+
+    return solution
+
+
+def _mutate_node_at(solution, u_point, u_operator, basis_set, terminal_set):
+    index = solution.tree.index
+    point = int(u_point * len(index.nodes))
+    node = index.nodes[point]
+    operator = node.operator
+
+    if isinstance(operator, BasisOperator):
+        candidates = tuple(
+            o for o in _lookup(basis_set, operator.signature)
+            if o.dtype is operator.dtype and o is not operator
+        )
+    else:
+        candidates = tuple(
+            o for o in _lookup(terminal_set, operator.dtype)
+            if o is not operator
+        )
+
+    if len(candidates) == 0:
+        return solution
+
+    choice = u_operator * len(candidates)
+    operator = candidates[int(choice)]
+
+    if isinstance(operator, EphemeralConstant):
+        # the fractional part of choice is itself uniform on [0, 1)
+        operator = operator.constant(choice - int(choice))
+
+    mutant = Node(operator=operator)
+
+    for position, child in enumerate(node.children):
+        mutant.add_child(child=child, position=position)
+
+    return _offspring(solution, point, mutant)
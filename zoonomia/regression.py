@@ -0,0 +1,340 @@
+import logging
+import numbers
+
+import numpy as np
+
+from zoonomia.tree import Node, Tree
+from zoonomia.solution import ConstantTerminal, Solution
+from zoonomia.interpreter import Interpreter
+from zoonomia.streaming import Reducer, CaseObjective
+
+log = logging.getLogger(__name__)  # FIXME
+
+
+def linear_scaling(output, target):
+    """Returns the intercept :math:`a` and slope :math:`b` minimizing the
+    mean squared error between :math:`a + b \\cdot output` and *target*, in
+    closed form. See Keijzer2003.
+
+    :param output: A tree's output on each fitness case.
+    :type output: numpy.ndarray
+
+    :param target: The desired output on each fitness case.
+    :type target: numpy.ndarray
+
+    :return: The intercept and slope.
+    :rtype: (float, float)
+
+    """
+    return _coefficients(_statistics(output, target))
+
+
+def _statistics(output, target):
+    target = np.asarray(target, dtype=np.float64)
+    output = np.broadcast_to(
+        np.asarray(output, dtype=np.float64), target.shape
+    )
+
+    return np.array((
+        target.size,
+        output.sum(),
+        target.sum(),
+        np.dot(output, output),
+        np.dot(output, target),
+        np.dot(target, target)
+    ))
+
+
+def _coefficients(statistics):
+    n, sum_y, sum_t, sum_yy, sum_ty, _ = statistics
+
+    if n == 0:
+        return 0.0, 0.0
+
+    variance = sum_yy - sum_y * sum_y / n
+    covariance = sum_ty - sum_y * sum_t / n
+
+    if variance <= 1e-12 * max(sum_yy, 1.0):
+        slope = 0.0
+    else:
+        slope = covariance / variance
+
+    return (sum_t - slope * sum_y) / n, slope
+
+
+def _scaled_mse(statistics):
+    n, sum_y, sum_t, sum_yy, sum_ty, sum_tt = statistics
+
+    if n == 0:
+        return 0.0
+
+    a, b = _coefficients(statistics)
+    sse = (
+        sum_tt - 2.0 * a * sum_t - 2.0 * b * sum_ty + n * a * a +
+        2.0 * a * b * sum_y + b * b * sum_yy
+    )
+
+    return max(float(sse), 0.0) / n
+
+
+SCALED_MSE = Reducer(
+    initial=np.zeros(6),
+    update=lambda state, statistics: state + statistics,
+    finish=_scaled_mse
+)
+
+
+class ScaledObjective(CaseObjective):
+
+    __slots__ = ('target',)
+
+    def __init__(self, target, weight=-1.0, dataset=None):
+        """A ScaledObjective measures the mean squared error of a tree's
+        output after linear scaling, that is, of the best fitting
+        :math:`a + b \\cdot output` rather than of the output itself. Evolution
+        then only has to find the shape of the target function, not its
+        offset and scale. See Keijzer2003.
+
+        The coefficients are found in closed form from six sums over the
+        fitness cases, which are accumulated chunk by chunk, so the objective
+        can be streamed like any other CaseObjective.
+
+        :param target: The name of the column holding the desired outputs.
+        :type target: str
+
+        :param weight: The weight to give this objective.
+        :type weight: float
+
+        :param dataset:
+            Optionally, a dataset against which *evaluate* can score a single
+            solution.
+
+        :type dataset: zoonomia.data.Dataset
+
+        """
+        super(ScaledObjective, self).__init__(
+            error=lambda output, cases: _statistics(output, cases[target]),
+            reducer=SCALED_MSE,
+            weight=weight,
+            dataset=dataset
+        )
+        self.target = target
+
+    def coefficients(self, state):
+        """Returns the intercept and slope of the linear scaling for a final
+        *state*.
+
+        :rtype: (float, float)
+
+        """
+        return _coefficients(state)
+
+    def __repr__(self):
+        return 'ScaledObjective(target={target}, weight={weight})'.format(
+            target=repr(self.target), weight=repr(self._weight)
+        )
+
+
+def scale_tree(tree, intercept, slope, add, multiply):
+    """Returns a tree computing :math:`intercept + slope \\cdot tree`, so that
+    the scaled model found by linear scaling can be used on its own.
+
+    :param tree: The tree to scale.
+    :type tree: zoonomia.tree.Tree
+
+    :param intercept: The intercept.
+    :type intercept: float
+
+    :param slope: The slope.
+    :type slope: float
+
+    :param add: An addition operator whose signature is (dtype, dtype).
+    :type add: zoonomia.solution.BasisOperator
+
+    :param multiply:
+        A multiplication operator whose signature is (dtype, dtype).
+
+    :type multiply: zoonomia.solution.BasisOperator
+
+    :rtype: zoonomia.tree.Tree
+
+    """
+    product = Node(operator=multiply)
+    product.add_child(
+        child=Node(operator=ConstantTerminal(value=slope, dtype=tree.dtype)),
+        position=0
+    )
+    product.add_child(child=tree.root, position=1)
+
+    root = Node(operator=add)
+    root.add_child(
+        child=Node(
+            operator=ConstantTerminal(value=intercept, dtype=tree.dtype)
+        ),
+        position=0
+    )
+    root.add_child(child=product, position=1)
+
+    return Tree(root=root)
+
+
+def _tunable(operator):
+    return isinstance(operator, ConstantTerminal) and isinstance(
+        operator.value, numbers.Real
+    ) and not isinstance(operator.value, numbers.Integral)
+
+
+def _with_constant(tree, position, value):
+    operator = tree.index.nodes[position].operator
+    return tree.replace(
+        position,
+        Node(
+            operator=ConstantTerminal(
+                value=type(operator.value)(value), dtype=operator.dtype
+            )
+        )
+    )
+
+
+def _with_constants(tree, positions, values):
+    for position, value in zip(positions, values):
+        tree = _with_constant(tree, position, value)
+    return tree
+
+
+def tune_constants(
+    tree, dataset, target, steps=5, damping=1e-3, epsilon=1e-6, scale=True
+):
+    """Tune the floating point constants of *tree* to minimize its mean
+    squared error on *dataset* with a few Levenberg-Marquardt steps; integer
+    and boolean constants are left alone. The Jacobian of the output with
+    respect to the constants is estimated by finite differences, which costs
+    one evaluation per constant; each probe perturbs a single constant, so
+    the perturbed tree shares every subtree off the path from that constant
+    to the root and a caching interpreter only recomputes that path.
+
+    A step is only kept if it lowers the error, so the tuned tree is never
+    worse than *tree*.
+
+    :param tree: The tree whose ConstantTerminals to tune.
+    :type tree: zoonomia.tree.Tree
+
+    :param dataset: The fitness cases.
+    :type dataset: zoonomia.data.Dataset
+
+    :param target: The name of the column holding the desired outputs.
+    :type target: str
+
+    :param steps: The number of steps to take.
+    :type steps: int
+
+    :param damping: The initial Levenberg-Marquardt damping factor.
+    :type damping: float
+
+    :param epsilon: The relative step for finite differences.
+    :type epsilon: float
+
+    :param scale:
+        Whether to measure the error after linear scaling, as a
+        ScaledObjective does.
+
+    :type scale: bool
+
+    :return: The tuned tree and its mean squared error.
+    :rtype: (zoonomia.tree.Tree, float)
+
+    """
+    positions = tuple(
+        i for i, node in enumerate(tree.index.nodes) if _tunable(node.operator)
+    )
+    values = np.array(
+        [tree.index.nodes[i].operator.value for i in positions],
+        dtype=np.float64
+    )
+    targets = np.asarray(dataset[target], dtype=np.float64)
+    interpreter = Interpreter(
+        bindings=dataset, cache_budget=2 * tree.size * (targets.nbytes + 128)
+    )
+
+    def output(candidate):
+        return np.broadcast_to(
+            np.asarray(interpreter.evaluate(candidate), dtype=np.float64),
+            targets.shape
+        )
+
+    def residual(y):
+        if scale:
+            a, b = linear_scaling(y, targets)
+            return targets - (a + b * y), b
+        else:
+            return targets - y, 1.0
+
+    y = output(tree)
+    r, slope = residual(y)
+    error = float(np.dot(r, r)) / max(targets.size, 1)
+
+    for _ in xrange(steps if len(positions) > 0 else 0):
+        jacobian = np.empty((targets.size, len(positions)))
+
+        for j in xrange(len(positions)):
+            h = epsilon * max(abs(values[j]), 1.0)
+            jacobian[:, j] = slope * (
+                output(_with_constant(tree, positions[j], values[j] + h)) - y
+            ) / h
+
+        normal = np.dot(jacobian.T, jacobian)
+        gradient = np.dot(jacobian.T, r)
+
+        try:
+            delta = np.linalg.solve(
+                normal + damping * np.diag(np.diag(normal) + 1e-12),
+                gradient
+            )
+        except np.linalg.LinAlgError:
+            break
+
+        candidate_values = values + delta
+        candidate = _with_constants(tree, positions, candidate_values)
+        candidate_y = output(candidate)
+        candidate_r, candidate_slope = residual(candidate_y)
+        candidate_error = float(
+            np.dot(candidate_r, candidate_r)
+        ) / max(targets.size, 1)
+
+        if np.isfinite(candidate_error) and candidate_error < error:
+            tree, values, y, r, slope, error = (
+                candidate, candidate_values, candidate_y, candidate_r,
+                candidate_slope, candidate_error
+            )
+            damping /= 10.0
+        else:
+            damping *= 10.0
+
+    return tree, error
+
+
+def tune_solution(solution, dataset, target, **kwargs):
+    """Returns a new solution whose tree is *solution*'s tree with tuned
+    constants (see *tune_constants*), with the same objectives and map, or
+    *solution* itself if nothing could be improved.
+
+    :param solution: The solution to tune.
+    :type solution: zoonomia.solution.Solution
+
+    :param dataset: The fitness cases.
+    :type dataset: zoonomia.data.Dataset
+
+    :param target: The name of the column holding the desired outputs.
+    :type target: str
+
+    :rtype: zoonomia.solution.Solution
+
+    """
+    tree, _ = tune_constants(solution.tree, dataset, target, **kwargs)
+
+    if tree is solution.tree:
+        return solution
+    else:
+        return Solution(
+            tree=tree, objectives=solution.objectives, map_=solution.map
+        )
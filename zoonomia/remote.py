@@ -0,0 +1,647 @@
+import base64
+import collections
+import json
+import logging
+import socket
+import SocketServer
+import struct
+import threading
+import time
+
+from zoonomia.codec import pack_tree, unpack_tree
+from zoonomia.executor import schedule
+from zoonomia.solution import Fitness, Solution
+
+log = logging.getLogger(__name__)  # FIXME
+
+TASK = 1
+RESULT = 2
+HEARTBEAT = 3
+ERROR = 4
+
+_HEADER = struct.Struct('!BI')
+
+
+class ProtocolError(Exception):
+    """Raised when a peer sends a frame which does not follow the worker
+    protocol, or hangs up in the middle of an exchange.
+
+    """
+
+
+class RemoteError(Exception):
+    """Raised when a worker reports that it failed to evaluate a batch."""
+
+
+def send_frame(sock, kind, payload):
+    """Write one frame to *sock*. A frame is a header holding the frame kind
+    and the payload length, followed by the payload encoded as JSON.
+
+    :param sock: A connected socket.
+    :type sock: socket.socket
+
+    :param kind: One of TASK, RESULT, HEARTBEAT or ERROR.
+    :type kind: int
+
+    :param payload: A JSON-serializable payload.
+    :type payload: dict
+
+    """
+    body = json.dumps(payload, separators=(',', ':'))
+    sock.sendall(_HEADER.pack(kind, len(body)) + body)
+
+
+def recv_frame(sock):
+    """Read one frame from *sock*.
+
+    :param sock: A connected socket.
+    :type sock: socket.socket
+
+    :raise ProtocolError: If the peer hangs up part way through a frame.
+
+    :return:
+        A pair of the frame kind and its decoded payload, or None if the peer
+        hung up cleanly between frames.
+
+    :rtype: (int, dict) or None
+
+    """
+    header = _recv_exactly(sock, _HEADER.size)
+
+    if header is None:
+        return None
+
+    kind, length = _HEADER.unpack(header)
+    body = _recv_exactly(sock, length) if length > 0 else ''
+
+    if body is None:
+        raise ProtocolError('peer hung up in the middle of a frame')
+
+    return kind, json.loads(body)
+
+
+def _recv_exactly(sock, n):
+    chunks = []
+    remaining = n
+
+    while remaining > 0:
+        chunk = sock.recv(remaining)
+        if not chunk:
+            if remaining == n:
+                return None
+            raise ProtocolError('peer hung up in the middle of a frame')
+        chunks.append(chunk)
+        remaining -= len(chunk)
+
+    return ''.join(chunks)
+
+
+def _pack(tree, registry):
+    return base64.b64encode(pack_tree(tree, registry))
+
+
+class _WorkerHandler(SocketServer.BaseRequestHandler):
+
+    def handle(self):
+        worker = self.server.worker
+        send_lock = threading.Lock()
+
+        while True:
+            try:
+                frame = recv_frame(self.request)
+            except (socket.error, ProtocolError):
+                log.exception('worker connection failed')
+                return
+
+            if frame is None:
+                return
+
+            kind, payload = frame
+
+            if kind != TASK:
+                log.error('worker received unexpected frame kind %d', kind)
+                return
+
+            done = threading.Event()
+            heartbeat = threading.Thread(
+                target=_heartbeat,
+                args=(self.request, send_lock, done, worker.heartbeat_interval)
+            )
+            heartbeat.daemon = True
+            heartbeat.start()
+
+            try:
+                scores, times = worker.evaluate(payload['trees'])
+                reply = RESULT, {
+                    'batch': payload['batch'], 'scores': scores, 'times': times
+                }
+            except Exception as e:
+                log.exception('worker failed to evaluate batch')
+                reply = ERROR, {'batch': payload['batch'], 'message': repr(e)}
+            finally:
+                done.set()
+
+            try:
+                with send_lock:
+                    send_frame(self.request, *reply)
+            except socket.error:
+                # The client gave up on this batch (for instance because
+                # another worker finished it first).
+                return
+
+
+def _heartbeat(sock, send_lock, done, interval):
+    while not done.wait(interval):
+        try:
+            with send_lock:
+                if not done.is_set():
+                    send_frame(sock, HEARTBEAT, {})
+        except socket.error:
+            return
+
+
+class _WorkerServer(SocketServer.ThreadingMixIn, SocketServer.TCPServer):
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class Worker(object):
+
+    __slots__ = (
+        'registry', 'objectives', 'heartbeat_interval', '_server', '_thread',
+        '_serving'
+    )
+
+    def __init__(
+        self, registry, objectives, address=('127.0.0.1', 0),
+        heartbeat_interval=1.0
+    ):
+        """A Worker evaluates batches of trees sent to it over a socket by a
+        RemoteExecutor. Each batch is a list of trees packed by
+        zoonomia.codec.pack_tree and base64-encoded to travel in JSON frames;
+        the reply holds one list of weighted scores per tree, one score per
+        objective, and the time it took to evaluate each tree. While a batch
+        is being evaluated the worker sends a heartbeat every
+        *heartbeat_interval* seconds so that the client can tell a slow batch
+        from a dead worker.
+
+        A worker host runs *serve_forever*. To test on a single machine, call
+        *start* instead: the worker then serves from a background thread of
+        the current process, and *address* tells the client where to connect.
+
+        :param registry:
+            The registry to decode trees against. It must agree with the
+            client's registry.
+
+        :type registry: zoonomia.codec.OperatorRegistry
+
+        :param objectives:
+            The objectives to evaluate each tree against, in the same order as
+            the client's objectives.
+
+        :type objectives: tuple[zoonomia.solution.Objective]
+
+        :param address:
+            The (host, port) pair to listen on. Port 0 picks a free port.
+
+        :type address: (str, int)
+
+        :param heartbeat_interval: Seconds between heartbeats.
+        :type heartbeat_interval: float
+
+        """
+        self.registry = registry
+        self.objectives = objectives
+        self.heartbeat_interval = heartbeat_interval
+        self._server = _WorkerServer(address, _WorkerHandler)
+        self._server.worker = self
+        self._thread = None
+        self._serving = threading.Event()
+
+    @property
+    def address(self):
+        """The (host, port) pair this worker is listening on.
+
+        :rtype: (str, int)
+
+        """
+        return self._server.server_address
+
+    def evaluate(self, trees):
+        """Evaluate a batch of packed trees.
+
+        :param trees: Each tree in the batch, packed and base64-encoded.
+        :type trees: list[str]
+
+        :return:
+            The weighted scores of each tree, one per objective, and the time
+            in seconds it took to evaluate each tree.
+
+        :rtype: (list[list[float]], list[float])
+
+        """
+        scores = []
+        times = []
+
+        for packed in trees:
+            solution = Solution(
+                tree=unpack_tree(base64.b64decode(packed), self.registry),
+                objectives=self.objectives
+            )
+            start = time.time()
+            scores.append([fitness.score for fitness in solution.evaluate()])
+            times.append(time.time() - start)
+
+        return scores, times
+
+    def serve_forever(self):
+        """Serve batches until *close* is called."""
+        self._serving.set()
+        self._server.serve_forever()
+
+    def start(self):
+        """Serve batches from a background thread of this process.
+
+        :return: This worker.
+        :rtype: zoonomia.remote.Worker
+
+        """
+        self._thread = threading.Thread(target=self.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        self._serving.wait()
+        return self
+
+    def close(self):
+        """Stop serving and release the listening socket."""
+        if self._serving.is_set():
+            self._server.shutdown()
+        self._server.server_close()
+
+        if self._thread is not None:
+            self._thread.join()
+
+    def __repr__(self):
+        return 'Worker(address={address}, objectives={objectives})'.format(
+            address=repr(self.address), objectives=repr(self.objectives)
+        )
+
+
+class RemoteExecutor(object):
+
+    __slots__ = (
+        'addresses', 'registry', 'batch_size', 'heartbeat_timeout',
+        'max_retries', 'cost_model'
+    )
+
+    def __init__(
+        self, addresses, registry, batch_size=64, heartbeat_timeout=10.0,
+        max_retries=3, cost_model=None
+    ):
+        """A RemoteExecutor evaluates populations on a pool of Workers.
+
+        Solutions which have not been evaluated yet are encoded and split
+        into batches of *batch_size* trees. Each worker address is served by
+        its own connection, which pulls the next batch off a shared queue as
+        soon as it is idle, so fast workers naturally take on more batches.
+        Once the queue is empty an idle connection steals a batch that is
+        still in flight elsewhere and races the original worker for it; the
+        first result wins.
+
+        A worker that falls silent for more than *heartbeat_timeout* seconds,
+        hangs up, or reports an error has its batch put back on the queue.
+        A batch is retried at most *max_retries* times, and a worker address
+        is abandoned after *max_retries* consecutive failures.
+
+        Given a *cost_model*, batches are formed by zoonomia.executor.schedule
+        instead of by *batch_size*: the most expensive trees are sent first,
+        in small batches, and cheap trees follow in larger ones. The times
+        reported by the workers are fed back into the cost model.
+
+        :param addresses: The (host, port) pairs of the workers.
+        :type addresses: collections.Iterable[(str, int)]
+
+        :param registry:
+            The registry to encode trees against. It must agree with the
+            workers' registries.
+
+        :type registry: zoonomia.codec.OperatorRegistry
+
+        :param batch_size: The number of trees per batch.
+        :type batch_size: int
+
+        :param heartbeat_timeout:
+            Seconds to wait for any frame from a worker before giving up on it.
+
+        :type heartbeat_timeout: float
+
+        :param max_retries: See above.
+        :type max_retries: int
+
+        :param cost_model: An optional cost model to schedule batches with.
+        :type cost_model: zoonomia.executor.CostModel
+
+        """
+        self.addresses = tuple(addresses)
+        self.registry = registry
+        self.batch_size = batch_size
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_retries = max_retries
+        self.cost_model = cost_model
+
+    def evaluate(self, solutions):
+        """Evaluate every solution in *solutions* on the workers.
+
+        :param solutions: The population to evaluate.
+        :type solutions: collections.Iterable[zoonomia.solution.Solution]
+
+        :raise RuntimeError:
+            If a batch could not be evaluated within the retry budget, or if
+            every worker has been abandoned.
+
+        :return: The Fitness measurements of each solution, in order.
+        :rtype: tuple[tuple[zoonomia.solution.Fitness]]
+
+        """
+        solutions = tuple(solutions)
+        pending = tuple(s for s in solutions if s.fitnesses is None)
+
+        if len(pending) > 0:
+            if self.cost_model is None:
+                batches = tuple(
+                    pending[i:i + self.batch_size]
+                    for i in xrange(0, len(pending), self.batch_size)
+                )
+            else:
+                batches = tuple(
+                    [pending[i] for i in chunk] for chunk in schedule(
+                        [self.cost_model.estimate(s.tree) for s in pending],
+                        len(self.addresses)
+                    )
+                )
+
+            results = self.dispatch(
+                tuple(
+                    [_pack(s.tree, self.registry) for s in batch]
+                    for batch in batches
+                )
+            )
+
+            for batch, (scores, times) in zip(batches, results):
+                for solution, solution_scores, elapsed in zip(
+                    batch, scores, times
+                ):
+                    if self.cost_model is not None:
+                        self.cost_model.update(solution.tree, elapsed)
+
+                    solution.set_fitnesses(
+                        tuple(
+                            Fitness(score=score, objective=objective)
+                            for score, objective in zip(
+                                solution_scores, solution.objectives
+                            )
+                        )
+                    )
+
+        return tuple(s.evaluate() for s in solutions)
+
+    def dispatch(self, batches):
+        """Evaluate already encoded *batches* on the workers.
+
+        :param batches:
+            Each batch is a list of trees, packed and base64-encoded (see
+            Worker.evaluate).
+
+        :type batches: tuple[list[str]]
+
+        :raise RuntimeError: See *evaluate*.
+
+        :return:
+            The scores and evaluation times of each batch, in order. See
+            Worker.evaluate.
+
+        :rtype: tuple[(list[list[float]], list[float])]
+
+        """
+        dispatch = _Dispatch(
+            n_batches=len(batches),
+            n_workers=len(self.addresses),
+            max_retries=self.max_retries
+        )
+        threads = [
+            threading.Thread(
+                target=self._serve, args=(dispatch, batches, address)
+            ) for address in self.addresses
+        ]
+
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        dispatch.wait()
+
+        for thread in threads:
+            thread.join()
+
+        if dispatch.error is not None:
+            raise RuntimeError(
+                'remote evaluation failed: {0}'.format(dispatch.error)
+            )
+
+        return tuple(dispatch.results)
+
+    def _serve(self, dispatch, batches, address):
+        sock = None
+        failures = 0
+
+        try:
+            while True:
+                batch_id = dispatch.next_batch()
+
+                if batch_id is None:
+                    return
+
+                if sock is None:
+                    try:
+                        sock = socket.create_connection(
+                            address, timeout=self.heartbeat_timeout
+                        )
+                    except socket.error as e:
+                        # The batch never reached this worker, so it does not
+                        # count against the batch's retry budget.
+                        log.warn('could not connect to %s: %r', address, e)
+                        dispatch.release(batch_id)
+                        failures += 1
+
+                        if failures > self.max_retries:
+                            dispatch.retire(e)
+                            return
+
+                        continue
+
+                    dispatch.register(sock)
+
+                try:
+                    scores = _request(sock, batch_id, batches[batch_id])
+                except (socket.error, ProtocolError, RemoteError) as e:
+                    log.warn('batch %d failed on %s: %r', batch_id, address, e)
+                    dispatch.unregister(sock)
+                    sock.close()
+                    sock = None
+                    dispatch.fail(batch_id, e)
+                    failures += 1
+
+                    if failures > self.max_retries:
+                        dispatch.retire(e)
+                        return
+                else:
+                    dispatch.complete(batch_id, scores)
+                    failures = 0
+        finally:
+            if sock is not None:
+                dispatch.unregister(sock)
+                sock.close()
+
+    def __repr__(self):
+        return (
+            'RemoteExecutor(addresses={addresses}, batch_size={batch_size})'
+        ).format(
+            addresses=repr(self.addresses), batch_size=repr(self.batch_size)
+        )
+
+
+def _request(sock, batch_id, trees):
+    send_frame(sock, TASK, {'batch': batch_id, 'trees': trees})
+
+    while True:
+        frame = recv_frame(sock)
+
+        if frame is None:
+            raise ProtocolError('worker hung up before replying')
+
+        kind, payload = frame
+
+        if kind == HEARTBEAT:
+            continue
+        elif kind == RESULT and payload.get('batch') == batch_id:
+            return payload['scores'], payload['times']
+        elif kind == ERROR:
+            raise RemoteError(payload.get('message'))
+        else:
+            raise ProtocolError('unexpected frame kind {0}'.format(kind))
+
+
+class _Dispatch(object):
+
+    __slots__ = (
+        'results', 'error', '_queue', '_in_flight', '_attempts', '_remaining',
+        '_live_workers', '_max_retries', '_sockets', '_condition'
+    )
+
+    def __init__(self, n_batches, n_workers, max_retries):
+        self.results = [None for _ in xrange(n_batches)]
+        self.error = None
+        self._queue = collections.deque(xrange(n_batches))
+        self._in_flight = collections.OrderedDict()
+        self._attempts = [0 for _ in xrange(n_batches)]
+        self._remaining = n_batches
+        self._live_workers = n_workers
+        self._max_retries = max_retries
+        self._sockets = set()
+        self._condition = threading.Condition()
+
+        if n_batches > 0 and n_workers == 0:
+            self.error = 'no workers'
+
+    def _finished(self):
+        return self._remaining == 0 or self.error is not None
+
+    def next_batch(self):
+        with self._condition:
+            while True:
+                if self._finished():
+                    return None
+
+                if len(self._queue) > 0:
+                    batch_id = self._queue.popleft()
+                    self._in_flight[batch_id] = 1
+                    return batch_id
+
+                for batch_id, count in self._in_flight.iteritems():
+                    if count == 1:
+                        # steal the oldest batch nobody else is racing for
+                        self._in_flight[batch_id] = 2
+                        return batch_id
+
+                self._condition.wait()
+
+    def complete(self, batch_id, scores):
+        with self._condition:
+            self._in_flight.pop(batch_id, None)
+
+            if self.results[batch_id] is None:
+                self.results[batch_id] = scores
+                self._remaining -= 1
+
+            if self._finished():
+                self._abandon_sockets()
+
+            self._condition.notify_all()
+
+    def fail(self, batch_id, error):
+        self._give_back(batch_id, error)
+
+    def release(self, batch_id):
+        self._give_back(batch_id, None)
+
+    def _give_back(self, batch_id, error):
+        with self._condition:
+            if self.results[batch_id] is None and batch_id in self._in_flight:
+                self._in_flight[batch_id] -= 1
+
+                if self._in_flight[batch_id] == 0:
+                    del self._in_flight[batch_id]
+
+                    if error is not None:
+                        self._attempts[batch_id] += 1
+
+                    if self._attempts[batch_id] > self._max_retries:
+                        self.error = error
+                        self._abandon_sockets()
+                    else:
+                        self._queue.appendleft(batch_id)
+
+            self._condition.notify_all()
+
+    def retire(self, error):
+        with self._condition:
+            self._live_workers -= 1
+
+            if self._live_workers == 0 and not self._finished():
+                self.error = error
+                self._abandon_sockets()
+
+            self._condition.notify_all()
+
+    def register(self, sock):
+        with self._condition:
+            self._sockets.add(sock)
+
+    def unregister(self, sock):
+        with self._condition:
+            self._sockets.discard(sock)
+
+    def _abandon_sockets(self):
+        # Connections still racing for batches which have been completed
+        # elsewhere are shut down, so their threads stop waiting.
+        for sock in self._sockets:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except socket.error:
+                pass
+
+    def wait(self):
+        with self._condition:
+            while not self._finished():
+                self._condition.wait()
@@ -0,0 +1,252 @@
+import collections
+import logging
+import math
+import numbers
+import threading
+
+from zoonomia.interpreter import Interpreter
+
+log = logging.getLogger(__name__)  # FIXME
+
+
+def _quantize(value, tolerance):
+    if isinstance(value, (bool, numbers.Integral)):
+        return int(value)
+    elif isinstance(value, numbers.Real):
+        value = float(value)
+        if math.isnan(value) or math.isinf(value):
+            return repr(value)
+        return int(math.floor(value / tolerance + 0.5))
+    else:
+        return value
+
+
+def semantic_hash(output, tolerance=1e-6):
+    """Returns a hash of a tree's output on a set of fitness cases (its
+    semantics), quantized to multiples of *tolerance* so that outputs which
+    differ only by rounding error hash alike. Integer and boolean outputs are
+    hashed exactly, and a constant output hashes like a vector repeating it.
+
+    Quantizing rounds each value to the nearest multiple of *tolerance*, so
+    two values closer than *tolerance* usually, but not always, share a hash:
+    those which straddle a rounding boundary do not.
+
+    :param output: The output of a tree, one value per fitness case.
+    :type output: collections.Iterable[T]|T
+
+    :param tolerance: The width of a quantization step.
+    :type tolerance: float
+
+    :rtype: int
+
+    """
+    if getattr(output, 'ndim', None) == 0:
+        output = output.item()
+
+    if isinstance(output, (basestring, numbers.Number)) or not hasattr(
+        output, '__iter__'
+    ):
+        return hash(('constant', _quantize(output, tolerance)))
+    else:
+        values = tuple(_quantize(value, tolerance) for value in output)
+        if len(values) > 0 and all(v == values[0] for v in values):
+            return hash(('constant', values[0]))
+        return hash(values)
+
+
+class SemanticIndex(object):
+
+    __slots__ = (
+        'interpreter', 'tolerance', 'memo_size', 'duplicates', '_counts',
+        '_keys', '_lock'
+    )
+
+    def __init__(self, cases, tolerance=1e-6, memo_size=65536):
+        """A SemanticIndex remembers the semantic hashes (see
+        *semantic_hash*) of a population's solutions, so that a new solution
+        computing the same function as an existing one, however different its
+        tree, can be detected by evaluating it on a small sample of fitness
+        *cases* rather than paying for a full evaluation of every objective.
+
+        Semantic hashes are memoized by structural hash (see
+        zoonomia.tree.TreeIndex), so structurally identical trees are only
+        interpreted once while their hash stays among the *memo_size* most
+        recently used, and a solution carrying its own semantics (see
+        zoonomia.gsgp.SemanticSolution) is not interpreted at all.
+
+        :param cases:
+            The fitness cases to compute semantics on, which should be few
+            enough to make interpreting a tree cheap.
+
+        :type cases: zoonomia.data.Dataset
+
+        :param tolerance: See *semantic_hash*.
+        :type tolerance: float
+
+        :param memo_size: The number of structural hashes to memoize.
+        :type memo_size: int
+
+        The *duplicates* attribute counts the solutions *add* has rejected.
+
+        """
+        self.interpreter = Interpreter(bindings=cases)
+        self.tolerance = tolerance
+        self.memo_size = memo_size
+        self.duplicates = 0
+        self._counts = {}
+        self._keys = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, solution):
+        """Returns the semantic hash of *solution*.
+
+        :param solution: A candidate solution.
+        :type solution: zoonomia.solution.Solution
+
+        :rtype: int
+
+        """
+        semantics = getattr(solution, 'semantics', None)
+
+        if semantics is not None:
+            return semantic_hash(semantics, self.tolerance)
+
+        structure = solution.tree.index.hashes[-1]
+
+        with self._lock:
+            key = self._keys.pop(structure, None)
+            if key is not None:
+                self._keys[structure] = key
+                return key
+
+        key = semantic_hash(
+            self.interpreter.evaluate(solution.tree), self.tolerance
+        )
+
+        with self._lock:
+            self._keys[structure] = key
+            while len(self._keys) > self.memo_size:
+                self._keys.popitem(last=False)
+
+        return key
+
+    @property
+    def memo_length(self):
+        """The number of structural hashes currently memoized.
+
+        :rtype: int
+
+        """
+        return len(self._keys)
+
+    def add(self, solution):
+        """Add *solution* to the index unless it is semantically identical to
+        a solution already in the index.
+
+        :param solution: A candidate solution.
+        :type solution: zoonomia.solution.Solution
+
+        :return: Whether *solution* was added.
+        :rtype: bool
+
+        """
+        key = self.key(solution)
+
+        with self._lock:
+            if key in self._counts:
+                self.duplicates += 1
+                return False
+            self._counts[key] = 1
+            return True
+
+    def update(self, solutions):
+        """Add every solution in *solutions* to the index, whether or not it
+        duplicates another.
+
+        :param solutions: The solutions to add.
+        :type solutions: collections.Iterable[zoonomia.solution.Solution]
+
+        """
+        for solution in solutions:
+            key = self.key(solution)
+            with self._lock:
+                self._counts[key] = self._counts.get(key, 0) + 1
+
+    def discard(self, solution):
+        """Remove one occurrence of *solution*'s semantics from the index, for
+        instance when it fails selection, if it is present.
+
+        :param solution: A solution.
+        :type solution: zoonomia.solution.Solution
+
+        """
+        key = self.key(solution)
+
+        with self._lock:
+            count = self._counts.get(key, 0)
+            if count > 1:
+                self._counts[key] = count - 1
+            elif count == 1:
+                del self._counts[key]
+
+    def clear(self):
+        """Forget every solution in the index, and every memoized semantic
+        hash.
+
+        """
+        with self._lock:
+            self._counts.clear()
+            self._keys.clear()
+
+    def __contains__(self, solution):
+        return self.key(solution) in self._counts
+
+    def __len__(self):
+        return len(self._counts)
+
+    def __repr__(self):
+        return 'SemanticIndex(cases={cases}, tolerance={tolerance})'.format(
+            cases=repr(self.interpreter.bindings),
+            tolerance=repr(self.tolerance)
+        )
+
+
+def unique(variation, index, attempts=8):
+    """Wrap a variation operator (such as
+    zoonomia.operations.mutate_subtree or
+    zoonomia.operations.crossover_subtree) so that it retries, up to
+    *attempts* times, until none of its offspring are semantically identical
+    to a solution in *index*. The accepted offspring are added to *index*.
+    When every attempt produces a duplicate, the offspring of the last
+    attempt are returned anyway, so that the population keeps its size.
+
+    :param variation:
+        A function returning either one offspring or a tuple of offspring.
+
+    :type variation:
+        (...) -> zoonomia.solution.Solution|tuple[zoonomia.solution.Solution]
+
+    :param index: The index of the population's semantics.
+    :type index: zoonomia.semantics.SemanticIndex
+
+    :param attempts: The maximum number of times to call *variation*.
+    :type attempts: int
+
+    :rtype:
+        (...) -> zoonomia.solution.Solution|tuple[zoonomia.solution.Solution]
+
+    """
+    def wrapper(*args, **kwargs):
+        for _ in xrange(attempts):
+            result = variation(*args, **kwargs)
+            offspring = result if isinstance(result, tuple) else (result,)
+
+            if all(s not in index for s in offspring) and len(
+                set(index.key(s) for s in offspring)
+            ) == len(offspring):
+                break
+
+        index.update(offspring)
+        return result
+
+    return wrapper
@@ -0,0 +1,329 @@
+import logging
+import threading
+
+from zoonomia.tree import Node, Tree
+from zoonomia.solution import ConstantTerminal, Solution
+
+log = logging.getLogger(__name__)  # FIXME
+
+
+def is_constant(node):
+    """Predicate function to determine whether *node* is a constant terminal.
+
+    :param node: A node.
+    :type node: zoonomia.tree.Node
+
+    :rtype: bool
+
+    """
+    return isinstance(node.operator, ConstantTerminal)
+
+
+def constant(value, dtype):
+    """Returns a new terminal node which emits *value*.
+
+    :param value: The constant.
+    :type value: T
+
+    :param dtype: The type of *value*.
+    :type dtype: T
+
+    :rtype: zoonomia.tree.Node
+
+    """
+    return Node(operator=ConstantTerminal(value=value, dtype=dtype))
+
+
+def equivalent(node_1, node_2):
+    """Predicate function to determine whether the subtrees rooted at *node_1*
+    and *node_2* are structurally identical, meaning that they apply the same
+    operators in the same shape. Constant terminals are compared by value, so
+    that separately folded constants can be recognized as equal.
+
+    :param node_1: The root of a subtree.
+    :type node_1: zoonomia.tree.Node
+
+    :param node_2: The root of another subtree.
+    :type node_2: zoonomia.tree.Node
+
+    :rtype: bool
+
+    """
+    stack = [(node_1, node_2)]
+
+    while len(stack) > 0:
+        a, b = stack.pop()
+
+        if a is b:
+            continue
+        elif is_constant(a) and is_constant(b):
+            if a.dtype is not b.dtype or a.operator.value != b.operator.value:
+                return False
+        elif a.operator is not b.operator:
+            return False
+        else:
+            stack.extend(zip(a.children, b.children))
+
+    return True
+
+
+def collapse_identical(value):
+    """Returns a rewrite rule which replaces a node whose children are all
+    equivalent with the constant *value*, as in :math:`x - x = 0` or
+    :math:`x \\oplus x = False`.
+
+    :param value: The constant to replace such nodes with.
+    :type value: T
+
+    :rtype: (zoonomia.tree.Node) -> zoonomia.tree.Node
+
+    """
+    def rule(node):
+        children = node.children
+        if all(equivalent(children[0], c) for c in children[1:]):
+            return constant(value=value, dtype=node.dtype)
+
+    return rule
+
+
+def drop_identity(value, positions=(0, 1)):
+    """Returns a rewrite rule for a binary operator which replaces a node
+    having a child equal to the constant *value* with its other child, as in
+    :math:`x + 0 = x` or :math:`x \\cdot 1 = x`.
+
+    By default the constant may be either child, which is only correct for
+    commutative operators. For any other operator, give the positions at
+    which *value* is an identity: for subtraction :math:`x - 0 = x` but
+    :math:`0 - x \\neq x`, so its rule is drop_identity(0, positions=(1,)).
+
+    :param value: The operator's identity element.
+    :type value: T
+
+    :param positions:
+        The positions of the children which are dropped when equal to
+        *value*: 0 for the left child, 1 for the right.
+
+    :type positions: collections.Container[int]
+
+    :rtype: (zoonomia.tree.Node) -> zoonomia.tree.Node
+
+    """
+    def rule(node):
+        left, right = node.children
+        if (
+            1 in positions and
+            is_constant(right) and right.operator.value == value
+        ):
+            return left
+        elif (
+            0 in positions and
+            is_constant(left) and left.operator.value == value
+        ):
+            return right
+
+    return rule
+
+
+def select_branch(node):
+    """A rewrite rule for an *if* operator whose signature is (condition,
+    consequent, alternative) which replaces a node having a constant condition
+    with the branch that condition selects.
+
+    :param node: A node whose operator is an *if* operator.
+    :type node: zoonomia.tree.Node
+
+    :rtype: zoonomia.tree.Node or None
+
+    """
+    condition, consequent, alternative = node.children
+    if is_constant(condition):
+        return consequent if condition.operator.value else alternative
+
+
+class Simplifier(object):
+
+    __slots__ = (
+        'rules', 'fold', 'simplified', 'nodes_removed', 'folded', 'rewritten',
+        '_lock'
+    )
+
+    def __init__(self, rules=None, fold=True):
+        """A Simplifier removes dead and constant code from trees so that it
+        is not evaluated on every fitness case. It visits each node bottom up,
+        after its children have been simplified, and
+
+        1. if *fold* is set and every child of a basis node is a constant,
+           replaces the node with a constant computed by applying its
+           operator once, then
+        2. applies the rewrite rules registered for the node's operator, in
+           the order they were registered, until none of them applies.
+
+        A rewrite rule is a function taking a node (whose children are
+        already simplified) to an equivalent node, or to None if it does not
+        apply. Rules must strictly simplify, otherwise simplification may not
+        terminate. The replacement must have the same dtype as the node it
+        replaces, so simplification never changes the type of a tree.
+
+        Simplified trees share every unchanged subtree with the original,
+        but every node that does change is a new node on each call, whose
+        output an interpreter's cache (see zoonomia.interpreter.Interpreter)
+        has never seen. Simplify each tree once, when it is created (see
+        *simplify_solution*), rather than before every evaluation.
+
+        .. warning::
+            Folding calls basis operators on constant arguments, so it is
+            only correct for operators which are pure functions of their
+            arguments. Pass fold=False otherwise. A node whose operator
+            raises when folded is left unfolded.
+
+        :param rules:
+            A mapping from basis operators to their rewrite rules. Rules can
+            also be added with *register*.
+
+        :type rules:
+            dict[zoonomia.solution.BasisOperator, list[(Node) -> Node]]
+
+        :param fold: Whether to fold constant subtrees.
+        :type fold: bool
+
+        The following counters accumulate over every call to *simplify*:
+
+        *simplified*
+            The number of trees simplified.
+
+        *nodes_removed*
+            The total decrease in tree size.
+
+        *folded*
+            The number of basis nodes replaced by constants.
+
+        *rewritten*
+            The number of rewrite rule applications.
+
+        """
+        self.rules = {} if rules is None else {
+            operator: list(rs) for operator, rs in rules.iteritems()
+        }
+        self.fold = fold
+        self.simplified = 0
+        self.nodes_removed = 0
+        self.folded = 0
+        self.rewritten = 0
+        self._lock = threading.Lock()
+
+    def register(self, operator, rule):
+        """Add a rewrite *rule* for nodes whose operator is *operator*.
+
+        :param operator: A basis operator.
+        :type operator: zoonomia.solution.BasisOperator
+
+        :param rule: A rewrite rule.
+        :type rule: (zoonomia.tree.Node) -> zoonomia.tree.Node
+
+        """
+        self.rules.setdefault(operator, []).append(rule)
+
+    def simplify(self, tree):
+        """Returns a simplified tree equivalent to *tree*.
+
+        :param tree: The tree to simplify.
+        :type tree: zoonomia.tree.Tree
+
+        :raise TypeError:
+            If a rewrite rule returns a node whose dtype does not match the
+            node it replaces.
+
+        :return: The simplified tree, or *tree* itself if nothing changed.
+        :rtype: zoonomia.tree.Tree
+
+        """
+        folded = 0
+        rewritten = 0
+        simplified = {}
+
+        for node in tree:
+            if node in simplified:
+                continue
+
+            old_children = node.children
+            children = tuple(simplified[c] for c in old_children)
+
+            if all(c is o for c, o in zip(children, old_children)):
+                current = node
+            else:
+                current = Node(operator=node.operator)
+                for position, child in enumerate(children):
+                    current.add_child(child=child, position=position)
+
+            while len(children) > 0:
+                if self.fold and all(is_constant(c) for c in children):
+                    try:
+                        value = current.operator(
+                            *(c.operator.value for c in children)
+                        )
+                    except Exception as e:
+                        log.warn(
+                            'not folding %r: %r', current.operator, e
+                        )
+                    else:
+                        current = constant(value=value, dtype=current.dtype)
+                        folded += 1
+                        break
+
+                for rule in self.rules.get(current.operator, ()):
+                    replacement = rule(current)
+                    if replacement is not None:
+                        break
+                else:
+                    break
+
+                if replacement.dtype is not current.dtype:
+                    raise TypeError(
+                        'rewrite rule changed dtype of {0}'.format(
+                            repr(current.operator)
+                        )
+                    )
+
+                rewritten += 1
+                current = replacement
+                children = current.children
+
+            simplified[node] = current
+
+        root = simplified[tree.root]
+        result = tree if root is tree.root else Tree(root=root)
+
+        with self._lock:
+            self.simplified += 1
+            self.nodes_removed += tree.size - result.size
+            self.folded += folded
+            self.rewritten += rewritten
+
+        return result
+
+    def simplify_solution(self, solution):
+        """Returns a new solution whose tree is the simplified tree of
+        *solution*, with the same objectives and map, or *solution* itself if
+        its tree could not be simplified. Simplifying offspring once when
+        they are created, rather than on every evaluation, keeps their nodes
+        stable between evaluations.
+
+        :param solution: The solution to simplify.
+        :type solution: zoonomia.solution.Solution
+
+        :rtype: zoonomia.solution.Solution
+
+        """
+        tree = self.simplify(solution.tree)
+
+        if tree is solution.tree:
+            return solution
+        else:
+            return Solution(
+                tree=tree, objectives=solution.objectives, map_=solution.map
+            )
+
+    def __repr__(self):
+        return 'Simplifier(rules={rules}, fold={fold})'.format(
+            rules=repr(self.rules), fold=repr(self.fold)
+        )
@@ -1,5 +1,8 @@
+import array
+import copy
 import itertools
 import logging
+import random
 
 from threading import Lock
 
@@ -55,9 +58,9 @@ def verify_closure_property(basis_set, terminal_set):  # TODO: clean up docs
 
 class BasisOperator(object):
 
-    __slots__ = ('func', 'signature', 'dtype')
+    __slots__ = ('func', 'signature', 'dtype', 'bitwise')
 
-    def __init__(self, func, signature, dtype):
+    def __init__(self, func, signature, dtype, bitwise=None):
         """A BasisOperator represents a member of the basis set. A
         BasisOperator contains a reference to a function, a tuple type
         *signature* corresponding to that function, and a reference *dtype* to
@@ -81,10 +84,21 @@ class BasisOperator(object):
             actual type returned by the function.
 
         :type dtype: U
+
+        :param bitwise:
+            Optionally, a bit-parallel implementation of *func* for boolean
+            operators. It takes integers whose bits are the arguments' values
+            on each fitness case and returns an integer whose bits are the
+            results, so that one call evaluates every fitness case. It must
+            only use operations which act on each bit independently (&, |, ^
+            and ~). See zoonomia.interpreter.BitwiseInterpreter.
+
+        :type bitwise: (int) -> int
         """
         self.func = func
         self.signature = signature
         self.dtype = dtype
+        self.bitwise = bitwise
 
     def __repr__(self):
         return (
@@ -101,12 +115,16 @@ class BasisOperator(object):
 
 class TerminalOperator(object):
 
-    __slots__ = ('source', 'dtype')
+    __slots__ = ('source', 'dtype', '_buffer')
 
     def __init__(self, source, dtype):
         """A TerminalOperator represents a member of the terminal set. A
         TerminalOperator acts as a source which emits data of type dtype.
 
+        If *source* is a one-shot iterator (such as a generator) the data it
+        yields are buffered as they are consumed, so that every iteration
+        over this TerminalOperator sees the same data from the beginning.
+
         :param source: An iterable which yields data of type T.
 
         :type source: collections.Iterable[T]
@@ -120,6 +138,13 @@ class TerminalOperator(object):
         """
         self.source = source
         self.dtype = dtype
+        self._buffer = None
+
+        try:
+            if iter(source) is source:
+                self._buffer = itertools.tee(source, 1)[0]
+        except TypeError:
+            pass
 
     def __repr__(self):
         return 'TerminalOperator(source={source}, dtype={dtype})'.format(
@@ -128,7 +153,201 @@ class TerminalOperator(object):
         )
 
     def __iter__(self):
-        return iter(self.source)
+        if self._buffer is not None:
+            return copy.copy(self._buffer)
+        else:
+            return iter(self.source)
+
+
+class VariableTerminal(TerminalOperator):
+
+    __slots__ = ('name',)
+
+    def __init__(self, name, dtype):
+        """A VariableTerminal is an input variable of the problem. It is
+        bound by *name* to a column of a fitness-case dataset: interpreters
+        look it up in their bindings first by the terminal itself and then by
+        its name, so a mapping from column names to columns can be used as
+        bindings directly.
+
+        :param name: The name of the column this variable is bound to.
+        :type name: str
+
+        :param dtype: The type of the values in that column.
+        :type dtype: T
+
+        """
+        super(VariableTerminal, self).__init__(source=None, dtype=dtype)
+        self.name = name
+
+    @property
+    def key(self):
+        """A stable identifier for this terminal, which is equal for every
+        VariableTerminal bound to the same column.
+
+        :rtype: tuple
+
+        """
+        return 'variable', self.name
+
+    def __repr__(self):
+        return 'VariableTerminal(name={name}, dtype={dtype})'.format(
+            name=repr(self.name),
+            dtype=repr(self.dtype)
+        )
+
+
+class ConstantTerminal(TerminalOperator):
+
+    __slots__ = ()
+
+    def __init__(self, value, dtype):
+        """A ConstantTerminal is a TerminalOperator which always emits the
+        same *value*. Interpreters use the value itself as the terminal's
+        output, so a constant costs nothing per fitness case, and
+        simplification can fold basis nodes whose children are all constants.
+
+        :param value: The constant.
+        :type value: T
+
+        :param dtype:
+            The type of *value*. You should make sure this matches the actual
+            type of the constant.
+
+        :type dtype: T
+
+        """
+        super(ConstantTerminal, self).__init__(source=value, dtype=dtype)
+
+    @property
+    def value(self):
+        """The constant emitted by this terminal.
+
+        :rtype: T
+
+        """
+        return self.source
+
+    @property
+    def key(self):
+        """A stable identifier for this terminal, which is equal for every
+        ConstantTerminal having the same value and dtype.
+
+        :rtype: tuple
+
+        """
+        return (
+            'constant', getattr(self.dtype, '__name__', repr(self.dtype)),
+            self.source
+        )
+
+    def __repr__(self):
+        return 'ConstantTerminal(value={value}, dtype={dtype})'.format(
+            value=repr(self.source),
+            dtype=repr(self.dtype)
+        )
+
+    def __iter__(self):
+        return itertools.repeat(self.source)
+
+
+class EphemeralConstant(TerminalOperator):
+
+    __slots__ = ('distribution', 'size', 'seed', 'constants')
+
+    def __init__(self, distribution, dtype, size=256, seed=0, typecode=None):
+        """An EphemeralConstant is a terminal which stands for a constant
+        drawn at random each time a tree builder or mutation chooses it (an
+        "ephemeral random constant" in Koza1992). Values are drawn from a
+        fixed pool of *size* values which are generated once by calling
+        *distribution* with a random.Random seeded by *seed*, so the same
+        arguments always yield the same pool. The pool is stored in an
+        array.array when a *typecode* is given.
+
+        Drawing returns one of the pool's ConstantTerminals rather than a new
+        operator, so trees drawing the same value share an operator, and the
+        pool's constants can be registered with a
+        zoonomia.codec.OperatorRegistry like any other operator.
+
+        :param distribution:
+            A function which draws a single value of type T.
+
+        :type distribution: (random.Random) -> T
+
+        :param dtype: The type of the values drawn.
+        :type dtype: T
+
+        :param size: The number of values in the pool.
+        :type size: int
+
+        :param seed: The seed used to generate the pool.
+        :type seed: int
+
+        :param typecode:
+            Optionally, an array.array typecode with which to store the pool.
+
+        :type typecode: str
+
+        """
+        rng = random.Random(seed)
+        values = [distribution(rng) for _ in xrange(size)]
+
+        super(EphemeralConstant, self).__init__(
+            source=(
+                array.array(typecode, values) if typecode is not None
+                else tuple(values)
+            ),
+            dtype=dtype
+        )
+        self.distribution = distribution
+        self.size = size
+        self.seed = seed
+        self.constants = tuple(
+            ConstantTerminal(value=value, dtype=dtype) for value in self.source
+        )
+
+    @property
+    def key(self):
+        """A stable identifier for this terminal, which is equal for every
+        EphemeralConstant generating the same pool.
+
+        :rtype: tuple
+
+        """
+        return 'ephemeral', self.size, self.seed, tuple(self.source)
+
+    def constant(self, u):
+        """Returns the constant selected from the pool by a uniform variate.
+
+        :param u: A number in the interval [0, 1).
+        :type u: float
+
+        :rtype: zoonomia.solution.ConstantTerminal
+
+        """
+        return self.constants[int(u * self.size)]
+
+    def draw(self, rng):
+        """Returns a constant drawn uniformly from the pool.
+
+        :param rng: A random number generator.
+        :type rng: random.Random
+
+        :rtype: zoonomia.solution.ConstantTerminal
+
+        """
+        return self.constant(rng.random())
+
+    def __repr__(self):
+        return (
+            'EphemeralConstant(distribution={distribution}, dtype={dtype}, '
+            'size={size}, seed={seed})'
+        ).format(
+            distribution=repr(self.distribution),
+            dtype=repr(self.dtype),
+            size=repr(self.size),
+            seed=repr(self.seed)
+        )
 
 
 class OperatorSet(object):
@@ -270,6 +489,10 @@ class Fitness(object):
 
     __slots__ = ('score', '_objective', '_hash')
 
+    #: Whether the score is an estimate rather than a measurement (see
+    #: zoonomia.surrogate.PredictedFitness).
+    estimated = False
+
     def __init__(self, score, objective):
         """A Fitness maps a fitness measurement to an Objective.
 
@@ -363,18 +586,74 @@ class Solution(object):
             with self._lock:
                 if self._fitnesses is None:
                     self._fitnesses = tuple(
-                        self.map(
-                            lambda o: Fitness(
-                                score=o.evaluate(self), objective=o
-                            ),
-                            self.objectives
-                        )
+                        self.map(lambda o: o.evaluate(self), self.objectives)
                     )
                     self._hash = hash((self.objectives, self._fitnesses))
             return self._fitnesses
         else:
             return self._fitnesses
 
+    @property
+    def fitnesses(self):
+        """The cached Fitness measurements of this solution, or None if it
+        has not been evaluated yet. Reading this property never triggers an
+        evaluation.
+
+        :rtype: tuple[zoonomia.solution.Fitness] or None
+
+        """
+        return self._fitnesses
+
+    @property
+    def measured(self):
+        """The cached Fitness measurements of this solution, or None if it
+        has not been evaluated yet or any of them is an estimate (see
+        zoonomia.solution.Fitness.estimated). Serializers record only
+        measured fitnesses, so that estimates are never mistaken for
+        measurements elsewhere.
+
+        :rtype: tuple[zoonomia.solution.Fitness] or None
+
+        """
+        fitnesses = self._fitnesses
+        if fitnesses is None or any(f.estimated for f in fitnesses):
+            return None
+        return fitnesses
+
+    def set_fitnesses(self, fitnesses):
+        """Install Fitness measurements which were computed elsewhere (for
+        instance in another process) as this solution's cached evaluation.
+        Like *evaluate*, this transition happens at most once: if the solution
+        already has Fitness measurements they are kept and *fitnesses* is
+        ignored.
+
+        :param fitnesses:
+            One Fitness measurement per objective, in the same order as this
+            solution's objectives.
+
+        :type fitnesses: tuple[zoonomia.solution.Fitness]
+
+        :raise ValueError:
+            If the number of fitnesses does not match the number of
+            objectives.
+
+        :return: This solution's Fitness measurements.
+        :rtype: tuple[zoonomia.solution.Fitness]
+
+        """
+        fitnesses = tuple(fitnesses)
+
+        if len(fitnesses) != len(self.objectives):
+            raise ValueError('expected one fitness per objective')
+
+        if self._fitnesses is None:
+            with self._lock:
+                if self._fitnesses is None:
+                    self._fitnesses = fitnesses
+                    self._hash = hash((self.objectives, self._fitnesses))
+
+        return self._fitnesses
+
     def dominates(self, other):
         """Predicate function to determine whether this solution dominates
         another solution in the Pareto sense. That is, we say that this
@@ -410,12 +689,8 @@ class Solution(object):
 
     def __hash__(self):
         if self._hash is None:
-            with self._lock:
-                if self._hash is None:
-                    log.warn(
-                        'Evaluation triggered by hash for solution %s', self
-                    )
-                    self.evaluate()
+            log.warn('Evaluation triggered by hash for solution %s', self)
+            self.evaluate()
         return self._hash
 
     def __eq__(self, other):
@@ -432,7 +707,7 @@ class Solution(object):
 
     def __lt__(self, other):
         if self.objectives == other.objectives:
-            return self.dominates(other)
+            return other.dominates(self)
         else:
             return False
 
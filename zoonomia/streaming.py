@@ -0,0 +1,473 @@
+import logging
+
+from zoonomia.solution import Objective, Fitness, Solution
+from zoonomia.interpreter import Interpreter
+
+log = logging.getLogger(__name__)  # FIXME
+
+
+def _total(errors):
+    total = getattr(errors, 'sum', None)
+    return float(total()) if total is not None else float(sum(errors))
+
+
+def _count(errors):
+    return getattr(errors, 'size', None) or len(errors)
+
+
+def _maximum(errors):
+    maximum = getattr(errors, 'max', None)
+    return float(maximum()) if maximum is not None else float(max(errors))
+
+
+class Reducer(object):
+
+    __slots__ = ('initial', 'update', 'finish', 'bound')
+
+    def __init__(self, initial, update, finish, bound=None):
+        """A Reducer combines the errors of a solution on each fitness case
+        into a single score, one chunk of fitness cases at a time, so that
+        the score of a solution over a whole dataset can be accumulated
+        without holding all of its errors at once.
+
+        :param initial: The state before any errors have been seen.
+        :type initial: S
+
+        :param update:
+            A function which combines a state with the errors on a chunk of
+            fitness cases.
+
+        :type update: (S, collections.Sequence[float]) -> S
+
+        :param finish: A function which turns a final state into a score.
+        :type finish: (S) -> float
+
+        :param bound:
+            Optionally, a function taking a partial state and the total number
+            of fitness cases to a lower bound on the final score, assuming
+            every error is nonnegative. Reducers with a bound can be raced
+            (see StreamingExecutor).
+
+        :type bound: (S, int) -> float
+
+        """
+        self.initial = initial
+        self.update = update
+        self.finish = finish
+        self.bound = bound
+
+    def __repr__(self):
+        return (
+            'Reducer(initial={initial}, update={update}, finish={finish}, '
+            'bound={bound})'
+        ).format(
+            initial=repr(self.initial),
+            update=repr(self.update),
+            finish=repr(self.finish),
+            bound=repr(self.bound)
+        )
+
+
+SUM = Reducer(
+    initial=0.0,
+    update=lambda total, errors: total + _total(errors),
+    finish=float,
+    bound=lambda total, n_cases: total
+)
+
+MEAN = Reducer(
+    initial=(0.0, 0),
+    update=lambda state, errors: (
+        state[0] + _total(errors), state[1] + _count(errors)
+    ),
+    finish=lambda state: state[0] / state[1] if state[1] > 0 else 0.0,
+    bound=lambda state, n_cases: state[0] / n_cases if n_cases > 0 else 0.0
+)
+
+MAX = Reducer(
+    initial=float('-inf'),
+    update=lambda maximum, errors: max(maximum, _maximum(errors)),
+    finish=float,
+    bound=lambda maximum, n_cases: maximum
+)
+
+
+def absolute_error(target):
+    """Returns an error function measuring the absolute difference between a
+    tree's output and the column named *target* on each fitness case.
+
+    :param target: The name of the column holding the desired outputs.
+    :type target: str
+
+    :rtype: (numpy.ndarray, zoonomia.data.Dataset) -> numpy.ndarray
+
+    """
+    return lambda output, cases: abs(output - cases[target])
+
+
+def squared_error(target):
+    """Returns an error function measuring the squared difference between a
+    tree's output and the column named *target* on each fitness case.
+
+    :param target: The name of the column holding the desired outputs.
+    :type target: str
+
+    :rtype: (numpy.ndarray, zoonomia.data.Dataset) -> numpy.ndarray
+
+    """
+    return lambda output, cases: (output - cases[target]) ** 2
+
+
+class CaseObjective(Objective):
+
+    __slots__ = ('error', 'reducer', 'dataset')
+
+    def __init__(self, error, reducer, weight, dataset=None):
+        """A CaseObjective scores a solution by the output of its tree on
+        each fitness case of a dataset. The *error* function measures the
+        output against each fitness case and the *reducer* combines those
+        measurements into a score, so the objective can be accumulated over a
+        dataset chunk by chunk (see StreamingExecutor).
+
+        :param error:
+            A function taking a tree's output on a chunk of fitness cases and
+            the chunk itself to one error per fitness case.
+
+        :type error: (T, zoonomia.data.Dataset) -> collections.Sequence[float]
+
+        :param reducer: How to combine the errors into a score.
+        :type reducer: zoonomia.streaming.Reducer
+
+        :param weight:
+            The weight to give this objective. Errors should be minimized, so
+            this is usually negative.
+
+        :type weight: float
+
+        :param dataset:
+            Optionally, a dataset against which *evaluate* can score a single
+            solution outside of a StreamingExecutor.
+
+        :type dataset: zoonomia.data.Dataset
+
+        """
+        super(CaseObjective, self).__init__(eval_func=error, weight=weight)
+        self.error = error
+        self.reducer = reducer
+        self.dataset = dataset
+
+    @property
+    def weight(self):
+        """The weight given to this objective.
+
+        :rtype: float
+
+        """
+        return self._weight
+
+    def start(self):
+        """Returns the state of this objective before any fitness cases have
+        been seen.
+
+        """
+        return self.reducer.initial
+
+    def accumulate(self, state, output, cases):
+        """Returns *state* updated with the errors of *output* on a chunk of
+        fitness *cases*.
+
+        :param state: The state accumulated over the previous chunks.
+
+        :param output: A tree's output on *cases*.
+        :type output: T
+
+        :param cases: A chunk of fitness cases.
+        :type cases: zoonomia.data.Dataset
+
+        """
+        return self.reducer.update(state, self.error(output, cases))
+
+    def fitness(self, state):
+        """Returns the weighted Fitness measurement of a final *state*.
+
+        :rtype: zoonomia.solution.Fitness
+
+        """
+        return Fitness(
+            score=self.reducer.finish(state) * self._weight, objective=self
+        )
+
+    def optimistic(self, state, n_cases):
+        """Returns the best weighted Fitness measurement a solution could
+        still achieve given the *state* accumulated over part of the fitness
+        cases. Only reducers with a bound and errors which are minimized (a
+        negative weight) can be bounded; otherwise the score is infinite.
+
+        :param state: The state accumulated so far.
+
+        :param n_cases: The total number of fitness cases.
+        :type n_cases: int
+
+        :rtype: zoonomia.solution.Fitness
+
+        """
+        if self.reducer.bound is None or self._weight > 0:
+            score = float('inf')
+        else:
+            score = self.reducer.bound(state, n_cases) * self._weight
+        return Fitness(score=score, objective=self)
+
+    def evaluate(self, solution):
+        """Compute the fitness measurement of a solution against every fitness
+        case of this objective's dataset at once.
+
+        :param solution: A candidate solution.
+        :type solution: zoonomia.solution.Solution
+
+        :raise ValueError: If this objective has no dataset.
+
+        :rtype: zoonomia.solution.Fitness
+
+        """
+        if self.dataset is None:
+            raise ValueError('CaseObjective needs a dataset to evaluate')
+
+        output = Interpreter(bindings=self.dataset).evaluate(solution.tree)
+        return self.fitness(
+            self.accumulate(self.start(), output, self.dataset)
+        )
+
+    def __repr__(self):
+        return (
+            'CaseObjective(error={error}, reducer={reducer}, weight={weight})'
+        ).format(
+            error=repr(self.error),
+            reducer=repr(self.reducer),
+            weight=repr(self._weight)
+        )
+
+
+def threshold(scores, objectives):
+    """Returns a stand-in solution whose Fitness measurements are *scores*,
+    for racing a population against a tournament threshold (see
+    StreamingExecutor).
+
+    :param scores: One weighted score per objective.
+    :type scores: collections.Sequence[float]
+
+    :param objectives: The objectives of the solutions being raced.
+    :type objectives: tuple[zoonomia.solution.Objective]
+
+    :rtype: zoonomia.solution.Solution
+
+    """
+    rival = Solution(tree=None, objectives=objectives)
+    rival.set_fitnesses(
+        Fitness(score=score, objective=objective)
+        for score, objective in zip(scores, objectives)
+    )
+    return rival
+
+
+class StreamingExecutor(object):
+
+    __slots__ = (
+        'dataset', 'chunk_size', 'cache_budget', 'rivals', 'chunks_read',
+        'eliminated', 'cases_skipped'
+    )
+
+    def __init__(self, dataset, chunk_size, cache_budget=0, rivals=()):
+        """A StreamingExecutor evaluates a population against a dataset too
+        large to fit in memory by streaming its fitness cases in chunks of
+        *chunk_size*. Each chunk is read into memory once and the whole
+        population is evaluated against it before moving on to the next, so
+        each fitness case is read from disk once per call to *evaluate*
+        rather than once per solution.
+
+        CaseObjectives are accumulated chunk by chunk with their reducers.
+        Any other objectives of a solution are evaluated as usual before its
+        CaseObjectives.
+
+        Given *rivals*, the executor races the population against them:
+        after each chunk, a solution is eliminated as soon as some rival
+        dominates (see zoonomia.solution.Solution.dominates) the best Fitness
+        measurements it could still achieve on the remaining fitness cases.
+        Rivals are typically the current Pareto front, or a stand-in for a
+        tournament threshold (see *threshold*). An eliminated solution is
+        given the worst possible score, negative infinity, on every
+        objective, so that it never wins selection or enters a front ahead
+        of a fully evaluated solution, and so that exported or checkpointed
+        scores cannot be mistaken for a full evaluation. The fitness cases
+        it skipped are counted.
+
+        .. note::
+            Racing relies on the bounds of the objectives' reducers, which
+            assume that errors are nonnegative and minimized. Objectives
+            which cannot be bounded never eliminate a solution.
+
+        :param dataset: The fitness cases.
+        :type dataset: zoonomia.data.Dataset
+
+        :param chunk_size: The number of fitness cases per chunk.
+        :type chunk_size: int
+
+        :param cache_budget:
+            The cache budget of the interpreter used for each chunk (see
+            zoonomia.interpreter.Interpreter). Offspring share subtrees with
+            each other, so within a chunk a shared subtree only needs to be
+            evaluated once for the whole population.
+
+        :type cache_budget: int
+
+        :param rivals: Evaluated solutions to race the population against.
+        :type rivals: collections.Iterable[zoonomia.solution.Solution]
+
+        The following counters accumulate over every call to *evaluate*:
+
+        *chunks_read*
+            The number of chunks read from the dataset.
+
+        *eliminated*
+            The number of solutions eliminated by racing.
+
+        *cases_skipped*
+            The number of fitness case evaluations skipped by racing.
+
+        """
+        self.dataset = dataset
+        self.chunk_size = chunk_size
+        self.cache_budget = cache_budget
+        self.rivals = tuple(rivals)
+        self.chunks_read = 0
+        self.eliminated = 0
+        self.cases_skipped = 0
+
+    def chunks(self):
+        """Returns an iterator over the dataset's fitness cases, one chunk at
+        a time.
+
+        :rtype: collections.Iterator[zoonomia.data.Dataset]
+
+        """
+        for start in xrange(0, self.dataset.n_cases, self.chunk_size):
+            yield self.dataset.slice(
+                start, min(start + self.chunk_size, self.dataset.n_cases),
+                copy=True
+            )
+
+    def evaluate(self, solutions):
+        """Evaluate every solution in *solutions*.
+
+        :param solutions: The population to evaluate.
+        :type solutions: collections.Iterable[zoonomia.solution.Solution]
+
+        :return: The Fitness measurements of each solution, in order.
+        :rtype: tuple[tuple[zoonomia.solution.Fitness]]
+
+        """
+        solutions = tuple(solutions)
+        n_cases = self.dataset.n_cases
+        active = []
+        seen = set()
+
+        for solution in solutions:
+            if solution.fitnesses is None and id(solution) not in seen:
+                seen.add(id(solution))
+                active.append(
+                    (
+                        solution,
+                        [
+                            o.start() if isinstance(o, CaseObjective)
+                            else o.evaluate(solution)
+                            for o in solution.objectives
+                        ]
+                    )
+                )
+
+        rivals = tuple(r for r in self.rivals if r.fitnesses is not None)
+        streaming = any(
+            isinstance(o, CaseObjective)
+            for solution, _ in active for o in solution.objectives
+        )
+        chunks = self.chunks() if streaming else ()
+        n_seen = 0
+        eliminated = 0
+        skipped = 0
+
+        for cases in chunks:
+            if len(active) == 0:
+                break
+
+            self.chunks_read += 1
+            n_seen += cases.n_cases
+            interpreter = Interpreter(
+                bindings=cases, cache_budget=self.cache_budget
+            )
+            racing = []
+
+            for solution, state in active:
+                output = interpreter.evaluate(solution.tree)
+
+                for i, objective in enumerate(solution.objectives):
+                    if isinstance(objective, CaseObjective):
+                        state[i] = objective.accumulate(
+                            state[i], output, cases
+                        )
+
+                if len(rivals) > 0 and n_seen < n_cases:
+                    bound = self._optimistic(solution, state, n_cases)
+                    if any(rival.dominates(bound) for rival in rivals):
+                        solution.set_fitnesses(
+                            Fitness(score=float('-inf'), objective=o)
+                            for o in solution.objectives
+                        )
+                        eliminated += 1
+                        skipped += n_cases - n_seen
+                        continue
+
+                racing.append((solution, state))
+
+            active = racing
+
+        for solution, state in active:
+            solution.set_fitnesses(
+                objective.fitness(s) if isinstance(objective, CaseObjective)
+                else s
+                for objective, s in zip(solution.objectives, state)
+            )
+
+        if eliminated > 0:
+            log.info(
+                'Racing eliminated %d solutions, skipping %d fitness cases',
+                eliminated, skipped
+            )
+
+        self.eliminated += eliminated
+        self.cases_skipped += skipped
+
+        return tuple(solution.evaluate() for solution in solutions)
+
+    @staticmethod
+    def _optimistic(solution, state, n_cases):
+        bound = Solution(
+            tree=solution.tree,
+            objectives=solution.objectives,
+            map_=solution.map
+        )
+        bound.set_fitnesses(
+            objective.optimistic(s, n_cases)
+            if isinstance(objective, CaseObjective) else s
+            for objective, s in zip(solution.objectives, state)
+        )
+        return bound
+
+    def __repr__(self):
+        return (
+            'StreamingExecutor(dataset={dataset}, chunk_size={chunk_size}, '
+            'cache_budget={cache_budget}, rivals={rivals})'
+        ).format(
+            dataset=repr(self.dataset),
+            chunk_size=repr(self.chunk_size),
+            cache_budget=repr(self.cache_budget),
+            rivals=repr(self.rivals)
+        )
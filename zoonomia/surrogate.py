@@ -0,0 +1,398 @@
+import collections
+import heapq
+import itertools
+import logging
+import math
+import threading
+
+from zoonomia.solution import Fitness
+from zoonomia.interpreter import Interpreter
+
+log = logging.getLogger(__name__)  # FIXME
+
+
+def structural_features(operators):
+    """Returns a feature function which describes a tree by the number of
+    nodes applying each of *operators*, followed by its size and depth.
+
+    :param operators: The operators to count.
+    :type operators: collections.Iterable[BasisOperator|TerminalOperator]
+
+    :rtype: (zoonomia.tree.Tree) -> tuple[float]
+
+    """
+    positions = {operator: i for i, operator in enumerate(operators)}
+
+    def features(tree):
+        counts = [0.0] * (len(positions) + 2)
+        for node in tree.index.nodes:
+            i = positions.get(node.operator)
+            if i is not None:
+                counts[i] += 1.0
+        counts[-2] = float(tree.size)
+        counts[-1] = float(tree.depth)
+        return tuple(counts)
+
+    return features
+
+
+def phenotype_features(cases):
+    """Returns a feature function which describes a tree by its output on a
+    small sample of fitness *cases*, so that trees which compute similar
+    functions have similar features whatever their shape.
+
+    :param cases: A small sample of fitness cases.
+    :type cases: zoonomia.data.Dataset
+
+    :rtype: (zoonomia.tree.Tree) -> tuple[float]
+
+    """
+    interpreter = Interpreter(bindings=cases)
+
+    def features(tree):
+        output = interpreter.evaluate(tree)
+        if hasattr(output, '__len__'):
+            return tuple(float(value) for value in output)
+        else:
+            return (float(output),) * cases.n_cases
+
+    return features
+
+
+def _distance(a, b):
+    return math.sqrt(sum((x - y) ** 2 for x, y in itertools.izip(a, b)))
+
+
+def _concordance(predicted, actual):
+    concordant = 0
+    pairs = 0
+
+    for i, j in itertools.combinations(xrange(len(actual)), 2):
+        if actual[i] != actual[j]:
+            pairs += 1
+            if (predicted[i] - predicted[j]) * (actual[i] - actual[j]) > 0:
+                concordant += 1
+
+    return float(concordant) / pairs if pairs > 0 else 1.0
+
+
+class KNNSurrogate(object):
+
+    __slots__ = ('features', 'k', 'capacity', '_archive', '_lock')
+
+    def __init__(self, features, k=5, capacity=1024):
+        """A KNNSurrogate predicts the Fitness scores of a solution as the
+        mean scores of the *k* evaluated solutions nearest to it in feature
+        space. It remembers the features and scores of the last *capacity*
+        solutions it has observed.
+
+        :param features:
+            A function describing a tree by a vector of numbers, such as
+            those returned by *structural_features* and
+            *phenotype_features*.
+
+        :type features: (zoonomia.tree.Tree) -> tuple[float]
+
+        :param k: The number of neighbours to average.
+        :type k: int
+
+        :param capacity: The number of observations to remember.
+        :type capacity: int
+
+        """
+        self.features = features
+        self.k = k
+        self.capacity = capacity
+        self._archive = collections.deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def observe(self, solution):
+        """Remember the features and Fitness scores of an evaluated
+        solution.
+
+        :param solution: An evaluated solution.
+        :type solution: zoonomia.solution.Solution
+
+        """
+        observation = (
+            self.features(solution.tree),
+            tuple(f.score for f in solution.evaluate())
+        )
+        with self._lock:
+            self._archive.append(observation)
+
+    def predict(self, solution):
+        """Predict the Fitness scores of *solution*.
+
+        :param solution: A candidate solution.
+        :type solution: zoonomia.solution.Solution
+
+        :raise ValueError: If nothing has been observed yet.
+
+        :return: One predicted score per objective.
+        :rtype: tuple[float]
+
+        """
+        features = self.features(solution.tree)
+
+        with self._lock:
+            archive = tuple(self._archive)
+
+        if len(archive) == 0:
+            raise ValueError('cannot predict before observing any solutions')
+
+        nearest = heapq.nsmallest(
+            self.k, archive, key=lambda o: _distance(features, o[0])
+        )
+
+        return tuple(
+            sum(scores) / len(nearest)
+            for scores in zip(*(s for _, s in nearest))
+        )
+
+    def __len__(self):
+        return len(self._archive)
+
+    def __repr__(self):
+        return (
+            'KNNSurrogate(features={features}, k={k}, capacity={capacity})'
+        ).format(
+            features=repr(self.features),
+            k=repr(self.k),
+            capacity=repr(self.capacity)
+        )
+
+
+class PredictedFitness(Fitness):
+
+    __slots__ = ()
+
+    estimated = True
+
+    def __init__(self, score, objective):
+        """A PredictedFitness is a Fitness whose score was predicted by a
+        surrogate rather than measured. Predictions can overestimate a
+        solution, so a PredictedFitness compares worse than every measured
+        Fitness, whatever their scores, and is only ordered by score against
+        other predictions. A solution with predicted Fitness measurements
+        therefore never wins selection against, or dominates, a solution
+        evaluated in full. Serializers do not record predictions (see
+        zoonomia.solution.Solution.measured).
+
+        :param score: The predicted score.
+        :type score: float
+
+        :param objective: The objective the score was predicted for.
+        :type objective: zoonomia.solution.Objective
+
+        """
+        super(PredictedFitness, self).__init__(score, objective)
+
+    def __gt__(self, other):
+        return other.estimated and self.score > other.score
+
+    def __ge__(self, other):
+        return other.estimated and self.score >= other.score
+
+    def __lt__(self, other):
+        return not other.estimated or self.score < other.score
+
+    def __le__(self, other):
+        return not other.estimated or self.score <= other.score
+
+    def __repr__(self):
+        return 'PredictedFitness(score={score}, objective={objective})'.format(
+            score=repr(self.score), objective=repr(self._objective)
+        )
+
+
+class SurrogateExecutor(object):
+
+    __slots__ = (
+        'executor', 'surrogate', 'fraction', 'audit', 'warmup',
+        'min_concordance', 'errors', 'concordance', 'fallback', 'predicted',
+        'evaluated', 'fallbacks'
+    )
+
+    def __init__(
+        self, executor, surrogate, fraction=0.5, audit=0.1, warmup=64,
+        min_concordance=0.6
+    ):
+        """A SurrogateExecutor pre-screens a population with a cheap
+        surrogate model before evaluating it with another executor. The
+        surrogate predicts every unevaluated solution's Fitness scores, only
+        the most promising *fraction* of them (by the sum of their predicted
+        scores) is evaluated in full, and the rest are given their
+        predictions as PredictedFitness measurements, which lose every
+        comparison with a solution evaluated in full.
+
+        Fully evaluated solutions are fed back to the surrogate, and its
+        predictions for them are compared with their actual scores. So that
+        this comparison covers the whole range of predictions, an *audit*
+        fraction of the remaining solutions, spread evenly over their
+        ranking, is evaluated in full as well. When the rank concordance
+        between predicted and actual scores (the fraction of pairs of
+        solutions they order the same way) drops below *min_concordance* the
+        predictions have drifted, and the executor falls back to evaluating
+        everything in full, while still measuring the surrogate, until the
+        concordance recovers.
+
+        :param executor: The executor performing full evaluations.
+        :type executor: zoonomia.executor.MapExecutor
+
+        :param surrogate: The model predicting Fitness scores.
+        :type surrogate: zoonomia.surrogate.KNNSurrogate
+
+        :param fraction:
+            The fraction of each population to evaluate in full.
+
+        :type fraction: float
+
+        :param audit:
+            The fraction of the remaining solutions to evaluate in full to
+            check the surrogate's accuracy.
+
+        :type audit: float
+
+        :param warmup:
+            The number of observations the surrogate needs before it is
+            trusted.
+
+        :type warmup: int
+
+        :param min_concordance:
+            The rank concordance below which predictions are considered to
+            have drifted.
+
+        :type min_concordance: float
+
+        The following attributes report on the surrogate:
+
+        *errors*
+            The mean absolute error of the last predictions checked against
+            full evaluations, per objective.
+
+        *concordance*
+            The rank concordance of the last predictions checked against full
+            evaluations.
+
+        *fallback*
+            Whether the executor is currently evaluating everything in full.
+
+        *predicted*, *evaluated*, *fallbacks*
+            The number of solutions given predicted Fitness measurements, the
+            number evaluated in full, and the number of times the executor
+            has fallen back.
+
+        """
+        self.executor = executor
+        self.surrogate = surrogate
+        self.fraction = fraction
+        self.audit = audit
+        self.warmup = warmup
+        self.min_concordance = min_concordance
+        self.errors = None
+        self.concordance = None
+        self.fallback = False
+        self.predicted = 0
+        self.evaluated = 0
+        self.fallbacks = 0
+
+    def evaluate(self, solutions):
+        """Evaluate every solution in *solutions*, in full or by prediction.
+
+        :param solutions: The population to evaluate.
+        :type solutions: collections.Iterable[zoonomia.solution.Solution]
+
+        :return: The Fitness measurements of each solution, in order.
+        :rtype: tuple[tuple[zoonomia.solution.Fitness]]
+
+        """
+        solutions = tuple(solutions)
+        pending = []
+        seen = set()
+
+        for solution in solutions:
+            if solution.fitnesses is None and id(solution) not in seen:
+                seen.add(id(solution))
+                pending.append(solution)
+
+        if len(self.surrogate) < self.warmup or len(pending) == 0:
+            self._evaluate_fully(pending)
+        else:
+            predictions = [self.surrogate.predict(s) for s in pending]
+
+            if self.fallback:
+                full = range(len(pending))
+            else:
+                ranked = sorted(
+                    xrange(len(pending)), key=lambda i: -sum(predictions[i])
+                )
+                n_full = max(1, int(self.fraction * len(pending)))
+                rest = ranked[n_full:]
+                n_audit = int(self.audit * len(rest))
+                full = ranked[:n_full] + (
+                    rest[::len(rest) // n_audit][:n_audit] if n_audit > 0
+                    else []
+                )
+
+            self._evaluate_fully(pending[i] for i in full)
+            self._check(
+                [predictions[i] for i in full],
+                [pending[i].evaluate() for i in full]
+            )
+
+            for i in sorted(set(xrange(len(pending))).difference(full)):
+                pending[i].set_fitnesses(
+                    PredictedFitness(score=score, objective=objective)
+                    for score, objective in zip(
+                        predictions[i], pending[i].objectives
+                    )
+                )
+                self.predicted += 1
+
+        return tuple(solution.evaluate() for solution in solutions)
+
+    def _evaluate_fully(self, solutions):
+        solutions = tuple(solutions)
+        self.executor.evaluate(solutions)
+        self.evaluated += len(solutions)
+        for solution in solutions:
+            self.surrogate.observe(solution)
+
+    def _check(self, predictions, fitnesses):
+        actual = [tuple(f.score for f in fs) for fs in fitnesses]
+
+        self.errors = tuple(
+            sum(abs(p[i] - a[i]) for p, a in zip(predictions, actual)) /
+            len(actual)
+            for i in xrange(len(actual[0]))
+        )
+        self.concordance = _concordance(
+            [sum(p) for p in predictions], [sum(a) for a in actual]
+        )
+
+        drifted = self.concordance < self.min_concordance
+
+        if drifted and not self.fallback:
+            log.info(
+                'Surrogate drifted (concordance %.3f), falling back',
+                self.concordance
+            )
+            self.fallbacks += 1
+
+        self.fallback = drifted
+
+    def __repr__(self):
+        return (
+            'SurrogateExecutor(executor={executor}, surrogate={surrogate}, '
+            'fraction={fraction}, audit={audit}, warmup={warmup}, '
+            'min_concordance={min_concordance})'
+        ).format(
+            executor=repr(self.executor),
+            surrogate=repr(self.surrogate),
+            fraction=repr(self.fraction),
+            audit=repr(self.audit),
+            warmup=repr(self.warmup),
+            min_concordance=repr(self.min_concordance)
+        )
@@ -74,6 +74,20 @@ class Node(object):  # TODO: make lazy/immutable? make thread safe? Any gain?
             self._right[position - 1] = child
             self.right = tuple(r for r in reversed(self._right))
 
+    @property
+    def children(self):
+        """This node's children, in the order of its operator's signature.
+
+        :rtype: tuple[zoonomia.tree.Node]
+
+        """
+        if self.left is None:
+            return ()
+        elif self.right is None:
+            return self.left,
+        else:
+            return (self.left,) + tuple(reversed(self.right))
+
     def __repr__(self):
         return (
             'Node(id={id}, operator={operator}, left={left}, right={right})'
@@ -97,9 +111,15 @@ class Tree(object):
         nothing will change its nodes you can be sure that the tree is
         "effectively immutable" and therefore "safe".
 
+    .. note::
+        Because Nodes are effectively immutable once a Tree has been
+        constructed, trees are free to share subtrees with each other (and
+        even to refer to the same subtree from several places). Variation
+        operators rely on this to avoid copying unchanged subtrees.
+
     """
 
-    __slots__ = ('root', 'dtype')
+    __slots__ = ('root', 'dtype', '_index')
 
     def __init__(self, root):
         """A Tree instance is a thin wrapper around a tree data structure
@@ -116,6 +136,85 @@ class Tree(object):
         """
         self.root = root
         self.dtype = root.dtype
+        self._index = None
+
+    @property
+    def index(self):
+        """Structural metadata about this tree, computed on first access and
+        cached thereafter.
+
+        :rtype: zoonomia.tree.TreeIndex
+
+        """
+        if self._index is None:
+            self._index = TreeIndex(tree=self)
+        return self._index
+
+    @property
+    def size(self):
+        """The number of nodes in this tree.
+
+        :rtype: int
+
+        """
+        return len(self.index.nodes)
+
+    @property
+    def depth(self):
+        """The number of nodes on the longest path from the root to a leaf. A
+        tree consisting of a single terminal node has depth 1.
+
+        :rtype: int
+
+        """
+        return self.index.heights[-1]
+
+    def replace(self, index, node):
+        """Returns a new tree in which the subtree at post-order position
+        *index* of this tree is replaced by the subtree rooted at *node*. Only
+        the nodes on the path from that position up to the root are copied;
+        every other subtree is shared with this tree.
+
+        :param index: A post-order position in this tree. See TreeIndex.
+        :type index: int
+
+        :param node: The root of the replacement subtree.
+        :type node: zoonomia.tree.Node
+
+        :raise TypeError:
+            If *node*'s dtype does not match the dtype of the subtree it
+            replaces.
+
+        :return: The new tree.
+        :rtype: zoonomia.tree.Tree
+
+        """
+        tree_index = self.index
+
+        if tree_index.nodes[index].dtype is not node.dtype:
+            raise TypeError('replacement dtype does not match subtree dtype')
+
+        child = node
+        parent = tree_index.parents[index]
+
+        while parent != -1:
+            old_parent = tree_index.nodes[parent]
+            new_parent = Node(operator=old_parent.operator)
+
+            for position, old_child in enumerate(old_parent.children):
+                new_parent.add_child(
+                    child=(
+                        child if position == tree_index.positions[index]
+                        else old_child
+                    ),
+                    position=position
+                )
+
+            child = new_parent
+            index = parent
+            parent = tree_index.parents[index]
+
+        return Tree(root=child)
 
     def __iter__(self):
         """Returns a post-order depth-first iterator over all nodes in this
@@ -125,40 +224,138 @@ class Tree(object):
         :rtype: collections.Iterator[zoonomia.tree.Node]
 
         """
-        stack = [self.root]
-        last = None
+        stack = [(self.root, self.root.children)]
+        positions = [0]
 
         while len(stack) > 0:
-            node = stack.pop()
-
-            if node.left is None:
-                # this is a terminal node
+            node, children = stack[-1]
+            position = positions[-1]
+
+            if position < len(children):
+                # moving down into the next child
+                positions[-1] = position + 1
+                child = children[position]
+                stack.append((child, child.children))
+                positions.append(0)
+            else:
+                # all children visited, moving up
+                stack.pop()
+                positions.pop()
                 yield node
-            elif (
-                last is None
-            ) or (
-                node is last.left
-            ) or (
-                last.right is not None and node in last.right
-            ):
-                # moving down
-                stack.append(node)
-                stack.append(node.left)
-            elif last is node.left:
-                if node.right is None:
-                    # moving up on a unary branch
-                    yield node
-                else:
-                    # moving up and to the right
-                    for right in node.right:
-                        stack.append(node)
-                        stack.append(right)
-            elif node.right is not None and last in node.right:
-                if last is node.right[0]:
-                    # we are on the right-most branch moving up and to the left
-                    yield node
-                else:
-                    # we are on an inner-right branch moving upwards
-                    stack.append(node)
-
-            last = node
+
+
+class TreeIndex(object):
+
+    __slots__ = (
+        'nodes', 'sizes', 'heights', 'levels', 'parents', 'positions',
+        'by_dtype', 'hashes'
+    )
+
+    def __init__(self, tree):
+        """A TreeIndex holds structural metadata about a tree, laid out in
+        parallel tuples indexed by post-order position. Position :math:`i`
+        refers to the :math:`i`-th node yielded by iterating over the tree,
+        so the root is always the last position.
+
+        :param tree: The tree to index.
+        :type tree: zoonomia.tree.Tree
+
+        The following attributes are available:
+
+        *nodes*
+            The nodes of the tree in post-order.
+
+        *sizes*
+            The number of nodes in the subtree rooted at each position.
+
+        *heights*
+            The depth of the subtree rooted at each position, where a leaf has
+            height 1.
+
+        *levels*
+            The depth of each position below the root, where the root has
+            level 1.
+
+        *parents*
+            The position of each position's parent, or -1 for the root.
+
+        *positions*
+            The signature position each position occupies in its parent, or
+            -1 for the root.
+
+        *by_dtype*
+            A mapping from dtype to the tuple of positions having that dtype.
+
+        *hashes*
+            A structural hash of the subtree rooted at each position, so that
+            equal hashes identify (with high probability) subtrees which apply
+            the same operators in the same shape. Terminals contribute their
+            stable *key* where they have one (see
+            zoonomia.solution.VariableTerminal and
+            zoonomia.solution.ConstantTerminal), so separately drawn equal
+            constants hash alike.
+
+        """
+        nodes = []
+        sizes = []
+        heights = []
+        parents = []
+        positions = []
+        by_dtype = {}
+        hashes = []
+
+        stack = [(tree.root, tree.root.children, [])]
+        cursors = [0]
+
+        while len(stack) > 0:
+            node, children, finished = stack[-1]
+            cursor = cursors[-1]
+
+            if cursor < len(children):
+                cursors[-1] = cursor + 1
+                child = children[cursor]
+                stack.append((child, child.children, []))
+                cursors.append(0)
+            else:
+                stack.pop()
+                cursors.pop()
+
+                index = len(nodes)
+                nodes.append(node)
+                sizes.append(1 + sum(sizes[c] for c in finished))
+                heights.append(
+                    1 + max(heights[c] for c in finished) if finished else 1
+                )
+                parents.append(-1)
+                positions.append(-1)
+                by_dtype.setdefault(node.dtype, []).append(index)
+                hashes.append(
+                    hash(
+                        (getattr(node.operator, 'key', node.operator),) +
+                        tuple(hashes[c] for c in finished)
+                    )
+                )
+
+                for position, c in enumerate(finished):
+                    parents[c] = index
+                    positions[c] = position
+
+                if len(stack) > 0:
+                    stack[-1][2].append(index)
+
+        levels = [1 for _ in nodes]
+
+        # parents always come after their children in post-order
+        for index in xrange(len(nodes) - 2, -1, -1):
+            levels[index] = levels[parents[index]] + 1
+
+        self.nodes = tuple(nodes)
+        self.sizes = tuple(sizes)
+        self.heights = tuple(heights)
+        self.levels = tuple(levels)
+        self.parents = tuple(parents)
+        self.positions = tuple(positions)
+        self.by_dtype = {
+            dtype: tuple(indices) for dtype, indices in by_dtype.iteritems()
+        }
+        self.hashes = tuple(hashes)